@@ -0,0 +1,268 @@
+"""
+Token Accounting
+Per-call token usage and cost, rolled up per agent, stage and workflow,
+with optional per-workflow token and cost budgets
+"""
+
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+import threading
+
+from config import config
+from retrieval import estimate_tokens
+
+
+# Tokens added per chat message for role/formatting (OpenAI-style framing)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+# Models counted with the character estimate only: the simulated provider
+# must not pay for loading (or downloading) a tokenizer in benchmarks
+ESTIMATED_MODELS = frozenset({"simulated"})
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str) -> Any:
+    if model in ESTIMATED_MODELS:
+        return None
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Non-OpenAI models: cl100k is a reasonable approximation
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The BPE file could not be loaded (e.g. offline, no cache)
+        return None
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    Token count with tiktoken if installed and loadable, else a character
+    estimate (about 4 characters per token)
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = "") -> int:
+    """Prompt tokens for a list of chat messages"""
+    return sum(
+        count_tokens(m.get("content", ""), model) + MESSAGE_OVERHEAD_TOKENS
+        for m in messages
+    )
+
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse "model:prompt/completion,..." (USD per 1K tokens)"""
+    prices = {}
+    for item in spec.split(","):
+        model, _, rates = item.strip().rpartition(":")
+        if not model:
+            continue
+        prompt, _, completion = rates.partition("/")
+        prices[model] = (float(prompt or 0), float(completion or prompt or 0))
+    return prices
+
+
+class PriceTable:
+    """USD prices per 1K prompt/completion tokens; unlisted models are free"""
+
+    def __init__(self, prices: Dict[str, Tuple[float, float]]):
+        self.prices = prices
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        prompt_rate, completion_rate = self.prices.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_rate + completion_tokens * completion_rate) / 1000
+
+
+PRICES = PriceTable(parse_prices(config.LLM_PRICES))
+
+
+@dataclass
+class Usage:
+    """Token and cost totals"""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    estimated_calls: int = 0  # calls whose tokens were estimated locally
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cost: float, estimated: bool) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost_usd += cost
+        self.estimated_calls += int(estimated)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["total_tokens"] = self.total_tokens
+        data["cost_usd"] = round(self.cost_usd, 6)
+        return data
+
+
+class BudgetExceededError(Exception):
+    """Raised when an LLM call would exceed the workflow's budget"""
+
+
+class TokenLedger:
+    """
+    Token usage and cost for one workflow
+
+    Every LLM call is recorded against the current agent and stage. With a
+    token or cost budget, a call that would start past the budget is
+    refused (BudgetExceededError) and on_exceeded is called so the workflow
+    can be stopped; a call that finishes past it triggers on_exceeded too.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 0,
+        cost_budget: float = 0.0,
+        prices: Optional[PriceTable] = None,
+        on_exceeded: Optional[Callable[[], None]] = None,
+    ):
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.prices = prices or PRICES
+        self.on_exceeded = on_exceeded
+        self.stage = "none"
+        self.total = Usage()
+        self.by_agent: Dict[str, Usage] = {}
+        self.by_stage: Dict[str, Usage] = {}
+        self.exceeded = False
+        self._lock = threading.Lock()
+
+    def check(self, model: str, prompt_tokens: int) -> None:
+        """
+        Refuse a call whose prompt alone would take the workflow over budget
+
+        Raises:
+            BudgetExceededError: the budget is (or would be) exhausted
+        """
+        if self.exceeded or self._over_budget(
+            self.total.total_tokens + prompt_tokens,
+            self.total.cost_usd + self.prices.cost(model, prompt_tokens, 0),
+        ):
+            self._exceed()
+            raise BudgetExceededError(
+                f"Workflow budget exhausted ({self._budget_description()})"
+            )
+
+    def record(
+        self,
+        agent: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        estimated: bool = False,
+    ) -> float:
+        """Record one call; returns its cost in USD"""
+        cost = self.prices.cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            for usage in (
+                self.total,
+                self.by_agent.setdefault(agent, Usage()),
+                self.by_stage.setdefault(self.stage, Usage()),
+            ):
+                usage.add(prompt_tokens, completion_tokens, cost, estimated)
+            over = self._over_budget(self.total.total_tokens, self.total.cost_usd)
+
+        if over:
+            self._exceed()
+        return cost
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **self.total.to_dict(),
+            "by_agent": {k: v.to_dict() for k, v in self.by_agent.items()},
+            "by_stage": {k: v.to_dict() for k, v in self.by_stage.items()},
+            "budget": {
+                "tokens": self.token_budget or None,
+                "cost_usd": self.cost_budget or None,
+                "exceeded": self.exceeded,
+            },
+        }
+
+    def _over_budget(self, tokens: int, cost: float) -> bool:
+        return bool(
+            (self.token_budget and tokens > self.token_budget)
+            or (self.cost_budget and cost > self.cost_budget)
+        )
+
+    def _budget_description(self) -> str:
+        parts = []
+        if self.token_budget:
+            parts.append(f"{self.total.total_tokens}/{self.token_budget} tokens")
+        if self.cost_budget:
+            parts.append(f"${self.total.cost_usd:.4f}/${self.cost_budget:.4f}")
+        return ", ".join(parts)
+
+    def _exceed(self) -> None:
+        if not self.exceeded:
+            self.exceeded = True
+            if self.on_exceeded is not None:
+                self.on_exceeded()
+
+
+# Ledger of the workflow running in this task, and usage scopes (one per
+# agent execution) that LLM calls are added to
+current_ledger: ContextVar[Optional[TokenLedger]] = ContextVar("current_ledger", default=None)
+_usage_scopes: ContextVar[Tuple[Usage, ...]] = ContextVar("usage_scopes", default=())
+
+
+@contextmanager
+def ledger_context(ledger: TokenLedger) -> Iterator[TokenLedger]:
+    """Record the LLM calls made inside the block in ledger"""
+    token = current_ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        current_ledger.reset(token)
+
+
+@contextmanager
+def usage_scope() -> Iterator[Usage]:
+    """Collect the usage of the LLM calls made inside the block"""
+    usage = Usage()
+    token = _usage_scopes.set(_usage_scopes.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _usage_scopes.reset(token)
+
+
+def record_usage(
+    agent: str,
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    estimated: bool = False,
+) -> float:
+    """Add one call to the current ledger and usage scopes; returns cost"""
+    ledger = current_ledger.get()
+    if ledger is not None:
+        cost = ledger.record(agent, model, prompt_tokens, completion_tokens, estimated)
+    else:
+        cost = PRICES.cost(model, prompt_tokens, completion_tokens)
+
+    for usage in _usage_scopes.get():
+        usage.add(prompt_tokens, completion_tokens, cost, estimated)
+    return cost
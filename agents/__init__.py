@@ -7,6 +7,7 @@ from .base_agent import BaseAgent, AgentResponse
 from .data_ingestion_agent import DataIngestionAgent
 from .analysis_agent import AnalysisAgent
 from .reasoning_agent import ReasoningAgent
+from .allocation_agent import AllocationAgent
 from .decision_agent import DecisionAgent
 from .execution_agent import ExecutionAgent
 
@@ -16,6 +17,7 @@ __all__ = [
     "DataIngestionAgent",
     "AnalysisAgent",
     "ReasoningAgent",
+    "AllocationAgent",
     "DecisionAgent",
     "ExecutionAgent",
 ]
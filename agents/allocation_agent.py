@@ -0,0 +1,76 @@
+"""
+Allocation Agent
+Distributes available resources across regions with a local optimizer
+Turns the ingested facts into hard numbers for the decision and execution plan
+"""
+
+from typing import Dict, Any
+from .base_agent import BaseAgent, AgentResponse
+from config import config
+
+
+class AllocationAgent(BaseAgent):
+    """
+    Agent that allocates resources across regions under budget and capacity limits
+    """
+
+    def __init__(self):
+        super().__init__(
+            name="AllocationAgent",
+            description="Optimizes the allocation of resources across regions (no LLM calls)",
+        )
+
+    async def execute(self, task: Dict[str, Any]) -> AgentResponse:
+        """
+        Allocate the scenario's resources across its regions
+
+        Args:
+            task: {
+                "data": Dict (ingested data: situation report or records),
+                "allocation": Dict (optional spec: resources, regions,
+                    budget, method, min_share; see allocation.build_model),
+                "constraints": Dict (budget limit fallback),
+                "resources": Dict (scenario resources)
+            }
+
+        Returns:
+            AgentResponse with the allocation (None when the facts name no
+            regions or no resources)
+        """
+        from allocation import allocate, build_model  # deferred: numpy adds ~80 ms to import
+
+        try:
+            spec = task.get("allocation") or {}
+            model = build_model(
+                task.get("data"), spec, task.get("constraints"), task.get("resources")
+            )
+
+            allocation = None
+            if model.regions and model.resources:
+                allocation = allocate(
+                    model,
+                    method=spec.get("method") or config.ALLOCATION_METHOD,
+                    min_share=float(spec.get("min_share", config.ALLOCATION_MIN_SHARE)),
+                )
+
+            response = AgentResponse(
+                agent_name=self.name,
+                status="success",
+                data={"allocation": allocation},
+                metadata={
+                    "regions": len(model.regions),
+                    "resources": len(model.resources),
+                    "method": allocation["method"] if allocation else None,
+                    "duration_ms": allocation["duration_ms"] if allocation else 0.0,
+                },
+            )
+
+        except Exception as e:
+            response = AgentResponse(
+                agent_name=self.name,
+                status="error",
+                error_message=str(e),
+            )
+
+        self.log_execution(response)
+        return response
@@ -4,10 +4,12 @@ Extracts insights, identifies constraints, and performs data analysis
 Uses LLM for intelligent analysis of unstructured data
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from .base_agent import BaseAgent, AgentResponse
 from config import config
 from llm_client import llm_client
+from metrics import call_context
+from retrieval import ANALYSIS_QUERIES, estimate_tokens
 
 
 class AnalysisAgent(BaseAgent):
@@ -30,7 +32,8 @@ class AnalysisAgent(BaseAgent):
             task: {
                 "data": Any (data to analyze),
                 "analysis_type": "constraints" | "insights" | "risks" | "summary",
-                "context": str (optional context about the operational decision)
+                "context": str (optional context about the operational decision),
+                "retrieval_index": BM25Index (optional, selects relevant chunks)
             }
 
         Returns:
@@ -40,9 +43,18 @@ class AnalysisAgent(BaseAgent):
             data = task.get("data")
             analysis_type = task.get("analysis_type", "insights")
             context = task.get("context", "")
+            index = task.get("retrieval_index")
+
+            # Select the slice of the data this analysis type actually needs
+            data_excerpt, retrieved_chunks = self._select_context(
+                data, analysis_type, context, index
+            )
 
             # Perform LLM-based analysis
-            analysis_result = await self._analyze_with_llm(data, analysis_type, context)
+            with call_context(operation=analysis_type):
+                analysis_result = await self._analyze_with_llm(
+                    data_excerpt, analysis_type, context
+                )
 
             response = AgentResponse(
                 agent_name=self.name,
@@ -54,6 +66,8 @@ class AnalysisAgent(BaseAgent):
                 metadata={
                     "provider": config.LLM_PROVIDER,
                     "context_provided": bool(context),
+                    "retrieved_chunks": retrieved_chunks,
+                    "context_tokens": estimate_tokens(data_excerpt),
                 },
             )
 
@@ -67,8 +81,29 @@ class AnalysisAgent(BaseAgent):
         self.log_execution(response)
         return response
 
+    def _select_context(
+        self, data: Any, analysis_type: str, context: str, index: Any
+    ) -> Tuple[str, int]:
+        """
+        Build the data excerpt for the prompt
+
+        With a retrieval index, the top-k chunks matching the analysis type's
+        query terms (plus the decision context) are selected within the token
+        budget. Without one, the leading slice of the raw data is used.
+        """
+        if index is None or not len(index):
+            return str(data)[:4000], 0
+
+        query = f"{ANALYSIS_QUERIES.get(analysis_type, ANALYSIS_QUERIES['insights'])} {context}"
+        chunks = index.select(
+            query,
+            token_budget=config.RETRIEVAL_TOKEN_BUDGET,
+            k=config.RETRIEVAL_TOP_K,
+        )
+        return "\n...\n".join(chunks), len(chunks)
+
     async def _analyze_with_llm(
-        self, data: Any, analysis_type: str, context: str
+        self, data: str, analysis_type: str, context: str
     ) -> Dict[str, Any]:
         """Use LLM to perform intelligent analysis"""
 
@@ -131,7 +166,7 @@ class AnalysisAgent(BaseAgent):
         }
 
         prompt = prompts.get(analysis_type, prompts["insights"]).format(
-            data=str(data)[:4000],  # Limit data size
+            data=data,
             context=context,
         )
 
@@ -7,6 +7,10 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
+from metrics import call_context
+from accounting import usage_scope
+from tracing import tracer
+import functools
 import json
 
 
@@ -35,6 +39,13 @@ class BaseAgent(ABC):
     Defines the interface that all agents must implement
     """
 
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        # Trace execute() and label the LLM calls it makes with the agent's name
+        execute = cls.__dict__.get("execute")
+        if execute is not None and not getattr(execute, "__isabstractmethod__", False):
+            cls.execute = _with_agent_context(execute)
+
     def __init__(self, name: str, description: str, tools: Optional[List[Any]] = None):
         self.name = name
         self.description = description
@@ -69,3 +80,25 @@ class BaseAgent(ABC):
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(name='{self.name}')"
+
+
+def _with_agent_context(execute):
+    """Wrap an agent's execute() in a span and attribute its LLM calls
+
+    The tokens and cost of those calls are added to the response metadata.
+    """
+
+    @functools.wraps(execute)
+    async def wrapper(self: BaseAgent, task: Dict[str, Any]) -> AgentResponse:
+        with tracer.span("agent.execute", {"agent.name": self.name}) as span, \
+                call_context(agent=self.name, operation="execute"), \
+                usage_scope() as usage:
+            response = await execute(self, task)
+            if usage.calls:
+                response.metadata["usage"] = usage.to_dict()
+            span.set_attribute("agent.status", response.status)
+            if response.status == "error":
+                span.set_status("ERROR", response.error_message)
+            return response
+
+    return wrapper
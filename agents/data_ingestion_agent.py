@@ -8,9 +8,9 @@ import json
 import csv
 from typing import Dict, Any, List
 from pathlib import Path
-import PyPDF2
-import pandas as pd
 from .base_agent import BaseAgent, AgentResponse
+from config import config
+from retrieval import BM25Index
 
 
 class DataIngestionAgent(BaseAgent):
@@ -71,6 +71,20 @@ class DataIngestionAgent(BaseAgent):
         self.log_execution(response)
         return response
 
+    def build_index(self, data: Dict[str, Any]) -> BM25Index:
+        """
+        Chunk ingested content and build a BM25 retrieval index over it
+
+        Args:
+            data: The data dict returned by execute()
+
+        Returns:
+            BM25Index used by downstream agents to select relevant context
+        """
+        return BM25Index.from_content(
+            data.get("content"), chunk_tokens=config.RETRIEVAL_CHUNK_TOKENS
+        )
+
     async def _ingest_file(self, file_path: str) -> Dict[str, Any]:
         """Ingest data from file based on extension"""
         path = Path(file_path)
@@ -95,6 +109,8 @@ class DataIngestionAgent(BaseAgent):
 
     def _read_pdf(self, path: Path) -> Dict[str, Any]:
         """Extract text from PDF"""
+        import PyPDF2  # deferred: only needed for PDF sources
+
         with open(path, "rb") as file:
             reader = PyPDF2.PdfReader(file)
             text = ""
@@ -109,6 +125,8 @@ class DataIngestionAgent(BaseAgent):
 
     def _read_csv(self, path: Path) -> Dict[str, Any]:
         """Read CSV file into structured format"""
+        import pandas as pd  # deferred: pandas dominates import time
+
         df = pd.read_csv(path)
         return {
             "content": df.to_dict(orient="records"),
@@ -138,6 +156,8 @@ class DataIngestionAgent(BaseAgent):
 
     def _read_excel(self, path: Path) -> Dict[str, Any]:
         """Read Excel file"""
+        import pandas as pd
+
         df = pd.read_excel(path)
         return {
             "content": df.to_dict(orient="records"),
@@ -1,10 +1,15 @@
 """
 Decision Agent
 Makes final recommendations based on analysis and reasoning
-Synthesizes inputs from multiple agents
+Synthesizes inputs from multiple agents, optionally as a self-consistency
+ensemble of concurrent samples (DECISION_SAMPLES)
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from collections import Counter, defaultdict
+import asyncio
+import re
+
 from .base_agent import BaseAgent, AgentResponse
 from config import config
 from llm_client import llm_client
@@ -30,6 +35,7 @@ class DecisionAgent(BaseAgent):
             task: {
                 "analysis_results": Dict (from AnalysisAgent),
                 "reasoning_results": Dict (from ReasoningAgent),
+                "allocation": Dict (optional, from AllocationAgent),
                 "context": str (decision context),
                 "decision_criteria": Dict (final criteria for decision)
             }
@@ -40,22 +46,36 @@ class DecisionAgent(BaseAgent):
         try:
             analysis = task.get("analysis_results", {})
             reasoning = task.get("reasoning_results", {})
+            allocation = task.get("allocation")
             context = task.get("context", "")
             criteria = task.get("decision_criteria", {})
 
             # Synthesize and make decision
-            decision = await self._make_decision(analysis, reasoning, context, criteria)
+            ensemble = None
+            if config.DECISION_SAMPLES > 1:
+                decision, ensemble = await self._decide_by_ensemble(
+                    analysis, reasoning, context, criteria, allocation
+                )
+            else:
+                decision = await self._make_decision(
+                    analysis, reasoning, context, criteria, allocation
+                )
+
+            data = {
+                "decision": decision,
+                "confidence_level": decision.get("confidence", "medium"),
+            }
+            if ensemble is not None:
+                data["ensemble"] = ensemble
 
             response = AgentResponse(
                 agent_name=self.name,
                 status="success",
-                data={
-                    "decision": decision,
-                    "confidence_level": decision.get("confidence", "medium"),
-                },
+                data=data,
                 metadata={
                     "has_analysis": bool(analysis),
                     "has_reasoning": bool(reasoning),
+                    "samples": ensemble["samples"] if ensemble else 1,
                 },
             )
 
@@ -75,6 +95,7 @@ class DecisionAgent(BaseAgent):
         reasoning: Dict,
         context: str,
         criteria: Dict,
+        allocation: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Synthesize all inputs and make final decision"""
 
@@ -88,7 +109,8 @@ class DecisionAgent(BaseAgent):
 
         REASONING AND EVALUATION:
         {self._format_reasoning(reasoning)}
-
+        {self._format_sensitivity(reasoning)}
+        {self._format_allocation(allocation)}
         DECISION CRITERIA:
         {self._format_criteria(criteria)}
 
@@ -128,6 +150,139 @@ class DecisionAgent(BaseAgent):
 
         return result
 
+    async def _decide_by_ensemble(
+        self,
+        analysis: Dict,
+        reasoning: Dict,
+        context: str,
+        criteria: Dict,
+        allocation: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Self-consistency decision from several concurrent samples
+
+        Samples are drawn in concurrent waves of DECISION_ENSEMBLE_WAVE
+        (so a wave costs the wall-clock time of one call) until the leading
+        recommendation holds DECISION_AGREEMENT of the votes or
+        DECISION_SAMPLES have been drawn. Votes are weighted by each
+        sample's stated confidence.
+
+        Returns:
+            (decision of the winning recommendation with the highest
+            confidence, ensemble summary with agreement score and votes)
+        """
+        max_samples = config.DECISION_SAMPLES
+        wave = max(1, min(config.DECISION_ENSEMBLE_WAVE, max_samples))
+        candidates = self._option_candidates(reasoning)
+
+        samples: List[Tuple[str, float, Dict[str, Any]]] = []
+        errors = []
+        waves = 0
+        while len(samples) + len(errors) < max_samples:
+            size = min(wave, max_samples - len(samples) - len(errors))
+            drawn = await asyncio.gather(
+                *(
+                    self._make_decision(analysis, reasoning, context, criteria, allocation)
+                    for _ in range(size)
+                ),
+                return_exceptions=True,
+            )
+            waves += 1
+            for sample in drawn:
+                if isinstance(sample, BaseException):
+                    if not isinstance(sample, Exception):
+                        raise sample
+                    errors.append(sample)
+                else:
+                    samples.append(
+                        (self._vote_key(sample, candidates), self._confidence_weight(sample), sample)
+                    )
+            if not samples:
+                raise errors[0]
+
+            counts = Counter(key for key, _, _ in samples)
+            leading = counts.most_common(1)[0][1]
+            if len(samples) > 1 and leading / len(samples) >= config.DECISION_AGREEMENT:
+                break
+
+        weights = defaultdict(float)
+        for key, weight, _ in samples:
+            weights[key] += weight
+        counts = Counter(key for key, _, _ in samples)
+        winner = max(weights, key=lambda key: (weights[key], counts[key]))
+        decision = max(
+            (sample for key, _, sample in samples if key == winner),
+            key=self._confidence_weight,
+        )
+
+        alternatives = []
+        for key, _ in counts.most_common():
+            if key != winner:
+                sample = next(s for k, _, s in samples if k == key)
+                alternatives.append({
+                    "vote": key,
+                    "count": counts[key],
+                    "decision": sample.get("RECOMMENDED DECISION") or sample.get("decision_summary"),
+                })
+
+        ensemble = {
+            "samples": len(samples),
+            "failed_samples": len(errors),
+            "waves": waves,
+            "stopped_early": len(samples) + len(errors) < max_samples,
+            "winner": winner,
+            "agreement": round(counts[winner] / len(samples), 3),
+            "weighted_agreement": round(weights[winner] / sum(weights.values()), 3),
+            "votes": dict(counts.most_common()),
+            "alternatives": alternatives,
+        }
+        return decision, ensemble
+
+    def _option_candidates(self, reasoning: Dict) -> Dict[str, str]:
+        """Option ids and names from the reasoning results -> option id"""
+        result = reasoning.get("reasoning", {}) if isinstance(reasoning, dict) else {}
+        candidates = {}
+        for key in ("evaluation", "ranked_recommendations"):
+            entries = result.get(key) if isinstance(result, dict) else None
+            for entry in entries if isinstance(entries, list) else []:
+                if not isinstance(entry, dict) or not entry.get("option_id"):
+                    continue
+                option_id = str(entry["option_id"])
+                candidates[option_id.lower()] = option_id
+                if entry.get("option_name"):
+                    candidates[str(entry["option_name"]).lower()] = option_id
+        return candidates
+
+    def _vote_key(self, decision: Dict[str, Any], candidates: Dict[str, str]) -> str:
+        """
+        What a sample votes for: the option it names, else its normalized text
+
+        Only the ids and names of the reasoning's options count; the one
+        mentioned first wins ("opt_2 rather than opt_1" votes opt_2), and
+        whole-word matching keeps "opt_12" from reading as "opt_1".
+        """
+        text = str(
+            decision.get("RECOMMENDED DECISION") or decision.get("decision_summary") or ""
+        ).lower()
+        mentions = []
+        for name, option_id in candidates.items():
+            found = re.search(rf"(?<!\w){re.escape(name)}(?!\w)", text)
+            if found:
+                mentions.append((found.start(), -len(name), option_id))
+        if mentions:
+            return min(mentions)[2]
+        return " ".join(re.sub(r"[^\w\s]", " ", text).split())[:200]
+
+    def _confidence_weight(self, decision: Dict[str, Any]) -> float:
+        """Vote weight from a sample's stated confidence (High 1, Medium 2/3, Low 1/3)"""
+        level = str(
+            decision.get("CONFIDENCE LEVEL") or decision.get("confidence") or ""
+        ).strip().lower()
+        for prefix, weight in (("high", 1.0), ("medium", 2 / 3), ("low", 1 / 3)):
+            if level.startswith(prefix):
+                return weight
+        return 0.5
+
     def _format_analysis(self, analysis: Dict) -> str:
         """Format analysis results for prompt"""
         if not analysis:
@@ -146,6 +301,41 @@ class DecisionAgent(BaseAgent):
 
         return json.dumps(reasoning, indent=2)[:2000]  # Limit size
 
+    def _format_sensitivity(self, reasoning: Dict) -> str:
+        """Prompt section on how robust the ranking is ("" without an analysis)"""
+        sensitivity = reasoning.get("sensitivity") if isinstance(reasoning, dict) else None
+        if not sensitivity:
+            return ""
+
+        model = sensitivity.get("model", "additive")
+        perturbed = "overall-score" if model == "overall_score" else "weight/score"
+        scored = "objective weights fitted to the overall scores" if model == "objective_scores" else model
+        lines = [
+            f"RANKING ROBUSTNESS ({sensitivity['samples']} perturbed {perturbed} samples, "
+            f"re-scored with {scored}):",
+            f"- {sensitivity['leader']} (ranked first) stays first with probability "
+            f"{sensitivity['leader_probability']:.0%}",
+        ]
+        if sensitivity.get("model_leader", sensitivity["leader"]) != sensitivity["leader"]:
+            lines.append(f"- by its scores alone, {sensitivity['model_leader']} would rank first")
+        for option in sensitivity["options"][:5]:
+            low, high = option["rank_interval"]
+            lines.append(
+                f"- {option['option_id']}: P(rank 1) {option['p_first']:.0%}, rank {low}-{high} (90% interval)"
+            )
+        for flip in sensitivity["flip_points"][:3]:
+            lines.append(
+                f"- {flip['new_leader']} would lead if {flip['criterion']} weighed "
+                f"{flip['flip_weight']:.2f} instead of {flip['base_weight']:.2f}"
+            )
+        return "\n        ".join(lines) + "\n"
+
+    def _format_allocation(self, allocation: Optional[Dict[str, Any]]) -> str:
+        """Prompt section with the computed allocation ("" without one)"""
+        from allocation import format_allocation  # deferred: numpy adds ~80 ms to import
+
+        return format_allocation(allocation, config.ALLOCATION_PROMPT_REGIONS)
+
     def _format_criteria(self, criteria: Dict) -> str:
         """Format decision criteria"""
         if not criteria:
@@ -4,7 +4,7 @@ Generates actionable execution plans, reports, and workflows
 Prepares outputs for real-world implementation
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from .base_agent import BaseAgent, AgentResponse
 from config import config
@@ -33,6 +33,7 @@ class ExecutionAgent(BaseAgent):
                 "decision": Dict (from DecisionAgent),
                 "resources": Dict (available resources),
                 "timeline": str (timeframe for execution),
+                "allocation": Dict (optional, from AllocationAgent),
                 "output_format": "detailed_plan" | "gantt_data" | "report"
             }
 
@@ -43,11 +44,12 @@ class ExecutionAgent(BaseAgent):
             decision = task.get("decision", {})
             resources = task.get("resources", {})
             timeline = task.get("timeline", "30 days")
+            allocation = task.get("allocation")
             output_format = task.get("output_format", "detailed_plan")
 
             # Generate execution plan
             execution_plan = await self._generate_execution_plan(
-                decision, resources, timeline, output_format
+                decision, resources, timeline, output_format, allocation
             )
 
             # Generate report if requested
@@ -84,8 +86,10 @@ class ExecutionAgent(BaseAgent):
         resources: Dict,
         timeline: str,
         output_format: str,
+        allocation: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Generate detailed execution plan using LLM"""
+        from allocation import format_allocation  # deferred: numpy adds ~80 ms to import
 
         prompt = f"""
         You are a project manager responsible for executing national-scale operational decisions.
@@ -96,6 +100,7 @@ class ExecutionAgent(BaseAgent):
         AVAILABLE RESOURCES:
         {json.dumps(resources, indent=2) if resources else "Standard government resources"}
 
+        {format_allocation(allocation, config.ALLOCATION_PROMPT_REGIONS)}
         TIMELINE: {timeline}
 
         OUTPUT FORMAT: {output_format}
@@ -1,12 +1,18 @@
 """
 Reasoning Agent
 Evaluates options against constraints and performs multi-criteria reasoning
-Uses LLM for complex reasoning tasks
+Scores and ranks options with the local MCDA engine when criteria are given
+(REASONING_MODE), using the LLM for the qualitative assessment
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+import time
+
 from .base_agent import BaseAgent, AgentResponse
 from config import config
+from feasibility import check_options, option_id, split_feasible
 from llm_client import llm_client
 
 
@@ -31,7 +37,10 @@ class ReasoningAgent(BaseAgent):
                 "options": List[Dict] (available options/alternatives),
                 "constraints": Dict (identified constraints),
                 "objectives": List[str] (decision objectives),
-                "context": str (decision context)
+                "context": str (decision context),
+                "criteria": Dict (optional MCDA spec: weights, directions,
+                    pairwise, method; see mcda.resolve_criteria),
+                "retrieval_index": BM25Index (optional, per-option evidence)
             }
 
         Returns:
@@ -42,11 +51,27 @@ class ReasoningAgent(BaseAgent):
             constraints = task.get("constraints", {})
             objectives = task.get("objectives", [])
             context = task.get("context", "")
+            criteria = task.get("criteria")
+            index = task.get("retrieval_index")
+
+            # Rule out options that break a numeric limit before reasoning
+            feasibility = None
+            ruled_out = []
+            if config.CONSTRAINT_PREFILTER != "off" and options:
+                feasibility = check_options(options, constraints)
+                options, ruled_out = split_feasible(options, feasibility)
+
+            # Pull supporting evidence from the source data for each option
+            evidence = self._retrieve_evidence(options, index)
 
             # Perform constraint-based reasoning
             reasoning_result = await self._reason_with_constraints(
-                options, constraints, objectives, context
+                options, constraints, objectives, context, evidence, criteria,
+                self._summarize_ruled_out(ruled_out, feasibility),
             )
+            if feasibility is not None:
+                self._apply_feasibility(reasoning_result, feasibility)
+            sensitivity = self._analyze_sensitivity(reasoning_result)
 
             response = AgentResponse(
                 agent_name=self.name,
@@ -54,10 +79,16 @@ class ReasoningAgent(BaseAgent):
                 data={
                     "reasoning": reasoning_result,
                     "evaluated_options": len(options),
+                    "ruled_out_options": [o["option_id"] for o in ruled_out],
+                    "sensitivity": sensitivity,
                 },
                 metadata={
                     "constraints_count": len(constraints) if isinstance(constraints, dict) else 0,
                     "objectives_count": len(objectives),
+                    "evidence_chunks": sum(len(chunks) for chunks in evidence.values()),
+                    "scoring": "local" if "scoring" in reasoning_result else "llm",
+                    "infeasible_options": len(ruled_out),
+                    "feasibility": feasibility,
                 },
             )
 
@@ -77,6 +108,49 @@ class ReasoningAgent(BaseAgent):
         constraints: Dict,
         objectives: List[str],
         context: str,
+        evidence: Optional[Dict[int, List[str]]] = None,
+        criteria: Optional[Dict[str, Any]] = None,
+        ruled_out: str = "",
+    ) -> Dict[str, Any]:
+        """
+        Evaluate and rank options
+
+        In "local" mode, or in "hybrid" mode when the scenario defines
+        criteria (or options carry criterion values), scores and rankings
+        come from the MCDA engine and the LLM only assesses pros, cons,
+        risks and justifications ("local" skips it). Otherwise the LLM
+        does the whole evaluation. ruled_out summarizes options already
+        excluded as infeasible.
+        """
+        mode = config.REASONING_MODE
+        if mode != "llm" and options and (
+            mode == "local" or criteria or any("criteria" in o for o in options)
+        ):
+            ranking = self._rank_locally(options, criteria)
+            if mode == "local":
+                return self._local_result(ranking)
+            assessment = await self._assess_ranking(
+                ranking, options, constraints, objectives, context, evidence, ruled_out
+            )
+            return self._merge_assessment(ranking, assessment)
+
+        shard_size = config.REASONING_SHARD_SIZE
+        if shard_size > 0 and len(options) > shard_size:
+            return await self._reason_sharded(
+                options, constraints, objectives, context, evidence, ruled_out
+            )
+        return await self._evaluate_with_llm(
+            options, constraints, objectives, context, evidence, ruled_out
+        )
+
+    async def _evaluate_with_llm(
+        self,
+        options: List[Dict],
+        constraints: Dict,
+        objectives: List[str],
+        context: str,
+        evidence: Optional[Dict[int, List[str]]] = None,
+        ruled_out: str = "",
     ) -> Dict[str, Any]:
         """Use LLM to perform constraint-based reasoning"""
 
@@ -92,8 +166,8 @@ class ReasoningAgent(BaseAgent):
         {self._format_constraints(constraints)}
 
         AVAILABLE OPTIONS:
-        {self._format_options(options)}
-
+        {self._format_options(options, evidence)}
+        {ruled_out}
         TASK:
         1. Evaluate each option against the constraints
         2. Score each option on how well it meets the objectives (0-100 scale)
@@ -140,8 +214,6 @@ class ReasoningAgent(BaseAgent):
 
         # Parse JSON response
         try:
-            import json
-
             result = json.loads(result_text)
         except:
             # Fallback if not valid JSON
@@ -149,6 +221,378 @@ class ReasoningAgent(BaseAgent):
 
         return result
 
+    async def _reason_sharded(
+        self,
+        options: List[Dict],
+        constraints: Dict,
+        objectives: List[str],
+        context: str,
+        evidence: Optional[Dict[int, List[str]]] = None,
+        ruled_out: str = "",
+    ) -> Dict[str, Any]:
+        """
+        Tournament evaluation of more options than fit one prompt
+
+        Options are split into shards of REASONING_SHARD_SIZE that are
+        evaluated concurrently; the best REASONING_SHARD_FINALISTS of each
+        shard advance to the next round until the rest fit one prompt,
+        whose evaluation ranks the finalists against each other. Options
+        that dropped out follow the finalists, later rounds first, so the
+        ranking covers every option. Each round shrinks the field by
+        about shard size / finalists, so LLM calls grow linearly.
+        """
+        evidence = evidence or {}
+        size = config.REASONING_SHARD_SIZE
+        advance = max(1, min(config.REASONING_SHARD_FINALISTS, size - 1))
+
+        entrants = []
+        for i, option in enumerate(options):
+            if "option_id" not in option:
+                option = {"option_id": option_id(option, i), **option}
+            entrants.append((option, evidence.get(i, [])))
+
+        evaluations: Dict[str, Dict[str, Any]] = {}
+        eliminated: List[List[Dict[str, Any]]] = []
+        calls = 0
+        while len(entrants) > size:
+            shards = [entrants[i:i + size] for i in range(0, len(entrants), size)]
+            results = await asyncio.gather(*(
+                self._evaluate_with_llm(
+                    [option for option, _ in shard],
+                    constraints,
+                    objectives,
+                    context,
+                    {j: chunks for j, (_, chunks) in enumerate(shard)},
+                )
+                for shard in shards
+            ))
+            calls += len(shards)
+
+            winners, losers = [], []
+            for shard, result in zip(shards, results):
+                by_id = {option["option_id"]: (option, chunks) for option, chunks in shard}
+                self._collect_evaluations(result, by_id, evaluations)
+                order = self._shard_order(list(by_id), result)
+                winners += [by_id[oid] for oid in order[:advance]]
+                losers += [
+                    {"option_id": oid, "position": position, "shard_size": len(order)}
+                    for position, oid in enumerate(order[advance:], advance + 1)
+                ]
+            # Interleave the shards: every shard's next best before the one after
+            losers.sort(key=lambda entry: entry["position"])
+            eliminated.append(losers)
+            entrants = winners
+
+        finalists = {option["option_id"]: option for option, _ in entrants}
+        result = await self._evaluate_with_llm(
+            [option for option, _ in entrants],
+            constraints,
+            objectives,
+            context,
+            {j: chunks for j, (_, chunks) in enumerate(entrants)},
+            ruled_out,
+        )
+        calls += 1
+        self._collect_evaluations(result, finalists, evaluations)
+
+        justifications = {
+            str(entry.get("option_id")): entry.get("justification")
+            for entry in result.get("ranked_recommendations") or []
+            if isinstance(entry, dict)
+        }
+        final_view = result
+        if not any(isinstance(result.get(k), list) for k in ("evaluation", "ranked_recommendations")):
+            # Unparseable final answer: order finalists by their shard scores
+            final_view = {"evaluation": [evaluations[oid] for oid in finalists if oid in evaluations]}
+        ranked = [
+            {"option_id": oid, "justification": justifications.get(oid) or "Finalist"}
+            for oid in self._shard_order(list(finalists), final_view)
+        ]
+        rounds = len(eliminated)
+        for round_number, losers in reversed(list(enumerate(eliminated, 1))):
+            ranked += [
+                {
+                    "option_id": entry["option_id"],
+                    "justification": (
+                        f"Eliminated in round {round_number} of {rounds + 1} "
+                        f"(placed {entry['position']} of {entry['shard_size']} in its shard)"
+                    ),
+                }
+                for entry in losers
+            ]
+        for rank, entry in enumerate(ranked, 1):
+            entry["rank"] = rank
+
+        merged = dict(result)
+        merged["evaluation"] = [evaluations[e["option_id"]] for e in ranked if e["option_id"] in evaluations]
+        merged["ranked_recommendations"] = [
+            {"rank": e["rank"], "option_id": e["option_id"], "justification": e["justification"]}
+            for e in ranked
+        ]
+        merged["sharding"] = {
+            "options": len(options),
+            "shard_size": size,
+            "finalists_per_shard": advance,
+            "rounds": rounds + 1,
+            "llm_calls": calls,
+            "finalists": list(finalists),
+        }
+        return merged
+
+    def _shard_order(self, ids: List[str], result: Dict[str, Any]) -> List[str]:
+        """
+        Option ids of one evaluation, best first
+
+        Uses the LLM's ranking, then its overall scores for options it did
+        not rank, then the given order for options it skipped entirely.
+        """
+        order = []
+        ranked = result.get("ranked_recommendations")
+        if isinstance(ranked, list):
+            entries = [e for e in ranked if isinstance(e, dict)]
+            entries.sort(key=lambda e: e.get("rank") if isinstance(e.get("rank"), (int, float)) else float("inf"))
+            order += [str(e.get("option_id")) for e in entries]
+
+        evaluation = result.get("evaluation")
+        if isinstance(evaluation, list):
+            scored = [e for e in evaluation if isinstance(e, dict)]
+            scored.sort(
+                key=lambda e: e.get("overall_score") if isinstance(e.get("overall_score"), (int, float)) else float("-inf"),
+                reverse=True,
+            )
+            order += [str(e.get("option_id")) for e in scored]
+
+        unique = []
+        for oid in order + ids:
+            if oid in ids and oid not in unique:
+                unique.append(oid)
+        return unique
+
+    def _collect_evaluations(
+        self,
+        result: Dict[str, Any],
+        by_id: Dict[str, Any],
+        evaluations: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """Keep the latest per-option evaluation of a shard or final round"""
+        evaluation = result.get("evaluation")
+        for entry in evaluation if isinstance(evaluation, list) else []:
+            if isinstance(entry, dict) and str(entry.get("option_id")) in by_id:
+                evaluations[str(entry["option_id"])] = entry
+
+    def _rank_locally(
+        self, options: List[Dict], criteria: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Scores and ranking from the MCDA engine"""
+        from mcda import rank_options  # deferred: numpy adds ~80 ms to import
+
+        started = time.perf_counter()
+        ranking = rank_options(options, criteria, method=config.MCDA_METHOD)
+        ranking["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return ranking
+
+    def _local_result(self, ranking: Dict[str, Any]) -> Dict[str, Any]:
+        """Reasoning result from the local ranking alone (no LLM call)"""
+        scores = {e["option_id"]: e for e in ranking["evaluation"]}
+        for entry in ranking["ranked_recommendations"]:
+            entry["justification"] = self._score_summary(
+                scores[entry["option_id"]], ranking["method"]
+            )
+        return {
+            "evaluation": ranking["evaluation"],
+            "ranked_recommendations": ranking["ranked_recommendations"],
+            "scoring": self._scoring_info(ranking),
+        }
+
+    async def _assess_ranking(
+        self,
+        ranking: Dict[str, Any],
+        options: List[Dict],
+        constraints: Dict,
+        objectives: List[str],
+        context: str,
+        evidence: Optional[Dict[int, List[str]]] = None,
+        ruled_out: str = "",
+    ) -> Dict[str, Any]:
+        """Ask the LLM for the qualitative side of the top-ranked options"""
+        top = ranking["ranked_recommendations"][: config.REASONING_EXPLAIN_TOP]
+        position = {option_id(o, i): i for i, o in enumerate(options)}
+        shortlisted = [options[position[entry["option_id"]]] for entry in top]
+        shortlisted_evidence = {
+            i: (evidence or {}).get(position[entry["option_id"]], [])
+            for i, entry in enumerate(top)
+        }
+        scores = "\n".join(
+            f"{entry['rank']}. {entry['option_id']}: {entry['overall_score']}/100"
+            for entry in top
+        )
+        weights = ", ".join(
+            f"{c['name']} ({c['direction']}, weight {c['weight']:.3g})"
+            for c in ranking["criteria"]
+        )
+
+        prompt = f"""
+        You are a strategic decision-making AI for national-scale operational decisions.
+
+        CONTEXT: {context}
+
+        OBJECTIVES:
+        {chr(10).join(f"- {obj}" for obj in objectives)}
+
+        CONSTRAINTS:
+        {self._format_constraints(constraints)}
+
+        SHORTLISTED OPTIONS:
+        {self._format_options(shortlisted, shortlisted_evidence)}
+        {ruled_out}
+        The options have already been scored with {ranking["method"]} over
+        these criteria: {weights or "none"}. Ranking:
+        {scores}
+
+        TASK (do not re-score or re-rank):
+        1. Check each option against the constraints
+        2. List its pros, cons and risks
+        3. Justify its rank in one or two sentences
+
+        Respond in the following JSON format:
+        {{
+            "assessments": [
+                {{
+                    "option_id": "string",
+                    "constraint_compliance": {{"constraint_name": "pass/fail/partial"}},
+                    "pros": ["list"],
+                    "cons": ["list"],
+                    "risks": ["list"],
+                    "justification": "string"
+                }}
+            ],
+            "key_tradeoffs": "string",
+            "critical_considerations": ["list"]
+        }}
+        """
+
+        result_text = await self.client.chat(
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert in multi-criteria decision analysis and operational planning at national scale.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=config.TEMPERATURE,
+            max_tokens=config.MAX_TOKENS,
+        )
+
+        try:
+            return json.loads(result_text)
+        except ValueError:
+            return {"raw_reasoning": result_text}
+
+    def _merge_assessment(
+        self, ranking: Dict[str, Any], assessment: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Local scores and ranking with the LLM's qualitative assessment"""
+        result = self._local_result(ranking)
+        assessments = assessment.get("assessments")
+        by_option = {
+            str(a.get("option_id")): a
+            for a in (assessments if isinstance(assessments, list) else [])
+            if isinstance(a, dict)
+        }
+
+        for entry in result["evaluation"]:
+            qualitative = by_option.get(entry["option_id"], {})
+            for key in ("constraint_compliance", "pros", "cons", "risks"):
+                if key in qualitative:
+                    entry[key] = qualitative[key]
+        for entry in result["ranked_recommendations"]:
+            justification = by_option.get(entry["option_id"], {}).get("justification")
+            if justification:
+                entry["justification"] = justification
+
+        for key in ("key_tradeoffs", "critical_considerations", "raw_reasoning"):
+            if key in assessment:
+                result[key] = assessment[key]
+        return result
+
+    def _score_summary(self, evaluation: Dict[str, Any], method: str) -> str:
+        """One-line justification of a local score"""
+        summary = f"Scores {evaluation['overall_score']}/100 ({method})"
+        scores = evaluation["objective_scores"]
+        if len(scores) > 1:
+            best = max(scores, key=scores.get)
+            worst = min(scores, key=scores.get)
+            if scores[best] != scores[worst]:
+                summary += f"; strongest on {best}, weakest on {worst}"
+        return summary
+
+    def _scoring_info(self, ranking: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "engine": "local",
+            "method": ranking["method"],
+            "criteria": ranking["criteria"],
+            "consistency_ratio": ranking["consistency_ratio"],
+            "duration_ms": ranking["duration_ms"],
+        }
+
+    def _analyze_sensitivity(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Monte Carlo robustness of the ranking (no LLM call)
+
+        Re-scores perturbed samples with the method and weights of the
+        local scoring (for LLM scoring, objective weights fitted to the
+        overall scores), so it measures
+        the ranking that was reported; None when disabled or there is
+        nothing to rank.
+        """
+        evaluation = result.get("evaluation")
+        if config.SENSITIVITY_SAMPLES <= 0 or not isinstance(evaluation, list):
+            return None
+        from sensitivity import analyze  # deferred: numpy adds ~80 ms to import
+
+        scoring = result.get("scoring") or {}
+        ranked = result.get("ranked_recommendations")
+        return analyze(
+            evaluation,
+            ranked if isinstance(ranked, list) else None,
+            criteria=scoring.get("criteria"),
+            method=scoring.get("method", config.MCDA_METHOD),
+            samples=config.SENSITIVITY_SAMPLES,
+            score_noise=config.SENSITIVITY_SCORE_NOISE,
+            weight_concentration=config.SENSITIVITY_WEIGHT_CONCENTRATION,
+        )
+
+    def _summarize_ruled_out(
+        self, ruled_out: List[Dict], feasibility: Optional[Dict[str, Any]]
+    ) -> str:
+        """Prompt section listing infeasible options ("" when excluded silently)"""
+        if not ruled_out or config.CONSTRAINT_PREFILTER != "summarize":
+            return ""
+        lines = ["RULED OUT (break hard numeric constraints; do not recommend):"]
+        for option in ruled_out:
+            violations = feasibility["options"][option["option_id"]]["violations"]
+            name = option.get("name", option["option_id"])
+            lines.append(f"- {option['option_id']} ({name}): {'; '.join(violations)}")
+        return "\n        ".join(lines) + "\n"
+
+    def _apply_feasibility(
+        self, result: Dict[str, Any], feasibility: Dict[str, Any]
+    ) -> None:
+        """Overwrite constraint compliance with the deterministic checks"""
+        evaluation = result.get("evaluation")
+        if not isinstance(evaluation, list):
+            return
+        for entry in evaluation:
+            checked = feasibility["options"].get(str(entry.get("option_id"))) if isinstance(entry, dict) else None
+            if not checked or not checked["checks"]:
+                continue
+            compliance = entry.get("constraint_compliance")
+            if not isinstance(compliance, dict):
+                compliance = entry["constraint_compliance"] = {}
+            for check in checked["checks"]:
+                compliance[check["constraint"]] = "pass" if check["passed"] else "fail"
+            entry["feasibility"] = checked["status"]
+
     def _format_constraints(self, constraints: Dict) -> str:
         """Format constraints for prompt"""
         if not constraints:
@@ -162,15 +606,41 @@ class ReasoningAgent(BaseAgent):
                 formatted.append(f"- {key}: {value}")
         return "\n".join(formatted)
 
-    def _format_options(self, options: List[Dict]) -> str:
+    def _retrieve_evidence(
+        self, options: List[Dict], index: Any
+    ) -> Dict[int, List[str]]:
+        """Retrieve the top source chunks matching each option's own terms"""
+        if index is None or not len(index):
+            return {}
+
+        evidence = {}
+        for i, option in enumerate(options):
+            query = " ".join(str(value) for value in option.values())
+            chunks = index.select(
+                query,
+                token_budget=config.RETRIEVAL_OPTION_TOKEN_BUDGET,
+                k=3,
+            )
+            if chunks:
+                evidence[i] = chunks
+        return evidence
+
+    def _format_options(
+        self, options: List[Dict], evidence: Optional[Dict[int, List[str]]] = None
+    ) -> str:
         """Format options for prompt"""
         if not options:
             return "No options provided"
 
+        evidence = evidence or {}
         formatted = []
         for i, option in enumerate(options, 1):
             option_str = f"\nOption {i}:"
             for key, value in option.items():
                 option_str += f"\n  - {key}: {value}"
+            if evidence.get(i - 1):
+                option_str += "\n  - supporting evidence from source data:"
+                for chunk in evidence[i - 1]:
+                    option_str += "\n      " + chunk.replace("\n", " | ")
             formatted.append(option_str)
         return "\n".join(formatted)
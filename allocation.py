@@ -0,0 +1,655 @@
+"""
+Resource Allocation
+Builds a regions x resources need matrix from the ingested facts and
+allocates the available units under supply, budget and capacity limits
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
+import re
+import time
+
+import numpy as np
+
+from feasibility import extract_limits
+from quantities import CURRENCY, NUMBER, PERCENT, parse_quantities, parse_quantity
+
+
+METHODS = ("auto", "greedy", "lp")
+
+# A resource meets a region's need when both name the same group
+NEED_GROUPS = {
+    "water": ("water",),
+    "medical": ("medical", "medicine", "hospital", "health", "clinic"),
+    "power": ("power", "generator", "electric", "fuel"),
+    "shelter": ("shelter", "housing", "tent"),
+    "food": ("food", "ration", "meal"),
+    "rescue": ("rescue", "search", "evacuat"),
+}
+
+# Words after an amount saying it measures what is left or what is lost
+_REMAINING = ("stock", "operational", "available", "supply", "supplies", "access", "working", "online", "open")
+_LOST = ("outage", "damaged", "offline", "destroyed", "closed", "loss", "lost", "shortage", "deficit", "down")
+
+_REGION_WORDS = ("region", "district", "county", "province", "state", "zone", "area", "sector")
+_REGION_HEADER = re.compile(
+    r"^\s*[-*•]?\s*(?P<name>(?:%s)\s+[\w.\-]+)\s*(?:\((?P<details>[^)]*)\))?\s*:\s*(?P<rest>.*)$"
+    % "|".join(_REGION_WORDS),
+    re.I,
+)
+_HEADING = re.compile(r"^\s*[A-Z][A-Z0-9 &/\-]+:\s*$")
+_ITEM = re.compile(r"^\s*[-*•]?\s*(?P<label>[^:]+):\s*(?P<value>.+)$")
+_POPULATION = re.compile(r"population\s*[:=]?\s*(?P<value>[^,;)]+)", re.I)
+_PERCENT = re.compile(r"(?P<number>\d+(?:\.\d+)?)\s*(?:%|percent\b)(?P<after>[^,;]*)", re.I)
+_COUNT = re.compile(r"(?P<number>\d[\d,]*)\s+(?:[a-z]+\s+)?(?P<status>[a-z]+)", re.I)
+_QUALIFIER = re.compile(r"\((?P<qualifier>[^)]*)\)")
+
+
+@dataclass
+class Resource:
+    """A pool of units to distribute"""
+
+    name: str
+    available: float
+    unit_cost: float = 0.0  # currency per unit (0: outside the budget)
+
+
+@dataclass
+class Region:
+    """A place that receives resources"""
+
+    name: str
+    population: Optional[float] = None
+    severity: Dict[str, float] = field(default_factory=dict)  # need group -> 0-1
+    needs: Dict[str, float] = field(default_factory=dict)  # resource -> units demanded
+    capacity: Optional[float] = None  # most units it can receive in total
+
+
+@dataclass
+class AllocationModel:
+    """Everything the solver needs"""
+
+    regions: List[Region]
+    resources: List[Resource]
+    budget: Optional[float] = None
+    source: str = "facts"  # "facts", "spec" or "facts+spec"
+
+
+_GROUP_PATTERNS = {
+    group: re.compile(r"\b(%s)" % "|".join(words), re.I) for group, words in NEED_GROUPS.items()
+}
+
+
+def need_groups(text: str) -> List[str]:
+    """Need groups named in a text ("Water trucks" -> ["water"])"""
+    return [g for g, pattern in _GROUP_PATTERNS.items() if pattern.search(text)]
+
+
+def _parts(text: str) -> List[str]:
+    # Commas inside numbers ("50,000") do not separate parts
+    return re.split(r",\s+|;", text)
+
+
+def _key(name: str) -> str:
+    return " ".join(re.split(r"[\W_]+", name.lower())).strip()
+
+
+def _severity(value: float, words: str) -> Optional[float]:
+    """Share of need from a percentage and the words around it"""
+    lowered = words.lower()
+    if any(w in lowered for w in _LOST):
+        return value / 100
+    if any(w in lowered for w in _REMAINING):
+        return 1 - value / 100
+    return None
+
+
+def line_signals(line: str) -> List[Tuple[str, float]]:
+    """
+    (need group, severity 0-1) pairs stated in one line of a report
+
+    Percentages are read per comma-separated part ("Water (40% stock)" ->
+    water 0.6, "60% power outage" -> power 0.6); counts across the line
+    ("15 operational, 5 damaged" -> 0.25).
+    """
+    signals = []
+    line_groups = need_groups(line)
+    for part in _parts(line):
+        groups = need_groups(part) or line_groups
+        for match in _PERCENT.finditer(part):
+            level = _severity(float(match.group("number")), match.group("after")) if groups else None
+            if level is None and groups:
+                level = _severity(float(match.group("number")), part)
+            if level is not None:
+                signals += [(g, min(max(level, 0.0), 1.0)) for g in groups]
+
+    if line_groups and "%" not in line:
+        good = lost = 0.0
+        for match in _COUNT.finditer(line):
+            status = match.group("status").lower()
+            count = float(match.group("number").replace(",", ""))
+            if any(status.startswith(w) for w in _LOST):
+                lost += count
+            elif any(status.startswith(w) for w in _REMAINING):
+                good += count
+        if lost and good + lost:
+            signals += [(g, lost / (good + lost)) for g in line_groups]
+    return signals
+
+
+def _add_signals(region: Region, signals: List[Tuple[str, float]]) -> None:
+    # The worst signal for a need stands
+    for group, level in signals:
+        region.severity[group] = max(region.severity.get(group, 0.0), level)
+
+
+def _parse_resource_item(label: str, value: str) -> Tuple[List[Resource], Optional[float]]:
+    """Resources (and a budget) from one "label: value" line of a resource list"""
+    quantities = parse_quantities(value)
+    counts = [q for q in quantities if q.kind == NUMBER]
+    money = [q for q in quantities if q.kind == CURRENCY]
+    if not counts:
+        return [], money[0].value if money else None
+
+    name = label.strip(" -*•")
+    parts = [p for p in _parts(value) if parse_quantity(p) is not None]
+    resources = []
+    for part in parts:
+        count = parse_quantity(part)
+        if count is None or count.kind != NUMBER:
+            continue
+        qualifier = _QUALIFIER.search(part)
+        part_name = f"{name} ({qualifier.group('qualifier')})" if qualifier and len(parts) > 1 else name
+        cost = next((q.value for q in parse_quantities(part) if q.kind == CURRENCY), 0.0)
+        resources.append(Resource(part_name, count.value, cost))
+    return resources, None
+
+
+def parse_report(text: str) -> Tuple[List[Region], List[Resource], Optional[float]]:
+    """
+    Regions, resources and budget from a text situation report
+
+    Regions start at "Region A (Population: 2.5M):" style headers (also
+    district, county, province, ...) and collect the indicators that
+    follow; a heading containing RESOURCES starts a "- Name: 30 units"
+    list, where an amount of money is the budget.
+    """
+    regions: List[Region] = []
+    resources: List[Resource] = []
+    budget = None
+    region = None
+    in_resources = False
+
+    for line in text.splitlines():
+        header = _REGION_HEADER.match(line)
+        if header:
+            in_resources = False
+            region = Region(name=header.group("name").strip())
+            population = _POPULATION.search(header.group("details") or "")
+            if population:
+                quantity = parse_quantity(population.group("value"))
+                region.population = quantity.value if quantity else None
+            regions.append(region)
+            _add_signals(region, line_signals(header.group("rest")))
+            continue
+
+        if _HEADING.match(line):
+            region = None
+            in_resources = "RESOURCE" in line.upper()
+            continue
+
+        if region is not None:
+            _add_signals(region, line_signals(line))
+        elif in_resources:
+            item = _ITEM.match(line)
+            if item:
+                found, money = _parse_resource_item(item.group("label"), item.group("value"))
+                resources += found
+                if money is not None and budget is None:
+                    budget = money
+    return regions, resources, budget
+
+
+def parse_records(records: List[Dict[str, Any]]) -> List[Region]:
+    """
+    Regions from structured rows (CSV, Excel, JSON)
+
+    The region is the first region-like column (region, district, ...,
+    name); "population" and "capacity" columns are read as such, columns
+    naming a need ("water_trucks_needed") as units demanded, and columns
+    naming a need group and a state ("power_outage_pct") as severity.
+    """
+    regions = []
+    for row in records:
+        if not isinstance(row, dict):
+            continue
+        name_key = next((k for k in row if _key(str(k)) in _REGION_WORDS + ("name",)), None)
+        if name_key is None:
+            continue
+        region = Region(name=str(row[name_key]))
+        for column, value in row.items():
+            column_key = _key(str(column))
+            quantity = parse_quantity(value)
+            if column == name_key or quantity is None:
+                continue
+            if "population" in column_key:
+                region.population = quantity.value
+            elif "capacity" in column_key:
+                region.capacity = quantity.value
+            elif re.search(r"\b(needed|need|needs|demand|required)\b", column_key):
+                resource = re.sub(r"\b(needed|need|needs|demand|required|units)\b", "", column_key)
+                region.needs[" ".join(resource.split())] = quantity.value
+            else:
+                percent = quantity.value if quantity.kind == PERCENT or quantity.value > 1 else quantity.value * 100
+                level = _severity(percent, column_key)
+                if level is not None:
+                    _add_signals(region, [(g, min(max(level, 0.0), 1.0)) for g in need_groups(column_key)])
+        regions.append(region)
+    return regions
+
+
+def _spec_resources(spec: Dict[str, Any]) -> List[Resource]:
+    resources = []
+    for name, value in (spec.get("resources") or {}).items():
+        if isinstance(value, dict):
+            available = parse_quantity(value.get("available"))
+            cost = parse_quantity(value.get("unit_cost"))
+        else:
+            available, cost = parse_quantity(value), None
+        if available is not None:
+            resources.append(Resource(name, available.value, cost.value if cost else 0.0))
+    return resources
+
+
+def _merge_spec_regions(regions: List[Region], spec: Dict[str, Any]) -> List[Region]:
+    entries = spec.get("regions") or {}
+    if isinstance(entries, list):
+        entries = {e.get("name"): e for e in entries if isinstance(e, dict) and e.get("name")}
+    by_key = {_key(r.name): r for r in regions}
+    for name, entry in entries.items():
+        region = by_key.get(_key(name))
+        if region is None:
+            region = by_key[_key(name)] = Region(name=name)
+            regions.append(region)
+        population = parse_quantity(entry.get("population"))
+        capacity = parse_quantity(entry.get("capacity"))
+        if population is not None:
+            region.population = population.value
+        if capacity is not None:
+            region.capacity = capacity.value
+        for resource, units in (entry.get("needs") or {}).items():
+            quantity = parse_quantity(units)
+            if quantity is not None:
+                region.needs[resource] = quantity.value
+        _add_signals(region, [(g, float(v)) for g, v in (entry.get("severity") or {}).items()])
+    return regions
+
+
+def build_model(
+    data: Optional[Dict[str, Any]],
+    spec: Optional[Dict[str, Any]] = None,
+    constraints: Optional[Dict[str, Any]] = None,
+    resources: Optional[Dict[str, Any]] = None,
+) -> AllocationModel:
+    """
+    Allocation model from ingested data and the scenario
+
+    Args:
+        data: Ingestion output ({"content": report text or records})
+        spec: Scenario allocation spec: {
+            "resources": {name: units | {"available", "unit_cost"}}
+                (replace the resources found in the facts),
+            "regions": {name: {"population", "needs": {resource: units},
+                "capacity", "severity": {need group: 0-1}}} (merged into
+                the regions found in the facts),
+            "budget": amount (default: the report's, else the first
+                currency limit in the constraints)
+        }
+        constraints: Scenario constraints (budget fallback)
+        resources: Scenario resources ("500 responders available" lines)
+
+    Returns:
+        AllocationModel (no regions or no resources: nothing to allocate)
+    """
+    spec = spec or {}
+    content = (data or {}).get("content")
+    regions: List[Region] = []
+    found: List[Resource] = []
+    budget = None
+    if isinstance(content, str):
+        regions, found, budget = parse_report(content)
+    elif isinstance(content, list):
+        regions = parse_records(content)
+    elif isinstance(content, dict) and isinstance(content.get("regions"), list):
+        regions = parse_records(content["regions"])
+
+    for label, value in (resources or {}).items():
+        if isinstance(value, str):
+            items, money = _parse_resource_item(label.replace("_", " "), value)
+            found += items
+            budget = budget if budget is not None else money
+
+    facts = bool(regions)
+    regions = _merge_spec_regions(regions, spec)
+    spec_resources = _spec_resources(spec)
+
+    spec_budget = parse_quantity(spec.get("budget"))
+    if spec_budget is not None:
+        budget = spec_budget.value
+    elif budget is None:
+        limits = [l for l in extract_limits(constraints or {}) if l.upper and l.bound.kind == CURRENCY]
+        budget = limits[0].bound.value if limits else None
+
+    source = "facts+spec" if facts and spec else ("spec" if spec else "facts")
+    return AllocationModel(regions, spec_resources or found, budget, source)
+
+
+def need_matrix(model: AllocationModel) -> np.ndarray:
+    """
+    Regions x resources need scores: population x severity
+
+    Severity is the region's signal for the resource's need group, else
+    the mean of the region's signals, else the mean over all regions (1
+    without any signals). A missing population is the median known one.
+    """
+    regions, resources = model.regions, model.resources
+    populations = [r.population for r in regions if r.population]
+    default_population = float(np.median(populations)) if populations else 1.0
+    population = np.array([r.population or default_population for r in regions], dtype=float)
+
+    signals = [level for r in regions for level in r.severity.values()]
+    overall = float(np.mean(signals)) if signals else 1.0
+    groups = [need_groups(r.name) for r in resources]
+    severity = np.empty((len(regions), len(resources)))
+    for i, region in enumerate(regions):
+        general = float(np.mean(list(region.severity.values()))) if region.severity else overall
+        for j, resource_groups in enumerate(groups):
+            levels = [region.severity[g] for g in resource_groups if g in region.severity]
+            severity[i, j] = max(levels) if levels else general
+    return population[:, None] * severity
+
+
+def _apportion(total: float, weights: np.ndarray) -> np.ndarray:
+    """Whole units summing to total, proportional to weights (largest remainder)"""
+    total = int(total)
+    if weights.sum() <= 0:
+        weights = np.ones_like(weights)
+    exact = total * weights / weights.sum()
+    units = np.floor(exact).astype(np.int64)
+    remainder = total - int(units.sum())
+    if remainder > 0:
+        units[np.argsort(-(exact - units), kind="stable")[:remainder]] += 1
+    return units
+
+
+def demand_matrix(model: AllocationModel, need: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Regions x resources units demanded, and which cells were stated
+
+    Stated needs are used as given; the rest of a resource's supply is
+    split over the other regions in proportion to their need scores.
+    """
+    demand = np.zeros(need.shape, dtype=np.int64)
+    stated = np.zeros(need.shape, dtype=bool)
+    for j, resource in enumerate(model.resources):
+        key = _key(resource.name)
+        for i, region in enumerate(model.regions):
+            units = next((v for k, v in region.needs.items() if _key(k) == key), None)
+            if units is not None:
+                demand[i, j] = max(int(units), 0)
+                stated[i, j] = True
+        rest = ~stated[:, j]
+        if rest.any():
+            left = max(resource.available - demand[stated[:, j], j].sum(), 0)
+            demand[rest, j] = _apportion(left, need[rest, j])
+    return demand, stated
+
+
+def solve_greedy(
+    value: np.ndarray,
+    demand: np.ndarray,
+    supply: np.ndarray,
+    cost: np.ndarray,
+    budget: Optional[float],
+    capacity: np.ndarray,
+    floor: Optional[np.ndarray] = None,
+    start: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Whole-unit allocation, best value per unit of cost first
+
+    Exact for the linear objective when only supply and budget bind;
+    with region capacities it is a heuristic (see solve_lp). A floor
+    (minimum units per cell) is filled first, in the same order.
+    """
+    x = np.zeros(demand.shape, dtype=np.int64) if start is None else start.copy()
+    supply_left = supply - x.sum(axis=0)
+    capacity_left = capacity - x.sum(axis=1)
+    budget_left = (budget if budget is not None else np.inf) - float((x.sum(axis=0) * cost).sum())
+
+    per_cost = value / np.where(cost > 0, cost, 1.0)[None, :]
+    # Ties (a resource split by need) go to the neediest region first
+    order = np.lexsort((-value.ravel(), -per_cost.ravel()))
+    columns = demand.shape[1]
+
+    for caps in ([floor] if floor is not None else []) + [demand]:
+        for flat in order.tolist():
+            i, j = divmod(flat, columns)
+            units = min(caps[i, j] - x[i, j], supply_left[j], capacity_left[i])
+            if cost[j] > 0:
+                units = min(units, budget_left // cost[j])
+            units = int(units)
+            if units <= 0:
+                continue
+            x[i, j] += units
+            supply_left[j] -= units
+            capacity_left[i] -= units
+            budget_left -= units * cost[j]
+    return x
+
+
+def solve_lp(
+    value: np.ndarray,
+    demand: np.ndarray,
+    supply: np.ndarray,
+    cost: np.ndarray,
+    budget: Optional[float],
+    capacity: np.ndarray,
+    floor: Optional[np.ndarray] = None,
+) -> Optional[np.ndarray]:
+    """
+    Linear-programming allocation (SciPy HiGHS), rounded down to whole
+    units and topped up greedily; None without a feasible solution
+
+    Raises:
+        ImportError: SciPy (an optional dependency) is not installed
+    """
+    from scipy.optimize import linprog
+    from scipy.sparse import identity, kron, vstack, csr_matrix
+
+    regions, resources = demand.shape
+    rows = [kron(np.ones((1, regions)), identity(resources))]
+    bounds_right = [supply.astype(float)]
+    if budget is not None and (cost > 0).any():
+        rows.append(csr_matrix(np.tile(cost, regions)[None, :]))
+        bounds_right.append(np.array([budget], dtype=float))
+    limited = np.flatnonzero(np.isfinite(capacity))
+    if limited.size:
+        rows.append(kron(identity(regions), np.ones((1, resources))).tocsr()[limited])
+        bounds_right.append(capacity[limited].astype(float))
+
+    lower = (floor if floor is not None else np.zeros_like(demand)).ravel()
+    solution = linprog(
+        -value.ravel(),
+        A_ub=vstack(rows).tocsr(),
+        b_ub=np.concatenate(bounds_right),
+        bounds=np.column_stack([np.minimum(lower, demand.ravel()), demand.ravel()]),
+        method="highs",
+    )
+    if not solution.success:
+        return None
+    x = np.floor(solution.x + 1e-6).astype(np.int64).reshape(demand.shape)
+    return solve_greedy(value, demand, supply, cost, budget, capacity, start=x)
+
+
+def solve_proportional(
+    demand: np.ndarray,
+    cost: np.ndarray,
+    budget: Optional[float],
+    capacity: np.ndarray,
+) -> np.ndarray:
+    """
+    Demand scaled down uniformly until the budget and capacities hold
+
+    For inferred demand (supply already split by need): every resource is
+    cut by the same factor when the budget cannot pay for all of it, and a
+    region over its capacity keeps the same mix of resources.
+    """
+    x = demand.copy()
+    price = float((x.sum(axis=0) * cost).sum())
+    if budget is not None and price > budget:
+        scale = budget / price
+        for j in range(x.shape[1]):
+            x[:, j] = _apportion(np.floor(x[:, j].sum() * scale), x[:, j].astype(float))
+    for i in np.flatnonzero(x.sum(axis=1) > capacity):
+        x[i] = _apportion(capacity[i], x[i].astype(float))
+    return x
+
+
+def allocate(
+    model: AllocationModel, method: str = "auto", min_share: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Allocate every resource across the regions
+
+    The objective is need covered: each unit sent to a region is worth
+    the region's need score per unit it demands, so when supply, budget
+    or capacity run short, units go where they cover the most need per
+    unit of cost. When no region states its demand, the demand is the
+    supply split by need scores, so there is nothing to optimize: the
+    split is only scaled down to the limits ("proportional") and no
+    coverage is reported.
+
+    Args:
+        model: Regions, resources and budget (see build_model)
+        method: "greedy", "lp" (needs SciPy, an optional dependency;
+            greedy when not installed) or "auto" (LP only when region
+            capacities make greedy inexact)
+        min_share: Share of every region's demand served before the
+            rest is optimized (equity floor)
+
+    Returns:
+        {"method", "regions", "resources" (available, allocated, unmet
+        stated demand), "budget", "allocations" (per region: units, and
+        coverage of stated demand), "totals", "demand", "notes",
+        "duration_ms"}
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown allocation method: {method} (use {', '.join(METHODS)})")
+    started = time.perf_counter()
+    notes = []
+
+    need = need_matrix(model)
+    demand, stated = demand_matrix(model, need)
+    supply = np.array([int(r.available) for r in model.resources], dtype=np.int64)
+    cost = np.array([r.unit_cost for r in model.resources], dtype=float)
+    capacity = np.array(
+        [r.capacity if r.capacity is not None else np.inf for r in model.regions], dtype=float
+    )
+    value = need / np.maximum(demand, 1)
+    floor = np.ceil(demand * min_share).astype(np.int64) if min_share > 0 else None
+    budget = model.budget if (cost > 0).any() else None
+
+    x = None
+    if not stated.any():
+        x = solve_proportional(demand, cost, budget, capacity)
+        used = "proportional"
+        notes.append("No region states its demand: units are split in proportion to need scores")
+    elif method == "lp" or (method == "auto" and np.isfinite(capacity).any()):
+        try:
+            x = solve_lp(value, demand, supply, cost, budget, capacity, floor)
+            if x is None:
+                notes.append("LP found no feasible solution; used greedy")
+        except ImportError:
+            notes.append("LP solver needs SciPy (pip install scipy); used greedy")
+        used = "lp" if x is not None else "greedy"
+    else:
+        used = "greedy"
+    if x is None:
+        x = solve_greedy(value, demand, supply, cost, budget, capacity, floor)
+
+    allocated = x.sum(axis=0)
+    spent = float((allocated * cost).sum())
+    if budget is None and model.budget is not None:
+        notes.append("No unit costs given; the budget does not limit the allocation")
+
+    # Coverage is only meaningful against demand someone stated
+    stated_demand = np.where(stated, demand, 0)
+    served = np.where(stated, np.minimum(x, demand), 0)
+    allocations = []
+    for i, region in enumerate(model.regions):
+        entry = {
+            "region": region.name,
+            "units": {r.name: int(x[i, j]) for j, r in enumerate(model.resources)},
+            "need_score": round(float(need[i].sum()), 2),
+        }
+        if stated[i].any():
+            entry["coverage"] = round(float(served[i].sum() / max(stated_demand[i].sum(), 1)), 4)
+        allocations.append(entry)
+    totals = {"allocated_units": int(allocated.sum())}
+    if stated.any():
+        totals["stated_demand_units"] = int(stated_demand.sum())
+        totals["coverage"] = round(float(served.sum() / max(stated_demand.sum(), 1)), 4)
+
+    return {
+        "method": used,
+        "source": model.source,
+        "demand": "stated" if stated.all() else ("inferred" if not stated.any() else "mixed"),
+        "regions": len(model.regions),
+        "resources": [
+            {
+                "name": r.name,
+                "available": int(supply[j]),
+                "allocated": int(allocated[j]),
+                "unmet_demand": int(stated_demand[:, j].sum() - served[:, j].sum()),
+                "unit_cost": r.unit_cost,
+            }
+            for j, r in enumerate(model.resources)
+        ],
+        "budget": None if model.budget is None else {"limit": model.budget, "spent": spent},
+        "allocations": allocations,
+        "totals": totals,
+        "notes": notes,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def format_allocation(result: Optional[Dict[str, Any]], max_regions: int = 15) -> str:
+    """Prompt section with the computed allocation ("" without one)"""
+    if not result:
+        return ""
+    basis = {
+        "inferred": "split by need scores; no region stated its demand",
+        "mixed": "part of the demand inferred from need scores",
+    }.get(result["demand"], "against stated demand")
+    lines = [
+        f"COMPUTED RESOURCE ALLOCATION ({result['method']}, {result['regions']} regions; {basis}):"
+    ]
+    # Neediest regions first; the rest are summarized
+    allocations = sorted(result["allocations"], key=lambda a: -a["need_score"])
+    for entry in allocations[:max_regions]:
+        units = ", ".join(f"{n} {name}" for name, n in entry["units"].items() if n)
+        lines.append(f"- {entry['region']}: {units or 'nothing'}")
+    rest = allocations[max_regions:]
+    if rest:
+        units = sum(sum(a["units"].values()) for a in rest)
+        lines.append(f"- {len(rest)} more regions: {units:,} units in total")
+
+    for resource in result["resources"]:
+        line = f"- Total {resource['name']}: {resource['allocated']} of {resource['available']} allocated"
+        if resource["unmet_demand"]:
+            line += f", {resource['unmet_demand']} of the stated demand not covered"
+        lines.append(line)
+    if result["budget"] and result["budget"]["spent"]:
+        lines.append(f"- Budget: {result['budget']['spent']:,.0f} of {result['budget']['limit']:,.0f} spent")
+    return "\n        ".join(lines) + "\n"
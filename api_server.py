@@ -3,22 +3,77 @@ FastAPI Server for Agentic AI System
 Provides REST API endpoints for the frontend
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from contextlib import asynccontextmanager
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
+import os
+import socket
+import time
 import uuid
 
-from orchestrator import AgenticOrchestrator
+from orchestrator import AgenticOrchestrator, STAGES, summarize_batch
 from config import config
+from llm_client import llm_client
+from fingerprint import scenario_fingerprint
+from workflow_store import (
+    DuplicateIdempotencyKeyError,
+    StoreWriter,
+    WorkflowRepository,
+    create_workflow_repository,
+    to_json,
+)
+from events import EventBroker, TERMINAL_STATUSES
+from cancellation import CancellationToken, WorkflowCancelled
+from checkpoint import RepositoryCheckpointer, restore_stage, resumable_prefix
+from sweep import apply_point, expand_grid, point_outcome, summarize_sweep
+from tracing import tracer
+from metrics import (
+    CACHE_HITS,
+    QUEUE_DEPTH,
+    WORKFLOWS,
+    WORKFLOWS_RUNNING,
+    registry,
+)
+from job_queue import (
+    WorkflowJobQueue,
+    WorkflowJob,
+    QueueFullError,
+    QueueClosedError,
+    AdmissionDeferredError,
+)
+from scheduling import (
+    PRIORITY_CLASSES,
+    llm_scheduler,
+    priority_context,
+    priority_for_scenario,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop the workflow worker pool with the server"""
+    open_workflow_store()
+    await job_queue.start()
+    await store_writer.run(apply_retention)
+    await recover_interrupted_workflows()
+    heartbeat = asyncio.create_task(maintain_leases())
+    yield
+    await job_queue.stop()
+    heartbeat.cancel()
+    store_writer.close()
+
 
 app = FastAPI(
     title="Agentic AI System API",
     description="Multi-agent GenAI system for national-scale operational decisions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Enable CORS for frontend
@@ -30,9 +85,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory storage for workflow results (in production, use a database)
-workflows: Dict[str, Dict[str, Any]] = {}
-workflow_status: Dict[str, str] = {}
+# Workflow persistence (SQLite by default, shared by all worker processes).
+# Handlers read through asyncio.to_thread and write through store_writer, so
+# a busy database never blocks the event loop. The repository is opened at
+# startup (see lifespan), so importing this module creates no database file.
+workflow_store: Optional[WorkflowRepository] = None
+store_writer = StoreWriter()
+event_broker: Optional[EventBroker] = None
+
+
+def open_workflow_store() -> WorkflowRepository:
+    """Open the configured repository and its event broker, once per process"""
+    global workflow_store, event_broker
+    if workflow_store is None:
+        workflow_store = create_workflow_repository()
+        event_broker = EventBroker(
+            workflow_store, poll_interval=config.EVENT_POLL_INTERVAL, writer=store_writer
+        )
+    return workflow_store
+
+# This server process, as the lease holder of the workflows it queues and
+# runs; other processes take a workflow over only once its lease expires
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+ACTIVE_STATUSES = ["queued", "running"]
 
 
 class ScenarioRequest(BaseModel):
@@ -45,6 +120,29 @@ class ScenarioRequest(BaseModel):
     constraints: Optional[Dict[str, Any]] = None
     resources: Optional[Dict[str, Any]] = None
     timeline: Optional[str] = "30 days"
+    decision_criteria: Optional[Dict[str, Any]] = None
+    criteria: Optional[Dict[str, Any]] = None  # MCDA weights (see mcda.resolve_criteria)
+    allocation: Optional[Dict[str, Any]] = None  # resources/regions/budget (see allocation.build_model)
+    priority: Optional[str] = None  # overrides the scenario type's class
+    deadline_seconds: Optional[float] = None  # overrides WORKFLOW_DEADLINE (0 = none)
+    token_budget: Optional[int] = None  # overrides WORKFLOW_TOKEN_BUDGET
+    cost_budget: Optional[float] = None  # USD, overrides WORKFLOW_COST_BUDGET
+
+
+class BatchRequest(BaseModel):
+    """Request model for running several scenarios at once"""
+    scenarios: List[Dict[str, Any]]  # ScenarioRequest fields, merged over base
+    base: Optional[Dict[str, Any]] = None
+    priority: Optional[str] = None  # default: the batch class (see bulk_priority)
+    deadline_seconds: Optional[float] = None  # per item, unless the item sets one
+
+
+class SweepRequest(BaseModel):
+    """Request model for a what-if sweep over one scenario"""
+    scenario: Dict[str, Any]  # ScenarioRequest fields
+    grid: Dict[str, List[Any]]  # dotted path -> values, e.g. "constraints.budget_limit"
+    priority: Optional[str] = None  # default: the batch class (see bulk_priority)
+    deadline_seconds: Optional[float] = None  # per grid point (0 = none)
 
 
 class WorkflowResponse(BaseModel):
@@ -52,6 +150,7 @@ class WorkflowResponse(BaseModel):
     workflow_id: str
     status: str
     message: str
+    reused: bool = False
 
 
 @app.get("/")
@@ -65,6 +164,25 @@ async def root():
     }
 
 
+@app.get("/queue")
+async def queue_status():
+    """Queue depth, worker utilisation and wait percentiles per priority class"""
+    return {
+        "workflows": job_queue.stats(),
+        "llm_calls": llm_scheduler.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics (text exposition format)"""
+    for priority, stats in job_queue.stats()["classes"].items():
+        QUEUE_DEPTH.labels(priority).set(stats["queued"])
+        WORKFLOWS_RUNNING.labels(priority).set(stats["running"])
+
+    return PlainTextResponse(registry.render(), media_type=registry.CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
@@ -101,20 +219,205 @@ async def get_scenarios():
 
 
 @app.post("/workflow/run", response_model=WorkflowResponse)
-async def run_workflow(request: ScenarioRequest, background_tasks: BackgroundTasks):
+async def run_workflow(
+    request: ScenarioRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    cache_control: Optional[str] = Header(None, alias="Cache-Control"),
+):
     """
-    Start a workflow execution
-    Returns immediately with workflow_id, actual processing happens in background
+    Queue a workflow execution
+    Returns immediately with workflow_id; a worker from the pool runs it.
+    Workflows are scheduled by priority class (emergency scenarios are
+    critical by default). Responds 429 (queue full) or 503 (low-priority
+    work deferred under load, or not accepting work) with Retry-After.
+
+    Duplicate submissions (same scenario fingerprint) attach to the queued
+    or running workflow, or reuse a result completed within
+    RESULT_REUSE_WINDOW seconds. A new run still reuses memoized outputs of
+    stages whose inputs are unchanged (e.g. ingestion and analysis when
+    only the options differ); send Cache-Control: no-cache to force a
+    fully fresh run. A repeated Idempotency-Key always returns the original
+    workflow.
+
+    A workflow still unfinished deadline_seconds after submission (default
+    WORKFLOW_DEADLINE) is stopped and recorded as timed_out; one that runs
+    out of token_budget / cost_budget is stopped as budget_exceeded.
     """
+    scenario = build_scenario(request)
+
+    priority = request.priority or priority_for_scenario(request.scenario_type)
+    if priority not in PRIORITY_CLASSES:
+        raise HTTPException(status_code=400, detail=f"Invalid priority: {priority}")
+    deadline = submission_deadline(request)
+    fingerprint = request_fingerprint(request, scenario, priority, deadline)
+
+    if idempotency_key:
+        existing = await asyncio.to_thread(
+            workflow_store.find_by_idempotency_key, idempotency_key
+        )
+        if existing is not None:
+            return idempotent_response(existing, fingerprint)
+
+    no_cache = "no-cache" in (cache_control or "")
+    if not no_cache:
+        duplicate = await find_reusable_workflow(fingerprint)
+        if duplicate is not None:
+            return duplicate
+
     workflow_id = str(uuid.uuid4())
+    try:
+        ahead = await enqueue_workflow(
+            workflow_id,
+            request,
+            scenario,
+            priority,
+            deadline,
+            fingerprint,
+            reuse_stages=not no_cache,
+            idempotency_key=idempotency_key,
+        )
+    except DuplicateIdempotencyKeyError:
+        # A concurrent request with the same key was stored first
+        existing = await asyncio.to_thread(
+            workflow_store.find_by_idempotency_key, idempotency_key
+        )
+        if existing is None:
+            # ... and refused by admission control since: nothing to attach to
+            raise HTTPException(
+                status_code=409,
+                detail="A concurrent request with this Idempotency-Key was not accepted",
+                headers={"Retry-After": "1"},
+            )
+        return idempotent_response(existing, fingerprint)
+    return WorkflowResponse(
+        workflow_id=workflow_id,
+        status="queued",
+        message=f"Workflow queued ({ahead} ahead)"
+    )
+
+
+def idempotent_response(existing: Dict[str, Any], fingerprint: str) -> WorkflowResponse:
+    """The original workflow of a repeated Idempotency-Key (422 for another scenario)"""
+    if existing.get("fingerprint") != fingerprint:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different scenario",
+        )
+    CACHE_HITS.labels("idempotency_key").inc()
+    return WorkflowResponse(
+        workflow_id=existing["workflow_id"],
+        status=existing["status"],
+        message="Duplicate request (Idempotency-Key)",
+        reused=True,
+    )
+
+
+def submission_deadline(request: ScenarioRequest) -> float:
+    """Deadline in seconds for a submission (0 = none); 400 for bad limits"""
+    deadline = (
+        request.deadline_seconds
+        if request.deadline_seconds is not None
+        else config.WORKFLOW_DEADLINE
+    )
+    if deadline < 0:
+        raise HTTPException(status_code=400, detail="deadline_seconds must be >= 0")
+    if (request.token_budget or 0) < 0 or (request.cost_budget or 0) < 0:
+        raise HTTPException(status_code=400, detail="Budgets must be >= 0")
+    return deadline
+
+
+def request_fingerprint(
+    request: ScenarioRequest, scenario: Dict[str, Any], priority: str, deadline: float
+) -> str:
+    """Dedupe key of a submission: the scenario and the limits it runs under"""
+    return scenario_fingerprint(
+        request.scenario_type,
+        scenario,
+        llm_client.provider,
+        llm_client.model,
+        {
+            "priority": priority,
+            "deadline_seconds": deadline or None,
+            "token_budget": request.token_budget,
+            "cost_budget": request.cost_budget,
+        },
+    )
 
-    # Get scenario configuration
+
+async def enqueue_workflow(
+    workflow_id: str,
+    request: ScenarioRequest,
+    scenario: Dict[str, Any],
+    priority: str,
+    deadline: float,
+    fingerprint: str,
+    reuse_stages: bool = True,
+    idempotency_key: Optional[str] = None,
+    **fields: Any,
+) -> int:
+    """
+    Store a new workflow and hand it to the worker pool
+
+    Extra fields are stored on the record. Returns the number of jobs ahead
+    of it. A submission refused by admission control leaves no record
+    behind and raises HTTPException 429 (queue full) or 503 (deferred or
+    not accepting work) with Retry-After.
+    """
+    job = WorkflowJob(
+        workflow_id=workflow_id,
+        scenario=scenario,
+        priority=priority,
+        cancellation=CancellationToken(timeout=deadline),
+        token_budget=request.token_budget,
+        cost_budget=request.cost_budget,
+        reuse_stages=reuse_stages,
+    )
+    await store_writer.run(workflow_store.create, {
+        "workflow_id": workflow_id,
+        "status": "queued",
+        "created_at": job.queued_at,
+        "queued_at": job.queued_at,
+        "scenario_type": request.scenario_type,
+        "priority": priority,
+        "fingerprint": fingerprint,
+        "idempotency_key": idempotency_key,
+        "owner": INSTANCE_ID,
+        "lease_expires_at": lease_expiry(),
+        "deadline_seconds": deadline or None,
+        "deadline_at": deadline_after(job.queued_at, deadline),
+        "token_budget": request.token_budget,
+        "cost_budget": request.cost_budget,
+        # Kept so the workflow can be resumed after a failure or restart
+        "scenario": scenario,
+        "progress": 0,
+        **fields,
+    })
+
+    try:
+        return job_queue.submit(job)
+    except QueueFullError as e:
+        await store_writer.run(workflow_store.delete, workflow_id)
+        raise HTTPException(
+            # Deferred low-priority work is "try later", a full queue is "slow down"
+            status_code=503 if isinstance(e, AdmissionDeferredError) else 429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except QueueClosedError as e:
+        await store_writer.run(workflow_store.delete, workflow_id)
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "5"}
+        )
+
+
+def build_scenario(request: ScenarioRequest) -> Dict[str, Any]:
+    """Scenario configuration for a request (400 for an unknown type)"""
     if request.scenario_type == "emergency":
-        scenario = get_emergency_scenario()
+        return get_emergency_scenario()
     elif request.scenario_type == "infrastructure":
-        scenario = get_infrastructure_scenario()
+        return get_infrastructure_scenario()
     elif request.scenario_type == "custom":
-        scenario = {
+        return {
             "data_source": request.data_source,
             "context": request.context,
             "objectives": request.objectives,
@@ -122,89 +425,877 @@ async def run_workflow(request: ScenarioRequest, background_tasks: BackgroundTas
             "constraints": request.constraints,
             "resources": request.resources,
             "timeline": request.timeline,
+            "decision_criteria": request.decision_criteria,
+            "criteria": request.criteria,
+            "allocation": request.allocation,
         }
-    else:
-        raise HTTPException(status_code=400, detail="Invalid scenario type")
+    raise HTTPException(status_code=400, detail="Invalid scenario type")
 
-    # Initialize workflow status
-    workflow_status[workflow_id] = "running"
-    workflows[workflow_id] = {
-        "workflow_id": workflow_id,
-        "status": "running",
-        "started_at": datetime.now().isoformat(),
-        "scenario_type": request.scenario_type,
-        "progress": 0
+
+@app.post("/workflow/batch")
+async def run_batch(
+    request: BatchRequest,
+    detail: str = Query("summary", pattern="^(summary|full)$"),
+):
+    """
+    Queue several scenarios and stream results as newline-delimited JSON
+
+    Each entry of `scenarios` takes the fields of POST /workflow/run and is
+    merged over `base`, so regional variants only list what differs. Every
+    item is queued as its own workflow at the batch priority class (see
+    bulk_priority), under the same admission control as POST
+    /workflow/run: if any item is refused, none is queued and the batch
+    gets 429/503 with Retry-After. Identical stages across items, such as
+    ingesting and analyzing a shared data source, run once.
+
+    The first line, {"type": "accepted"}, lists the item workflow ids; the
+    items are stored like any workflow and can be polled with GET
+    /workflow/{id} even if the stream is dropped. One {"type": "item"} line
+    follows per scenario as it finishes (detail=full adds every stage's
+    output), then a {"type": "summary"} line with statuses, usage and
+    decision counts.
+    """
+    if not 1 <= len(request.scenarios) <= config.BATCH_MAX_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch takes 1 to {config.BATCH_MAX_SCENARIOS} scenarios",
+        )
+    priority = bulk_priority(request.priority)
+
+    items = []
+    for index, item in enumerate(request.scenarios):
+        try:
+            scenario_request = ScenarioRequest(**{**(request.base or {}), **item})
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=422, detail={"index": index, "errors": e.errors(include_url=False)}
+            )
+        if scenario_request.deadline_seconds is None:
+            scenario_request.deadline_seconds = request.deadline_seconds
+        items.append((scenario_request, build_scenario(scenario_request), {"batch_index": index}))
+
+    batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+    workflow_ids = await enqueue_items(batch_id, items, priority, batch_id=batch_id)
+
+    async def stream():
+        yield to_json(accepted_line(workflow_ids, batch_id=batch_id)) + "\n"
+        started = time.perf_counter()
+        completed = []
+        async for index, results in as_finished(workflow_ids):
+            completed.append(results)
+            item = {"index": index, "workflow_id": results["workflow_id"], "results": results}
+            yield to_json(batch_item(item, full=detail == "full")) + "\n"
+        yield to_json({
+            "type": "summary",
+            **summarize_batch(batch_id, completed, time.perf_counter() - started),
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/workflow/sweep")
+async def run_sweep_request(request: SweepRequest):
+    """
+    Queue one scenario over a parameter grid, streaming NDJSON outcomes
+
+    `grid` maps dotted paths under constraints, objectives,
+    decision_criteria, criteria (MCDA weights) or allocation (e.g.
+    allocation.budget) to the values to try; every combination is one grid
+    point. Each point is queued as its own workflow, like a batch item (at
+    the batch priority class, all points or none). Ingestion and analysis
+    run once for the whole sweep, and each point only re-runs the stages
+    its parameters affect.
+
+    The first line, {"type": "accepted"}, lists the point workflow ids.
+    One {"type": "point"} line (parameters, decision, confidence, usage)
+    follows per point as it finishes, then a {"type": "summary"} line whose
+    "matrix" compares all points.
+    """
+    try:
+        points = expand_grid(request.grid)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(points) > config.SWEEP_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Grid has {len(points)} points (max {config.SWEEP_MAX_POINTS})",
+        )
+    priority = bulk_priority(request.priority)
+
+    try:
+        scenario_request = ScenarioRequest(**request.scenario)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    if request.deadline_seconds is not None:
+        scenario_request.deadline_seconds = request.deadline_seconds
+    scenario = build_scenario(scenario_request)
+    try:
+        items = [
+            (scenario_request, apply_point(scenario, point), {"sweep_parameters": point})
+            for point in points
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    sweep_id = f"sweep_{uuid.uuid4().hex[:12]}"
+    workflow_ids = await enqueue_items(sweep_id, items, priority, sweep_id=sweep_id)
+
+    async def stream():
+        yield to_json(accepted_line(workflow_ids, sweep_id=sweep_id)) + "\n"
+        started = time.perf_counter()
+        completed, outcomes = [], []
+        async for index, results in as_finished(workflow_ids):
+            completed.append(results)
+            outcome = point_outcome(index, points[index], results)
+            outcomes.append(outcome)
+            yield to_json({"type": "point", **outcome}) + "\n"
+        yield to_json(summarize_sweep(
+            sweep_id,
+            request.grid,
+            outcomes,
+            summarize_batch(sweep_id, completed, time.perf_counter() - started),
+        )) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def bulk_priority(requested: Optional[str]) -> str:
+    """
+    Priority class for batch and sweep items (400 if not allowed)
+
+    Defaults to the batch class. A bulk request may pick a class up to the
+    weight of DEFAULT_PRIORITY but never above it, so a caller cannot queue
+    many items ahead of critical work in the weighted fair queue.
+    """
+    priority = requested or "batch"
+    if priority not in PRIORITY_CLASSES:
+        raise HTTPException(status_code=400, detail=f"Invalid priority: {priority}")
+    ceiling = PRIORITY_CLASSES.get(config.DEFAULT_PRIORITY)
+    if ceiling is not None and PRIORITY_CLASSES[priority].weight > ceiling.weight:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch and sweep items cannot run above the {ceiling.name} class",
+        )
+    return priority
+
+
+async def enqueue_items(
+    prefix: str,
+    items: List[Tuple[ScenarioRequest, Dict[str, Any], Dict[str, Any]]],
+    priority: str,
+    **fields: Any,
+) -> List[str]:
+    """
+    Queue the (request, scenario, record fields) items of a batch or sweep
+
+    Item i becomes workflow "{prefix}_{i}". All or nothing: if admission
+    control refuses an item, those already queued are withdrawn and the
+    HTTPException is raised.
+    """
+    limits = [submission_deadline(scenario_request) for scenario_request, _, _ in items]
+    workflow_ids: List[str] = []
+    try:
+        for index, ((scenario_request, scenario, item_fields), deadline) in enumerate(
+            zip(items, limits)
+        ):
+            workflow_id = f"{prefix}_{index}"
+            await enqueue_workflow(
+                workflow_id,
+                scenario_request,
+                scenario,
+                priority,
+                deadline,
+                request_fingerprint(scenario_request, scenario, priority, deadline),
+                **fields,
+                **item_fields,
+            )
+            workflow_ids.append(workflow_id)
+    except HTTPException:
+        for workflow_id in workflow_ids:
+            job_queue.cancel(workflow_id)
+            await store_writer.run(workflow_store.delete, workflow_id)
+        raise
+    return workflow_ids
+
+
+def accepted_line(workflow_ids: List[str], **ids: str) -> Dict[str, Any]:
+    """First NDJSON line of a batch or sweep: the queued workflow ids"""
+    return {
+        "type": "accepted",
+        **ids,
+        "workflows": [
+            {"index": index, "workflow_id": workflow_id}
+            for index, workflow_id in enumerate(workflow_ids)
+        ],
     }
 
-    # Run workflow in background
-    background_tasks.add_task(execute_workflow, workflow_id, scenario)
 
-    return WorkflowResponse(
-        workflow_id=workflow_id,
+async def as_finished(workflow_ids: List[str]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    (index, stored results) of each workflow as it finishes
+
+    Closing the iterator (the client went away) only stops waiting; the
+    workflows keep running.
+    """
+    waits = {
+        asyncio.create_task(finished_results(workflow_id)): index
+        for index, workflow_id in enumerate(workflow_ids)
+    }
+    try:
+        pending = set(waits)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=waits.get):
+                yield waits[task], task.result()
+    finally:
+        for task in waits:
+            task.cancel()
+
+
+async def finished_results(workflow_id: str) -> Dict[str, Any]:
+    """Stored results of a workflow, once it has finished"""
+    async for _ in event_broker.subscribe(workflow_id):
+        pass
+    record = await asyncio.to_thread(workflow_store.get, workflow_id)
+    return stored_results(record or {"workflow_id": workflow_id, "status": "deleted"})
+
+
+def stored_results(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Orchestrator-style results of a finished workflow record
+
+    Stages are rebuilt as AgentResponse objects; workflows that stopped
+    without results (failed, rejected) report their record status.
+    """
+    results = dict(record.get("results") or {})
+    stages = {}
+    for stage, payload in (results.get("stages") or {}).items():
+        try:
+            stages[stage] = restore_stage(payload)
+        except (TypeError, ValueError):
+            continue
+    results["stages"] = stages
+    results["workflow_id"] = record["workflow_id"]
+    results.setdefault("status", record.get("status"))
+    results.setdefault("error", record.get("error"))
+    results.setdefault("reused_stages", [])
+    results.setdefault("usage", {
+        "calls": 0,
+        "total_tokens": record.get("total_tokens") or 0,
+        "cost_usd": record.get("cost_usd") or 0.0,
+    })
+    return results
+
+
+def batch_item(item: Dict[str, Any], full: bool = False) -> Dict[str, Any]:
+    """NDJSON line for one finished batch item"""
+    results = item["results"]
+    stages = results.get("stages", {})
+    decision = stages.get("decision")
+    line = {
+        "type": "item",
+        "index": item["index"],
+        "workflow_id": item["workflow_id"],
+        "status": results["status"],
+        "error": results.get("error"),
+        "reused_stages": results["reused_stages"],
+        "usage": {k: results["usage"][k] for k in ("calls", "total_tokens", "cost_usd")},
+        "decision": decision.data.get("decision") if decision is not None else None,
+    }
+    if full:
+        line["stages"] = stages
+    return line
+
+
+async def find_reusable_workflow(fingerprint: str) -> Optional[WorkflowResponse]:
+    """Existing in-flight or fresh completed workflow with this fingerprint"""
+    existing = await asyncio.to_thread(
+        workflow_store.find_by_fingerprint, fingerprint, ["queued", "running", "completed"]
+    )
+    if existing is None:
+        return None
+
+    if existing["status"] in ("queued", "running"):
+        CACHE_HITS.labels("in_flight").inc()
+        return WorkflowResponse(
+            workflow_id=existing["workflow_id"],
+            status=existing["status"],
+            message="Attached to identical workflow in progress",
+            reused=True,
+        )
+
+    # Completed: reuse only successful results inside the freshness window
+    completed_at = existing.get("completed_at")
+    if (
+        config.RESULT_REUSE_WINDOW > 0
+        and completed_at
+        and existing.get("result_status") == "success"
+        and (datetime.now() - datetime.fromisoformat(completed_at)).total_seconds()
+        <= config.RESULT_REUSE_WINDOW
+    ):
+        CACHE_HITS.labels("result").inc()
+        return WorkflowResponse(
+            workflow_id=existing["workflow_id"],
+            status="completed",
+            message="Reused result of identical workflow",
+            reused=True,
+        )
+
+    return None
+
+
+async def execute_workflow(job: WorkflowJob):
+    """Execute a queued workflow on a pool worker"""
+    workflow_id = job.workflow_id
+    scenario = job.scenario
+    started = time.monotonic()
+
+    if not job.cancellation.cancelled and await asyncio.to_thread(
+        cancel_requested, workflow_id
+    ):
+        job.cancellation.cancel("cancelled")
+    if job.cancellation.cancelled:
+        # Deadline passed or cancelled (by another worker) while queued:
+        # never start it
+        await record_interrupted(workflow_id, job.cancellation.reason)
+        return
+
+    await store_writer.run(
+        workflow_store.update,
+        workflow_id,
         status="running",
-        message="Workflow started successfully"
+        started_at=datetime.now().isoformat(),
+        queue_wait_seconds=round(job.queue_wait, 3),
     )
 
+    def on_event(event_type: str, data: Dict[str, Any]):
+        """Record orchestrator progress and publish it to stream subscribers"""
+        # Runs on the event loop: writes are queued, not waited for
+        if event_type == "stage_started":
+            store_writer.submit(
+                workflow_store.update,
+                workflow_id,
+                progress=data["progress"],
+                current_stage=data["label"],
+            )
+        elif event_type in ("stage_finished", "analysis_completed"):
+            store_writer.submit(workflow_store.update, workflow_id, progress=data["progress"])
+        event_broker.publish(workflow_id, event_type, data)
 
-async def execute_workflow(workflow_id: str, scenario: Dict[str, Any]):
-    """Execute the workflow in background"""
+    watcher = asyncio.create_task(watch_cancel_request(job))
     try:
         orchestrator = AgenticOrchestrator()
+        event_broker.publish(workflow_id, "workflow_started", {"progress": 0})
 
-        # Update progress
-        workflows[workflow_id]["progress"] = 10
-        workflows[workflow_id]["current_stage"] = "Data Ingestion"
+        # LLM calls made by this workflow are scheduled at its priority
+        span_attributes = {
+            "workflow.job_id": workflow_id,
+            "workflow.priority": job.priority,
+            "workflow.queue_wait_ms": round(job.queue_wait * 1000, 1),
+        }
+        with tracer.span("workflow.job", span_attributes), priority_context(job.priority):
+            results = await orchestrator.execute_workflow(
+                scenario,
+                verbose=False,
+                event_callback=on_event,
+                cancellation=job.cancellation,
+                token_budget=job.token_budget,
+                cost_budget=job.cost_budget,
+                reuse_stages=job.reuse_stages,
+                workflow_id=workflow_id,
+                checkpointer=RepositoryCheckpointer(workflow_store, store_writer),
+                resume=job.resume,
+            )
 
-        results = await orchestrator.execute_workflow(scenario, verbose=False)
+        if results.get("status") in ("cancelled", "timed_out", "budget_exceeded"):
+            await record_interrupted(
+                workflow_id,
+                results["status"],
+                results,
+                execution_seconds=round(time.monotonic() - started, 3),
+            )
+            return
 
-        # Store results
-        workflows[workflow_id].update({
-            "status": "completed",
-            "completed_at": datetime.now().isoformat(),
-            "progress": 100,
-            "results": results,
-            "current_stage": "Completed"
-        })
-        workflow_status[workflow_id] = "completed"
+        # Store results (stage results are written as one batch)
+        await store_writer.run(workflow_store.save_results, workflow_id, results)
+        await store_writer.run(
+            workflow_store.update,
+            workflow_id,
+            status="completed",
+            completed_at=datetime.now().isoformat(),
+            execution_seconds=round(time.monotonic() - started, 3),
+            result_status=results.get("status"),
+            total_tokens=results["usage"]["total_tokens"],
+            cost_usd=results["usage"]["cost_usd"],
+            progress=100,
+            current_stage="Completed",
+        )
+        WORKFLOWS.labels("completed").inc()
+        event_broker.publish(
+            workflow_id,
+            "workflow_completed",
+            {"status": "completed", "result_status": results.get("status"), "progress": 100},
+        )
+        store_writer.submit(apply_retention, workflow_id)
 
     except Exception as e:
-        workflows[workflow_id].update({
-            "status": "failed",
-            "completed_at": datetime.now().isoformat(),
-            "error": str(e),
-            "current_stage": "Failed"
-        })
-        workflow_status[workflow_id] = "failed"
+        await store_writer.run(
+            workflow_store.update,
+            workflow_id,
+            status="failed",
+            completed_at=datetime.now().isoformat(),
+            execution_seconds=round(time.monotonic() - started, 3),
+            error=str(e),
+            current_stage="Failed",
+        )
+        WORKFLOWS.labels("failed").inc()
+        event_broker.publish(
+            workflow_id, "workflow_failed", {"status": "failed", "error": str(e)}
+        )
+        store_writer.submit(apply_retention, workflow_id)
+    finally:
+        watcher.cancel()
+
+
+def cancel_requested(workflow_id: str) -> bool:
+    """Whether a cancel was requested through the store (or the record deleted)"""
+    return (
+        workflow_store.get_status(workflow_id) is None
+        or workflow_store.is_cancel_requested(workflow_id)
+    )
+
+
+async def watch_cancel_request(job: WorkflowJob):
+    """Fire a running job's token when another server process cancels it"""
+    while not job.cancellation.cancelled:
+        await asyncio.sleep(config.EVENT_POLL_INTERVAL)
+        if await asyncio.to_thread(cancel_requested, job.workflow_id):
+            job.cancellation.cancel("cancelled")
+            return
+
+
+async def record_interrupted(
+    workflow_id: str,
+    reason: str,
+    results: Optional[Dict[str, Any]] = None,
+    execution_seconds: Optional[float] = None,
+):
+    """Record a workflow stopped by a cancel request, deadline or budget"""
+    if await store_writer.run(workflow_store.get_status, workflow_id) is None:
+        # Deleted while running; nothing left to record
+        return
+
+    results = results or {}
+    skipped = results.get("skipped_stages", [key for key, _, _ in STAGES])
+    fields = {
+        "status": reason,
+        "completed_at": datetime.now().isoformat(),
+        "result_status": reason,
+        "error": results.get("error") or str(WorkflowCancelled(reason)),
+        "interrupted_stage": results.get("interrupted_stage"),
+        "skipped_stages": skipped,
+        "current_stage": reason.replace("_", " ").capitalize(),
+    }
+    if execution_seconds is not None:
+        fields["execution_seconds"] = execution_seconds
+    if "usage" in results:
+        fields["total_tokens"] = results["usage"]["total_tokens"]
+        fields["cost_usd"] = results["usage"]["cost_usd"]
+
+    # Stages that finished before the interruption are kept
+    if results:
+        await store_writer.run(workflow_store.save_results, workflow_id, results)
+    await store_writer.run(workflow_store.update, workflow_id, **fields)
+    WORKFLOWS.labels(reason).inc()
+    event_broker.publish(
+        workflow_id,
+        f"workflow_{reason}",
+        {
+            "status": reason,
+            "interrupted_stage": fields["interrupted_stage"],
+            "skipped_stages": skipped,
+        },
+    )
+    store_writer.submit(apply_retention, workflow_id)
 
 
 @app.get("/workflow/{workflow_id}")
 async def get_workflow_status(workflow_id: str):
     """Get workflow status and results"""
-    if workflow_id not in workflows:
+    workflow = await asyncio.to_thread(workflow_store.get, workflow_id)
+    if workflow is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    return workflow
+
+
+def shed_workflow(job: WorkflowJob):
+    """Record a queued workflow dropped by admission control"""
+    store_writer.submit(
+        workflow_store.update,
+        job.workflow_id,
+        status="rejected",
+        completed_at=datetime.now().isoformat(),
+        error=f"Shed from the queue to admit higher-priority work ({job.priority})",
+        current_stage="Rejected",
+    )
+    WORKFLOWS.labels("rejected").inc()
+    event_broker.publish(job.workflow_id, "workflow_rejected", {"status": "rejected"})
+    store_writer.submit(apply_retention, job.workflow_id)
+
+
+# Monotonic time of the last purge of expired workflows
+_last_purge: Optional[float] = None
+
+
+def apply_retention(workflow_id: Optional[str] = None):
+    """
+    Enforce WORKFLOW_EVENT_RETENTION and WORKFLOW_RETENTION_DAYS
+
+    Runs on the store writer thread. For a workflow that just finished,
+    trims its event log and purges expired workflows at most hourly; with
+    no workflow_id (startup) trims every event log and purges at once.
+    """
+    global _last_purge
+
+    if config.WORKFLOW_EVENT_RETENTION > 0:
+        workflow_store.trim_events(config.WORKFLOW_EVENT_RETENTION, workflow_id)
+
+    now = time.monotonic()
+    if config.WORKFLOW_RETENTION_DAYS > 0 and (
+        workflow_id is None or _last_purge is None or now - _last_purge >= 3600
+    ):
+        _last_purge = now
+        cutoff = datetime.now() - timedelta(days=config.WORKFLOW_RETENTION_DAYS)
+        workflow_store.delete_finished(cutoff.isoformat(), sorted(TERMINAL_STATUSES))
+
+
+# Bounded worker pool for workflow execution
+job_queue = WorkflowJobQueue(
+    execute_workflow,
+    workers=config.WORKFLOW_WORKERS,
+    max_depth=config.WORKFLOW_QUEUE_MAX,
+    shed_threshold=config.ADMISSION_SHED_THRESHOLD,
+    on_shed=shed_workflow,
+)
+
+
+@app.get("/workflow/{workflow_id}/events")
+async def stream_workflow_events(
+    workflow_id: str,
+    request: Request,
+    last_event_id: Optional[int] = None,
+):
+    """
+    Stream workflow progress as Server-Sent Events
+
+    Events: workflow_started, stage_started, analysis_completed,
+    stage_finished, then one of workflow_completed / workflow_failed /
+    workflow_rejected / workflow_cancelled / workflow_timed_out /
+    workflow_budget_exceeded. Reconnecting
+    clients resume after the Last-Event-ID header (or ?last_event_id=).
+    """
+    if await asyncio.to_thread(workflow_store.get_status, workflow_id) is None:
         raise HTTPException(status_code=404, detail="Workflow not found")
 
-    return workflows[workflow_id]
+    header_id = request.headers.get("last-event-id")
+    try:
+        start_id = int(header_id) if header_id else (last_event_id or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    async def event_stream():
+        async for event in event_broker.subscribe(workflow_id, start_id):
+            if await request.is_disconnected():
+                break
+            yield event.to_sse() if event is not None else ": keep-alive\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/workflows")
-async def list_workflows():
-    """List all workflows"""
+async def list_workflows(
+    status: Optional[str] = None,
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    fields: Optional[str] = None,
+):
+    """
+    List workflows (newest first) with cursor pagination
+
+    Only lightweight fields are returned (id, status, progress, timestamps
+    by default); use `fields` to pick others from LISTABLE_FIELDS. Full
+    results are served by GET /workflow/{workflow_id}. `total` counts all
+    workflows matching the status and created_* filters.
+    """
+    field_list = (
+        [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    )
+
+    try:
+        records, next_cursor = await asyncio.to_thread(
+            workflow_store.list_page,
+            status=status,
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            limit=limit,
+            fields=field_list,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     return {
-        "workflows": list(workflows.values()),
-        "total": len(workflows)
+        "workflows": records,
+        "next_cursor": next_cursor,
+        "total": await asyncio.to_thread(
+            workflow_store.count, status, created_after, created_before
+        ),
+    }
+
+
+@app.post("/workflow/{workflow_id}/cancel", response_model=WorkflowResponse)
+async def cancel_workflow(workflow_id: str):
+    """
+    Cancel a queued or running workflow
+
+    A queued workflow is removed from the queue immediately. A running one
+    is stopped at once: its in-flight LLM calls are aborted, finished stages
+    are kept and the rest are recorded as skipped. A workflow owned by
+    another server process is flagged in the store; its worker picks the
+    request up within EVENT_POLL_INTERVAL seconds.
+    """
+    status = await asyncio.to_thread(workflow_store.get_status, workflow_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    if status in TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Workflow already {status}")
+
+    job = job_queue.cancel(workflow_id)
+    if job is None:
+        await store_writer.run(workflow_store.update, workflow_id, cancel_requested=True)
+        return WorkflowResponse(
+            workflow_id=workflow_id,
+            status="cancelling",
+            message="Cancellation requested; the worker running it will stop it",
+        )
+
+    if job.started_at is None:
+        await record_interrupted(workflow_id, "cancelled")
+        return WorkflowResponse(
+            workflow_id=workflow_id,
+            status="cancelled",
+            message="Workflow cancelled before it started",
+        )
+
+    return WorkflowResponse(
+        workflow_id=workflow_id,
+        status="cancelling",
+        message="Cancellation requested; in-flight LLM calls are being aborted",
+    )
+
+
+@app.post("/workflow/{workflow_id}/resume", response_model=WorkflowResponse)
+async def resume_workflow(workflow_id: str):
+    """
+    Resume a failed, interrupted or stopped workflow
+
+    Completed stages are checkpointed as they finish; the workflow is queued
+    again and continues after its last good stage, so upstream LLM work is
+    not repeated. Stages that had failed, and everything after them, run
+    again. The original priority and budgets apply; the deadline counts
+    again from the resume.
+    """
+    workflow = await asyncio.to_thread(workflow_store.get, workflow_id)
+    if workflow is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    if workflow["status"] not in TERMINAL_STATUSES:
+        raise HTTPException(
+            status_code=409, detail=f"Workflow is {workflow['status']}"
+        )
+    if not workflow.get("scenario"):
+        raise HTTPException(
+            status_code=409,
+            detail="Workflow has no stored scenario to resume; submit it again",
+        )
+
+    stages = (workflow.get("results") or {}).get("stages") or {}
+    restored = resumable_prefix(stages, [key for key, _, _ in STAGES])
+    if workflow["status"] == "completed" and len(restored) == len(STAGES):
+        raise HTTPException(
+            status_code=409, detail="Workflow completed successfully; nothing to resume"
+        )
+
+    previous = {
+        k: workflow.get(k)
+        for k in ("status", "completed_at", "error", "current_stage", "deadline_at")
     }
+    workflow["deadline_at"] = deadline_after(
+        datetime.now().isoformat(), workflow.get("deadline_seconds")
+    )
+    try:
+        await requeue_workflow(workflow)
+    except QueueFullError as e:
+        await store_writer.run(workflow_store.update, workflow_id, **previous)
+        raise HTTPException(
+            status_code=503 if isinstance(e, AdmissionDeferredError) else 429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except QueueClosedError as e:
+        await store_writer.run(workflow_store.update, workflow_id, **previous)
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "5"}
+        )
+
+    return WorkflowResponse(
+        workflow_id=workflow_id,
+        status="queued",
+        message=f"Workflow resumed ({len(restored)} completed stages restored)",
+    )
+
+
+async def requeue_workflow(workflow: Dict[str, Any]) -> int:
+    """
+    Queue a stored workflow again, resuming from its checkpoints
+
+    The deadline keeps counting from deadline_at; a workflow whose deadline
+    passed meanwhile is recorded as timed_out instead of running. Returns
+    the number of jobs ahead of it. Raises QueueFullError or
+    QueueClosedError (the record is then left as queued; callers restore it).
+    """
+    workflow_id = workflow["workflow_id"]
+    deadline_at = workflow.get("deadline_at")
+    if deadline_at is None and workflow.get("created_at"):
+        # Records stored before deadline_at
+        deadline_at = deadline_after(workflow["created_at"], workflow.get("deadline_seconds"))
+    job = WorkflowJob(
+        workflow_id=workflow_id,
+        scenario=workflow["scenario"],
+        priority=workflow.get("priority") or config.DEFAULT_PRIORITY,
+        cancellation=deadline_token(deadline_at),
+        token_budget=workflow.get("token_budget"),
+        cost_budget=workflow.get("cost_budget"),
+        resume=True,
+    )
+    await store_writer.run(
+        workflow_store.update,
+        workflow_id,
+        status="queued",
+        owner=INSTANCE_ID,
+        lease_expires_at=lease_expiry(),
+        deadline_at=deadline_at,
+        queued_at=job.queued_at,
+        resumed_at=job.queued_at,
+        resume_count=(workflow.get("resume_count") or 0) + 1,
+        completed_at=None,
+        error=None,
+        cancel_requested=None,
+        current_stage="Resuming",
+    )
+    ahead = job_queue.submit(job)
+    event_broker.publish(workflow_id, "workflow_resumed", {"status": "queued"})
+    return ahead
+
+
+def lease_expiry() -> str:
+    """Expiry of a lease taken or renewed now"""
+    return (datetime.now() + timedelta(seconds=config.WORKFLOW_LEASE_SECONDS)).isoformat()
+
+
+def deadline_after(start: str, deadline_seconds: Optional[float]) -> Optional[str]:
+    """Absolute (ISO) deadline deadline_seconds after start; None without one"""
+    if not deadline_seconds:
+        return None
+    return (datetime.fromisoformat(start) + timedelta(seconds=deadline_seconds)).isoformat()
+
+
+def deadline_token(deadline_at: Optional[str]) -> CancellationToken:
+    """Cancellation token for the time left until deadline_at"""
+    if deadline_at is None:
+        return CancellationToken()
+    remaining = (datetime.fromisoformat(deadline_at) - datetime.now()).total_seconds()
+    token = CancellationToken(timeout=remaining)
+    if remaining <= 0:
+        token.cancel("timed_out")
+    return token
+
+
+async def recover_interrupted_workflows():
+    """
+    Take over workflows left queued or running by a stopped server process
+
+    Only workflows whose lease expired are claimed (so those of live
+    sibling workers are left alone), and each by exactly one process. With
+    RESUME_ON_STARTUP they are queued again and resume from their
+    checkpoints; otherwise (or if they cannot be queued) they are marked
+    interrupted and can be resumed with POST /workflow/{id}/resume.
+    """
+    claimed = await store_writer.run(
+        workflow_store.claim_expired,
+        INSTANCE_ID,
+        lease_expiry(),
+        datetime.now().isoformat(),
+        ACTIVE_STATUSES,
+    )
+    for workflow in claimed:
+        if workflow.get("cancel_requested"):
+            # Cancelled while its server was down: honour the request
+            await record_interrupted(workflow["workflow_id"], "cancelled")
+            continue
+        if config.RESUME_ON_STARTUP and workflow.get("scenario"):
+            try:
+                await requeue_workflow(workflow)
+                continue
+            except (QueueFullError, QueueClosedError):
+                pass
+
+        await store_writer.run(
+            workflow_store.update,
+            workflow["workflow_id"],
+            status="interrupted",
+            completed_at=datetime.now().isoformat(),
+            error=f"Server stopped while the workflow was {workflow['status']}",
+            current_stage="Interrupted",
+        )
+        WORKFLOWS.labels("interrupted").inc()
+        event_broker.publish(
+            workflow["workflow_id"], "workflow_interrupted", {"status": "interrupted"}
+        )
+
+
+async def maintain_leases():
+    """
+    Renew this process's workflow leases and take over expired ones
+
+    Runs for the server's lifetime, every third of WORKFLOW_LEASE_SECONDS,
+    so a worker that stops is replaced without waiting for a restart.
+    """
+    while True:
+        await asyncio.sleep(config.WORKFLOW_LEASE_SECONDS / 3)
+        try:
+            await store_writer.run(
+                workflow_store.renew_leases, INSTANCE_ID, lease_expiry(), ACTIVE_STATUSES
+            )
+            await recover_interrupted_workflows()
+        except Exception:
+            # A busy or briefly unavailable store: retried on the next beat
+            continue
 
 
 @app.delete("/workflow/{workflow_id}")
 async def delete_workflow(workflow_id: str):
-    """Delete a workflow"""
-    if workflow_id not in workflows:
+    """Delete a workflow, cancelling it first if it is still active"""
+    job_queue.cancel(workflow_id)
+    if not await store_writer.run(workflow_store.delete, workflow_id):
         raise HTTPException(status_code=404, detail="Workflow not found")
 
-    del workflows[workflow_id]
-    if workflow_id in workflow_status:
-        del workflow_status[workflow_id]
-
     return {"message": "Workflow deleted successfully"}
 
 
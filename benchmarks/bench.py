@@ -0,0 +1,361 @@
+"""
+Benchmark Suite
+Full-workflow and per-agent latency, throughput at increasing concurrency,
+peak RSS and event-loop lag, measured against the simulated LLM provider
+
+Usage:
+    python benchmarks/bench.py                    # run and write results.json
+    python benchmarks/bench.py --save-baseline    # also write baseline.json
+    python benchmarks/bench.py --compare          # flag regressions vs baseline
+"""
+
+from typing import Dict, Any, Callable, List, Optional
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Orchestrator benchmark suite")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Simulated LLM latency in seconds (default 0.05)")
+    parser.add_argument("--jitter", type=float, default=0.01,
+                        help="Standard deviation of the simulated latency")
+    parser.add_argument("--iterations", type=int, default=20,
+                        help="Serial runs per latency benchmark")
+    parser.add_argument("--concurrency", default="1,4,16,64",
+                        help="Comma-separated concurrency levels for throughput")
+    parser.add_argument("--workflows", type=int, default=64,
+                        help="Workflows per concurrency level")
+    parser.add_argument("--llm-concurrency", type=int, default=None,
+                        help="Override LLM_MAX_CONCURRENCY (0 = unlimited)")
+    parser.add_argument("--output", default=os.path.join(HERE, "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(HERE, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write the results to the baseline file as well")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare with the baseline; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative change counted as a regression (default 0.2)")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point the system at the simulated provider (before it is imported)"""
+    os.environ["LLM_PROVIDER"] = "simulated"
+    os.environ["SIMULATED_LATENCY"] = str(args.latency)
+    os.environ["SIMULATED_LATENCY_JITTER"] = str(args.jitter)
+    os.environ["TRACE_EXPORTER"] = "none"
+    if args.llm_concurrency is not None:
+        os.environ["LLM_MAX_CONCURRENCY"] = str(args.llm_concurrency)
+    sys.path.insert(0, ROOT)
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a periodic timer"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def __enter__(self) -> "LoopLagMonitor":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._task.cancel()
+
+
+class Results:
+    """Named measurements with units and the direction that is better"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, value: Optional[float], unit: str, better: str = "lower") -> None:
+        if value is not None:
+            self.metrics[name] = {"value": round(value, 6), "unit": unit, "better": better}
+
+    def add_latency(self, prefix: str, samples: List[float]) -> None:
+        for p in (50, 95, 99):
+            self.add(f"{prefix}.latency.p{p}", percentile(samples, p), "s")
+
+
+def load_scenario() -> Dict[str, Any]:
+    """Benchmark scenario built on the bundled disaster report"""
+    with open(os.path.join(ROOT, "examples", "disaster_report.txt"), encoding="utf-8") as f:
+        report = f.read()
+
+    return {
+        "data_source": {"source_type": "text", "data": report},
+        "context": "Earthquake response resource allocation within 72 hours",
+        "objectives": ["Minimize casualties", "Restore critical services"],
+        "options": [
+            {"option_id": "opt_1", "name": "Concentrate on Alpha",
+             "description": "Send most teams to the metropolitan area"},
+            {"option_id": "opt_2", "name": "Proportional Distribution",
+             "description": "Allocate by affected population"},
+            {"option_id": "opt_3", "name": "Staged Response",
+             "description": "Triage first, then expand systematically"},
+        ],
+        "constraints": {"time_constraint": "72 hours", "budget": "$500M"},
+        "resources": {"personnel": "2,000 responders"},
+        "timeline": "72 hours",
+    }
+
+
+async def timed(func: Callable, iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def new_orchestrator() -> Any:
+    from orchestrator import AgenticOrchestrator
+
+    return AgenticOrchestrator()
+
+
+async def bench_workflow(results: Results, scenario: Dict[str, Any], iterations: int) -> None:
+    async def run() -> None:
+        outcome = await new_orchestrator().execute_workflow(scenario, verbose=False)
+        if outcome["status"] != "success":
+            raise RuntimeError(f"Workflow failed: {outcome.get('error')}")
+
+    await run()  # warm-up: first-call imports and allocations
+    results.add_latency("workflow", await timed(run, iterations))
+
+
+async def bench_agents(results: Results, scenario: Dict[str, Any], iterations: int) -> None:
+    from agents import (
+        DataIngestionAgent,
+        AnalysisAgent,
+        ReasoningAgent,
+        DecisionAgent,
+        ExecutionAgent,
+    )
+
+    ingestion_agent = DataIngestionAgent()
+    ingested = await ingestion_agent.execute(scenario["data_source"])
+    index = ingestion_agent.build_index(ingested.data)
+
+    results.add_latency(
+        "agent.ingestion",
+        await timed(lambda: ingestion_agent.execute(scenario["data_source"]), iterations),
+    )
+    start = time.perf_counter()
+    for _ in range(iterations):
+        ingestion_agent.build_index(ingested.data)
+    results.add("agent.ingestion.build_index.mean", (time.perf_counter() - start) / iterations, "s")
+
+    analysis_agent = AnalysisAgent()
+    analyses = {}
+    for analysis_type in ("constraints", "insights", "risks", "summary"):
+        task = {
+            "data": ingested.data,
+            "analysis_type": analysis_type,
+            "context": scenario["context"],
+            "retrieval_index": index,
+        }
+        analyses[analysis_type] = (await analysis_agent.execute(task)).data
+        results.add_latency(
+            f"agent.analysis.{analysis_type}",
+            await timed(lambda: analysis_agent.execute(task), iterations),
+        )
+
+    reasoning_agent = ReasoningAgent()
+    reasoning_task = {
+        "options": scenario["options"],
+        "constraints": scenario["constraints"],
+        "objectives": scenario["objectives"],
+        "context": scenario["context"],
+        "retrieval_index": index,
+    }
+    reasoning = await reasoning_agent.execute(reasoning_task)
+    results.add_latency(
+        "agent.reasoning", await timed(lambda: reasoning_agent.execute(reasoning_task), iterations)
+    )
+
+    decision_agent = DecisionAgent()
+    decision_task = {
+        "analysis_results": analyses,
+        "reasoning_results": reasoning.data,
+        "context": scenario["context"],
+        "decision_criteria": {},
+    }
+    decision = await decision_agent.execute(decision_task)
+    results.add_latency(
+        "agent.decision", await timed(lambda: decision_agent.execute(decision_task), iterations)
+    )
+
+    execution_agent = ExecutionAgent()
+    execution_task = {
+        "decision": decision.data.get("decision", {}),
+        "resources": scenario["resources"],
+        "timeline": scenario["timeline"],
+        "output_format": "report",
+    }
+    results.add_latency(
+        "agent.execution", await timed(lambda: execution_agent.execute(execution_task), iterations)
+    )
+
+
+async def bench_throughput(
+    results: Results, scenario: Dict[str, Any], levels: List[int], workflows: int
+) -> None:
+    lag_samples: List[float] = []
+
+    for level in levels:
+        semaphore = asyncio.Semaphore(level)
+        latencies: List[float] = []
+
+        async def one() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                await new_orchestrator().execute_workflow(scenario, verbose=False)
+                latencies.append(time.perf_counter() - started)
+
+        with LoopLagMonitor() as monitor:
+            started = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(workflows)))
+            elapsed = time.perf_counter() - started
+
+        lag_samples.extend(monitor.samples)
+        results.add(f"throughput.c{level}.workflows_per_sec", workflows / elapsed, "1/s", "higher")
+        results.add(f"throughput.c{level}.latency.p95", percentile(latencies, 95), "s")
+
+    if lag_samples:
+        results.add("event_loop_lag.p50", percentile(lag_samples, 50), "s")
+        results.add("event_loop_lag.p99", percentile(lag_samples, 99), "s")
+        results.add("event_loop_lag.max", max(lag_samples), "s")
+
+
+async def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    scenario = load_scenario()
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    results = Results()
+
+    await bench_workflow(results, scenario, args.iterations)
+    await bench_agents(results, scenario, args.iterations)
+    await bench_throughput(results, scenario, levels, args.workflows)
+    results.add("peak_rss_mb", peak_rss_mb(), "MB")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "simulated_latency": args.latency,
+            "simulated_latency_jitter": args.jitter,
+            "iterations": args.iterations,
+            "concurrency": levels,
+            "workflows_per_level": args.workflows,
+        },
+        "metrics": results.metrics,
+    }
+
+
+# Absolute changes below these are noise, whatever their relative size
+MIN_DELTA = {"s": 0.005, "MB": 5.0}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table; returns the names of regressed metrics"""
+    regressions = []
+    print(f"\n{'metric':<48} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, base in baseline["metrics"].items():
+        metric = current["metrics"].get(name)
+        if metric is None or not base["value"]:
+            continue
+        change = (metric["value"] - base["value"]) / base["value"]
+        worse = (
+            (change > threshold if base["better"] == "lower" else change < -threshold)
+            and abs(metric["value"] - base["value"]) >= MIN_DELTA.get(base["unit"], 0.0)
+        )
+        if worse:
+            regressions.append(name)
+        print(
+            f"{name:<48} {base['value']:>12.4f} {metric['value']:>12.4f} "
+            f"{change:>+8.1%}{'  REGRESSION' if worse else ''}"
+        )
+    return regressions
+
+
+def print_results(report: Dict[str, Any]) -> None:
+    for name, metric in report["metrics"].items():
+        print(f"{name:<48} {metric['value']:>12.6f} {metric['unit']}")
+
+
+def write_json(path: str, data: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    configure_environment(args)
+
+    report = asyncio.run(run_suite(args))
+    print_results(report)
+    write_json(args.output, report)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        write_json(args.baseline, report)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
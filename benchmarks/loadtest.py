@@ -0,0 +1,407 @@
+"""
+HTTP Load Test
+Drives POST /workflow/run, status polling and /workflows listing against a
+locally started api_server (simulated LLM provider) with open-model
+arrivals at increasing rates, and reports latency percentiles, error
+rates, the saturation point and server resource usage
+
+Usage:
+    python benchmarks/loadtest.py                         # 1,2,5,10 sessions/s
+    python benchmarks/loadtest.py --rates 5,10,20,40 --step-duration 30
+    python benchmarks/loadtest.py --url http://localhost:8000   # existing server
+"""
+
+from typing import Dict, Any, List, Optional
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TERMINAL_STATUSES = {"completed", "failed", "rejected", "cancelled", "timed_out", "budget_exceeded"}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="api_server load test")
+    parser.add_argument("--url", help="Target an already running server instead")
+    parser.add_argument("--rates", default="1,2,5,10",
+                        help="Comma-separated session arrival rates (per second)")
+    parser.add_argument("--step-duration", type=float, default=20.0,
+                        help="Seconds of arrivals per rate step")
+    parser.add_argument("--pattern", choices=["poisson", "constant", "burst"], default="poisson",
+                        help="Arrival pattern within a step")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="Seconds between status polls per session")
+    parser.add_argument("--session-timeout", type=float, default=120.0,
+                        help="Give up polling a workflow after this many seconds")
+    parser.add_argument("--list-ratio", type=float, default=0.3,
+                        help="Fraction of sessions that also list /workflows")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0,
+                        help="Fraction of submissions that may reuse identical runs")
+    parser.add_argument("--slo", type=float, default=0.5,
+                        help="p95 latency (s) of GET /workflow/{id} counted as saturated")
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="Simulated LLM latency for the started server")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="WORKFLOW_WORKERS for the started server")
+    parser.add_argument("--output", default=os.path.join(HERE, "loadtest.json"))
+    return parser.parse_args(argv)
+
+
+def percentile(samples: List[float], p: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ServerProcess:
+    """api_server under uvicorn in a subprocess, backed by the simulated provider"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._tmp = tempfile.TemporaryDirectory()
+        env = dict(os.environ)
+        env.update({
+            "LLM_PROVIDER": "simulated",
+            "SIMULATED_LATENCY": str(args.latency),
+            "WORKFLOW_DB_PATH": os.path.join(self._tmp.name, "workflows.db"),
+            "TRACE_EXPORTER": "none",
+        })
+        if args.workers is not None:
+            env["WORKFLOW_WORKERS"] = str(args.workers)
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api_server:app",
+             "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning"],
+            cwd=ROOT,
+            env=env,
+        )
+
+    async def wait_ready(self, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient() as client:
+            while time.monotonic() < deadline:
+                if self.process.poll() is not None:
+                    raise RuntimeError("Server exited during startup")
+                try:
+                    if (await client.get(f"{self.url}/")).status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError("Server did not become ready")
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self._tmp.cleanup()
+
+
+class ResourceSampler:
+    """Samples server CPU and RSS from /proc (Linux) plus queue depth from /queue"""
+
+    def __init__(self, client: httpx.AsyncClient, url: str, pid: Optional[int]):
+        self.client = client
+        self.url = url
+        self.pid = pid
+        self.samples: List[Dict[str, Any]] = []
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def _cpu_seconds(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / self._ticks
+        except (OSError, IndexError, TypeError):
+            return None
+
+    def _rss_mb(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, TypeError):
+            return None
+        return None
+
+    async def run(self, interval: float = 1.0) -> None:
+        last_cpu, last_time = self._cpu_seconds(), time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            cpu, now = self._cpu_seconds(), time.monotonic()
+            sample: Dict[str, Any] = {"t": now, "rss_mb": self._rss_mb()}
+            if cpu is not None and last_cpu is not None:
+                sample["cpu_percent"] = 100 * (cpu - last_cpu) / (now - last_time)
+            last_cpu, last_time = cpu, now
+            try:
+                queue = (await self.client.get(f"{self.url}/queue")).json()["workflows"]
+                sample["queued"] = queue["queued"]
+                sample["running"] = queue["running"]
+            except (httpx.HTTPError, KeyError, ValueError):
+                pass
+            self.samples.append(sample)
+
+
+class Step:
+    """Measurements for one arrival-rate step"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.latencies: Dict[str, List[float]] = {}
+        self.requests: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.rejected = 0
+        self.sessions = 0
+        self.completed = 0
+        self.timed_out = 0
+        self.workflow_seconds: List[float] = []
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        total = sum(self.requests.values())
+        endpoints = {}
+        for endpoint, samples in self.latencies.items():
+            endpoints[endpoint] = {
+                "requests": self.requests[endpoint],
+                "errors": self.errors.get(endpoint, 0),
+                **{f"p{p}": percentile(samples, p) for p in (50, 95, 99)},
+            }
+        return {
+            "offered_rate": self.rate,
+            "sessions": self.sessions,
+            "completed_workflows": self.completed,
+            "abandoned_sessions": self.timed_out,
+            "rejected_submissions": self.rejected,
+            "workflow_throughput": self.completed / duration if duration else 0.0,
+            "requests": total,
+            "error_rate": sum(self.errors.values()) / total if total else 0.0,
+            "workflow_seconds_p50": percentile(self.workflow_seconds, 50),
+            "workflow_seconds_p95": percentile(self.workflow_seconds, 95),
+            "endpoints": endpoints,
+        }
+
+
+def scenario_request(duplicate_ratio: float) -> Dict[str, Any]:
+    """A submission; unique unless drawn as a (reusable) duplicate"""
+    if random.random() < duplicate_ratio:
+        return {"scenario_type": random.choice(["emergency", "infrastructure"])}
+    return {
+        "scenario_type": "custom",
+        "data_source": {
+            "source_type": "text",
+            "data": f"Region {random.randint(1, 10**6)}: 40% power outage, "
+                    f"{random.randint(1, 20)} shelters damaged, water stock 25%",
+        },
+        "context": "Load test scenario",
+        "objectives": ["Restore power", "Supply water"],
+        "options": [
+            {"option_id": "a", "name": "Generators first"},
+            {"option_id": "b", "name": "Water first"},
+        ],
+        "constraints": {"budget": "$5M"},
+        "resources": {"crews": "20"},
+        "timeline": "48 hours",
+    }
+
+
+async def timed_request(
+    client: httpx.AsyncClient, step: Step, endpoint: str, method: str, url: str, **kwargs: Any
+) -> Optional[httpx.Response]:
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        step.record(endpoint, time.perf_counter() - started, ok=False)
+        return None
+    # 429/503 are admission control working as designed, not errors
+    ok = response.status_code < 400 or response.status_code in (429, 503)
+    step.record(endpoint, time.perf_counter() - started, ok=ok)
+    return response
+
+
+async def session(client: httpx.AsyncClient, url: str, step: Step, args: argparse.Namespace) -> None:
+    """One user: submit, poll until done, sometimes list workflows"""
+    step.sessions += 1
+    started = time.perf_counter()
+    headers = {} if random.random() < args.duplicate_ratio else {"Cache-Control": "no-cache"}
+    response = await timed_request(
+        client, step, "POST /workflow/run", "POST", f"{url}/workflow/run",
+        json=scenario_request(args.duplicate_ratio), headers=headers,
+    )
+    if response is None or response.status_code != 200:
+        if response is not None and response.status_code in (429, 503):
+            step.rejected += 1
+        return
+
+    workflow_id = response.json()["workflow_id"]
+    if random.random() < args.list_ratio:
+        await timed_request(
+            client, step, "GET /workflows", "GET", f"{url}/workflows", params={"limit": 20}
+        )
+
+    while time.perf_counter() - started < args.session_timeout:
+        await asyncio.sleep(args.poll_interval)
+        response = await timed_request(
+            client, step, "GET /workflow/{id}", "GET", f"{url}/workflow/{workflow_id}"
+        )
+        if response is not None and response.status_code == 200:
+            if response.json().get("status") in TERMINAL_STATUSES:
+                step.completed += 1
+                step.workflow_seconds.append(time.perf_counter() - started)
+                return
+    step.timed_out += 1
+
+
+def arrival_gaps(pattern: str, rate: float, duration: float) -> List[float]:
+    """Inter-arrival gaps for one step"""
+    count = max(1, round(rate * duration))
+    if pattern == "constant":
+        return [1 / rate] * count
+    if pattern == "burst":
+        # Arrivals in bursts of 10% of the step's sessions every 10% of the step
+        burst = max(1, count // 10)
+        return [duration / 10 if i % burst == 0 and i else 0.0 for i in range(count)]
+    return [random.expovariate(rate) for _ in range(count)]
+
+
+async def run_step(
+    client: httpx.AsyncClient, url: str, rate: float, args: argparse.Namespace
+) -> Dict[str, Any]:
+    step = Step(rate)
+    tasks = []
+    started = time.perf_counter()
+    for gap in arrival_gaps(args.pattern, rate, args.step_duration):
+        await asyncio.sleep(gap)
+        tasks.append(asyncio.create_task(session(client, url, step, args)))
+    await asyncio.gather(*tasks)
+    return step.summary(time.perf_counter() - started)
+
+
+def saturated(summary: Dict[str, Any], slo: float) -> Optional[str]:
+    """Why a step counts as saturated, or None"""
+    status = summary["endpoints"].get("GET /workflow/{id}", {})
+    if status.get("p95") is not None and status["p95"] > slo:
+        return f"status p95 {status['p95']:.3f}s > {slo}s"
+    if summary["error_rate"] > 0.01:
+        return f"error rate {summary['error_rate']:.1%}"
+    if summary["rejected_submissions"]:
+        return f"{summary['rejected_submissions']} submissions rejected (queue full)"
+    if summary["abandoned_sessions"]:
+        return f"{summary['abandoned_sessions']} workflows not finished in time"
+    return None
+
+
+def print_step(summary: Dict[str, Any]) -> None:
+    print(
+        f"\nrate {summary['offered_rate']}/s: {summary['sessions']} sessions, "
+        f"{summary['completed_workflows']} completed, {summary['rejected_submissions']} rejected, "
+        f"error rate {summary['error_rate']:.2%}, "
+        f"{summary['workflow_throughput']:.2f} workflows/s"
+    )
+    for endpoint, stats in summary["endpoints"].items():
+        values = " ".join(
+            f"{p}={stats[p] * 1000:.1f}ms" for p in ("p50", "p95", "p99") if stats[p] is not None
+        )
+        print(f"  {endpoint:<22} n={stats['requests']:<6} errors={stats['errors']:<4} {values}")
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    server = None if args.url else ServerProcess(args)
+    url = args.url or server.url
+    try:
+        if server is not None:
+            await server.wait_ready()
+
+        limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+        async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+            sampler = ResourceSampler(client, url, server.process.pid if server else None)
+            sampler_task = asyncio.create_task(sampler.run())
+            steps = []
+            saturation = None
+            try:
+                for rate in [float(r) for r in args.rates.split(",") if r.strip()]:
+                    step_started = time.monotonic()
+                    summary = await run_step(client, url, rate, args)
+                    window = [s for s in sampler.samples if s["t"] >= step_started]
+                    summary["server"] = {
+                        "cpu_percent_max": max(
+                            (s["cpu_percent"] for s in window if "cpu_percent" in s), default=None
+                        ),
+                        "rss_mb_max": max(
+                            (s["rss_mb"] for s in window if s.get("rss_mb") is not None), default=None
+                        ),
+                        "queued_max": max((s.get("queued", 0) for s in window), default=None),
+                    }
+                    steps.append(summary)
+                    print_step(summary)
+                    reason = saturated(summary, args.slo)
+                    if reason and saturation is None:
+                        saturation = {"rate": rate, "reason": reason}
+                        print(f"  saturated: {reason}")
+            finally:
+                sampler_task.cancel()
+    finally:
+        if server is not None:
+            server.stop()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "target": args.url or "local (simulated provider)",
+            "pattern": args.pattern,
+            "step_duration": args.step_duration,
+            "simulated_latency": None if args.url else args.latency,
+            "slo_status_p95": args.slo,
+        },
+        "steps": steps,
+        "saturation": saturation,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_load_test(args))
+
+    if report["saturation"]:
+        print(f"\nSaturation at {report['saturation']['rate']} sessions/s: "
+              f"{report['saturation']['reason']}")
+    else:
+        print("\nNo saturation within the tested rates")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Workflow Cancellation
+Cooperative cancellation tokens with optional deadlines, used to stop a
+running workflow (and abort its in-flight provider calls) on request or
+when its time budget runs out
+"""
+
+from typing import Awaitable, Optional, TypeVar
+import asyncio
+import time
+
+
+T = TypeVar("T")
+
+
+class WorkflowCancelled(Exception):
+    """Raised when a workflow is stopped before it finishes"""
+
+    def __init__(self, reason: str, message: Optional[str] = None):
+        super().__init__(message or f"Workflow {reason.replace('_', ' ')}")
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    Cancellation handle shared between a workflow and whoever controls it
+
+    cancel() marks the token as "cancelled" (or another reason such as
+    "budget_exceeded"); a token created with a timeout marks itself
+    "timed_out" once its deadline passes. run() executes a
+    coroutine until it finishes or the token fires, in which case the
+    coroutine's task is cancelled so awaiting provider calls are aborted.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.deadline = (
+            time.monotonic() + self.timeout if self.timeout is not None else None
+        )
+        self.reason: Optional[str] = None
+        self._event = asyncio.Event()
+        self._task: Optional[asyncio.Future] = None
+
+    @property
+    def cancelled(self) -> bool:
+        self._check_deadline()
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (None if there is no deadline)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Fire the token; returns False if it had already fired"""
+        if self.reason is not None:
+            return False
+        self.reason = reason
+        self._event.set()
+        if self._task is not None and not self._task.done():
+            # Cancel directly so it also works when fired from inside the task
+            self._task.cancel()
+        return True
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise WorkflowCancelled(self.reason)
+
+    async def wait(self) -> str:
+        """Wait until the token fires; returns the reason"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=self.remaining())
+        except asyncio.TimeoutError:
+            self.cancel("timed_out")
+        return self.reason
+
+    async def run(self, coro: Awaitable[T]) -> T:
+        """
+        Await coro unless the token fires first
+
+        Raises:
+            WorkflowCancelled: the token fired before coro finished
+        """
+        if self.cancelled:
+            coro.close()
+            raise WorkflowCancelled(self.reason)
+
+        task = self._task = asyncio.ensure_future(coro)
+        watcher = asyncio.ensure_future(self.wait())
+        try:
+            await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not task.done():
+                task.cancel()
+                # Let the work unwind (release scheduler slots, close streams)
+                await asyncio.gather(task, return_exceptions=True)
+            watcher.cancel()
+            self._task = None
+
+        if self.reason is not None:
+            raise WorkflowCancelled(self.reason)
+        return task.result()
+
+    def _check_deadline(self) -> None:
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("timed_out")
@@ -0,0 +1,132 @@
+"""
+Workflow Checkpoints
+Durable per-stage checkpoints so an interrupted or partly failed workflow
+can resume from its last good stage instead of repeating upstream LLM work
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Union
+import json
+import os
+
+from agents import AgentResponse
+from workflow_store import StoreWriter, WorkflowRepository, to_json
+
+StageResult = Union[AgentResponse, Dict[str, AgentResponse]]
+
+
+def restore_stage(payload: Dict[str, Any]) -> StageResult:
+    """Rebuild a stage result from its JSON form"""
+    if "agent_name" in payload:
+        return AgentResponse(**payload)
+    # Analysis stage: one response per analysis type
+    return {key: AgentResponse(**value) for key, value in payload.items()}
+
+
+def succeeded(result: StageResult) -> bool:
+    """Whether every response in a stage result succeeded"""
+    responses = result.values() if isinstance(result, dict) else [result]
+    return all(r.status == "success" for r in responses)
+
+
+def resumable_prefix(
+    stages: Dict[str, Dict[str, Any]], order: List[str]
+) -> Dict[str, StageResult]:
+    """
+    Restored results of the leading run of successful stages
+
+    Stops at the first stage that is missing or failed: everything after it
+    consumed that stage's output and has to be recomputed.
+    """
+    restored = {}
+    for stage in order:
+        payload = stages.get(stage)
+        if not payload:
+            break
+        try:
+            result = restore_stage(payload)
+        except (TypeError, ValueError):
+            break
+        if not succeeded(result):
+            break
+        restored[stage] = result
+    return restored
+
+
+class Checkpointer(ABC):
+    """Saves and loads the completed stages of a workflow"""
+
+    @abstractmethod
+    def save(self, workflow_id: str, stage: str, result: StageResult) -> None:
+        """Durably record a completed stage before the next one starts"""
+        pass
+
+    @abstractmethod
+    def load(self, workflow_id: str) -> Dict[str, Dict[str, Any]]:
+        """Checkpointed stages as JSON payloads, by stage key"""
+        pass
+
+    def clear(self, workflow_id: str) -> None:
+        """Drop a workflow's checkpoints"""
+        pass
+
+
+class FileCheckpointer(Checkpointer):
+    """One JSON file per workflow in a directory (CLI and scripts)"""
+
+    def __init__(self, directory: str = "checkpoints"):
+        self.directory = directory
+
+    def _path(self, workflow_id: str) -> str:
+        return os.path.join(self.directory, f"{workflow_id}.json")
+
+    def save(self, workflow_id: str, stage: str, result: StageResult) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        stages = self.load(workflow_id)
+        stages[stage] = json.loads(to_json(result))
+
+        # Write-then-rename so a crash never leaves a truncated checkpoint
+        path = self._path(workflow_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stages, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load(self, workflow_id: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._path(workflow_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def clear(self, workflow_id: str) -> None:
+        try:
+            os.remove(self._path(workflow_id))
+        except OSError:
+            pass
+
+
+class RepositoryCheckpointer(Checkpointer):
+    """
+    Checkpoints stored as the workflow's stage results (API server)
+
+    With a writer the checkpoint is queued on its thread: it is written
+    before any later store call of the workflow, without blocking the
+    event loop.
+    """
+
+    def __init__(self, store: WorkflowRepository, writer: Optional[StoreWriter] = None):
+        self.store = store
+        self.writer = writer
+
+    def save(self, workflow_id: str, stage: str, result: StageResult) -> None:
+        if self.writer is not None:
+            self.writer.submit(self.store.save_stage_result, workflow_id, stage, result)
+        else:
+            self.store.save_stage_result(workflow_id, stage, result)
+
+    def load(self, workflow_id: str) -> Dict[str, Dict[str, Any]]:
+        record = self.store.get(workflow_id) or {}
+        return (record.get("results") or {}).get("stages") or {}
@@ -14,7 +14,7 @@ class Config:
     """Central configuration class for the system"""
 
     # LLM Provider Selection
-    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini")  # gemini, ollama, or openai
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini")  # gemini, ollama, openai, or simulated
 
     # API Configuration
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
@@ -24,6 +24,10 @@ class Config:
     OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama2")
 
+    # Simulated provider (benchmarks and load tests; no network calls)
+    SIMULATED_LATENCY: float = float(os.getenv("SIMULATED_LATENCY", "0.5"))
+    SIMULATED_LATENCY_JITTER: float = float(os.getenv("SIMULATED_LATENCY_JITTER", "0.1"))
+
     # Model Configuration
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.7"))
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "2000"))
@@ -37,6 +41,112 @@ class Config:
     MAX_AGENT_ITERATIONS: int = 5
     AGENT_TIMEOUT: int = 120
 
+    # Retrieval Configuration (BM25 context selection)
+    RETRIEVAL_CHUNK_TOKENS: int = int(os.getenv("RETRIEVAL_CHUNK_TOKENS", "80"))
+    RETRIEVAL_TOP_K: int = int(os.getenv("RETRIEVAL_TOP_K", "8"))
+    RETRIEVAL_TOKEN_BUDGET: int = int(os.getenv("RETRIEVAL_TOKEN_BUDGET", "1000"))
+    RETRIEVAL_OPTION_TOKEN_BUDGET: int = int(os.getenv("RETRIEVAL_OPTION_TOKEN_BUDGET", "250"))
+
+    # Reasoning: "llm" (the LLM scores and ranks options), "hybrid" (the local
+    # MCDA engine scores and ranks when criteria are given; the LLM only
+    # writes pros, cons and justifications) or "local" (no LLM call)
+    REASONING_MODE: str = os.getenv("REASONING_MODE", "hybrid")
+    MCDA_METHOD: str = os.getenv("MCDA_METHOD", "topsis")  # topsis, weighted_sum or ahp
+    REASONING_EXPLAIN_TOP: int = int(os.getenv("REASONING_EXPLAIN_TOP", "5"))
+    # Option sets larger than REASONING_SHARD_SIZE are evaluated in shards
+    # (0 = never); the best REASONING_SHARD_FINALISTS of each advance
+    REASONING_SHARD_SIZE: int = int(os.getenv("REASONING_SHARD_SIZE", "25"))
+    REASONING_SHARD_FINALISTS: int = int(os.getenv("REASONING_SHARD_FINALISTS", "3"))
+    # Decision ensemble: up to DECISION_SAMPLES samples (1 = single call),
+    # drawn DECISION_ENSEMBLE_WAVE at a time until the leading recommendation
+    # holds DECISION_AGREEMENT of the votes
+    DECISION_SAMPLES: int = int(os.getenv("DECISION_SAMPLES", "1"))
+    DECISION_ENSEMBLE_WAVE: int = int(os.getenv("DECISION_ENSEMBLE_WAVE", "3"))
+    DECISION_AGREEMENT: float = float(os.getenv("DECISION_AGREEMENT", "0.75"))
+    # Options breaking a numeric constraint (budget, deadline, % cap) before
+    # reasoning: "summarize" (one line each in the prompt), "exclude" or "off"
+    CONSTRAINT_PREFILTER: str = os.getenv("CONSTRAINT_PREFILTER", "summarize")
+    # Monte Carlo sensitivity of the reasoning ranking (0 samples = off),
+    # re-scored with the ranking's own method: weights drawn around the
+    # criterion weights (higher concentration = smaller shifts), values
+    # perturbed by SENSITIVITY_SCORE_NOISE percent of their range (points
+    # of the objective scores for LLM scoring, weighted as fitted to the
+    # overall scores)
+    SENSITIVITY_SAMPLES: int = int(os.getenv("SENSITIVITY_SAMPLES", "2000"))
+    SENSITIVITY_SCORE_NOISE: float = float(os.getenv("SENSITIVITY_SCORE_NOISE", "5.0"))
+    SENSITIVITY_WEIGHT_CONCENTRATION: float = float(os.getenv("SENSITIVITY_WEIGHT_CONCENTRATION", "50"))
+    # Resource allocation stage (no LLM call): "auto" (LP via SciPy when
+    # region capacities make greedy inexact), "greedy" or "lp"; SciPy is
+    # optional (greedy without it, noted in the result); every region first
+    # gets ALLOCATION_MIN_SHARE of its demand. Without any stated demand the
+    # supply is split proportionally to need instead
+    ALLOCATION_METHOD: str = os.getenv("ALLOCATION_METHOD", "auto")
+    ALLOCATION_MIN_SHARE: float = float(os.getenv("ALLOCATION_MIN_SHARE", "0"))
+    ALLOCATION_PROMPT_REGIONS: int = int(os.getenv("ALLOCATION_PROMPT_REGIONS", "15"))
+
+    # Workflow Store Configuration (API server persistence)
+    WORKFLOW_STORE: str = os.getenv("WORKFLOW_STORE", "sqlite")  # sqlite or memory
+    WORKFLOW_DB_PATH: str = os.getenv("WORKFLOW_DB_PATH", "workflows.db")
+    # Retention: workflows finished more than this many days ago are deleted
+    # with their results and events (at startup and hourly on completion),
+    # and a finished workflow keeps its newest WORKFLOW_EVENT_RETENTION
+    # events (0 = keep forever / keep all)
+    WORKFLOW_RETENTION_DAYS: float = float(os.getenv("WORKFLOW_RETENTION_DAYS", "30"))
+    WORKFLOW_EVENT_RETENTION: int = int(os.getenv("WORKFLOW_EVENT_RETENTION", "500"))
+
+    # Workflow Queue Configuration (API server worker pool)
+    WORKFLOW_WORKERS: int = int(os.getenv("WORKFLOW_WORKERS", "4"))
+    WORKFLOW_QUEUE_MAX: int = int(os.getenv("WORKFLOW_QUEUE_MAX", "100"))
+    # Default seconds from submission before a workflow is timed out (0 = none)
+    WORKFLOW_DEADLINE: float = float(os.getenv("WORKFLOW_DEADLINE", "0"))
+    # Batch and sweep endpoints: scenarios / grid points per request (each
+    # is queued as a workflow)
+    BATCH_MAX_SCENARIOS: int = int(os.getenv("BATCH_MAX_SCENARIOS", "100"))
+    SWEEP_MAX_POINTS: int = int(os.getenv("SWEEP_MAX_POINTS", "64"))
+
+    # Priority Scheduling ("name:weight" classes, scenario type -> class)
+    PRIORITY_CLASSES: str = os.getenv("PRIORITY_CLASSES", "critical:8,standard:3,batch:1")
+    SCENARIO_PRIORITIES: str = os.getenv(
+        "SCENARIO_PRIORITIES", "emergency:critical,custom:standard,infrastructure:batch"
+    )
+    DEFAULT_PRIORITY: str = os.getenv("DEFAULT_PRIORITY", "standard")
+    # Queue fill ratio above which new lowest-priority work is deferred
+    ADMISSION_SHED_THRESHOLD: float = float(os.getenv("ADMISSION_SHED_THRESHOLD", "0.8"))
+    # Concurrent provider calls per process (0 = unlimited)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+    # Token accounting: USD per 1K tokens as "model:prompt/completion"
+    # (unlisted models, e.g. local Ollama ones, cost nothing)
+    LLM_PRICES: str = os.getenv(
+        "LLM_PRICES", "gpt-4-turbo-preview:0.01/0.03,gemini-pro:0.0005/0.0015"
+    )
+    # Default per-workflow budgets (0 = unlimited)
+    WORKFLOW_TOKEN_BUDGET: int = int(os.getenv("WORKFLOW_TOKEN_BUDGET", "0"))
+    WORKFLOW_COST_BUDGET: float = float(os.getenv("WORKFLOW_COST_BUDGET", "0"))
+
+    # Seconds a completed result is reused for identical submissions (0 = off)
+    RESULT_REUSE_WINDOW: int = int(os.getenv("RESULT_REUSE_WINDOW", "600"))
+
+    # Stage memoization: successful stage outputs kept per input hash so
+    # re-runs only recompute changed stages (entries, seconds; 0 = off)
+    STAGE_CACHE_SIZE: int = int(os.getenv("STAGE_CACHE_SIZE", "256"))
+    STAGE_CACHE_TTL: int = int(os.getenv("STAGE_CACHE_TTL", "3600"))
+
+    # Re-queue workflows whose server process stopped while they were
+    # queued/running (resuming from their checkpoints). Each process holds a
+    # lease on its workflows, renewed every third of WORKFLOW_LEASE_SECONDS;
+    # only workflows whose lease expired are taken over, by one process
+    RESUME_ON_STARTUP: bool = os.getenv("RESUME_ON_STARTUP", "true").lower() == "true"
+    WORKFLOW_LEASE_SECONDS: float = float(os.getenv("WORKFLOW_LEASE_SECONDS", "30"))
+
+    # Seconds between cross-worker store checks: the event log for SSE
+    # subscribers, and cancel requests for running workflows
+    EVENT_POLL_INTERVAL: float = float(os.getenv("EVENT_POLL_INTERVAL", "1.0"))
+
+    # Tracing ("none", "console" or "file"; file traces are OTLP/JSON lines)
+    TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "none")
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "traces.jsonl")
+
     @classmethod
     def validate(cls) -> bool:
         """Validate that required configuration is present"""
@@ -53,8 +163,8 @@ class Config:
             print(f"Using Ollama at {cls.OLLAMA_BASE_URL} with model {cls.OLLAMA_MODEL}")
             print("Make sure Ollama is running: 'ollama serve'")
 
-        if cls.LLM_PROVIDER not in ["openai", "gemini", "ollama"]:
-            raise ValueError(f"Invalid LLM_PROVIDER: {cls.LLM_PROVIDER}. Must be 'openai', 'gemini', or 'ollama'")
+        if cls.LLM_PROVIDER not in ["openai", "gemini", "ollama", "simulated"]:
+            raise ValueError(f"Invalid LLM_PROVIDER: {cls.LLM_PROVIDER}. Must be 'openai', 'gemini', 'ollama', or 'simulated'")
 
         return True
 
@@ -0,0 +1,180 @@
+"""
+Workflow Events
+Stage-level progress events emitted by the orchestrator and streamed to
+clients as Server-Sent Events with resume-from-event-id support
+"""
+
+from typing import Dict, Any, AsyncIterator, Optional, Set
+from datetime import datetime
+import asyncio
+import json
+import time
+
+from pydantic import BaseModel, Field
+
+from workflow_store import StoreWriter, WorkflowRepository, to_json
+
+
+# Event types that end a workflow's stream
+TERMINAL_EVENTS = frozenset({
+    "workflow_completed",
+    "workflow_failed",
+    "workflow_rejected",
+    "workflow_cancelled",
+    "workflow_timed_out",
+    "workflow_budget_exceeded",
+    "workflow_interrupted",
+})
+
+# Workflow statuses after which no further events will be published
+TERMINAL_STATUSES = frozenset(
+    {
+        "completed",
+        "failed",
+        "rejected",
+        "cancelled",
+        "timed_out",
+        "budget_exceeded",
+        "interrupted",
+    }
+)
+
+
+class WorkflowEvent(BaseModel):
+    """A single progress event for a workflow"""
+
+    event_id: int
+    workflow_id: str
+    type: str
+    timestamp: str
+    data: Dict[str, Any] = Field(default_factory=dict)
+
+    def to_sse(self) -> str:
+        """Format the event as a Server-Sent Events message"""
+        payload = json.dumps(
+            {"workflow_id": self.workflow_id, "timestamp": self.timestamp, **self.data},
+            default=str,
+        )
+        return f"id: {self.event_id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class EventBroker:
+    """
+    Publishes workflow events and serves them to subscribers
+
+    Events are persisted through the workflow repository so any worker
+    process can replay them; subscribers in the publishing process are
+    woken immediately, others pick new events up on the next poll. With a
+    writer, events are persisted on its thread and publish() returns at
+    once.
+    """
+
+    def __init__(
+        self,
+        store: WorkflowRepository,
+        poll_interval: float = 1.0,
+        keepalive_interval: float = 15.0,
+        writer: Optional[StoreWriter] = None,
+    ):
+        self.store = store
+        self.writer = writer
+        self.poll_interval = poll_interval
+        self.keepalive_interval = keepalive_interval
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+
+    def publish(
+        self, workflow_id: str, event_type: str, data: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Persist an event and wake local subscribers"""
+        if self.writer is None:
+            self._persist(workflow_id, event_type, data)
+            self._wake(workflow_id)
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        future = self.writer.submit(self._persist, workflow_id, event_type, data)
+        if loop is not None:
+            future.add_done_callback(
+                lambda _: self._wake_threadsafe(loop, workflow_id)
+            )
+
+    def _persist(
+        self, workflow_id: str, event_type: str, data: Optional[Dict[str, Any]]
+    ) -> WorkflowEvent:
+        # Round-trip through JSON so AgentResponse payloads are plain dicts
+        payload = json.loads(to_json(data or {}))
+        return WorkflowEvent(
+            **self.store.append_event(workflow_id, event_type, payload)
+        )
+
+    def _wake(self, workflow_id: str) -> None:
+        for waiter in self._waiters.get(workflow_id, ()):
+            waiter.set()
+
+    def _wake_threadsafe(self, loop: asyncio.AbstractEventLoop, workflow_id: str) -> None:
+        try:
+            loop.call_soon_threadsafe(self._wake, workflow_id)
+        except RuntimeError:
+            # Loop already closed (shutdown); there is nobody to wake
+            pass
+
+    async def subscribe(
+        self, workflow_id: str, last_event_id: int = 0
+    ) -> AsyncIterator[Optional[WorkflowEvent]]:
+        """
+        Yield events after last_event_id until the workflow finishes
+
+        Yields None when a keep-alive should be sent to the client.
+        """
+        waiter = asyncio.Event()
+        self._waiters.setdefault(workflow_id, set()).add(waiter)
+        last_sent = time.monotonic()
+
+        try:
+            while True:
+                waiter.clear()
+                events = await asyncio.to_thread(
+                    self.store.list_events, workflow_id, last_event_id
+                )
+
+                for raw in events:
+                    event = WorkflowEvent(**raw)
+                    last_event_id = event.event_id
+                    last_sent = time.monotonic()
+                    yield event
+                    # A terminal event followed by more events was resumed
+                    if event.type in TERMINAL_EVENTS and raw is events[-1]:
+                        return
+
+                if not events:
+                    status = await asyncio.to_thread(self.store.get_status, workflow_id)
+                    if status is None:
+                        return
+                    if status in TERMINAL_STATUSES:
+                        # Finished without a terminal event in the log (e.g. it
+                        # ran before events were recorded); close the stream
+                        # explicitly so EventSource clients stop reconnecting
+                        yield WorkflowEvent(
+                            event_id=last_event_id,
+                            workflow_id=workflow_id,
+                            type=f"workflow_{status}",
+                            timestamp=datetime.now().isoformat(),
+                            data={"status": status},
+                        )
+                        return
+
+                try:
+                    await asyncio.wait_for(waiter.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    if time.monotonic() - last_sent >= self.keepalive_interval:
+                        last_sent = time.monotonic()
+                        yield None
+        finally:
+            waiters = self._waiters.get(workflow_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[workflow_id]
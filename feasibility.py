@@ -0,0 +1,188 @@
+"""
+Constraint Feasibility
+Deterministic check of options against the numeric limits in a scenario's
+constraints (budgets, deadlines, percentage caps) before any reasoning
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
+import re
+
+from quantities import NUMBER, Quantity, parse_quantity
+
+
+FEASIBLE = "feasible"
+INFEASIBLE = "infeasible"
+UNKNOWN = "unknown"
+
+_LOWER_BOUND = re.compile(r"\b(at least|minimum|min|no less than|not less than|above|over)\b|>=?", re.I)
+_UPPER_BOUND = re.compile(
+    r"\b(limit|max|maximum|within|under|below|up to|cap|capped|ceiling|"
+    r"no more than|not exceed|at most|budget|deadline)\b|<=?",
+    re.I,
+)
+
+# Option fields that identify an option rather than measure it
+_ID_FIELDS = {"option_id", "id", "name", "description", "criteria"}
+
+
+@dataclass
+class Limit:
+    """A numeric bound taken from one constraint"""
+
+    constraint: str
+    bound: Quantity
+    upper: bool  # True: value must not exceed bound; False: must reach it
+    field: Optional[str] = None  # option field it applies to (None: inferred)
+
+    def allows(self, value: Quantity) -> bool:
+        return value.value <= self.bound.value if self.upper else value.value >= self.bound.value
+
+    def describe(self) -> str:
+        return f"{'<=' if self.upper else '>='} {self.bound}"
+
+
+def option_id(option: Dict[str, Any], index: int) -> str:
+    return str(option.get("option_id") or option.get("id") or f"opt_{index + 1}")
+
+
+def extract_limits(constraints: Dict[str, Any]) -> List[Limit]:
+    """
+    Numeric limits stated in a constraints dict
+
+    A constraint is a limit when it states an amount and reads as a bound:
+    upper for "limit", "max", "within", "budget", ..., lower for "at
+    least", "minimum", .... The first amount is the binding one ("$50M
+    immediate, $200M total" -> $50M). A constraint may also be explicit:
+    {"field": "estimated_cost", "max": "$50M"} (or "min").
+    """
+    limits = []
+    for name, value in (constraints or {}).items():
+        if isinstance(value, dict):
+            for key, upper in (("max", True), ("min", False)):
+                bound = parse_quantity(value.get(key))
+                if bound is not None:
+                    limits.append(Limit(name, bound, upper, value.get("field")))
+            continue
+
+        bound = parse_quantity(value)
+        # Plain numbers ("Region 3") cannot be matched to option fields
+        if bound is None or bound.kind == NUMBER:
+            continue
+        text = f"{name.replace('_', ' ')} {value}"
+        if _LOWER_BOUND.search(text):
+            limits.append(Limit(name, bound, upper=False))
+        elif _UPPER_BOUND.search(text):
+            limits.append(Limit(name, bound, upper=True))
+    return limits
+
+
+def _candidate_fields(
+    limit: Limit, quantities: Dict[str, Quantity]
+) -> List[str]:
+    """Option fields a limit applies to"""
+    if limit.field:
+        return [limit.field]
+    matching = [f for f, q in quantities.items() if q.comparable(limit.bound)]
+    if len(matching) > 1:
+        # Several amounts of the same kind: keep those named like the constraint
+        tokens = set(re.split(r"[\W_]+", limit.constraint.lower())) - {""}
+        matching = [f for f in matching if tokens & set(re.split(r"[\W_]+", f.lower()))]
+    return matching
+
+
+def check_option(option: Dict[str, Any], limits: List[Limit]) -> Dict[str, Any]:
+    """
+    Feasibility of one option
+
+    Returns:
+        {"status": feasible | infeasible | unknown, "checks": [...],
+        "violations": [readable reasons]}; infeasible if any limit is
+        broken, unknown if some limit could not be checked (no matching
+        field) or there were no limits at all
+    """
+    quantities = {}
+    for field, value in option.items():
+        if field not in _ID_FIELDS:
+            quantity = parse_quantity(value)
+            if quantity is not None:
+                quantities[field] = quantity
+
+    checks = []
+    unchecked = 0
+    for limit in limits:
+        fields = _candidate_fields(limit, quantities)
+        values = [(f, quantities.get(f)) for f in fields]
+        values = [(f, q) for f, q in values if q is not None and q.comparable(limit.bound)]
+        if not values:
+            unchecked += 1
+            continue
+        for field, value in values:
+            checks.append({
+                "constraint": limit.constraint,
+                "field": field,
+                "value": str(value),
+                "limit": limit.describe(),
+                "passed": limit.allows(value),
+            })
+
+    violations = [
+        f"{c['field']} {c['value']} violates {c['constraint']} ({c['limit']})"
+        for c in checks if not c["passed"]
+    ]
+    if violations:
+        status = INFEASIBLE
+    elif unchecked or not checks:
+        status = UNKNOWN
+    else:
+        status = FEASIBLE
+    return {"status": status, "checks": checks, "violations": violations}
+
+
+def check_options(
+    options: List[Dict[str, Any]], constraints: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Feasibility of every option against a scenario's constraints
+
+    Returns:
+        {"limits": [constraint limits found], "options": {option_id:
+        check_option result}}
+    """
+    limits = extract_limits(constraints if isinstance(constraints, dict) else {})
+    return {
+        "limits": [
+            {"constraint": l.constraint, "limit": l.describe(), "field": l.field}
+            for l in limits
+        ],
+        "options": {
+            option_id(option, i): check_option(option, limits)
+            for i, option in enumerate(options)
+        },
+    }
+
+
+def split_feasible(
+    options: List[Dict[str, Any]], feasibility: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    (options still in play, infeasible options)
+
+    Infeasible options are only ruled out while something feasible or
+    unknown remains; if every option breaks a limit, all stay in play so
+    reasoning can still pick the least bad one. When options are removed,
+    the rest carry an explicit option_id ("opt_3" by position if unset).
+    """
+    kept, ruled_out = [], []
+    for i, option in enumerate(options):
+        oid = option_id(option, i)
+        if "option_id" not in option:
+            # Keep ids stable once options are removed
+            option = {"option_id": oid, **option}
+        if feasibility["options"][oid]["status"] == INFEASIBLE:
+            ruled_out.append(option)
+        else:
+            kept.append(option)
+    if not kept or not ruled_out:
+        return list(options), []
+    return kept, ruled_out
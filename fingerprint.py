@@ -0,0 +1,85 @@
+"""
+Scenario Fingerprinting
+Stable hash of everything that determines a workflow's output, used to
+detect duplicate submissions and reuse recent results
+"""
+
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import os
+import re
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(value: Any) -> Any:
+    """
+    Canonical form of a scenario value
+
+    Strings have whitespace collapsed (indentation in pasted reports does
+    not change the result), None-valued keys are dropped, and dict keys are
+    sorted on serialization. List order is preserved because it reaches the
+    prompts unchanged.
+    """
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
+
+
+def source_versions(data_source: Any) -> List[Optional[List[int]]]:
+    """
+    [mtime_ns, size] of every file data source (None if unreadable)
+
+    A file edited in place keeps its path, so the path alone would match
+    a result computed from the old contents.
+    """
+    sources = data_source if isinstance(data_source, list) else [data_source]
+    versions = []
+    for source in sources:
+        if not isinstance(source, dict) or source.get("source_type", "file") != "file":
+            continue
+        try:
+            stat = os.stat(source.get("source_path", ""))
+        except (OSError, TypeError, ValueError):
+            versions.append(None)
+            continue
+        versions.append([stat.st_mtime_ns, stat.st_size])
+    return versions
+
+
+def scenario_fingerprint(
+    scenario_type: str,
+    scenario: Dict[str, Any],
+    provider: str,
+    model: str,
+    run_options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    SHA-256 fingerprint of a scenario run
+
+    Covers scenario type, data sources (and the version of file sources),
+    context, objectives, options, constraints, resources, timeline and
+    decision criteria, the provider and model that would answer it, and
+    run_options such as priority, deadline and budgets, which decide
+    whether the run can finish at all.
+    """
+    canonical = json.dumps(
+        {
+            "scenario_type": scenario_type,
+            "scenario": normalize(scenario),
+            "sources": source_versions(scenario.get("data_source")),
+            "provider": provider,
+            "model": model,
+            "run_options": normalize(run_options or {}),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -135,20 +135,69 @@ export default function Home() {
         scenario_type: selectedScenario
       })
 
-      pollWorkflowStatus(workflowId)
+      streamWorkflowStatus(workflowId)
     } catch (error) {
       console.error('Error starting workflow:', error)
       setLoading(false)
     }
   }
 
+  const fetchWorkflow = async (workflowId: string) => {
+    try {
+      const response = await axios.get(`${API_URL}/workflow/${workflowId}`)
+      setWorkflow(response.data)
+    } catch (error) {
+      console.error('Error fetching workflow:', error)
+    }
+    setLoading(false)
+  }
+
+  const streamWorkflowStatus = (workflowId: string) => {
+    if (typeof EventSource === 'undefined') {
+      pollWorkflowStatus(workflowId)
+      return
+    }
+
+    // Server-Sent Events: the browser resumes from Last-Event-ID on reconnect
+    const source = new EventSource(`${API_URL}/workflow/${workflowId}/events`)
+    let receivedEvents = false
+
+    const onProgress = (event: MessageEvent) => {
+      receivedEvents = true
+      const data = JSON.parse(event.data)
+      setWorkflow(prev => prev ? {
+        ...prev,
+        progress: data.progress ?? prev.progress,
+        current_stage: data.label ?? prev.current_stage
+      } : prev)
+    }
+
+    const onFinished = () => {
+      source.close()
+      fetchWorkflow(workflowId)
+    }
+
+    ;['workflow_started', 'stage_started', 'analysis_completed', 'stage_finished']
+      .forEach(type => source.addEventListener(type, onProgress as EventListener))
+    ;['workflow_completed', 'workflow_failed', 'workflow_rejected', 'workflow_cancelled', 'workflow_timed_out', 'workflow_budget_exceeded', 'workflow_interrupted']
+      .forEach(type => source.addEventListener(type, onFinished))
+
+    source.onerror = () => {
+      // Stream unavailable (e.g. proxy without SSE support): fall back to polling
+      if (!receivedEvents) {
+        source.close()
+        pollWorkflowStatus(workflowId)
+      }
+    }
+  }
+
   const pollWorkflowStatus = async (workflowId: string) => {
     const pollInterval = setInterval(async () => {
       try {
         const response = await axios.get(`${API_URL}/workflow/${workflowId}`)
         setWorkflow(response.data)
 
-        if (response.data.status === 'completed' || response.data.status === 'failed') {
+        if (['completed', 'failed', 'rejected', 'cancelled', 'timed_out', 'budget_exceeded', 'interrupted'].includes(response.data.status)) {
           clearInterval(pollInterval)
           setLoading(false)
         }
@@ -167,7 +216,13 @@ export default function Home() {
       case 'completed':
         return <CheckCircle className="w-6 h-6 text-green-500" />
       case 'failed':
+      case 'rejected':
         return <XCircle className="w-6 h-6 text-red-500" />
+      case 'cancelled':
+      case 'timed_out':
+      case 'budget_exceeded':
+      case 'interrupted':
+        return <XCircle className="w-6 h-6 text-gray-500" />
       default:
         return <Clock className="w-6 h-6 text-gray-500" />
     }
@@ -291,6 +346,7 @@ export default function Home() {
       { name: 'Data Ingestion', icon: Database, description: 'Processing unstructured data from multiple sources' },
       { name: 'Analysis', icon: BarChart3, description: 'Identifying constraints, risks, and key insights' },
       { name: 'Reasoning', icon: Brain, description: 'Evaluating options against constraints' },
+      { name: 'Resource Allocation', icon: Users, description: 'Optimizing resources across regions' },
       { name: 'Decision', icon: Target, description: 'Synthesizing recommendations' },
       { name: 'Execution Planning', icon: Zap, description: 'Generating action plans' }
     ]
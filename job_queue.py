@@ -0,0 +1,261 @@
+"""
+Workflow Job Queue
+Bounded in-process queue with a fixed pool of workflow workers
+Applies backpressure instead of starting every submitted workflow at once;
+jobs are served in weighted fair order across priority classes
+"""
+
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+import asyncio
+import math
+import time
+
+from cancellation import CancellationToken
+from scheduling import (
+    PRIORITY_CLASSES,
+    DEFAULT_PRIORITY,
+    PriorityClass,
+    WaitStats,
+    WeightedFairQueue,
+)
+
+
+class QueueFullError(Exception):
+    """Raised when the queue cannot accept more work"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionDeferredError(QueueFullError):
+    """Raised when low-priority work is turned away to protect capacity"""
+
+
+class QueueClosedError(Exception):
+    """Raised when submitting to a queue that is not running"""
+
+
+@dataclass
+class WorkflowJob:
+    """A workflow waiting for (or running on) a worker"""
+
+    workflow_id: str
+    scenario: Dict[str, Any]
+    priority: str = DEFAULT_PRIORITY
+    enqueued_at: float = field(default_factory=time.monotonic)
+    queued_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[float] = None
+    cancellation: CancellationToken = field(default_factory=CancellationToken)
+    token_budget: Optional[int] = None
+    cost_budget: Optional[float] = None
+    reuse_stages: bool = True
+    resume: bool = False  # continue from the workflow's checkpointed stages
+
+    @property
+    def queue_wait(self) -> float:
+        """Seconds spent waiting for a worker"""
+        end = self.started_at if self.started_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+
+JobRunner = Callable[[WorkflowJob], Awaitable[None]]
+ShedCallback = Callable[[WorkflowJob], None]
+
+
+class WorkflowJobQueue:
+    """
+    Fixed-size worker pool fed by a bounded weighted fair queue
+
+    Admission control, in order:
+    - queue full: the newest job of a lower priority class is shed to make
+      room; if there is none the submission is rejected (QueueFullError)
+    - queue above shed_threshold: new jobs of the lowest priority class are
+      deferred (AdmissionDeferredError) before they reach the provider
+    """
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        workers: int = 4,
+        max_depth: int = 100,
+        initial_estimate: float = 60.0,
+        classes: Optional[Dict[str, PriorityClass]] = None,
+        shed_threshold: float = 0.8,
+        on_shed: Optional[ShedCallback] = None,
+    ):
+        self.runner = runner
+        self.workers = workers
+        self.max_depth = max_depth
+        self.classes = classes or PRIORITY_CLASSES
+        self.shed_threshold = shed_threshold
+        self.on_shed = on_shed
+        self._pending: WeightedFairQueue[WorkflowJob] = WeightedFairQueue(self.classes)
+        self._available: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, WorkflowJob] = {}
+        self._avg_execution = initial_estimate
+        self._lowest = min(self.classes.values(), key=lambda c: c.weight).name
+        self._wait_stats = {name: WaitStats() for name in self.classes}
+        self._counters = {
+            name: {"admitted": 0, "shed": 0, "deferred": 0, "rejected": 0}
+            for name in self.classes
+        }
+
+    @property
+    def started(self) -> bool:
+        return self._available is not None
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker"""
+        return len(self._pending)
+
+    @property
+    def running(self) -> int:
+        """Jobs currently executing"""
+        return len(self._running)
+
+    async def start(self) -> None:
+        """Start the worker pool on the running event loop"""
+        if self.started:
+            return
+        self._available = asyncio.Semaphore(0)
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"workflow-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel workers; queued jobs are dropped"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._available = None
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a queue slot frees up"""
+        # A slot frees whenever any worker finishes its current job
+        return max(1, math.ceil(self._avg_execution / self.workers))
+
+    def submit(self, job: WorkflowJob) -> int:
+        """
+        Enqueue a job without waiting
+
+        Returns:
+            Number of jobs queued ahead of this one (all classes)
+
+        Raises:
+            ValueError: unknown priority class
+            QueueClosedError: the worker pool is not running
+            QueueFullError: no room and nothing of lower priority to shed
+            AdmissionDeferredError: overloaded and the job is lowest priority
+        """
+        if self._available is None:
+            raise QueueClosedError("Workflow queue is not accepting work")
+        if job.priority not in self.classes:
+            raise ValueError(f"Unknown priority class: {job.priority}")
+
+        counters = self._counters[job.priority]
+        ahead = self.depth
+
+        if ahead >= self.max_depth:
+            victim_class = self._pending.lowest_backlogged(below=job.priority)
+            if victim_class is None:
+                counters["rejected"] += 1
+                raise QueueFullError(
+                    f"Workflow queue is full ({self.max_depth} waiting)",
+                    retry_after=self.retry_after(),
+                )
+            victim = self._pending.pop_newest(victim_class)
+            self._counters[victim_class]["shed"] += 1
+            if self.on_shed is not None:
+                self.on_shed(victim)
+            ahead -= 1
+        elif (
+            len(self.classes) > 1
+            and job.priority == self._lowest
+            and ahead >= self.shed_threshold * self.max_depth
+        ):
+            counters["deferred"] += 1
+            raise AdmissionDeferredError(
+                f"Overloaded: deferring {job.priority} priority work",
+                retry_after=self.retry_after(),
+            )
+
+        self._pending.push(job.priority, job)
+        counters["admitted"] += 1
+        self._available.release()
+        return ahead
+
+    def cancel(self, workflow_id: str, reason: str = "cancelled") -> Optional[WorkflowJob]:
+        """
+        Cancel a queued or running job
+
+        A queued job is removed before it reaches a worker; a running job has
+        its cancellation token fired and is stopped by the orchestrator.
+
+        Returns:
+            The cancelled job, or None if this queue does not hold it
+        """
+        job = self._running.get(workflow_id)
+        if job is not None:
+            job.cancellation.cancel(reason)
+            return job
+
+        job = self._pending.find(lambda j: j.workflow_id == workflow_id)
+        if job is not None:
+            # The worker permit released for it is skipped like a shed job's
+            self._pending.remove(job.priority, job)
+            job.cancellation.cancel(reason)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue statistics (overall and per priority class)"""
+        running_by_class: Dict[str, int] = {name: 0 for name in self.classes}
+        for job in self._running.values():
+            running_by_class[job.priority] += 1
+
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.depth,
+            "max_depth": self.max_depth,
+            "avg_execution_seconds": round(self._avg_execution, 2),
+            "classes": {
+                name: {
+                    "weight": cls.weight,
+                    "queued": self._pending.depth(name),
+                    "running": running_by_class[name],
+                    "queue_wait_seconds": self._wait_stats[name].summary(),
+                    **self._counters[name],
+                }
+                for name, cls in self.classes.items()
+            },
+        }
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            await self._available.acquire()
+            if not len(self._pending):
+                # The job this permit was for has been shed or cancelled
+                continue
+
+            _, job = self._pending.pop()
+            job.started_at = time.monotonic()
+            self._wait_stats[job.priority].record(job.queue_wait)
+            self._running[job.workflow_id] = job
+            try:
+                await self.runner(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # The runner records its own failures; keep the worker alive
+                pass
+            finally:
+                self._running.pop(job.workflow_id, None)
+                elapsed = time.monotonic() - job.started_at
+                self._avg_execution = 0.8 * self._avg_execution + 0.2 * elapsed
@@ -3,9 +3,73 @@ Universal LLM Client
 Supports multiple providers: OpenAI (paid), Google Gemini (free), Ollama (free, local)
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from contextvars import ContextVar
 from config import config
+from accounting import (
+    BudgetExceededError,
+    count_message_tokens,
+    count_tokens,
+    current_ledger,
+    record_usage,
+)
+from scheduling import llm_scheduler
+from tracing import tracer
+from metrics import (
+    LLM_COST,
+    LLM_ERRORS,
+    LLM_LATENCY,
+    LLM_RETRIES,
+    LLM_TOKENS,
+    current_agent,
+    current_operation,
+)
+import asyncio
 import json
+import random
+import time
+
+
+# Provider errors worth retrying (rate limits, timeouts, dropped connections)
+TRANSIENT_ERRORS = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "RateLimitError",
+    "InternalServerError",
+    "ConnectError",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "RemoteProtocolError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+}
+RETRY_BACKOFF = 1.0  # seconds, doubled per attempt
+
+# Response of the simulated provider; satisfies every agent's parser
+SIMULATED_RESPONSE = {
+    "analysis": "Simulated analysis of the supplied data",
+    "RECOMMENDED DECISION": "Staged Response (opt_3)",
+    "CONFIDENCE LEVEL": "High",
+    "KEY SUPPORTING FACTORS": ["Fastest initial response", "Within budget"],
+    "IDENTIFIED RISKS": ["Supply chain delays"],
+    "NEXT STEPS": ["Deploy medical teams", "Dispatch water trucks"],
+}
+
+# Token usage reported by the provider for the attempt in progress
+_reported_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "reported_usage", default=None
+)
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a provider error is likely to succeed on retry"""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int) and (status in (408, 429) or status >= 500):
+        return True
+    return type(error).__name__ in TRANSIENT_ERRORS
 
 
 class LLMClient:
@@ -13,22 +77,45 @@ class LLMClient:
 
     def __init__(self):
         self.provider = config.LLM_PROVIDER
+        self._client: Any = None
 
         if self.provider == "openai":
-            from openai import AsyncOpenAI
-            self.client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
             self.model = "gpt-4-turbo-preview"
+        elif self.provider == "gemini":
+            self.model = "gemini-pro"
+        elif self.provider == "ollama":
+            self.model = config.OLLAMA_MODEL
+        elif self.provider == "simulated":
+            # Canned responses after a configurable delay (benchmarks)
+            self.model = "simulated"
+
+    @property
+    def client(self) -> Any:
+        """Provider SDK client, imported and created on first use"""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    @client.setter
+    def client(self, value: Any) -> None:
+        self._client = value
+
+    def _create_client(self) -> Any:
+        if self.provider == "openai":
+            from openai import AsyncOpenAI
+            return AsyncOpenAI(api_key=config.OPENAI_API_KEY)
 
         elif self.provider == "gemini":
             import google.generativeai as genai
             genai.configure(api_key=config.GOOGLE_API_KEY)
-            self.model = "gemini-pro"
-            self.client = genai
+            return genai
 
         elif self.provider == "ollama":
             import ollama
-            self.client = ollama
-            self.model = config.OLLAMA_MODEL
+            # Async client so cancelling a workflow aborts the HTTP request
+            return ollama.AsyncClient()
+
+        return None
 
     async def chat(
         self,
@@ -38,6 +125,9 @@ class LLMClient:
     ) -> str:
         """
         Universal chat method that works across all providers
+        Transient provider errors are retried up to MAX_RETRIES times with
+        exponential backoff. Token usage is recorded in the workflow's
+        ledger, which may refuse the call if its budget is exhausted
 
         Args:
             messages: List of message dicts with 'role' and 'content'
@@ -50,12 +140,115 @@ class LLMClient:
         temp = temperature if temperature is not None else config.TEMPERATURE
         max_tok = max_tokens if max_tokens is not None else config.MAX_TOKENS
 
+        agent, operation = current_agent.get(), current_operation.get()
+        latency = LLM_LATENCY.labels(self.provider, agent, operation)
+        ledger = current_ledger.get()
+        attempt = 0
+
+        while True:
+            attributes = {
+                "llm.provider": self.provider,
+                "llm.model": self.model,
+                "llm.agent": agent,
+                "llm.operation": operation,
+                "llm.attempt": attempt + 1,
+                "llm.max_tokens": max_tok,
+            }
+            with tracer.span("llm.chat", attributes, kind="CLIENT") as span:
+                if ledger is not None and (ledger.token_budget or ledger.cost_budget):
+                    try:
+                        ledger.check(self.model, count_message_tokens(messages, self.model))
+                    except BudgetExceededError:
+                        # The ledger has asked for the workflow to stop; yield
+                        # so that cancellation lands here, not in the agent
+                        await asyncio.sleep(0)
+                        raise
+
+                # Wait for a provider slot; waiting calls are admitted by the
+                # priority of the workflow that issued them
+                requested = time.perf_counter()
+                async with llm_scheduler.slot():
+                    started = time.perf_counter()
+                    span.set_attribute(
+                        "llm.slot_wait_ms", round((started - requested) * 1000, 1)
+                    )
+                    reported: Dict[str, int] = {}
+                    usage_token = _reported_usage.set(reported)
+                    try:
+                        content = await self._dispatch(messages, temp, max_tok)
+                    except Exception as e:
+                        LLM_ERRORS.labels(self.provider, type(e).__name__).inc()
+                        if attempt >= config.MAX_RETRIES or not is_transient(e):
+                            raise
+                        span.set_attribute("error.type", type(e).__name__)
+                        span.set_status("ERROR", str(e))
+                    else:
+                        # Not in the try: an accounting failure is neither a
+                        # provider error nor a reason to call the provider again
+                        self._account(agent, messages, content, reported, span)
+                        return content
+                    finally:
+                        _reported_usage.reset(usage_token)
+                        latency.observe(time.perf_counter() - started)
+
+            # Back off outside the slot so other calls can use it
+            attempt += 1
+            LLM_RETRIES.labels(self.provider).inc()
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
+    async def _dispatch(
+        self, messages: List[Dict[str, str]], temperature: float, max_tokens: int
+    ) -> str:
+        """Single attempt against the configured provider"""
         if self.provider == "openai":
-            return await self._chat_openai(messages, temp, max_tok)
+            return await self._chat_openai(messages, temperature, max_tokens)
         elif self.provider == "gemini":
-            return await self._chat_gemini(messages, temp, max_tok)
+            return await self._chat_gemini(messages, temperature, max_tokens)
         elif self.provider == "ollama":
-            return await self._chat_ollama(messages, temp, max_tok)
+            return await self._chat_ollama(messages, temperature, max_tokens)
+        elif self.provider == "simulated":
+            return await self._chat_simulated(messages, temperature, max_tokens)
+
+    def _record_usage(
+        self, prompt_tokens: Optional[int], completion_tokens: Optional[int]
+    ) -> None:
+        """Note the token usage reported in a provider response"""
+        reported = _reported_usage.get()
+        if reported is None:
+            return
+        if prompt_tokens is not None:
+            reported["prompt_tokens"] = prompt_tokens
+        if completion_tokens is not None:
+            reported["completion_tokens"] = completion_tokens
+
+    def _account(
+        self,
+        agent: str,
+        messages: List[Dict[str, str]],
+        content: Optional[str],
+        reported: Dict[str, int],
+        span: Any,
+    ) -> None:
+        """Record a call's tokens and cost, estimating what was not reported"""
+        prompt_tokens = reported.get("prompt_tokens")
+        completion_tokens = reported.get("completion_tokens")
+        estimated = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = count_message_tokens(messages, self.model)
+        if completion_tokens is None:
+            completion_tokens = count_tokens(content or "", self.model)
+
+        cost = record_usage(agent, self.model, prompt_tokens, completion_tokens, estimated)
+
+        LLM_TOKENS.labels(self.provider, agent, "prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(self.provider, agent, "completion").inc(completion_tokens)
+        LLM_COST.labels(self.provider, agent).inc(cost)
+        span.set_attributes({
+            "llm.prompt_tokens": prompt_tokens,
+            "llm.completion_tokens": completion_tokens,
+            "llm.tokens_estimated": estimated,
+            "llm.cost_usd": round(cost, 6),
+        })
 
     async def _chat_openai(
         self, messages: List[Dict[str, str]], temperature: float, max_tokens: int
@@ -67,6 +260,10 @@ class LLMClient:
             temperature=temperature,
             max_tokens=max_tokens,
         )
+        if response.usage is not None:
+            self._record_usage(
+                response.usage.prompt_tokens, response.usage.completion_tokens
+            )
         return response.choices[0].message.content
 
     async def _chat_gemini(
@@ -85,36 +282,51 @@ class LLMClient:
             "max_output_tokens": max_tokens,
         }
 
-        # Generate response
-        response = model.generate_content(
+        # Generate response (async, so the call can be cancelled)
+        response = await model.generate_content_async(
             prompt,
             generation_config=generation_config,
         )
 
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self._record_usage(
+                getattr(usage, "prompt_token_count", None),
+                getattr(usage, "candidates_token_count", None),
+            )
         return response.text
 
     async def _chat_ollama(
         self, messages: List[Dict[str, str]], temperature: float, max_tokens: int
     ) -> str:
         """Ollama local LLM chat completion"""
-        import asyncio
-
-        # Ollama doesn't have async support, so we run in executor
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: self.client.chat(
-                model=self.model,
-                messages=messages,
-                options={
-                    "temperature": temperature,
-                    "num_predict": max_tokens,
-                },
-            ),
+        response = await self.client.chat(
+            model=self.model,
+            messages=messages,
+            options={
+                "temperature": temperature,
+                "num_predict": max_tokens,
+            },
         )
 
+        self._record_usage(
+            response.get("prompt_eval_count"), response.get("eval_count")
+        )
         return response["message"]["content"]
 
+    async def _chat_simulated(
+        self, messages: List[Dict[str, str]], temperature: float, max_tokens: int
+    ) -> str:
+        """Simulated provider: sleeps for SIMULATED_LATENCY (+/- jitter)"""
+        delay = random.gauss(config.SIMULATED_LATENCY, config.SIMULATED_LATENCY_JITTER)
+        await asyncio.sleep(max(0.0, delay))
+
+        content = json.dumps(SIMULATED_RESPONSE)
+        self._record_usage(
+            count_message_tokens(messages, self.model), count_tokens(content, self.model)
+        )
+        return content
+
     def _convert_messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
         """Convert OpenAI-style messages to a single prompt for Gemini"""
         prompt_parts = []
@@ -133,5 +345,5 @@ class LLMClient:
         return "\n".join(prompt_parts)
 
 
-# Create a singleton instance
+# Create a singleton instance (cheap: the provider SDK is loaded on first call)
 llm_client = LLMClient()
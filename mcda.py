@@ -0,0 +1,315 @@
+"""
+Multi-Criteria Decision Analysis
+Vectorized weighted-sum, TOPSIS and AHP scoring over an options x criteria
+matrix, so ranking options needs no LLM call
+"""
+
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+
+import numpy as np
+
+from feasibility import option_id
+from quantities import parse_quantity
+
+
+METHODS = ("weighted_sum", "topsis", "ahp")
+
+# Criteria whose names contain one of these are minimized unless stated
+COST_HINTS = ("cost", "price", "budget", "time", "duration", "delay", "risk", "emission")
+
+# Option fields that identify an option rather than measure it
+_ID_FIELDS = {"option_id", "id", "name", "description", "criteria"}
+
+# Saaty's random consistency index by matrix size
+_RANDOM_INDEX = [0.0, 0.0, 0.0, 0.58, 0.90, 1.12, 1.24, 1.32, 1.41, 1.45, 1.49]
+
+
+@dataclass
+class Criterion:
+    """One column of the decision matrix"""
+
+    name: str
+    weight: float = 1.0
+    direction: str = "benefit"  # "benefit" (higher is better) or "cost"
+
+    @property
+    def benefit(self) -> bool:
+        return self.direction != "cost"
+
+
+def criterion_value(option: Dict[str, Any], name: str) -> Optional[float]:
+    """
+    Value of a criterion for an option: its "criteria" entry, else the field
+
+    Strings are read as quantities in a common unit, so "2 days" and
+    "12 hours" compare as 48 and 12 hours.
+    """
+    explicit = option.get("criteria")
+    if isinstance(explicit, dict) and name in explicit:
+        quantity = parse_quantity(explicit[name])
+    else:
+        quantity = parse_quantity(option.get(name))
+    return quantity.value if quantity is not None else None
+
+
+def infer_direction(name: str) -> str:
+    lowered = name.lower()
+    return "cost" if any(hint in lowered for hint in COST_HINTS) else "benefit"
+
+
+def infer_criteria(options: List[Dict[str, Any]]) -> List[Criterion]:
+    """Equally weighted criteria from every measurable option field"""
+    names = []
+    for option in options:
+        explicit = option.get("criteria")
+        fields = list(explicit) if isinstance(explicit, dict) else []
+        fields += [k for k in option if k not in _ID_FIELDS]
+        for name in fields:
+            if name not in names and criterion_value(option, name) is not None:
+                names.append(name)
+    return [Criterion(name=name, direction=infer_direction(name)) for name in names]
+
+
+def ahp_weights(pairwise: Sequence[Sequence[float]]) -> Tuple[np.ndarray, float]:
+    """
+    Criterion weights from an AHP pairwise comparison matrix
+
+    Args:
+        pairwise: n x n matrix; entry [i][j] is how much more important
+            criterion i is than j on Saaty's 1-9 scale ([j][i] = 1/[i][j])
+
+    Returns:
+        (weights summing to 1, consistency ratio); a ratio above 0.1
+        usually means the judgments contradict each other
+    """
+    matrix = np.asarray(pairwise, dtype=float)
+    n = matrix.shape[0]
+    if matrix.shape != (n, n) or n == 0 or np.any(matrix <= 0):
+        raise ValueError("AHP needs a square matrix of positive comparisons")
+
+    eigenvalues, eigenvectors = np.linalg.eig(matrix)
+    principal = int(np.argmax(eigenvalues.real))
+    weights = np.abs(eigenvectors[:, principal].real)
+    weights = weights / weights.sum()
+
+    if n < 3:
+        return weights, 0.0
+    consistency_index = (eigenvalues[principal].real - n) / (n - 1)
+    random_index = _RANDOM_INDEX[min(n, len(_RANDOM_INDEX) - 1)]
+    return weights, float(max(consistency_index, 0.0) / random_index)
+
+
+def build_matrix(
+    options: List[Dict[str, Any]], criteria: List[Criterion]
+) -> np.ndarray:
+    """
+    Options x criteria matrix of raw values
+
+    A missing value gets the worst value seen for its criterion, so an
+    option is never favoured for leaving a field out.
+    """
+    matrix = np.array(
+        [[criterion_value(o, c.name) for c in criteria] for o in options],
+        dtype=float,
+    ).reshape(len(options), len(criteria))
+
+    for j, criterion in enumerate(criteria):
+        column = matrix[:, j]
+        missing = np.isnan(column)
+        if missing.all():
+            column[:] = 0.0
+        elif missing.any():
+            column[missing] = np.nanmin(column) if criterion.benefit else np.nanmax(column)
+    return matrix
+
+
+def _weights(criteria: List[Criterion]) -> np.ndarray:
+    weights = np.array([max(c.weight, 0.0) for c in criteria], dtype=float)
+    total = weights.sum()
+    return weights / total if total > 0 else np.full(len(criteria), 1.0 / max(len(criteria), 1))
+
+
+def _benefit_mask(criteria: List[Criterion]) -> np.ndarray:
+    return np.array([c.benefit for c in criteria], dtype=bool)
+
+
+def normalize_minmax(matrix: np.ndarray, benefit: np.ndarray) -> np.ndarray:
+    """Scale each column to [0, 1] with 1 the best value (constant columns -> 1)"""
+    low = matrix.min(axis=-2, keepdims=True)
+    high = matrix.max(axis=-2, keepdims=True)
+    span = np.where(high > low, high - low, 1.0)
+    scaled = np.where(benefit, (matrix - low) / span, (high - matrix) / span)
+    return np.where(high > low, scaled, 1.0)
+
+
+# The scorers take (..., options, criteria) matrices and (..., criteria)
+# weights, so a batch of perturbed samples is scored in one call
+
+def weighted_sum(matrix: np.ndarray, weights: np.ndarray, benefit: np.ndarray) -> np.ndarray:
+    """Simple additive weighting of min-max normalized values, in [0, 1]"""
+    return np.einsum("...nm,...m->...n", normalize_minmax(matrix, benefit), weights)
+
+
+def topsis(matrix: np.ndarray, weights: np.ndarray, benefit: np.ndarray) -> np.ndarray:
+    """Relative closeness to the ideal solution (TOPSIS), in [0, 1]"""
+    norms = np.sqrt((matrix ** 2).sum(axis=-2, keepdims=True))
+    weighted = matrix / np.where(norms > 0, norms, 1.0) * np.expand_dims(weights, -2)
+
+    best, worst = weighted.max(axis=-2, keepdims=True), weighted.min(axis=-2, keepdims=True)
+    ideal = np.where(benefit, best, worst)
+    anti_ideal = np.where(benefit, worst, best)
+    to_ideal = np.sqrt(((weighted - ideal) ** 2).sum(axis=-1))
+    to_anti_ideal = np.sqrt(((weighted - anti_ideal) ** 2).sum(axis=-1))
+
+    total = to_ideal + to_anti_ideal
+    return np.where(total > 0, to_anti_ideal / np.where(total > 0, total, 1.0), 0.5)
+
+
+def ahp(matrix: np.ndarray, weights: np.ndarray, benefit: np.ndarray) -> np.ndarray:
+    """
+    AHP synthesis with distributive normalization of measured values
+
+    Each column is turned into priorities summing to 1 (reciprocals for
+    cost criteria), then weighted; rescaled so the best option scores 1.
+    """
+    positive = np.where(matrix > 0, matrix, np.nan)
+    values = np.where(benefit, positive, 1.0 / positive)
+    totals = np.nansum(values, axis=-2, keepdims=True)
+    priorities = np.nan_to_num(values / np.where(totals > 0, totals, 1.0))
+    scores = np.einsum("...nm,...m->...n", priorities, weights)
+    if not scores.shape[-1]:
+        return scores
+    best = scores.max(axis=-1, keepdims=True)
+    return np.where(best > 0, scores / np.where(best > 0, best, 1.0), 0.5)
+
+
+_SCORERS = {"weighted_sum": weighted_sum, "topsis": topsis, "ahp": ahp}
+
+
+def _scorer(method: str):
+    if method not in _SCORERS:
+        raise ValueError(f"Unknown MCDA method: {method} (use {', '.join(METHODS)})")
+    return _SCORERS[method]
+
+
+def score(
+    matrix: np.ndarray, weights: np.ndarray, benefit: np.ndarray, method: str = "topsis"
+) -> np.ndarray:
+    """Option scores (higher is better) under one of METHODS"""
+    return _scorer(method)(matrix, weights, benefit)
+
+
+def resolve_criteria(
+    spec: Optional[Dict[str, Any]], options: List[Dict[str, Any]]
+) -> Tuple[List[Criterion], Optional[float]]:
+    """
+    Criteria from a scenario's criteria spec
+
+    Args:
+        spec: {
+            "weights": {criterion: weight} (default: every measurable
+                option field, equally weighted),
+            "directions": {criterion: "benefit" | "cost"} (default:
+                inferred from the name, see COST_HINTS),
+            "pairwise": {"criteria": [names], "matrix": [[...]]} (AHP
+                judgments; the named criteria, default the weights' keys,
+                get the derived weights instead)
+        }
+
+    Returns:
+        (criteria, AHP consistency ratio or None)
+    """
+    spec = spec or {}
+    weights = spec.get("weights") or {}
+    directions = spec.get("directions") or {}
+
+    consistency = None
+    pairwise = spec.get("pairwise")
+    if pairwise:
+        names = list(pairwise.get("criteria") or weights)
+        derived, consistency = ahp_weights(pairwise["matrix"])
+        if len(names) != len(derived):
+            raise ValueError("Pairwise matrix size does not match its criteria")
+        criteria = [Criterion(name=n, weight=float(w)) for n, w in zip(names, derived)]
+    elif weights:
+        criteria = [Criterion(name=name, weight=float(w)) for name, w in weights.items()]
+    else:
+        criteria = infer_criteria(options)
+
+    for criterion in criteria:
+        criterion.direction = directions.get(criterion.name) or infer_direction(criterion.name)
+    return criteria, consistency
+
+
+def rank_options(
+    options: List[Dict[str, Any]],
+    spec: Optional[Dict[str, Any]] = None,
+    method: str = "topsis",
+) -> Dict[str, Any]:
+    """
+    Score and rank options against weighted criteria
+
+    Args:
+        options: Option dicts; criterion values come from option["criteria"]
+            or same-named fields, quantities parsed from strings ("$45M")
+        spec: Criteria spec (see resolve_criteria); spec["method"]
+            overrides method
+        method: "weighted_sum", "topsis" or "ahp"
+
+    Returns:
+        {"method", "criteria" (unrounded weights), "consistency_ratio",
+        "evaluation" (per option: criterion scores and overall_score,
+        0-100, and the raw criterion_values they were scored from),
+        "ranked_recommendations" (best first)}
+    """
+    method = (spec or {}).get("method") or method
+    scorer = _scorer(method)
+
+    criteria, consistency = resolve_criteria(spec, options)
+    matrix = build_matrix(options, criteria)
+    weights = _weights(criteria)
+    benefit = _benefit_mask(criteria)
+
+    if criteria and options:
+        overall = scorer(matrix, weights, benefit)
+        per_criterion = normalize_minmax(matrix, benefit)
+    else:
+        overall = np.full(len(options), 0.5)
+        per_criterion = np.zeros((len(options), 0))
+
+    # Stable: ties keep the order options were given in
+    order = np.argsort(-overall, kind="stable")
+
+    evaluation = [
+        {
+            "option_id": option_id(option, i),
+            "option_name": option.get("name", option_id(option, i)),
+            "objective_scores": {
+                c.name: round(float(per_criterion[i, j]) * 100, 1)
+                for j, c in enumerate(criteria)
+            },
+            "criterion_values": {c.name: float(matrix[i, j]) for j, c in enumerate(criteria)},
+            "overall_score": round(float(overall[i]) * 100, 1),
+        }
+        for i, option in enumerate(options)
+    ]
+    ranked = [
+        {
+            "rank": rank,
+            "option_id": evaluation[i]["option_id"],
+            "overall_score": evaluation[i]["overall_score"],
+        }
+        for rank, i in enumerate(order.tolist(), 1)
+    ]
+
+    return {
+        "method": method,
+        "criteria": [
+            {"name": c.name, "weight": float(w), "direction": c.direction}
+            for c, w in zip(criteria, weights)
+        ],
+        "consistency_ratio": None if consistency is None else round(consistency, 4),
+        "evaluation": evaluation,
+        "ranked_recommendations": ranked,
+    }
@@ -0,0 +1,272 @@
+"""
+Metrics
+Minimal Prometheus-compatible counters, gauges and histograms with text
+exposition, plus the instruments used by the orchestrator and LLM client
+"""
+
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import math
+import threading
+
+
+# Agent and operation (e.g. analysis type) issuing LLM calls in this task;
+# set around BaseAgent.execute so LLMClient can label its measurements
+current_agent: ContextVar[str] = ContextVar("current_agent", default="none")
+current_operation: ContextVar[str] = ContextVar("current_operation", default="none")
+
+
+@contextmanager
+def call_context(
+    agent: Optional[str] = None, operation: Optional[str] = None
+) -> Iterator[None]:
+    """Label the LLM calls made inside the block"""
+    tokens = []
+    if agent is not None:
+        tokens.append((current_agent, current_agent.set(agent)))
+    if operation is not None:
+        tokens.append((current_operation, current_operation.set(operation)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base for a metric family; children are created per label set"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any, **kwvalues: Any) -> Any:
+        """Child for one label set (cache it on hot paths)"""
+        if kwvalues:
+            values = tuple(str(kwvalues[n]) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in sorted(self._children.items())
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+# Process-wide registry and instruments
+registry = Registry()
+
+WORKFLOWS = registry.counter(
+    "agentic_workflows_total", "Workflows finished, by final status", ["status"]
+)
+QUEUE_DEPTH = registry.gauge(
+    "agentic_workflow_queue_depth", "Workflows waiting for a worker", ["priority"]
+)
+WORKFLOWS_RUNNING = registry.gauge(
+    "agentic_workflows_running", "Workflows currently executing", ["priority"]
+)
+STAGE_LATENCY = registry.histogram(
+    "agentic_stage_duration_seconds",
+    "Orchestrator stage latency",
+    ["stage", "status"],
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300),
+)
+LLM_LATENCY = registry.histogram(
+    "agentic_llm_request_duration_seconds",
+    "LLM provider call latency (per attempt)",
+    ["provider", "agent", "operation"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+LLM_TOKENS = registry.counter(
+    "agentic_llm_tokens_total",
+    "LLM tokens (provider-reported, or estimated when not reported)",
+    ["provider", "agent", "kind"],
+)
+LLM_COST = registry.counter(
+    "agentic_llm_cost_usd_total", "LLM spend from the price table", ["provider", "agent"]
+)
+LLM_RETRIES = registry.counter(
+    "agentic_llm_retries_total", "LLM calls retried after a transient error", ["provider"]
+)
+LLM_ERRORS = registry.counter(
+    "agentic_llm_errors_total", "LLM provider errors, by exception type", ["provider", "error"]
+)
+CACHE_HITS = registry.counter(
+    "agentic_cache_hits_total", "Submissions served from existing work", ["cache"]
+)
@@ -3,21 +3,161 @@ Orchestrator - Coordinates the multi-agent system
 Manages workflow between agents and ensures smooth execution
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Union
 from agents import (
     DataIngestionAgent,
     AnalysisAgent,
     ReasoningAgent,
+    AllocationAgent,
     DecisionAgent,
     ExecutionAgent,
     AgentResponse,
 )
+from retrieval import BM25Index
+from cancellation import CancellationToken, WorkflowCancelled
+from checkpoint import Checkpointer, StageResult, resumable_prefix, succeeded
+from accounting import TokenLedger, ledger_context
+from config import config
+from metrics import CACHE_HITS, STAGE_LATENCY
+from stage_cache import StageCache, stage_cache, stage_key
+from tracing import traced, tracer
+from reporting import EventCallback, EventReporter, RichReporter, WorkflowReporter, combine_reporters
+from collections import Counter
 from datetime import datetime
 import asyncio
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.panel import Panel
-from rich.tree import Tree
+import os
+import time
+
+
+# Workflow stages: (key, display label, progress weight in LLM calls)
+STAGES = [
+    ("ingestion", "Data Ingestion", 1),
+    ("analysis", "Analysis", 4),
+    ("reasoning", "Reasoning", 1),
+    ("allocation", "Resource Allocation", 0),
+    ("decision", "Decision", 1),
+    ("execution", "Execution Planning", 1),
+]
+
+class StageEvents:
+    """
+    Tracks stage progress for one workflow run and passes it to a reporter
+
+    Progress is measured in completed units of work (one per LLM call),
+    so the analysis stage advances the bar once per analysis type.
+    """
+
+    def __init__(
+        self,
+        reporter: Optional[WorkflowReporter] = None,
+        ledger: Optional[TokenLedger] = None,
+    ):
+        self.reporter = reporter or combine_reporters()
+        self.ledger = ledger
+        self.total_steps = sum(weight for _, _, weight in STAGES)
+        self.steps_done = 0
+        self._started: Dict[str, float] = {}
+        self._index = {key: i for i, (key, _, _) in enumerate(STAGES, 1)}
+        self._labels = {key: label for key, label, _ in STAGES}
+        self._weights = {key: weight for key, _, weight in STAGES}
+        self.current_stage: Optional[str] = None
+
+    @property
+    def progress(self) -> int:
+        return round(100 * self.steps_done / self.total_steps)
+
+    def stage_started(self, stage: str) -> None:
+        self.current_stage = stage
+        if self.ledger is not None:
+            # LLM calls from here on are charged to this stage
+            self.ledger.stage = stage
+        self._started[stage] = time.perf_counter()
+        self.reporter.stage_started(
+            stage, self._labels[stage], self._index[stage], len(STAGES), self.progress
+        )
+
+    def step_started(self, description: str) -> None:
+        self.reporter.step_started(description)
+
+    def analysis_completed(
+        self, analysis_type: str, result: AgentResponse, duration: float
+    ) -> None:
+        self.steps_done += 1
+        self.reporter.analysis_completed(analysis_type, result, duration, self.progress)
+
+    def stage_finished(
+        self, stage: str, result: Union[AgentResponse, Dict[str, AgentResponse]]
+    ) -> None:
+        # Recompute from stage weights so per-step events never double count
+        self.steps_done = sum(
+            self._weights[key] for key, _, _ in STAGES[: self._index[stage]]
+        )
+        if isinstance(result, dict):
+            statuses = {r.status for r in result.values()}
+            status = "success" if statuses <= {"success"} else "error"
+        else:
+            status = result.status
+
+        self.current_stage = None
+        duration = self._elapsed(stage)
+        STAGE_LATENCY.labels(stage, status).observe(duration)
+        self.reporter.stage_finished(
+            stage, self._labels[stage], status, duration, self.progress, result
+        )
+
+    def stage_interrupted(self, reason: str) -> None:
+        """Record the latency of a stage stopped by cancellation"""
+        if self.current_stage is not None:
+            STAGE_LATENCY.labels(self.current_stage, reason).observe(
+                self._elapsed(self.current_stage)
+            )
+
+    def _elapsed(self, stage: str) -> float:
+        return time.perf_counter() - self._started.get(stage, time.perf_counter())
+
+
+def _responses(result: Union[AgentResponse, Dict[str, AgentResponse]]) -> List[AgentResponse]:
+    return list(result.values()) if isinstance(result, dict) else [result]
+
+
+def _ingestion_key(data_source: Dict[str, Any]) -> Optional[str]:
+    """Memo key for ingestion; None (always re-read) for API sources"""
+    source_type = data_source.get("source_type", "file")
+    if source_type == "api":
+        return None
+    if source_type == "file":
+        # An edited file at the same path must be re-ingested
+        try:
+            stat = os.stat(data_source.get("source_path", ""))
+        except OSError:
+            return None
+        return stage_key("ingestion", data_source, stat.st_mtime_ns, stat.st_size)
+    return stage_key("ingestion", data_source)
+
+
+def summarize_batch(
+    batch_id: str, results: List[Dict[str, Any]], duration: float
+) -> Dict[str, Any]:
+    """Aggregate outcome of a batch of workflow results"""
+    decisions = Counter()
+    for item in results:
+        decision = item.get("stages", {}).get("decision")
+        if decision is not None:
+            recommended = decision.data.get("decision", {}).get("RECOMMENDED DECISION")
+            if recommended:
+                decisions[str(recommended)] += 1
+
+    return {
+        "batch_id": batch_id,
+        "items": len(results),
+        "statuses": dict(Counter(r["status"] for r in results)),
+        "duration_seconds": round(duration, 3),
+        "llm_calls": sum(r["usage"]["calls"] for r in results),
+        "total_tokens": sum(r["usage"]["total_tokens"] for r in results),
+        "cost_usd": round(sum(r["usage"]["cost_usd"] for r in results), 6),
+        "shared_stages": sum(len(r["reused_stages"]) for r in results),
+        "decisions": dict(decisions.most_common()),
+    }
 
 
 class AgenticOrchestrator:
@@ -27,12 +167,13 @@ class AgenticOrchestrator:
     """
 
     def __init__(self):
-        self.console = Console()
+        self._console = None
 
         # Initialize all agents
         self.data_agent = DataIngestionAgent()
         self.analysis_agent = AnalysisAgent()
         self.reasoning_agent = ReasoningAgent()
+        self.allocation_agent = AllocationAgent()
         self.decision_agent = DecisionAgent()
         self.execution_agent = ExecutionAgent()
 
@@ -44,6 +185,16 @@ class AgenticOrchestrator:
         self,
         scenario: Dict[str, Any],
         verbose: bool = True,
+        event_callback: Optional[EventCallback] = None,
+        cancellation: Optional[CancellationToken] = None,
+        token_budget: Optional[int] = None,
+        cost_budget: Optional[float] = None,
+        reporter: Optional[WorkflowReporter] = None,
+        reuse_stages: bool = True,
+        workflow_id: Optional[str] = None,
+        checkpointer: Optional[Checkpointer] = None,
+        resume: bool = False,
+        cache: Optional[StageCache] = None,
     ) -> Dict[str, Any]:
         """
         Execute the complete decision-making workflow
@@ -56,283 +207,517 @@ class AgenticOrchestrator:
                 "options": List[Dict] (available options),
                 "constraints": Dict (constraints),
                 "resources": Dict (available resources),
-                "timeline": str
+                "timeline": str,
+                "decision_criteria": Dict (optional),
+                "criteria": Dict (optional MCDA weights for local scoring),
+                "allocation": Dict (optional resource allocation spec)
             }
-            verbose: Whether to display detailed progress
+            verbose: Whether to render progress on the Rich console
+            event_callback: Optional callable(event_type, data) receiving
+                stage_started / analysis_completed / stage_finished events
+            cancellation: Optional token that stops the workflow when
+                cancelled or when its deadline passes; the result status is
+                then "cancelled" or "timed_out" and lists skipped_stages
+            token_budget: Maximum tokens for the workflow (default
+                WORKFLOW_TOKEN_BUDGET, 0 = unlimited)
+            cost_budget: Maximum USD spend (default WORKFLOW_COST_BUDGET);
+                running out stops the workflow with status "budget_exceeded"
+            reporter: Optional additional WorkflowReporter; with neither
+                verbose nor event_callback the run reports to a no-op
+            reuse_stages: Reuse memoized outputs of stages whose inputs are
+                unchanged since an earlier run (listed in reused_stages)
+            workflow_id: Identifier to run under (default: timestamp based)
+            checkpointer: Optional Checkpointer; each successful stage is
+                saved as soon as it finishes
+            resume: Restore the leading successful stages from checkpointer
+                and continue after them (listed in resumed_stages)
+            cache: StageCache to memoize stages in (default: the process-wide
+                stage_cache)
 
         Returns:
             Complete workflow results
         """
-        workflow_id = f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        workflow_id = workflow_id or f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         self.current_workflow_id = workflow_id
+        restored = {}
+        if resume and checkpointer is not None:
+            restored = resumable_prefix(
+                checkpointer.load(workflow_id), [key for key, _, _ in STAGES]
+            )
+        cancellation = cancellation or CancellationToken()
+        ledger = TokenLedger(
+            token_budget=token_budget if token_budget is not None else config.WORKFLOW_TOKEN_BUDGET,
+            cost_budget=cost_budget if cost_budget is not None else config.WORKFLOW_COST_BUDGET,
+            on_exceeded=lambda: cancellation.cancel("budget_exceeded"),
+        )
+        events = StageEvents(
+            combine_reporters(
+                RichReporter(self.console) if verbose else None,
+                EventReporter(event_callback) if event_callback else None,
+                reporter,
+            ),
+            ledger,
+        )
 
-        if verbose:
-            self._display_header()
+        with tracer.span("workflow", {"workflow.id": workflow_id}) as span, \
+                ledger_context(ledger):
+            results = await self._execute(
+                workflow_id, scenario, events, cancellation, reuse_stages,
+                checkpointer, restored, cache,
+            )
+            results["usage"] = ledger.summary()
+            span.set_attributes({
+                "workflow.status": results["status"],
+                "workflow.total_tokens": ledger.total.total_tokens,
+                "workflow.cost_usd": round(ledger.total.cost_usd, 6),
+                "workflow.reused_stages": len(results["reused_stages"]),
+                "workflow.resumed_stages": len(results["resumed_stages"]),
+            })
+            if span.trace_id:
+                results["trace_id"] = span.trace_id
+            if results["status"] != "success":
+                span.set_status("ERROR", results.get("error"))
+
+        self.workflow_history.append(results)
+        return results
+
+    async def resume_workflow(
+        self,
+        workflow_id: str,
+        scenario: Dict[str, Any],
+        checkpointer: Checkpointer,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """
+        Continue a workflow from its last good checkpointed stage
+
+        Stages up to the first missing or failed checkpoint are restored
+        without any LLM calls; the rest run (and are checkpointed) as usual.
+        Accepts the same keyword arguments as execute_workflow.
+        """
+        return await self.execute_workflow(
+            scenario,
+            workflow_id=workflow_id,
+            checkpointer=checkpointer,
+            resume=True,
+            **kwargs,
+        )
+
+    async def execute_batch(
+        self,
+        scenarios: List[Dict[str, Any]],
+        concurrency: int = 4,
+        deadline: Optional[float] = None,
+        batch_id: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run several scenarios with bounded concurrency, yielding as they finish
+
+        Identical stages across the batch (e.g. ingestion and analysis of a
+        shared data source) run once and are shared by every item that
+        needs them. Items whose stages were shared list them in
+        reused_stages and are not charged for their tokens.
+
+        Args:
+            scenarios: Scenario dicts as accepted by execute_workflow
+            concurrency: Maximum workflows running at once
+            deadline: Optional per-item time limit in seconds
+            batch_id: Prefix for item workflow ids
+            **kwargs: Passed to execute_workflow (verbose defaults to False)
+
+        Yields:
+            {"type": "item", "index", "workflow_id", "results"} per scenario
+            in completion order, then {"type": "summary", ...}
+        """
+        batch_id = batch_id or f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        kwargs.setdefault("verbose", False)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        started = time.perf_counter()
+
+        async def run(index: int, scenario: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.execute_workflow(
+                    scenario,
+                    workflow_id=f"{batch_id}_{index}",
+                    cancellation=CancellationToken(timeout=deadline),
+                    **kwargs,
+                )
+
+        tasks = [asyncio.create_task(run(i, s)) for i, s in enumerate(scenarios)]
+        index_of = {task: i for i, task in enumerate(tasks)}
+        completed = []
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=index_of.get):
+                    results = task.result()
+                    completed.append(results)
+                    yield {
+                        "type": "item",
+                        "index": index_of[task],
+                        "workflow_id": results["workflow_id"],
+                        "results": results,
+                    }
+        finally:
+            # Consumer went away (or failed): stop the remaining items
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        yield {
+            "type": "summary",
+            **summarize_batch(batch_id, completed, time.perf_counter() - started),
+        }
+
+    async def _execute(
+        self,
+        workflow_id: str,
+        scenario: Dict[str, Any],
+        events: StageEvents,
+        cancellation: CancellationToken,
+        reuse_stages: bool = True,
+        checkpointer: Optional[Checkpointer] = None,
+        restored: Optional[Dict[str, StageResult]] = None,
+        cache: Optional[StageCache] = None,
+    ) -> Dict[str, Any]:
+        """Run the stage pipeline and collect results (or the interruption)"""
+        events.reporter.workflow_started(workflow_id)
 
         results = {
             "workflow_id": workflow_id,
             "timestamp": datetime.now().isoformat(),
             "scenario": scenario,
             "stages": {},
+            "reused_stages": [],
+            "resumed_stages": list(restored or {}),
         }
 
         try:
-            # Stage 1: Data Ingestion
-            if verbose:
-                self.console.print("\n[bold cyan]Stage 1: Data Ingestion[/bold cyan]")
-
-            ingestion_result = await self._stage_data_ingestion(
-                scenario.get("data_source", {}), verbose
-            )
-            results["stages"]["ingestion"] = ingestion_result
-
-            # Stage 2: Analysis
-            if verbose:
-                self.console.print("\n[bold cyan]Stage 2: Data Analysis[/bold cyan]")
-
-            analysis_result = await self._stage_analysis(
-                ingestion_result, scenario.get("context", ""), verbose
+            # Stages run as a separate task so a cancel request or an expired
+            # deadline can interrupt them mid-call
+            await cancellation.run(
+                self._run_stages(
+                    scenario, results, events, reuse_stages, checkpointer,
+                    restored, cache,
+                )
             )
-            results["stages"]["analysis"] = analysis_result
-
-            # Stage 3: Reasoning
-            if verbose:
-                self.console.print("\n[bold cyan]Stage 3: Constraint-Based Reasoning[/bold cyan]")
-
-            reasoning_result = await self._stage_reasoning(
-                scenario.get("options", []),
-                scenario.get("constraints", {}),
-                scenario.get("objectives", []),
-                scenario.get("context", ""),
-                verbose,
-            )
-            results["stages"]["reasoning"] = reasoning_result
-
-            # Stage 4: Decision Making
-            if verbose:
-                self.console.print("\n[bold cyan]Stage 4: Decision Making[/bold cyan]")
-
-            decision_result = await self._stage_decision(
-                analysis_result,
-                reasoning_result,
-                scenario.get("context", ""),
-                scenario.get("decision_criteria", {}),
-                verbose,
-            )
-            results["stages"]["decision"] = decision_result
-
-            # Stage 5: Execution Planning
-            if verbose:
-                self.console.print("\n[bold cyan]Stage 5: Execution Planning[/bold cyan]")
-
-            execution_result = await self._stage_execution(
-                decision_result,
-                scenario.get("resources", {}),
-                scenario.get("timeline", "30 days"),
-                verbose,
-            )
-            results["stages"]["execution"] = execution_result
 
             results["status"] = "success"
 
-            if verbose:
-                self._display_summary(results)
+        except WorkflowCancelled as e:
+            events.stage_interrupted(e.reason)
+            results["status"] = e.reason
+            results["error"] = str(e)
+            results["interrupted_stage"] = events.current_stage
+            results["skipped_stages"] = [
+                key for key, _, _ in STAGES if key not in results["stages"]
+            ]
 
         except Exception as e:
             results["status"] = "error"
             results["error"] = str(e)
-            if verbose:
-                self.console.print(f"\n[bold red]Error:[/bold red] {str(e)}")
 
-        self.workflow_history.append(results)
+        events.reporter.workflow_finished(results)
         return results
 
-    async def _stage_data_ingestion(
-        self, data_source: Dict[str, Any], verbose: bool
-    ) -> AgentResponse:
-        """Execute data ingestion stage"""
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True,
-        ) as progress:
-            if verbose:
-                progress.add_task("Ingesting data...", total=None)
+    async def _run_stages(
+        self,
+        scenario: Dict[str, Any],
+        results: Dict[str, Any],
+        events: StageEvents,
+        reuse_stages: bool = True,
+        checkpointer: Optional[Checkpointer] = None,
+        restored: Optional[Dict[str, StageResult]] = None,
+        cache: Optional[StageCache] = None,
+    ) -> None:
+        """
+        Run the workflow stages, recording each result as it finishes
 
-            result = await self.data_agent.execute(data_source)
+        Each stage is keyed on a hash of its exact inputs (upstream outputs,
+        the scenario fields it reads, provider and model). A stage whose key
+        has a memoized successful output is not recomputed, so changing only
+        the options re-runs reasoning, decision and execution. Stages in
+        restored (resumed from checkpoints) are not recomputed either.
 
-        if verbose and result.status == "success":
-            self.console.print("✓ Data ingested successfully", style="green")
+        Optional scenario fields may be present but None (custom scenarios),
+        so each falls back to its default with `or`.
+        """
+        llm = self.analysis_agent.client
+        context = scenario.get("context") or ""
+        restored = restored or {}
+        cache = cache or stage_cache
+
+        async def run_stage(
+            stage: str, make_key: Callable[[], Optional[str]], compute: Callable
+        ) -> Any:
+            if stage in restored:
+                return restored[stage]
+
+            # A key that cannot be computed only costs the memoization; the
+            # agent still runs and reports its own errors
+            try:
+                key = make_key() if reuse_stages else None
+            except Exception:
+                key = None
+
+            if key:
+                # Memoized, or shared with a concurrent identical stage
+                result, reused = await cache.get_or_compute(
+                    key, compute, store_if=succeeded
+                )
+                if reused:
+                    CACHE_HITS.labels("stage").inc()
+                    results["reused_stages"].append(stage)
+                    for response in _responses(result):
+                        response.metadata["reused"] = True
+            else:
+                result = await compute()
+
+            if checkpointer is not None and succeeded(result):
+                checkpointer.save(results["workflow_id"], stage, result)
+            return result
+
+        # Stage 1: Data Ingestion
+        data_source = scenario.get("data_source") or {}
+        events.stage_started("ingestion")
+        ingestion_result = await run_stage(
+            "ingestion",
+            lambda: _ingestion_key(data_source),
+            lambda: self._stage_data_ingestion(data_source, events),
+        )
+        results["stages"]["ingestion"] = ingestion_result
+
+        # Index the ingested content so each downstream prompt can
+        # retrieve only the chunks relevant to it
+        retrieval_index = self.data_agent.build_index(ingestion_result.data)
+        ingestion_result.metadata["retrieval_index"] = retrieval_index.stats()
+        events.stage_finished("ingestion", ingestion_result)
+        data_digest = stage_key("data", ingestion_result.data)
+
+        # Stage 2: Analysis
+        events.stage_started("analysis")
+        analysis_result = await run_stage(
+            "analysis",
+            lambda: stage_key("analysis", llm.provider, llm.model, data_digest, context),
+            lambda: self._stage_analysis(
+                ingestion_result, context, retrieval_index, events
+            ),
+        )
+        results["stages"]["analysis"] = analysis_result
+        events.stage_finished("analysis", analysis_result)
+
+        # Stage 3: Reasoning
+        options = scenario.get("options") or []
+        constraints = scenario.get("constraints") or {}
+        objectives = scenario.get("objectives") or []
+        mcda_criteria = scenario.get("criteria")
+        events.stage_started("reasoning")
+        reasoning_result = await run_stage(
+            "reasoning",
+            lambda: stage_key(
+                "reasoning", llm.provider, llm.model, data_digest,
+                options, constraints, objectives, context, mcda_criteria,
+                config.REASONING_MODE, config.MCDA_METHOD, config.CONSTRAINT_PREFILTER,
+                config.REASONING_SHARD_SIZE, config.REASONING_SHARD_FINALISTS,
+                config.SENSITIVITY_SAMPLES, config.SENSITIVITY_SCORE_NOISE,
+                config.SENSITIVITY_WEIGHT_CONCENTRATION,
+            ),
+            lambda: self._stage_reasoning(
+                options, constraints, objectives, context, mcda_criteria,
+                retrieval_index, events,
+            ),
+        )
+        results["stages"]["reasoning"] = reasoning_result
+        events.stage_finished("reasoning", reasoning_result)
+
+        # Stage 4: Resource Allocation (local optimizer, no LLM call)
+        allocation_spec = scenario.get("allocation")
+        resources = scenario.get("resources") or {}
+        events.stage_started("allocation")
+        allocation_result = await run_stage(
+            "allocation",
+            lambda: stage_key(
+                "allocation", data_digest, allocation_spec, constraints, resources,
+                config.ALLOCATION_METHOD, config.ALLOCATION_MIN_SHARE,
+            ),
+            lambda: self._stage_allocation(
+                ingestion_result, allocation_spec, constraints, resources, events
+            ),
+        )
+        results["stages"]["allocation"] = allocation_result
+        events.stage_finished("allocation", allocation_result)
+        allocation = allocation_result.data.get("allocation")
+
+        # Stage 5: Decision Making
+        criteria = scenario.get("decision_criteria") or {}
+        events.stage_started("decision")
+        decision_result = await run_stage(
+            "decision",
+            lambda: stage_key(
+                "decision", llm.provider, llm.model,
+                {k: v.data for k, v in analysis_result.items()},
+                reasoning_result.data, allocation, context, criteria,
+                config.DECISION_SAMPLES, config.DECISION_ENSEMBLE_WAVE,
+                config.DECISION_AGREEMENT,
+            ),
+            lambda: self._stage_decision(
+                analysis_result, reasoning_result, allocation, context, criteria, events
+            ),
+        )
+        results["stages"]["decision"] = decision_result
+        events.stage_finished("decision", decision_result)
+
+        # Stage 6: Execution Planning
+        timeline = scenario.get("timeline") or "30 days"
+        events.stage_started("execution")
+        execution_result = await run_stage(
+            "execution",
+            lambda: stage_key(
+                "execution", llm.provider, llm.model,
+                decision_result.data.get("decision", {}), resources, timeline, allocation,
+            ),
+            lambda: self._stage_execution(
+                decision_result, resources, timeline, allocation, events
+            ),
+        )
+        results["stages"]["execution"] = execution_result
+        events.stage_finished("execution", execution_result)
 
-        return result
+    @traced("stage.ingestion")
+    async def _stage_data_ingestion(
+        self, data_source: Dict[str, Any], events: StageEvents
+    ) -> AgentResponse:
+        """Execute data ingestion stage"""
+        events.step_started("Ingesting data...")
+        return await self.data_agent.execute(data_source)
 
+    @traced("stage.analysis")
     async def _stage_analysis(
-        self, ingestion_result: AgentResponse, context: str, verbose: bool
+        self,
+        ingestion_result: AgentResponse,
+        context: str,
+        retrieval_index: BM25Index,
+        events: StageEvents,
     ) -> Dict[str, AgentResponse]:
         """Execute analysis stage with multiple analysis types"""
         analyses = {}
 
         analysis_types = ["constraints", "insights", "risks", "summary"]
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True,
-        ) as progress:
-            for analysis_type in analysis_types:
-                if verbose:
-                    task = progress.add_task(
-                        f"Analyzing {analysis_type}...", total=None
-                    )
-
-                result = await self.analysis_agent.execute({
-                    "data": ingestion_result.data,
-                    "analysis_type": analysis_type,
-                    "context": context,
-                })
-
-                analyses[analysis_type] = result
-
-                if verbose:
-                    progress.remove_task(task)
-                    if result.status == "success":
-                        self.console.print(
-                            f"✓ {analysis_type.capitalize()} analysis complete",
-                            style="green",
-                        )
+        for analysis_type in analysis_types:
+            events.step_started(f"Analyzing {analysis_type}...")
+
+            started = time.perf_counter()
+            result = await self.analysis_agent.execute({
+                "data": ingestion_result.data,
+                "analysis_type": analysis_type,
+                "context": context,
+                "retrieval_index": retrieval_index,
+            })
+
+            analyses[analysis_type] = result
+            events.analysis_completed(analysis_type, result, time.perf_counter() - started)
 
         return analyses
 
+    @traced("stage.reasoning")
     async def _stage_reasoning(
         self,
         options: List[Dict],
         constraints: Dict,
         objectives: List[str],
         context: str,
-        verbose: bool,
+        criteria: Optional[Dict[str, Any]],
+        retrieval_index: BM25Index,
+        events: StageEvents,
     ) -> AgentResponse:
         """Execute reasoning stage"""
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True,
-        ) as progress:
-            if verbose:
-                progress.add_task("Evaluating options against constraints...", total=None)
-
-            result = await self.reasoning_agent.execute({
-                "options": options,
-                "constraints": constraints,
-                "objectives": objectives,
-                "context": context,
-            })
-
-        if verbose and result.status == "success":
-            self.console.print("✓ Reasoning complete", style="green")
-
-        return result
-
+        events.step_started("Evaluating options against constraints...")
+        return await self.reasoning_agent.execute({
+            "options": options,
+            "constraints": constraints,
+            "objectives": objectives,
+            "context": context,
+            "criteria": criteria,
+            "retrieval_index": retrieval_index,
+        })
+
+    @traced("stage.allocation")
+    async def _stage_allocation(
+        self,
+        ingestion_result: AgentResponse,
+        spec: Optional[Dict[str, Any]],
+        constraints: Dict,
+        resources: Dict,
+        events: StageEvents,
+    ) -> AgentResponse:
+        """Execute resource allocation stage"""
+        events.step_started("Optimizing resource allocation...")
+        return await self.allocation_agent.execute({
+            "data": ingestion_result.data,
+            "allocation": spec,
+            "constraints": constraints,
+            "resources": resources,
+        })
+
+    @traced("stage.decision")
     async def _stage_decision(
         self,
         analysis_results: Dict[str, AgentResponse],
         reasoning_result: AgentResponse,
+        allocation: Optional[Dict[str, Any]],
         context: str,
         criteria: Dict,
-        verbose: bool,
+        events: StageEvents,
     ) -> AgentResponse:
         """Execute decision-making stage"""
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True,
-        ) as progress:
-            if verbose:
-                progress.add_task("Synthesizing decision...", total=None)
-
-            # Combine all analysis results
-            combined_analysis = {
-                k: v.data for k, v in analysis_results.items()
-            }
-
-            result = await self.decision_agent.execute({
-                "analysis_results": combined_analysis,
-                "reasoning_results": reasoning_result.data,
-                "context": context,
-                "decision_criteria": criteria,
-            })
+        events.step_started("Synthesizing decision...")
 
-        if verbose and result.status == "success":
-            self.console.print("✓ Decision finalized", style="green")
+        # Combine all analysis results
+        combined_analysis = {
+            k: v.data for k, v in analysis_results.items()
+        }
 
-        return result
+        return await self.decision_agent.execute({
+            "analysis_results": combined_analysis,
+            "reasoning_results": reasoning_result.data,
+            "allocation": allocation,
+            "context": context,
+            "decision_criteria": criteria,
+        })
 
+    @traced("stage.execution")
     async def _stage_execution(
         self,
         decision_result: AgentResponse,
         resources: Dict,
         timeline: str,
-        verbose: bool,
+        allocation: Optional[Dict[str, Any]],
+        events: StageEvents,
     ) -> AgentResponse:
         """Execute execution planning stage"""
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True,
-        ) as progress:
-            if verbose:
-                progress.add_task("Generating execution plan...", total=None)
-
-            result = await self.execution_agent.execute({
-                "decision": decision_result.data.get("decision", {}),
-                "resources": resources,
-                "timeline": timeline,
-                "output_format": "report",
-            })
-
-        if verbose and result.status == "success":
-            self.console.print("✓ Execution plan ready", style="green")
-
-        return result
-
-    def _display_header(self):
-        """Display workflow header"""
-        header = Panel(
-            "[bold white]AGENTIC AI SYSTEM FOR NATIONAL-SCALE OPERATIONAL DECISIONS[/bold white]\n"
-            "[dim]Multi-Agent GenAI System for Automated Decision Making[/dim]",
-            border_style="cyan",
-            padding=(1, 2),
-        )
-        self.console.print(header)
-
-    def _display_summary(self, results: Dict[str, Any]):
-        """Display workflow summary"""
-        self.console.print("\n" + "=" * 70)
-        self.console.print("[bold green]WORKFLOW COMPLETED SUCCESSFULLY[/bold green]")
-        self.console.print("=" * 70)
-
-        # Display decision
-        decision = results["stages"]["decision"].data.get("decision", {})
-
-        if "RECOMMENDED DECISION" in decision:
-            self.console.print(
-                f"\n[bold]Recommended Decision:[/bold] {decision['RECOMMENDED DECISION']}"
-            )
-
-        if "CONFIDENCE LEVEL" in decision:
-            self.console.print(
-                f"[bold]Confidence Level:[/bold] {decision['CONFIDENCE LEVEL']}"
-            )
-
-        # Display execution report if available
-        execution = results["stages"]["execution"].data.get("execution_plan", {})
-        if "report" in execution:
-            self.console.print("\n[bold cyan]EXECUTIVE REPORT:[/bold cyan]")
-            self.console.print(execution["report"])
+        events.step_started("Generating execution plan...")
+        return await self.execution_agent.execute({
+            "decision": decision_result.data.get("decision", {}),
+            "resources": resources,
+            "timeline": timeline,
+            "allocation": allocation,
+            "output_format": "report",
+        })
+
+    @property
+    def console(self):
+        """Rich console for verbose runs, created on first use"""
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return self._console
+
+    @console.setter
+    def console(self, value):
+        self._console = value
 
     def get_workflow_history(self) -> List[Dict[str, Any]]:
         """Get complete workflow history"""
@@ -0,0 +1,109 @@
+"""
+Quantity Parsing
+Reads the amounts written into scenario fields ("$48M", "8 hours",
+"15%") as numbers in a common unit per kind
+"""
+
+from typing import Any, List, Optional
+from dataclasses import dataclass
+import re
+
+
+CURRENCY = "currency"
+PERCENT = "percent"
+DURATION = "duration"
+NUMBER = "number"
+
+_SCALES = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "mn": 1e6, "million": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9,
+    "t": 1e12, "trillion": 1e12,
+}
+
+_CURRENCIES = {
+    "$": "USD", "usd": "USD", "dollar": "USD", "dollars": "USD",
+    "€": "EUR", "eur": "EUR", "euro": "EUR", "euros": "EUR",
+    "£": "GBP", "gbp": "GBP", "pound": "GBP", "pounds": "GBP",
+}
+
+# Durations are normalized to hours
+_HOURS = {
+    "min": 1 / 60, "mins": 1 / 60, "minute": 1 / 60, "minutes": 1 / 60,
+    "h": 1.0, "hr": 1.0, "hrs": 1.0, "hour": 1.0, "hours": 1.0,
+    "d": 24.0, "day": 24.0, "days": 24.0,
+    "w": 168.0, "wk": 168.0, "wks": 168.0, "week": 168.0, "weeks": 168.0,
+    "mo": 730.0, "mos": 730.0, "month": 730.0, "months": 730.0,
+    "y": 8760.0, "yr": 8760.0, "yrs": 8760.0, "year": 8760.0, "years": 8760.0,
+}
+
+_PATTERN = re.compile(
+    r"(?P<symbol>[$€£])?\s*"
+    r"(?P<number>-?\d[\d,]*(?:\.\d+)?)\s*"
+    r"(?:(?P<scale>k|mn|m|bn|b|t|thousand|million|billion|trillion)\b\s*)?"
+    r"(?:(?P<percent>%|percent\b)|(?P<unit>[a-z]+)\b)?",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class Quantity:
+    """An amount in its kind's common unit (currency code, %, hours)"""
+
+    value: float
+    kind: str  # "currency", "percent", "duration" or "number"
+    unit: str  # e.g. "USD", "%", "hours"; "" for plain numbers
+    text: str  # the matched text
+
+    def comparable(self, other: "Quantity") -> bool:
+        return self.kind == other.kind and self.unit == other.unit
+
+    def __str__(self) -> str:
+        if self.kind == CURRENCY:
+            return f"{self.value:,.0f} {self.unit}"
+        if self.kind == PERCENT:
+            return f"{self.value:g}%"
+        if self.kind == DURATION:
+            return f"{self.value:g} hours"
+        return f"{self.value:g}"
+
+
+def parse_quantities(value: Any) -> List[Quantity]:
+    """
+    Every quantity in a value, in order of appearance
+
+    Numbers pass through as plain quantities; strings are scanned for
+    amounts with an optional currency symbol or code, scale word (k, M,
+    bn, million, ...) and unit (%, minutes to years).
+    """
+    if isinstance(value, bool) or value is None:
+        return []
+    if isinstance(value, (int, float)):
+        return [Quantity(float(value), NUMBER, "", str(value))]
+    if not isinstance(value, str):
+        return []
+
+    quantities = []
+    for match in _PATTERN.finditer(value):
+        number = float(match.group("number").replace(",", ""))
+        scale = (match.group("scale") or "").lower()
+        unit = (match.group("unit") or "").lower()
+        number *= _SCALES.get(scale, 1.0)
+
+        currency = _CURRENCIES.get(match.group("symbol") or "") or _CURRENCIES.get(unit)
+        if currency:
+            quantity = Quantity(number, CURRENCY, currency, match.group(0).strip())
+        elif match.group("percent"):
+            quantity = Quantity(number, PERCENT, "%", match.group(0).strip())
+        elif unit in _HOURS:
+            quantity = Quantity(number * _HOURS[unit], DURATION, "hours", match.group(0).strip())
+        else:
+            quantity = Quantity(number, NUMBER, "", match.group(0).strip())
+        quantities.append(quantity)
+    return quantities
+
+
+def parse_quantity(value: Any) -> Optional[Quantity]:
+    """The first (headline) quantity in a value, or None"""
+    quantities = parse_quantities(value)
+    return quantities[0] if quantities else None
@@ -0,0 +1,293 @@
+"""
+Workflow Reporters
+Pluggable receivers for orchestrator progress: a no-op reporter for headless
+runs, the Rich console for the CLI, and an event reporter for the API
+"""
+
+from typing import Dict, Any, Callable, List, Optional, Union
+
+
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class WorkflowReporter:
+    """
+    Receives the lifecycle notifications of one workflow run
+
+    Every method is a no-op; subclasses override what they render or
+    forward. A reporter is created per run, so it may keep per-run state.
+    """
+
+    def workflow_started(self, workflow_id: str) -> None:
+        pass
+
+    def stage_started(
+        self, stage: str, label: str, index: int, total_stages: int, progress: int
+    ) -> None:
+        pass
+
+    def step_started(self, description: str) -> None:
+        """A unit of work (one agent call) is starting"""
+        pass
+
+    def analysis_completed(
+        self, analysis_type: str, result: Any, duration: float, progress: int
+    ) -> None:
+        pass
+
+    def stage_finished(
+        self,
+        stage: str,
+        label: str,
+        status: str,
+        duration: float,
+        progress: int,
+        result: Union[Any, Dict[str, Any]],
+    ) -> None:
+        pass
+
+    def workflow_finished(self, results: Dict[str, Any]) -> None:
+        pass
+
+
+class NullReporter(WorkflowReporter):
+    """Discards everything (headless runs)"""
+
+
+class EventReporter(WorkflowReporter):
+    """Forwards progress as (event_type, data) to a callback"""
+
+    def __init__(self, callback: EventCallback):
+        self.callback = callback
+
+    def stage_started(
+        self, stage: str, label: str, index: int, total_stages: int, progress: int
+    ) -> None:
+        self.callback("stage_started", {
+            "stage": stage,
+            "label": label,
+            "index": index,
+            "total_stages": total_stages,
+            "progress": progress,
+        })
+
+    def analysis_completed(
+        self, analysis_type: str, result: Any, duration: float, progress: int
+    ) -> None:
+        self.callback("analysis_completed", {
+            "stage": "analysis",
+            "analysis_type": analysis_type,
+            "status": result.status,
+            "duration_ms": round(duration * 1000, 1),
+            "progress": progress,
+            "result": result,
+        })
+
+    def stage_finished(
+        self,
+        stage: str,
+        label: str,
+        status: str,
+        duration: float,
+        progress: int,
+        result: Union[Any, Dict[str, Any]],
+    ) -> None:
+        self.callback("stage_finished", {
+            "stage": stage,
+            "label": label,
+            "status": status,
+            "duration_ms": round(duration * 1000, 1),
+            "progress": progress,
+            "result": result,
+        })
+
+
+class RichReporter(WorkflowReporter):
+    """Console rendering for interactive runs: stage headings, spinners, summary"""
+
+    HEADINGS = {
+        "ingestion": "Data Ingestion",
+        "analysis": "Data Analysis",
+        "reasoning": "Constraint-Based Reasoning",
+        "allocation": "Resource Allocation",
+        "decision": "Decision Making",
+        "execution": "Execution Planning",
+    }
+    COMPLETED = {
+        "ingestion": "✓ Data ingested successfully",
+        "reasoning": "✓ Reasoning complete",
+        "allocation": "✓ Resources allocated",
+        "decision": "✓ Decision finalized",
+        "execution": "✓ Execution plan ready",
+    }
+
+    def __init__(self, console: Any = None):
+        if console is None:
+            from rich.console import Console
+            console = Console()
+        self.console = console
+        self._progress = None
+        self._task = None
+
+    def workflow_started(self, workflow_id: str) -> None:
+        from rich.panel import Panel
+
+        header = Panel(
+            "[bold white]AGENTIC AI SYSTEM FOR NATIONAL-SCALE OPERATIONAL DECISIONS[/bold white]\n"
+            "[dim]Multi-Agent GenAI System for Automated Decision Making[/dim]",
+            border_style="cyan",
+            padding=(1, 2),
+        )
+        self.console.print(header)
+
+    def stage_started(
+        self, stage: str, label: str, index: int, total_stages: int, progress: int
+    ) -> None:
+        heading = self.HEADINGS.get(stage, label)
+        self.console.print(f"\n[bold cyan]Stage {index}: {heading}[/bold cyan]")
+
+    def step_started(self, description: str) -> None:
+        if self._progress is None:
+            from rich.progress import Progress, SpinnerColumn, TextColumn
+
+            self._progress = Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=self.console,
+                transient=True,
+            )
+            self._progress.start()
+        self._finish_step()
+        self._task = self._progress.add_task(description, total=None)
+
+    def analysis_completed(
+        self, analysis_type: str, result: Any, duration: float, progress: int
+    ) -> None:
+        self._finish_step()
+        if result.status == "success":
+            self.console.print(
+                f"✓ {analysis_type.capitalize()} analysis complete", style="green"
+            )
+
+    def stage_finished(
+        self,
+        stage: str,
+        label: str,
+        status: str,
+        duration: float,
+        progress: int,
+        result: Union[Any, Dict[str, Any]],
+    ) -> None:
+        self._stop_spinner()
+        if status == "success" and stage in self.COMPLETED:
+            self.console.print(self.COMPLETED[stage], style="green")
+
+    def workflow_finished(self, results: Dict[str, Any]) -> None:
+        self._stop_spinner()
+        status = results["status"]
+        if status == "success":
+            self._display_summary(results)
+        elif "skipped_stages" in results:
+            self.console.print(
+                f"\n[bold yellow]{results['error']}:[/bold yellow] skipped "
+                f"{', '.join(results['skipped_stages'])}"
+            )
+        else:
+            self.console.print(f"\n[bold red]Error:[/bold red] {results.get('error')}")
+
+    def _finish_step(self) -> None:
+        if self._task is not None:
+            self._progress.remove_task(self._task)
+            self._task = None
+
+    def _stop_spinner(self) -> None:
+        if self._progress is not None:
+            self._finish_step()
+            self._progress.stop()
+            self._progress = None
+
+    def _display_summary(self, results: Dict[str, Any]) -> None:
+        self.console.print("\n" + "=" * 70)
+        self.console.print("[bold green]WORKFLOW COMPLETED SUCCESSFULLY[/bold green]")
+        self.console.print("=" * 70)
+
+        # Display decision
+        decision = results["stages"]["decision"].data.get("decision", {})
+
+        if "RECOMMENDED DECISION" in decision:
+            self.console.print(
+                f"\n[bold]Recommended Decision:[/bold] {decision['RECOMMENDED DECISION']}"
+            )
+
+        if "CONFIDENCE LEVEL" in decision:
+            self.console.print(
+                f"[bold]Confidence Level:[/bold] {decision['CONFIDENCE LEVEL']}"
+            )
+
+        ensemble = results["stages"]["decision"].data.get("ensemble")
+        if ensemble:
+            self.console.print(
+                f"[bold]Agreement:[/bold] {ensemble['votes'][ensemble['winner']]}"
+                f"/{ensemble['samples']} samples ({ensemble['agreement']:.0%})"
+            )
+
+        sensitivity = results["stages"]["reasoning"].data.get("sensitivity")
+        if sensitivity:
+            self.console.print(
+                f"[bold]Ranking Robustness:[/bold] {sensitivity['leader']} first in "
+                f"{sensitivity['leader_probability']:.0%} of {sensitivity['samples']} samples"
+            )
+
+        allocation = results["stages"]["allocation"].data.get("allocation")
+        if allocation:
+            self.console.print(
+                f"[bold]Resources Allocated:[/bold] {allocation['totals']['allocated_units']:,} units "
+                f"across {allocation['regions']:,} regions ({allocation['method']})"
+            )
+
+        # Display execution report if available
+        execution = results["stages"]["execution"].data.get("execution_plan", {})
+        if "report" in execution:
+            self.console.print("\n[bold cyan]EXECUTIVE REPORT:[/bold cyan]")
+            self.console.print(execution["report"])
+
+
+class CompositeReporter(WorkflowReporter):
+    """Forwards every notification to several reporters in order"""
+
+    def __init__(self, reporters: List[WorkflowReporter]):
+        self.reporters = reporters
+
+    def workflow_started(self, *args: Any) -> None:
+        for reporter in self.reporters:
+            reporter.workflow_started(*args)
+
+    def stage_started(self, *args: Any) -> None:
+        for reporter in self.reporters:
+            reporter.stage_started(*args)
+
+    def step_started(self, *args: Any) -> None:
+        for reporter in self.reporters:
+            reporter.step_started(*args)
+
+    def analysis_completed(self, *args: Any) -> None:
+        for reporter in self.reporters:
+            reporter.analysis_completed(*args)
+
+    def stage_finished(self, *args: Any) -> None:
+        for reporter in self.reporters:
+            reporter.stage_finished(*args)
+
+    def workflow_finished(self, *args: Any) -> None:
+        for reporter in self.reporters:
+            reporter.workflow_finished(*args)
+
+
+def combine_reporters(*reporters: Optional[WorkflowReporter]) -> WorkflowReporter:
+    """One reporter for all given (None entries are ignored)"""
+    active = [r for r in reporters if r is not None]
+    if not active:
+        return NullReporter()
+    if len(active) == 1:
+        return active[0]
+    return CompositeReporter(active)
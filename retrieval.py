@@ -0,0 +1,214 @@
+"""
+Retrieval Index
+In-memory BM25 inverted index over chunked source content
+Lets each analysis type and each option pull only the passages relevant to it
+"""
+
+from typing import Dict, Any, List, Tuple
+from collections import Counter
+import heapq
+import json
+import math
+import re
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+
+# Query terms used to pull relevant passages for each analysis type
+ANALYSIS_QUERIES: Dict[str, str] = {
+    "constraints": (
+        "budget cost limit limited constraint capacity requirement regulation "
+        "deadline timeline hours days shortage stock supply access dependency "
+        "available maximum minimum"
+    ),
+    "insights": (
+        "trend increase decrease growth pattern rate percent demand usage "
+        "ridership capacity impact opportunity population economic"
+    ),
+    "risks": (
+        "risk damage damaged outage offline failure shortage critical "
+        "casualties injured missing collapsed blackout incidents threat "
+        "vulnerable severe lack"
+    ),
+    "summary": (
+        "total population available budget resources critical status report "
+        "region overview key"
+    ),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokenizer with stopword removal"""
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def content_to_text(content: Any) -> str:
+    """Flatten ingested content (text, records, JSON) into plain text"""
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list) and all(isinstance(item, dict) for item in content):
+        # One line per record keeps CSV/Excel rows together in a chunk
+        return "\n".join(json.dumps(item, default=str) for item in content)
+    return json.dumps(content, indent=1, default=str)
+
+
+def chunk_text(text: str, chunk_tokens: int = 80) -> List[str]:
+    """
+    Split text into chunks of roughly chunk_tokens tokens
+
+    Lines are packed greedily so that related lines stay together;
+    lines longer than a chunk are split on word boundaries.
+    """
+    max_chars = chunk_tokens * 4
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    def flush():
+        nonlocal current, current_len
+        if current:
+            chunks.append("\n".join(current))
+        current = []
+        current_len = 0
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if len(line) > max_chars:
+            flush()
+            words = line.split()
+            piece: List[str] = []
+            piece_len = 0
+            for word in words:
+                if piece and piece_len + len(word) + 1 > max_chars:
+                    chunks.append(" ".join(piece))
+                    piece = []
+                    piece_len = 0
+                piece.append(word)
+                piece_len += len(word) + 1
+            if piece:
+                chunks.append(" ".join(piece))
+            continue
+
+        if current and current_len + len(line) + 1 > max_chars:
+            flush()
+        current.append(line)
+        current_len += len(line) + 1
+
+    flush()
+    return chunks
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index
+
+    Build cost is linear in the number of tokens; a lookup only touches
+    the postings of the query terms.
+    """
+
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_lengths: List[int] = []
+
+        for doc_id, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+
+        total = sum(self.doc_lengths)
+        self.avg_doc_length = total / len(chunks) if chunks else 0.0
+
+    @classmethod
+    def from_content(cls, content: Any, chunk_tokens: int = 80) -> "BM25Index":
+        """Chunk ingested content and index it"""
+        return cls(chunk_text(content_to_text(content), chunk_tokens))
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.chunks)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Return the top-k (chunk_id, score) pairs for a query
+
+        Args:
+            query: Free-text query
+            k: Number of results
+
+        Returns:
+            List of (chunk_id, score) sorted by descending score
+        """
+        if not self.chunks:
+            return []
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for doc_id, tf in postings:
+                norm = self.k1 * (
+                    1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_doc_length or 1)
+                )
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def select(
+        self,
+        query: str,
+        token_budget: int,
+        k: int = 8,
+    ) -> List[str]:
+        """
+        Select the best-matching chunks that fit within a token budget
+
+        Chunks are returned in document order so the excerpt reads naturally.
+        Falls back to the leading chunks when nothing matches the query.
+        """
+        hits = [doc_id for doc_id, _ in self.search(query, k)]
+        if not hits:
+            hits = list(range(min(k, len(self.chunks))))
+
+        selected: List[int] = []
+        used = 0
+        for doc_id in hits:
+            cost = estimate_tokens(self.chunks[doc_id])
+            if used + cost > token_budget:
+                continue
+            selected.append(doc_id)
+            used += cost
+
+        return [self.chunks[doc_id] for doc_id in sorted(selected)]
+
+    def stats(self) -> Dict[str, Any]:
+        """Index statistics for metadata"""
+        return {
+            "chunks": len(self.chunks),
+            "terms": len(self.postings),
+            "avg_chunk_tokens": round(self.avg_doc_length, 1),
+        }
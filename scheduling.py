@@ -0,0 +1,246 @@
+"""
+Priority Scheduling
+Priority classes with weighted fair queuing for workflows and LLM calls
+Time-critical work (emergency scenarios) keeps low latency while batch
+planning runs fill the remaining capacity
+"""
+
+from typing import Dict, Any, Callable, Generic, Iterator, List, Optional, Tuple, TypeVar
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import asyncio
+import math
+import time
+
+from config import config
+
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PriorityClass:
+    """A scheduling class; higher weight gets a larger share of capacity"""
+
+    name: str
+    weight: float
+
+
+def parse_priority_classes(spec: str) -> Dict[str, PriorityClass]:
+    """Parse "critical:8,standard:3,batch:1" into priority classes"""
+    classes = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition(":")
+        if name:
+            classes[name] = PriorityClass(name=name, weight=float(weight or 1))
+    if not classes:
+        raise ValueError("At least one priority class must be configured")
+    return classes
+
+
+def parse_mapping(spec: str) -> Dict[str, str]:
+    """Parse "emergency:critical,infrastructure:batch" into a dict"""
+    mapping = {}
+    for item in spec.split(","):
+        key, _, value = item.strip().partition(":")
+        if key and value:
+            mapping[key] = value
+    return mapping
+
+
+PRIORITY_CLASSES = parse_priority_classes(config.PRIORITY_CLASSES)
+SCENARIO_PRIORITIES = parse_mapping(config.SCENARIO_PRIORITIES)
+DEFAULT_PRIORITY = config.DEFAULT_PRIORITY
+
+
+def priority_for_scenario(scenario_type: str) -> str:
+    """Priority class for a scenario type"""
+    return SCENARIO_PRIORITIES.get(scenario_type, DEFAULT_PRIORITY)
+
+
+# Priority of the work running in the current task (inherited by LLM calls)
+current_priority: ContextVar[str] = ContextVar("current_priority", default=DEFAULT_PRIORITY)
+
+
+@contextmanager
+def priority_context(priority: str) -> Iterator[None]:
+    """Run the enclosed code (and the LLM calls it makes) at a priority"""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+class WaitStats:
+    """Rolling window of wait times with percentile summaries"""
+
+    def __init__(self, window: int = 1000):
+        self.samples: deque = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        def fmt(value: Optional[float]) -> Optional[float]:
+            return round(value, 3) if value is not None else None
+
+        return {
+            "count": self.count,
+            "p50": fmt(self.percentile(50)),
+            "p95": fmt(self.percentile(95)),
+            "p99": fmt(self.percentile(99)),
+        }
+
+
+class WeightedFairQueue(Generic[T]):
+    """
+    Weighted fair queue over priority classes
+
+    Each item gets a virtual finish tag of max(virtual_time, last tag of its
+    class) + 1/weight; pop() returns the head with the smallest tag. A class
+    with weight 8 is served eight times as often as a class with weight 1
+    while both are backlogged, and no class starves.
+    """
+
+    def __init__(self, classes: Dict[str, PriorityClass]):
+        self.classes = classes
+        self._queues: Dict[str, deque] = {name: deque() for name in classes}
+        self._last_tag: Dict[str, float] = {name: 0.0 for name in classes}
+        self._virtual_time = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def depth(self, priority: str) -> int:
+        return len(self._queues[priority])
+
+    def push(self, priority: str, item: T) -> None:
+        if priority not in self.classes:
+            raise ValueError(f"Unknown priority class: {priority}")
+        tag = max(self._virtual_time, self._last_tag[priority]) + 1 / self.classes[priority].weight
+        self._last_tag[priority] = tag
+        self._queues[priority].append((tag, item))
+
+    def pop(self) -> Tuple[str, T]:
+        best = None
+        for name, queue in self._queues.items():
+            if queue and (best is None or queue[0][0] < self._queues[best][0][0]):
+                best = name
+        if best is None:
+            raise IndexError("pop from an empty WeightedFairQueue")
+        tag, item = self._queues[best].popleft()
+        self._virtual_time = tag
+        return best, item
+
+    def remove(self, priority: str, item: T) -> bool:
+        """Remove a specific queued item (e.g. a cancelled waiter)"""
+        queue = self._queues[priority]
+        for entry in queue:
+            if entry[1] is item:
+                queue.remove(entry)
+                return True
+        return False
+
+    def find(self, predicate: Callable[[T], bool]) -> Optional[T]:
+        """First queued item (any class) matching predicate"""
+        for queue in self._queues.values():
+            for _, item in queue:
+                if predicate(item):
+                    return item
+        return None
+
+    def pop_newest(self, priority: str) -> T:
+        """Remove the most recently queued item of a class (load shedding)"""
+        return self._queues[priority].pop()[1]
+
+    def lowest_backlogged(self, below: Optional[str] = None) -> Optional[str]:
+        """Lowest-weight class with queued items, optionally below a class"""
+        limit = self.classes[below].weight if below is not None else math.inf
+        candidates = [
+            name for name, queue in self._queues.items()
+            if queue and self.classes[name].weight < limit
+        ]
+        return min(candidates, key=lambda n: self.classes[n].weight, default=None)
+
+
+class LLMCallScheduler:
+    """
+    Priority-aware concurrency limit for provider calls
+
+    At most max_concurrency calls are in flight; waiting calls are admitted
+    in weighted fair order by the priority of the workflow that issued them.
+    A max_concurrency of 0 disables the limit.
+    """
+
+    def __init__(self, max_concurrency: int, classes: Dict[str, PriorityClass]):
+        self.max_concurrency = max_concurrency
+        self.classes = classes
+        self.active = 0
+        self._waiting: WeightedFairQueue[asyncio.Future] = WeightedFairQueue(classes)
+        self.wait_stats = {name: WaitStats() for name in classes}
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None):
+        """Hold one provider-call slot for the duration of the block"""
+        priority = priority or current_priority.get()
+        if priority not in self.classes:
+            priority = DEFAULT_PRIORITY
+
+        start = time.monotonic()
+        if self.max_concurrency and self.active >= self.max_concurrency:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiting.push(priority, waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                removed = self._waiting.remove(priority, waiter)
+                if not removed and not waiter.cancelled():
+                    # Slot was handed over just before cancellation
+                    self._release()
+                raise
+        else:
+            self.active += 1
+
+        self.wait_stats[priority].record(time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter so it cannot be stolen
+        while len(self._waiting):
+            _, waiter = self._waiting.pop()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "classes": {
+                name: {
+                    "queued": self._waiting.depth(name),
+                    "wait_seconds": self.wait_stats[name].summary(),
+                }
+                for name in self.classes
+            },
+        }
+
+
+# Shared scheduler for all LLMClient calls in this process
+llm_scheduler = LLMCallScheduler(config.LLM_MAX_CONCURRENCY, PRIORITY_CLASSES)
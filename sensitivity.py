@@ -0,0 +1,327 @@
+"""
+Sensitivity Analysis
+Monte Carlo robustness of an option ranking: perturbs criterion weights and
+values and re-scores every sample with the ranking's own model, without any
+LLM calls
+"""
+
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import time
+
+import numpy as np
+
+from mcda import score
+
+Scorer = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+def value_matrix(
+    evaluation: List[Dict[str, Any]], criteria: List[Dict[str, Any]]
+) -> Tuple[List[str], np.ndarray]:
+    """
+    (option ids, options x criteria raw values) of a local MCDA evaluation
+
+    Values are the criterion_values the options were scored from; one
+    missing (e.g. from an older checkpoint) gets its criterion's worst
+    value, as in mcda.build_matrix.
+    """
+    entries = [e for e in evaluation if isinstance(e, dict) and e.get("option_id") is not None]
+    ids = [str(e["option_id"]) for e in entries]
+    matrix = np.array(
+        [
+            [_number((e.get("criterion_values") or {}).get(c["name"])) for c in criteria]
+            for e in entries
+        ],
+        dtype=float,
+    ).reshape(len(entries), len(criteria))
+
+    for j, criterion in enumerate(criteria):
+        column = matrix[:, j]
+        missing = np.isnan(column)
+        if missing.all():
+            column[:] = 0.0
+        elif missing.any():
+            column[missing] = np.nanmax(column) if criterion.get("direction") == "cost" else np.nanmin(column)
+    return ids, matrix
+
+
+def overall_scores(evaluation: List[Dict[str, Any]]) -> Tuple[List[str], np.ndarray]:
+    """
+    (option ids, options x 1 overall scores) of an LLM evaluation
+
+    A missing overall_score is the mean of the option's objective_scores,
+    else the mean of the other options' overall scores.
+    """
+    entries = [e for e in evaluation if isinstance(e, dict) and e.get("option_id") is not None]
+    ids = [str(e["option_id"]) for e in entries]
+    overall = np.array([_number(e.get("overall_score")) for e in entries], dtype=float)
+    for i, entry in enumerate(entries):
+        scores = entry.get("objective_scores")
+        values = [_number(v) for v in (scores.values() if isinstance(scores, dict) else [])]
+        values = [v for v in values if not np.isnan(v)]
+        if np.isnan(overall[i]) and values:
+            overall[i] = float(np.mean(values))
+    if overall.size:
+        fill = np.nanmean(overall) if not np.isnan(overall).all() else 50.0
+        overall = np.where(np.isnan(overall), fill, overall)
+    return ids, overall.reshape(-1, 1)
+
+
+def objective_matrix(evaluation: List[Dict[str, Any]]) -> Tuple[List[str], List[str], np.ndarray]:
+    """
+    (option ids, objectives, options x objectives scores) of an LLM evaluation
+
+    Objectives are those scored numerically for any option, in first-seen
+    order; a score an option lacks is its overall score (see
+    overall_scores), so it neither helps nor hurts the option.
+    """
+    entries = [e for e in evaluation if isinstance(e, dict) and e.get("option_id") is not None]
+    ids, overall = overall_scores(entries)
+    scores = [e.get("objective_scores") if isinstance(e.get("objective_scores"), dict) else {}
+              for e in entries]
+    objectives = []
+    for entry_scores in scores:
+        for name, value in entry_scores.items():
+            if name not in objectives and not np.isnan(_number(value)):
+                objectives.append(name)
+    matrix = np.array(
+        [[_number(entry_scores.get(name)) for name in objectives] for entry_scores in scores],
+        dtype=float,
+    ).reshape(len(entries), len(objectives))
+    matrix = np.where(np.isnan(matrix), overall, matrix)
+    return ids, objectives, matrix
+
+
+def fit_weights(matrix: np.ndarray, overall: np.ndarray, iterations: int = 500) -> np.ndarray:
+    """
+    Objective weights (non-negative, summing to 1) whose weighted sum best
+    orders the options like their overall scores
+
+    Least squares on centred scores (an offset does not change the order),
+    by projected gradient descent onto the simplex; equal weights when the
+    scores do not tell the objectives apart.
+    """
+    weights = np.full(matrix.shape[1], 1.0 / matrix.shape[1])
+    a = matrix - matrix.mean(axis=0)
+    b = overall - overall.mean()
+    curvature = np.linalg.norm(a, 2) ** 2
+    if curvature <= 1e-12:
+        return weights
+    for _ in range(iterations):
+        weights = _project_simplex(weights - a.T @ (a @ weights - b) / curvature)
+    return weights
+
+
+def _project_simplex(v: np.ndarray) -> np.ndarray:
+    """Euclidean projection onto {w >= 0, sum(w) = 1}"""
+    u = np.sort(v)[::-1]
+    excess = np.cumsum(u) - 1.0
+    k = np.flatnonzero(u - excess / np.arange(1, len(v) + 1) > 0)[-1]
+    return np.maximum(v - excess[k] / (k + 1), 0.0)
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _ranks(totals: np.ndarray) -> np.ndarray:
+    """1-based rank of every option in every sample (samples x options)"""
+    order = np.argsort(-totals, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, totals.shape[1] + 1), axis=1)
+    return ranks
+
+
+def flip_points(
+    matrix: np.ndarray,
+    weights: np.ndarray,
+    criteria: List[str],
+    ids: List[str],
+    scorer: Scorer,
+    steps: int = 201,
+) -> List[Dict[str, Any]]:
+    """
+    Per criterion, the nearest weight at which another option leads
+
+    The criterion's weight is moved from 0 to 1 while the others keep
+    their relative proportions, re-scoring the options at every step;
+    returns one entry per criterion that can change the leader, nearest
+    flips first.
+    """
+    leader = int(np.argmax(scorer(matrix, weights)))
+    grid = np.linspace(0.0, 1.0, steps)
+    flips = []
+    for k, name in enumerate(criteria):
+        rest = np.delete(weights, k)
+        if rest.sum() > 0:
+            rest = rest / rest.sum()
+        else:
+            rest = np.full(len(rest), 1.0 / max(len(rest), 1))
+        variants = np.empty((steps, len(weights)))
+        variants[:, k] = grid
+        variants[:, np.arange(len(weights)) != k] = np.outer(1.0 - grid, rest)
+
+        leaders = np.argmax(scorer(matrix, variants), axis=1)
+        flipped = np.flatnonzero(leaders != leader)
+        if not flipped.size:
+            continue
+        nearest = flipped[np.argmin(np.abs(grid[flipped] - weights[k]))]
+        flips.append({
+            "criterion": name,
+            "base_weight": round(float(weights[k]), 4),
+            "flip_weight": round(float(grid[nearest]), 4),
+            "new_leader": ids[int(leaders[nearest])],
+        })
+    flips.sort(key=lambda f: abs(f["flip_weight"] - f["base_weight"]))
+    return flips
+
+
+def analyze(
+    evaluation: List[Dict[str, Any]],
+    ranked: Optional[List[Dict[str, Any]]] = None,
+    criteria: Optional[List[Dict[str, Any]]] = None,
+    method: str = "topsis",
+    samples: int = 2000,
+    score_noise: float = 5.0,
+    weight_concentration: float = 50.0,
+    seed: int = 0,
+    top: int = 10,
+) -> Optional[Dict[str, Any]]:
+    """
+    How robust the top of a ranking is to weights and scores
+
+    With criteria (local MCDA scoring), every sample re-scores the
+    options' criterion values with the ranking's method: weights are
+    drawn from a Dirichlet distribution centred on the criterion weights
+    (higher weight_concentration = smaller perturbations) and each value
+    gets Gaussian noise of score_noise percent of its criterion's range.
+    Without criteria (LLM scoring) the model is a weighted sum of the
+    options' objective_scores, with the weights fitted to their
+    overall_score (fit_weights) and every score perturbed by score_noise
+    points; without objective scores it is the overall_score itself.
+
+    Args:
+        evaluation: Reasoning evaluation entries with option_id and
+            criterion_values (local) or overall_score and
+            objective_scores (LLM)
+        ranked: The ranking's ranked_recommendations; its first option is
+            the reported leader
+        criteria: Local scoring criteria (name, weight, direction)
+        method: MCDA method of the local scoring (see mcda.METHODS)
+        samples: Monte Carlo samples
+        score_noise: Score noise (percent of range, or points of 0-100)
+        weight_concentration: Dirichlet concentration around the weights
+        seed: Random seed (analysis is deterministic per input)
+        top: Options reported, most likely leaders first
+
+    Returns:
+        {"leader", "leader_probability", "options" (p_first and rank
+        interval), "flip_points", "nearest_flip", ...}, or None when there
+        are fewer than two options or nothing to perturb
+    """
+    started = time.perf_counter()
+    if criteria:
+        names = [c["name"] for c in criteria]
+        ids, matrix = value_matrix(evaluation, criteria)
+        base = np.array([max(float(c.get("weight") or 0.0), 0.0) for c in criteria])
+        benefit = np.array([c.get("direction") != "cost" for c in criteria], dtype=bool)
+        noise = score_noise / 100.0 * np.ptp(matrix, axis=0) if matrix.size else np.zeros(len(names))
+        model = method
+
+        def scorer(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+            return score(values, weights, benefit, method)
+    else:
+        ids, names, matrix = objective_matrix(evaluation)
+        if names:
+            base = fit_weights(matrix, overall_scores(evaluation)[1][:, 0])
+            model = "objective_scores"
+        else:
+            names = ["overall_score"]
+            ids, matrix = overall_scores(evaluation)
+            base = np.ones(1)
+            model = "overall_score"
+        noise = np.full(len(names), score_noise)
+
+        def scorer(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+            return np.einsum("...nm,...m->...n", values, weights)
+
+    if len(ids) < 2:
+        return None
+
+    # The ranking's own weights, so the base scores reproduce its order
+    base_totals = scorer(matrix, base)
+    if base.sum() <= 0:
+        base = np.full(len(names), 1.0)
+    base = base / base.sum()
+    position = {oid: i for i, oid in enumerate(ids)}
+    first = next(
+        (str(e.get("option_id")) for e in ranked or [] if isinstance(e, dict)
+         and str(e.get("option_id")) in position),
+        None,
+    )
+    model_leader = int(np.argmax(base_totals))
+    leader = position[first] if first is not None else model_leader
+
+    rng = np.random.default_rng(seed)
+    sampled_weights = rng.dirichlet(weight_concentration * base + 1e-3, size=samples)
+    # Values measured on a non-negative scale stay non-negative
+    floor = np.where(matrix.min(axis=0) >= 0, 0.0, -np.inf)
+
+    # Weights and values perturbed together, in chunks to bound memory
+    wins = np.zeros(len(ids))
+    ranks = np.empty((samples, len(ids)), dtype=np.int64)
+    chunk = max(1, 4_000_000 // max(matrix.size, 1))
+    for start in range(0, samples, chunk):
+        w = sampled_weights[start:start + chunk]
+        noisy = matrix + rng.normal(0.0, 1.0, size=(len(w),) + matrix.shape) * noise
+        chunk_ranks = _ranks(scorer(np.maximum(noisy, floor), w))
+        ranks[start:start + len(w)] = chunk_ranks
+        wins += (chunk_ranks == 1).sum(axis=0)
+    p_first = wins / samples
+
+    # Weights alone: the closest sampled weights that change the leader
+    weight_leaders = np.argmax(scorer(matrix, sampled_weights), axis=1)
+    flipped = np.flatnonzero(weight_leaders != model_leader)
+    nearest_flip = None
+    if flipped.size:
+        distances = np.abs(sampled_weights[flipped] - base).sum(axis=1)
+        closest = flipped[np.argmin(distances)]
+        nearest_flip = {
+            "weights": {c: round(float(w), 4) for c, w in zip(names, sampled_weights[closest])},
+            "new_leader": ids[int(weight_leaders[closest])],
+            "distance": round(float(distances.min()), 4),
+        }
+
+    base_ranks = _ranks(base_totals[None, :])[0]
+    low, median, high = np.percentile(ranks, [5, 50, 95], axis=0)
+    order = np.lexsort((median, -p_first))
+    options = [
+        {
+            "option_id": ids[i],
+            "base_rank": int(base_ranks[i]),
+            "p_first": round(float(p_first[i]), 4),
+            "rank_median": float(median[i]),
+            "rank_interval": [int(low[i]), int(high[i])],
+        }
+        for i in order[:top]
+    ]
+
+    return {
+        "model": model,
+        "samples": samples,
+        "score_noise": score_noise,
+        "weight_concentration": weight_concentration,
+        "weights": {c: round(float(w), 4) for c, w in zip(names, base)},
+        "leader": ids[leader],
+        "leader_probability": round(float(p_first[leader]), 4),
+        "model_leader": ids[model_leader],
+        "options": options,
+        "options_total": len(ids),
+        "flip_points": flip_points(matrix, base, names, ids, scorer) if len(names) > 1 else [],
+        "weight_flip_probability": round(float(flipped.size / samples), 4),
+        "nearest_flip": nearest_flip,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -0,0 +1,145 @@
+"""
+Stage Cache
+Memoizes successful stage outputs on a hash of their exact inputs, so a
+re-run with a partly changed scenario only recomputes the affected stages,
+and shares in-flight computations between concurrent identical stages
+"""
+
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import copy
+import hashlib
+import json
+import threading
+import time
+
+from config import config
+from fingerprint import normalize
+
+
+def stage_key(stage: str, *inputs: Any) -> str:
+    """SHA-256 of a stage name and its (normalized) inputs"""
+    canonical = json.dumps(
+        [stage, normalize(list(inputs))],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """
+    Process-wide LRU of stage outputs with an optional TTL
+
+    Values are deep-copied in and out so callers can annotate what they get
+    back (e.g. metadata) without touching the cached copy. get_or_compute
+    is single-flight: concurrent callers with the same key (e.g. batch items
+    sharing a data source) wait for one computation instead of repeating it.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        store_if: Callable[[Any], bool] = lambda value: True,
+    ) -> Tuple[Any, bool]:
+        """
+        Memoized value for key, computing it at most once at a time
+
+        Returns (value, reused). Values accepted by store_if are memoized;
+        others are only shared with callers that were already waiting.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached, True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                ok, value = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if task is not None and task.cancelling():
+                    raise
+                # The computing workflow was cancelled; compute here instead
+            else:
+                if not ok:
+                    raise value
+                self.shared += 1
+                return copy.deepcopy(value), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_result((False, e))
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        future.set_result((True, copy.deepcopy(value)))
+        if store_if(value):
+            self.put(key, value)
+        return value, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+        }
+
+
+stage_cache = StageCache(config.STAGE_CACHE_SIZE, config.STAGE_CACHE_TTL)
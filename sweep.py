@@ -0,0 +1,310 @@
+"""
+What-if Sweeps
+Runs one scenario over a grid of constraint, objective, decision-criteria
+and criteria-weight values and compares the outcomes side by side
+
+Usage:
+    python sweep.py scenario.json --grid grid.json
+    python sweep.py scenario.json \\
+        --param 'constraints.budget_limit=["$40M", "$50M", "$60M"]' \\
+        --param 'decision_criteria.risk_tolerance=["low", "high"]' \\
+        --param 'criteria.weights.estimated_cost=[1, 3]'
+"""
+
+from typing import Dict, Any, AsyncIterator, List, Optional
+import copy
+import itertools
+import json
+import time
+
+from stage_cache import StageCache, stage_cache
+
+# Scenario fields a sweep may vary. None of them feeds ingestion or
+# analysis, so every grid point shares those stages.
+SWEEPABLE_FIELDS = ("constraints", "objectives", "decision_criteria", "criteria", "allocation")
+
+_STAGE_COUNT = 6
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Cartesian product of a parameter grid
+
+    Args:
+        grid: Dotted scenario path -> values to try, e.g.
+            {"constraints.budget_limit": ["$40M", "$60M"]}; list elements
+            are addressed by index ("objectives.0")
+
+    Returns:
+        One {path: value} dict per grid point, the first path varying slowest
+    """
+    if not grid:
+        raise ValueError("A sweep needs at least one parameter")
+    for path, values in grid.items():
+        if path.split(".", 1)[0] not in SWEEPABLE_FIELDS:
+            raise ValueError(
+                f"Cannot sweep {path!r}: parameters must be under "
+                f"{', '.join(SWEEPABLE_FIELDS)}"
+            )
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Parameter {path!r} needs a non-empty list of values")
+
+    paths = list(grid)
+    return [dict(zip(paths, combo)) for combo in itertools.product(*grid.values())]
+
+
+def apply_point(scenario: Dict[str, Any], point: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of scenario with each dotted path of point set to its value"""
+    scenario = copy.deepcopy(scenario)
+    for path, value in point.items():
+        _set_path(scenario, path.split("."), copy.deepcopy(value))
+    return scenario
+
+
+def _set_path(target: Any, keys: List[str], value: Any) -> None:
+    for i, key in enumerate(keys):
+        last = i == len(keys) - 1
+        if isinstance(target, list):
+            try:
+                index = int(key)
+                target[index]
+            except (ValueError, IndexError):
+                raise ValueError(f"No list element {key!r} in {'.'.join(keys)}")
+            if last:
+                target[index] = value
+            else:
+                target = target[index]
+        else:
+            if last:
+                target[key] = value
+            else:
+                if target.get(key) is None:
+                    target[key] = {}
+                target = target[key]
+
+
+def point_outcome(
+    index: int, point: Dict[str, Any], results: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Compact outcome of one grid point"""
+    decision_result = results.get("stages", {}).get("decision")
+    decision = decision_result.data.get("decision", {}) if decision_result is not None else {}
+    return {
+        "index": index,
+        "workflow_id": results["workflow_id"],
+        "parameters": point,
+        "status": results["status"],
+        "error": results.get("error"),
+        "decision": decision.get("RECOMMENDED DECISION"),
+        "confidence": decision.get("CONFIDENCE LEVEL"),
+        "reused_stages": results["reused_stages"],
+        "usage": {k: results["usage"][k] for k in ("calls", "total_tokens", "cost_usd")},
+    }
+
+
+def comparison_matrix(
+    parameters: List[str], outcomes: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Table of grid points and their outcomes
+
+    Returns {"columns", "rows"} with one row per point in grid order; a
+    two-parameter sweep also gets a "pivot" of decisions, first parameter
+    down and second across.
+    """
+    outcomes = sorted(outcomes, key=lambda o: o["index"])
+    matrix = {
+        "columns": parameters + ["decision", "confidence", "status"],
+        "rows": [
+            [o["parameters"][p] for p in parameters]
+            + [o["decision"], o["confidence"], o["status"]]
+            for o in outcomes
+        ],
+    }
+
+    if len(parameters) == 2:
+        down, across = parameters
+        row_values = _distinct(o["parameters"][down] for o in outcomes)
+        column_values = _distinct(o["parameters"][across] for o in outcomes)
+        cells = [[None] * len(column_values) for _ in row_values]
+        for o in outcomes:
+            row = _position(row_values, o["parameters"][down])
+            column = _position(column_values, o["parameters"][across])
+            cells[row][column] = o["decision"] if o["status"] == "success" else o["status"]
+        matrix["pivot"] = {
+            "rows": row_values,
+            "columns": column_values,
+            "cells": cells,
+        }
+
+    return matrix
+
+
+def summarize_sweep(
+    sweep_id: str,
+    grid: Dict[str, List[Any]],
+    outcomes: List[Dict[str, Any]],
+    totals: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Summary line of a sweep: batch totals plus the comparison matrix"""
+    totals = {k: v for k, v in totals.items() if k not in ("type", "batch_id")}
+    return {
+        "type": "summary",
+        "sweep_id": sweep_id,
+        "points": len(outcomes),
+        **totals,
+        "matrix": comparison_matrix(list(grid), outcomes),
+    }
+
+
+def _distinct(values: Any) -> List[Any]:
+    seen = []
+    for value in values:
+        if value not in seen:
+            seen.append(value)
+    return seen
+
+
+def _position(values: List[Any], value: Any) -> int:
+    return next(i for i, v in enumerate(values) if v == value)
+
+
+def render_matrix(matrix: Dict[str, Any], width: int = 40) -> str:
+    """Plain-text table of a comparison matrix"""
+
+    def cell(value: Any) -> str:
+        text = value if isinstance(value, str) else json.dumps(value)
+        text = " ".join(str(text).split())
+        return text if len(text) <= width else text[: width - 1] + "…"
+
+    rows = [[cell(c) for c in matrix["columns"]]]
+    rows += [[cell(v) for v in row] for row in matrix["rows"]]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = [" | ".join(v.ljust(w) for v, w in zip(row, widths)).rstrip() for row in rows]
+    lines.insert(1, "-+-".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+async def run_sweep(
+    orchestrator: Any,
+    scenario: Dict[str, Any],
+    grid: Dict[str, List[Any]],
+    concurrency: int = 4,
+    deadline: Optional[float] = None,
+    sweep_id: Optional[str] = None,
+    **kwargs: Any,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run scenario at every grid point, yielding outcomes as they finish
+
+    Points run as one batch, so ingestion and analysis run once for the
+    whole sweep and each point only computes the stages its parameters
+    reach (reasoning for constraints, objectives and criteria weights,
+    decision for decision_criteria, and whatever follows). Stages are memoized in the shared
+    stage cache, or in a cache private to the sweep when that is disabled.
+
+    Args:
+        orchestrator: AgenticOrchestrator to run on
+        scenario: Base scenario the grid values are applied to
+        grid: Dotted path -> values (see expand_grid)
+        concurrency: Maximum grid points running at once
+        deadline: Optional per-point time limit in seconds
+        sweep_id: Prefix for point workflow ids
+        **kwargs: Passed to execute_workflow
+
+    Yields:
+        {"type": "point", ...point_outcome} per grid point in completion
+        order, then {"type": "summary", ...} with batch totals and the
+        comparison matrix
+    """
+    points = expand_grid(grid)
+    sweep_id = sweep_id or f"sweep_{int(time.time())}"
+    if kwargs.get("reuse_stages", True):
+        kwargs.setdefault(
+            "cache",
+            stage_cache if stage_cache.enabled
+            else StageCache(max_entries=len(points) * _STAGE_COUNT, ttl=0),
+        )
+
+    outcomes = []
+    batch = orchestrator.execute_batch(
+        [apply_point(scenario, point) for point in points],
+        concurrency=concurrency,
+        deadline=deadline,
+        batch_id=sweep_id,
+        **kwargs,
+    )
+    async for item in batch:
+        if item["type"] == "item":
+            outcome = point_outcome(item["index"], points[item["index"]], item["results"])
+            outcomes.append(outcome)
+            yield {"type": "point", **outcome}
+        else:
+            yield summarize_sweep(sweep_id, grid, outcomes, item)
+
+
+def _load_grid(grid_path: Optional[str], params: List[str]) -> Dict[str, List[Any]]:
+    grid = {}
+    if grid_path:
+        with open(grid_path, "r", encoding="utf-8") as f:
+            grid.update(json.load(f))
+    for param in params:
+        path, _, raw = param.partition("=")
+        try:
+            values = json.loads(raw)
+        except ValueError:
+            values = [v.strip() for v in raw.split(",")]
+        grid[path.strip()] = values if isinstance(values, list) else [values]
+    return grid
+
+
+async def _main(args: Any) -> int:
+    from orchestrator import AgenticOrchestrator
+
+    with open(args.scenario, "r", encoding="utf-8") as f:
+        scenario = json.load(f)
+    grid = _load_grid(args.grid, args.param)
+
+    summary = None
+    async for item in run_sweep(
+        AgenticOrchestrator(), scenario, grid, concurrency=args.concurrency, verbose=False
+    ):
+        if item["type"] == "point":
+            print(
+                f"[{item['index']}] {item['status']}: {item['decision']} "
+                f"({item['usage']['calls']} LLM calls)"
+            )
+        else:
+            summary = item
+
+    print()
+    print(render_matrix(summary["matrix"]))
+    print(
+        f"\n{summary['points']} points in {summary['duration_seconds']}s, "
+        f"{summary['llm_calls']} LLM calls, {summary['shared_stages']} shared stages"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, default=str)
+    return 0 if summary["statuses"].get("success") == summary["points"] else 1
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import sys
+
+    parser = argparse.ArgumentParser(description="What-if sweep over a scenario")
+    parser.add_argument("scenario", help="Scenario JSON file")
+    parser.add_argument("--grid", help="JSON file mapping dotted paths to value lists")
+    parser.add_argument("--param", action="append", default=[],
+                        help="path=JSON list (or comma-separated values); repeatable")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Grid points running at once (default 4)")
+    parser.add_argument("--output", help="Write the summary and matrix as JSON")
+    args = parser.parse_args()
+
+    try:
+        sys.exit(asyncio.run(_main(args)))
+    except ValueError as e:
+        parser.error(str(e))
@@ -0,0 +1,162 @@
+"""
+TEST: Token accounting
+Prices, per-agent and per-stage roll-ups, budgets, usage scopes, and how the
+LLM client records (and retries) calls
+
+Run with pytest: python -m pytest test_accounting.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+import accounting
+import llm_client as llm_module
+from accounting import (
+    BudgetExceededError,
+    PriceTable,
+    TokenLedger,
+    count_message_tokens,
+    ledger_context,
+    parse_prices,
+    record_usage,
+    usage_scope,
+)
+from llm_client import LLMClient
+
+
+PRICES = PriceTable(parse_prices("gpt-4:0.01/0.03,cheap:0.001"))
+
+
+def test_parse_prices():
+    assert parse_prices("gpt-4:0.01/0.03, ollama/llama3:0 ,bad") == {
+        "gpt-4": (0.01, 0.03),
+        "ollama/llama3": (0.0, 0.0),
+    }
+    # A single rate applies to prompt and completion tokens
+    assert PRICES.prices["cheap"] == (0.001, 0.001)
+    assert PRICES.cost("gpt-4", 1000, 1000) == pytest.approx(0.04)
+    assert PRICES.cost("unlisted", 1000, 1000) == 0.0
+
+
+def test_ledger_rolls_up_by_agent_and_stage():
+    ledger = TokenLedger(prices=PRICES)
+    ledger.stage = "analysis"
+    ledger.record("AnalysisAgent", "gpt-4", 1000, 500)
+    ledger.record("AnalysisAgent", "gpt-4", 1000, 500, estimated=True)
+    ledger.stage = "decision"
+    ledger.record("DecisionAgent", "gpt-4", 200, 100)
+
+    summary = ledger.summary()
+    assert summary["calls"] == 3
+    assert summary["total_tokens"] == 3300
+    assert summary["estimated_calls"] == 1
+    assert summary["by_agent"]["AnalysisAgent"]["total_tokens"] == 3000
+    assert summary["by_stage"]["decision"]["cost_usd"] == pytest.approx(0.005)
+    assert summary["budget"] == {"tokens": None, "cost_usd": None, "exceeded": False}
+
+
+def test_token_budget_refuses_calls_and_notifies_once():
+    stops = []
+    ledger = TokenLedger(token_budget=1000, prices=PRICES, on_exceeded=lambda: stops.append(1))
+
+    ledger.check("gpt-4", 600)
+    ledger.record("A", "gpt-4", 600, 300)
+    with pytest.raises(BudgetExceededError):
+        ledger.check("gpt-4", 200)
+    assert ledger.exceeded
+    # Further refusals do not notify again
+    with pytest.raises(BudgetExceededError):
+        ledger.check("gpt-4", 1)
+    assert stops == [1]
+
+
+def test_finishing_past_the_cost_budget_stops_the_workflow():
+    stops = []
+    ledger = TokenLedger(cost_budget=0.01, prices=PRICES, on_exceeded=lambda: stops.append(1))
+    ledger.check("gpt-4", 500)
+    ledger.record("A", "gpt-4", 500, 500)
+    assert ledger.exceeded and stops == [1]
+    assert ledger.summary()["budget"]["exceeded"] is True
+
+
+def test_record_usage_reaches_the_ledger_and_every_scope():
+    ledger = TokenLedger(prices=PRICES)
+    with ledger_context(ledger), usage_scope() as outer:
+        with usage_scope() as inner:
+            cost = record_usage("A", "gpt-4", 1000, 0)
+        record_usage("B", "gpt-4", 1000, 0)
+
+    assert cost == pytest.approx(0.01)
+    assert (inner.calls, outer.calls, ledger.total.calls) == (1, 2, 2)
+    # Outside a ledger the call is only priced (configured LLM_PRICES)
+    assert record_usage("A", "gpt-4-turbo-preview", 1000, 0) == accounting.PRICES.cost(
+        "gpt-4-turbo-preview", 1000, 0
+    )
+
+
+def test_message_tokens_include_framing_overhead():
+    messages = [{"role": "system", "content": ""}, {"role": "user", "content": "hi"}]
+    assert count_message_tokens(messages) >= 2 * 4 + 1
+
+
+class FakeClient(LLMClient):
+    """LLM client whose provider call is scripted"""
+
+    def __init__(self, outcomes):
+        super().__init__()
+        self.provider, self.model = "fake", "gpt-4"
+        self.outcomes = list(outcomes)
+        self.attempts = 0
+
+    async def _dispatch(self, messages, temperature, max_tokens):
+        self.attempts += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        self._record_usage(10, 5)
+        return outcome
+
+
+def chat(client, ledger=None):
+    async def main():
+        with ledger_context(ledger or TokenLedger(prices=PRICES)):
+            return await client.chat([{"role": "user", "content": "hello"}])
+
+    return asyncio.run(main())
+
+
+def test_chat_records_provider_reported_usage():
+    ledger = TokenLedger(prices=PRICES)
+    assert chat(FakeClient(["answer"]), ledger) == "answer"
+    assert (ledger.total.prompt_tokens, ledger.total.completion_tokens) == (10, 5)
+    assert ledger.total.estimated_calls == 0
+
+
+def test_transient_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(llm_module, "RETRY_BACKOFF", 0.0)
+    client = FakeClient([ConnectionError("reset"), "answer"])
+    assert chat(client) == "answer"
+    assert client.attempts == 2
+
+
+def test_accounting_failure_is_not_retried_as_a_provider_error(monkeypatch):
+    monkeypatch.setattr(llm_module, "RETRY_BACKOFF", 0.0)
+    client = FakeClient(["answer", "answer"])
+
+    def broken_account(*args):
+        # A transient-looking error: it must still not trigger a retry
+        raise ConnectionError("ledger unavailable")
+
+    monkeypatch.setattr(client, "_account", broken_account)
+    errors = llm_module.LLM_ERRORS.labels("fake", "ConnectionError")
+    before = errors.value
+    with pytest.raises(ConnectionError):
+        chat(client)
+    assert client.attempts == 1
+    assert errors.value == before
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,205 @@
+"""
+TEST: Resource allocation
+Situation-report parsing, need scores, proportional, greedy and LP
+allocation under supply, budget and capacity limits, and the prompt section
+
+Run with pytest: python -m pytest test_allocation.py
+"""
+
+import asyncio
+import sys
+
+import numpy as np
+import pytest
+
+from agents.allocation_agent import AllocationAgent
+from allocation import (
+    AllocationModel,
+    Region,
+    Resource,
+    allocate,
+    build_model,
+    format_allocation,
+    line_signals,
+    need_matrix,
+    parse_report,
+)
+
+
+REPORT = """
+EMERGENCY SITUATION REPORT
+
+Region A (Population: 2.5M):
+- 60% power outage
+- Emergency shelters: 15 operational, 5 damaged
+- Critical supplies: Water (40% stock), Medical (30% stock)
+
+Region B (Population: 1.8M):
+- 85% power outage
+- Critical supplies: Water (15% stock), Medical (20% stock)
+
+AVAILABLE RESOURCES:
+- Water trucks: 30 units
+- Power generators: 25 units (large), 50 units (portable)
+- Emergency budget: $50M immediate release
+"""
+
+INFRASTRUCTURE_REPORT = """
+INFRASTRUCTURE ASSESSMENT REPORT
+
+Transportation:
+- 35% of bridges require major repairs
+- Public transit ridership: Up 15% year-over-year
+
+Energy Grid:
+- 60% of grid infrastructure over 30 years old
+
+Telecommunications:
+- 25M citizens lack broadband access
+- 5G coverage: 60% of urban areas, 10% rural
+
+Available Budget: $300 Billion over 5 years
+"""
+
+
+def test_line_signals():
+    assert line_signals("- 60% power outage") == [("power", 0.6)]
+    assert line_signals("Critical supplies: Water (40% stock), Medical (30% stock)") == [
+        ("water", pytest.approx(0.6)), ("medical", pytest.approx(0.7)),
+    ]
+    assert line_signals("Emergency shelters: 15 operational, 5 damaged") == [("shelter", 0.25)]
+    assert line_signals("Road access: 70% of roads") == []
+
+
+def test_report_regions_resources_and_budget():
+    regions, resources, budget = parse_report(REPORT)
+    assert [(r.name, r.population) for r in regions] == [("Region A", 2.5e6), ("Region B", 1.8e6)]
+    assert regions[1].severity == {"power": 0.85, "water": 0.85, "medical": 0.8}
+    assert [(r.name, r.available) for r in resources] == [
+        ("Water trucks", 30), ("Power generators (large)", 25), ("Power generators (portable)", 50),
+    ]
+    assert budget == 50e6
+
+    need = need_matrix(AllocationModel(regions, resources, budget))
+    assert need[:, 0] == pytest.approx([2.5e6 * 0.6, 1.8e6 * 0.85])
+
+
+def test_inferred_demand_is_a_proportional_split_without_coverage():
+    model = build_model({"content": REPORT})
+    result = allocate(model)
+    assert (result["method"], result["demand"]) == ("proportional", "inferred")
+    water = {a["region"]: a["units"]["Water trucks"] for a in result["allocations"]}
+    assert water == {"Region A": 15, "Region B": 15}  # need 1.5M vs 1.53M
+    assert [r["allocated"] for r in result["resources"]] == [30, 25, 50]
+    # Demand is the supply itself: no coverage claim and nothing unmet
+    assert all("coverage" not in a for a in result["allocations"])
+    assert result["totals"] == {"allocated_units": 105}
+    assert all(r["unmet_demand"] == 0 for r in result["resources"])
+
+
+def model(needs=None, budget=None, capacity=None, cost=0.0):
+    regions = [
+        Region("North", population=100, severity={"water": 0.9}, capacity=capacity),
+        Region("South", population=100, severity={"water": 0.3}),
+    ]
+    for region, units in zip(regions, needs or []):
+        if units is not None:
+            region.needs["water trucks"] = units
+    return AllocationModel(regions, [Resource("Water trucks", 40, cost)], budget)
+
+
+def units(result):
+    return [a["units"]["Water trucks"] for a in result["allocations"]]
+
+
+def test_proportional_split_scales_down_to_the_limits():
+    assert units(allocate(model())) == [30, 10]
+    result = allocate(model(budget=200, cost=10.0))
+    assert units(result) == [15, 5]
+    assert result["budget"] == {"limit": 200, "spent": 200.0}
+    assert units(allocate(model(capacity=12))) == [12, 10]
+
+
+def test_stated_demand_shortage_goes_to_the_most_need_per_unit():
+    result = allocate(model(needs=[30, 30]), method="greedy")
+    assert result["method"] == "greedy" and result["demand"] == "stated"
+    assert units(result) == [30, 10]
+    assert [a["coverage"] for a in result["allocations"]] == [1.0, pytest.approx(1 / 3, abs=1e-4)]
+    assert result["totals"] == {"allocated_units": 40, "stated_demand_units": 60, "coverage": 0.6667}
+    assert result["resources"][0]["unmet_demand"] == 20
+
+
+def test_min_share_serves_every_region_first():
+    result = allocate(model(needs=[40, 40]), method="greedy", min_share=0.25)
+    assert units(result) == [30, 10]
+
+
+def test_mixed_demand_reports_coverage_of_stated_cells_only():
+    result = allocate(model(needs=[10, None]), method="greedy")
+    assert result["demand"] == "mixed"
+    assert units(result) == [10, 30]
+    assert result["allocations"][0]["coverage"] == 1.0
+    assert "coverage" not in result["allocations"][1]
+    assert result["totals"]["stated_demand_units"] == 10
+
+
+def test_lp_without_scipy_falls_back_to_greedy(monkeypatch):
+    monkeypatch.setitem(sys.modules, "scipy", None)
+    monkeypatch.setitem(sys.modules, "scipy.optimize", None)
+    result = allocate(model(needs=[30, 30], capacity=20), method="lp")
+    assert result["method"] == "greedy"
+    assert result["notes"] == ["LP solver needs SciPy (pip install scipy); used greedy"]
+    assert units(result) == [20, 20]
+
+
+def test_lp_respects_capacity():
+    pytest.importorskip("scipy")
+    result = allocate(model(needs=[30, 30], capacity=20), method="lp")
+    assert result["method"] == "lp"
+    assert units(result) == [20, 20]
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        allocate(model(), method="simplex")
+
+
+def test_prompt_states_units_without_coverage_claims():
+    inferred = format_allocation(allocate(build_model({"content": REPORT})))
+    assert "proportional, 2 regions; split by need scores" in inferred
+    assert "- Region B: 15 Water trucks" in inferred
+    assert "covered" not in inferred and "exact" not in inferred
+
+    stated = format_allocation(allocate(model(needs=[30, 30]), method="greedy"))
+    assert "20 of the stated demand not covered" in stated
+    assert format_allocation(None) == ""
+
+
+def test_infrastructure_scenario_has_nothing_to_allocate():
+    response = asyncio.run(AllocationAgent().execute({
+        "data": {"content": INFRASTRUCTURE_REPORT},
+        "constraints": {"budget": "$300B total, $60B per year maximum"},
+        "resources": {"budget": "$300 Billion", "implementation_period": "5 years"},
+    }))
+    assert response.status == "success"
+    assert response.data["allocation"] is None
+    assert response.metadata["regions"] == 0
+
+
+def test_allocation_agent_uses_the_scenario_spec():
+    response = asyncio.run(AllocationAgent().execute({
+        "data": {"content": REPORT},
+        "allocation": {
+            "resources": {"Water trucks": {"available": 20, "unit_cost": "$1M"}},
+            "budget": "$10M",
+            "method": "greedy",
+        },
+    }))
+    allocation = response.data["allocation"]
+    assert allocation["source"] == "facts+spec"
+    assert allocation["totals"]["allocated_units"] == 10
+    assert allocation["budget"]["spent"] == 10e6
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
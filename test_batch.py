@@ -0,0 +1,147 @@
+"""
+TEST: Batch endpoint
+Batch items queued as stored workflows under admission control, streamed
+results, and all-or-nothing rejection
+
+Run with pytest: python -m pytest test_batch.py
+"""
+
+import json
+import sys
+
+import pytest
+
+from config import config
+
+# The API server must not create workflows.db in the working directory
+config.WORKFLOW_STORE = "memory"
+config.EVENT_POLL_INTERVAL = 0.01
+
+import api_server  # noqa: E402
+from agents import AgentResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from job_queue import AdmissionDeferredError  # noqa: E402
+from llm_client import llm_client  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(llm_client, "provider", "simulated")
+    monkeypatch.setattr(llm_client, "model", "simulated")
+    monkeypatch.setattr(config, "SIMULATED_LATENCY", 0.0)
+    monkeypatch.setattr(config, "SIMULATED_LATENCY_JITTER", 0.0)
+    with TestClient(api_server.app) as client:
+        yield client
+
+
+def custom(region):
+    return {
+        "data_source": {"source_type": "text", "data": f"{region}: 40% power outage"},
+        "options": [{"option_id": "a", "name": "Generators first"}],
+    }
+
+
+def post_batch(client, body, **params):
+    response = client.post("/workflow/batch", json=body, params=params)
+    lines = [json.loads(line) for line in response.text.splitlines()] if response.is_success else []
+    return response, lines
+
+
+def test_batch_items_are_queued_as_pollable_workflows(client):
+    response, lines = post_batch(client, {
+        "base": {"scenario_type": "custom", "context": "Storm response"},
+        "scenarios": [custom("North"), custom("South"), {"scenario_type": "infrastructure"}],
+    })
+    assert response.status_code == 200
+
+    accepted, *items, summary = lines
+    assert accepted["type"] == "accepted"
+    ids = [w["workflow_id"] for w in accepted["workflows"]]
+    assert len(ids) == 3
+
+    assert sorted(item["index"] for item in items) == [0, 1, 2]
+    assert {item["workflow_id"] for item in items} == set(ids)
+    assert all(item["status"] == "success" and item["decision"] for item in items)
+    assert summary["type"] == "summary"
+    assert summary["batch_id"] == accepted["batch_id"]
+    assert summary["statuses"] == {"success": 3}
+
+    for index, workflow_id in enumerate(ids):
+        record = client.get(f"/workflow/{workflow_id}").json()
+        assert record["status"] == "completed"
+        assert record["priority"] == "batch"
+        assert record["batch_id"] == accepted["batch_id"]
+        assert record["batch_index"] == index
+
+
+def test_full_detail_includes_stage_outputs(client):
+    _, lines = post_batch(
+        client, {"scenarios": [{"scenario_type": "infrastructure"}]}, detail="full"
+    )
+    item = lines[1]
+    assert set(item["stages"]) >= {"ingestion", "analysis", "decision"}
+
+
+def test_refused_batch_queues_nothing(client, monkeypatch):
+    submitted = []
+    submit = api_server.job_queue.submit
+
+    def refuse_third(job):
+        if len(submitted) == 2:
+            raise AdmissionDeferredError("Deferred under load", retry_after=7)
+        submitted.append(job.workflow_id)
+        return submit(job)
+
+    monkeypatch.setattr(api_server.job_queue, "submit", refuse_third)
+    store = api_server.open_workflow_store()
+    before = store.count()
+    response, _ = post_batch(client, {
+        "scenarios": [{"scenario_type": "infrastructure"} for _ in range(4)],
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert len(submitted) == 2
+    assert all(store.get(wid) is None for wid in submitted)
+    assert store.count() == before
+
+
+def test_invalid_batches_are_rejected(client):
+    assert post_batch(client, {"scenarios": []})[0].status_code == 400
+    assert post_batch(
+        client, {"scenarios": [{"scenario_type": "custom"}], "priority": "urgent"}
+    )[0].status_code == 400
+    response, _ = post_batch(
+        client, {"scenarios": [{"scenario_type": "custom"}, {"timeline": ["not", "text"]}]}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"]["index"] == 1
+
+
+def test_stored_results_of_a_workflow_without_results():
+    results = api_server.stored_results({
+        "workflow_id": "w1", "status": "rejected", "error": "Shed", "total_tokens": 5,
+    })
+    assert results["status"] == "rejected"
+    assert results["error"] == "Shed"
+    assert results["stages"] == {}
+    assert results["usage"] == {"calls": 0, "total_tokens": 5, "cost_usd": 0.0}
+
+
+def test_stored_results_restore_stage_responses():
+    decision = AgentResponse(agent_name="DecisionAgent", status="success", data={"decision": {}})
+    results = api_server.stored_results({
+        "workflow_id": "w1",
+        "status": "completed",
+        "results": {
+            "status": "success",
+            "reused_stages": ["ingestion"],
+            "usage": {"calls": 6, "total_tokens": 900, "cost_usd": 0.0},
+            "stages": {"decision": decision.model_dump(), "broken": {"x": {"y": 1}}},
+        },
+    })
+    assert results["status"] == "success"
+    assert results["stages"] == {"decision": decision}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
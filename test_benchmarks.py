@@ -0,0 +1,111 @@
+"""
+TEST: Benchmark suite and simulated provider
+Regression comparison and percentiles of benchmarks/bench.py, and token
+counting of the simulated provider without a tokenizer
+
+Run with pytest: python -m pytest test_benchmarks.py
+"""
+
+import asyncio
+import sys
+import types
+
+import pytest
+
+import accounting
+from accounting import count_tokens
+from benchmarks.bench import Results, compare, percentile
+from config import config
+from llm_client import LLMClient
+
+
+class BrokenTiktoken(types.ModuleType):
+    """tiktoken whose encodings cannot be loaded (e.g. offline, no cache)"""
+
+    def __init__(self):
+        super().__init__("tiktoken")
+        self.calls = 0
+
+    def encoding_for_model(self, model):
+        self.calls += 1
+        raise KeyError(model)
+
+    def get_encoding(self, name):
+        self.calls += 1
+        raise OSError("cannot download cl100k_base")
+
+
+@pytest.fixture
+def broken_tiktoken(monkeypatch):
+    module = BrokenTiktoken()
+    monkeypatch.setitem(sys.modules, "tiktoken", module)
+    accounting._encoding.cache_clear()
+    yield module
+    accounting._encoding.cache_clear()
+
+
+def test_unloadable_encoding_falls_back_to_the_estimate(broken_tiktoken):
+    assert count_tokens("x" * 40, "llama3") == 10
+    # The failure is cached, not retried per call
+    count_tokens("x" * 40, "llama3")
+    assert broken_tiktoken.calls == 2
+
+
+def test_simulated_model_never_loads_a_tokenizer(broken_tiktoken):
+    assert count_tokens("x" * 400, "simulated") == 100
+    assert broken_tiktoken.calls == 0
+
+
+def test_simulated_provider_reports_estimated_usage(broken_tiktoken, monkeypatch):
+    monkeypatch.setattr(config, "SIMULATED_LATENCY", 0.0)
+    monkeypatch.setattr(config, "SIMULATED_LATENCY_JITTER", 0.0)
+    client = LLMClient()
+    client.provider, client.model = "simulated", "simulated"
+
+    ledger = accounting.TokenLedger(token_budget=10_000)
+
+    async def main():
+        with accounting.ledger_context(ledger):
+            return await client.chat([{"role": "user", "content": "x" * 400}])
+
+    content = asyncio.run(main())
+    assert "RECOMMENDED DECISION" in content
+    assert ledger.total.prompt_tokens == 100 + accounting.MESSAGE_OVERHEAD_TOKENS
+    assert ledger.total.completion_tokens == len(content) // 4
+    assert broken_tiktoken.calls == 0
+
+
+def test_percentile_is_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert [percentile(samples, p) for p in (50, 95, 99, 100)] == [50.0, 95.0, 99.0, 100.0]
+    assert percentile([3.0], 99) == 3.0
+
+
+def report(**values):
+    results = Results()
+    for name, (value, unit, better) in values.items():
+        results.add(name, value, unit, better)
+    results.add("skipped", None, "s")
+    return {"metrics": results.metrics}
+
+
+def test_compare_flags_only_real_regressions(capsys):
+    baseline = report(
+        latency=(1.0, "s", "lower"),
+        throughput=(100.0, "workflows/s", "higher"),
+        tiny=(0.001, "s", "lower"),
+        memory=(100.0, "MB", "lower"),
+    )
+    current = report(
+        latency=(1.3, "s", "lower"),  # 30% slower: regression
+        throughput=(90.0, "workflows/s", "higher"),  # 10% lower: within threshold
+        tiny=(0.003, "s", "lower"),  # +200% but below the noise floor
+        memory=(80.0, "MB", "lower"),  # improvement
+    )
+    assert compare(current, baseline, threshold=0.2) == ["latency"]
+    assert "REGRESSION" in capsys.readouterr().out
+    assert compare(current, baseline, threshold=0.05) == ["latency", "throughput"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,144 @@
+"""
+TEST: Workflow cancellation
+Cancellation tokens (cancel, deadline, aborting awaited work) and cancel
+requests for workflows owned by another server process
+
+Run with pytest: python -m pytest test_cancellation.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from config import config
+
+# The API server must not create workflows.db in the working directory
+config.WORKFLOW_STORE = "memory"
+config.EVENT_POLL_INTERVAL = 0.01
+
+import api_server  # noqa: E402
+from cancellation import CancellationToken, WorkflowCancelled  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from job_queue import WorkflowJob  # noqa: E402
+
+
+def test_cancel_fires_once_with_its_reason():
+    token = CancellationToken()
+    assert not token.cancelled
+    assert token.remaining() is None
+    assert token.cancel("budget_exceeded") is True
+    assert token.cancel("cancelled") is False
+    assert token.reason == "budget_exceeded"
+    with pytest.raises(WorkflowCancelled) as excinfo:
+        token.raise_if_cancelled()
+    assert excinfo.value.reason == "budget_exceeded"
+
+
+def test_zero_timeout_means_no_deadline():
+    assert CancellationToken(timeout=0).deadline is None
+    assert CancellationToken(timeout=None).remaining() is None
+
+
+def test_run_returns_the_result_when_not_cancelled():
+    async def main():
+        async def work():
+            await asyncio.sleep(0.01)
+            return 42
+
+        return await CancellationToken(timeout=5).run(work())
+
+    assert asyncio.run(main()) == 42
+
+
+def test_deadline_aborts_awaited_work():
+    async def main():
+        aborted = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                aborted.set()
+                raise
+
+        token = CancellationToken(timeout=0.05)
+        with pytest.raises(WorkflowCancelled) as excinfo:
+            await token.run(slow())
+        return excinfo.value.reason, aborted.is_set()
+
+    assert asyncio.run(main()) == ("timed_out", True)
+
+
+def test_cancel_from_another_task_aborts_run():
+    async def main():
+        token = CancellationToken()
+
+        async def cancel_soon():
+            await asyncio.sleep(0.02)
+            token.cancel()
+
+        asyncio.create_task(cancel_soon())
+        with pytest.raises(WorkflowCancelled):
+            await token.run(asyncio.sleep(10))
+        return token.reason
+
+    assert asyncio.run(main()) == "cancelled"
+
+
+def test_run_on_a_fired_token_does_not_start_the_work():
+    async def main():
+        started = []
+
+        async def work():
+            started.append(True)
+
+        token = CancellationToken()
+        token.cancel()
+        with pytest.raises(WorkflowCancelled):
+            await token.run(work())
+        return started
+
+    assert asyncio.run(main()) == []
+
+
+def test_cancel_of_a_workflow_owned_elsewhere_is_persisted():
+    store = api_server.open_workflow_store()
+    with TestClient(api_server.app) as client:
+        store.create({
+            "workflow_id": "remote",
+            "status": "running",
+            "created_at": "2026-01-01T00:00:00",
+        })
+        response = client.post("/workflow/remote/cancel")
+        assert response.status_code == 200
+        assert response.json()["status"] == "cancelling"
+        assert store.is_cancel_requested("remote")
+
+        store.update("remote", status="cancelled")
+        assert client.post("/workflow/remote/cancel").status_code == 409
+        assert client.post("/workflow/missing/cancel").status_code == 404
+
+
+def test_owning_worker_picks_up_a_persisted_cancel_request():
+    store = api_server.open_workflow_store()
+    store.create({
+        "workflow_id": "owned",
+        "status": "running",
+        "created_at": "2026-01-01T00:00:00",
+    })
+    job = WorkflowJob(workflow_id="owned", scenario={})
+
+    async def main():
+        watcher = asyncio.create_task(api_server.watch_cancel_request(job))
+        await asyncio.sleep(0.05)
+        assert not job.cancellation.cancelled
+        store.update("owned", cancel_requested=True)
+        await asyncio.wait_for(watcher, timeout=1.0)
+
+    asyncio.run(main())
+    assert job.cancellation.reason == "cancelled"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
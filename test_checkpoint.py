@@ -0,0 +1,187 @@
+"""
+TEST: Checkpoints and resume
+Stage checkpoints, resuming after the last good stage, lease-based recovery
+of workflows left behind by a stopped server, and deadlines across resumes
+
+Run with pytest: python -m pytest test_checkpoint.py
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import config
+
+# The API server must not create workflows.db in the working directory
+config.WORKFLOW_STORE = "memory"
+config.EVENT_POLL_INTERVAL = 0.01
+
+import api_server  # noqa: E402
+from agents import AgentResponse  # noqa: E402
+from checkpoint import FileCheckpointer, resumable_prefix, succeeded  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from llm_client import llm_client  # noqa: E402
+from orchestrator import STAGES, AgenticOrchestrator  # noqa: E402
+
+ORDER = [key for key, _, _ in STAGES]
+
+
+def payload(status="success"):
+    return AgentResponse(agent_name="TestAgent", status=status).model_dump()
+
+
+def test_resumable_prefix_stops_at_the_first_bad_stage():
+    stages = {
+        "ingestion": payload(),
+        "analysis": {"risk": payload(), "trend": payload()},
+        "reasoning": payload("error"),
+        "allocation": payload(),
+    }
+    assert list(resumable_prefix(stages, ORDER)) == ["ingestion", "analysis"]
+    assert list(resumable_prefix({"analysis": payload()}, ORDER)) == []
+    # Unreadable checkpoints are recomputed rather than trusted
+    assert resumable_prefix({"ingestion": {"bogus": 1}}, ORDER) == {}
+
+
+def test_succeeded_requires_every_response():
+    ok = AgentResponse(agent_name="A", status="success")
+    failed = AgentResponse(agent_name="B", status="error")
+    assert succeeded(ok) and succeeded({"a": ok})
+    assert not succeeded({"a": ok, "b": failed})
+
+
+def test_file_checkpointer_round_trips(tmp_path):
+    checkpointer = FileCheckpointer(str(tmp_path))
+    checkpointer.save("w1", "ingestion", AgentResponse(agent_name="A", status="success"))
+    checkpointer.save("w1", "analysis", {"risk": AgentResponse(agent_name="B", status="success")})
+    assert list(checkpointer.load("w1")) == ["ingestion", "analysis"]
+    assert not list(tmp_path.glob("*.tmp"))
+    checkpointer.clear("w1")
+    assert checkpointer.load("w1") == {}
+
+
+@pytest.fixture
+def simulated(monkeypatch):
+    monkeypatch.setattr(llm_client, "provider", "simulated")
+    monkeypatch.setattr(llm_client, "model", "simulated")
+    monkeypatch.setattr(config, "SIMULATED_LATENCY", 0.0)
+    monkeypatch.setattr(config, "SIMULATED_LATENCY_JITTER", 0.0)
+
+
+SCENARIO = {
+    "data_source": {"source_type": "text", "data": "Region North: 40% power outage"},
+    "context": "Storm response",
+    "objectives": ["Restore power"],
+    "options": [{"option_id": "a", "name": "Generators first"}],
+    "constraints": {},
+    "resources": {"crews": "20"},
+    "timeline": "48 hours",
+}
+
+
+def test_resume_continues_after_the_last_good_stage(simulated, tmp_path):
+    checkpointer = FileCheckpointer(str(tmp_path))
+    orchestrator = AgenticOrchestrator()
+
+    def run(resume):
+        return asyncio.run(orchestrator.execute_workflow(
+            SCENARIO, verbose=False, reuse_stages=False, workflow_id="w1",
+            checkpointer=checkpointer, resume=resume,
+        ))
+
+    assert run(resume=False)["status"] == "success"
+    assert list(checkpointer.load("w1")) == ORDER
+
+    # Pretend the decision stage failed: it and everything after it re-run
+    path = tmp_path / "w1.json"
+    stages = json.loads(path.read_text())
+    stages["decision"]["status"] = "error"
+    path.write_text(json.dumps(stages))
+
+    resumed = run(resume=True)
+    assert resumed["status"] == "success"
+    assert resumed["resumed_stages"] == ["ingestion", "analysis", "reasoning", "allocation"]
+
+
+def iso(**delta):
+    return (datetime.now() + timedelta(**delta)).isoformat()
+
+
+def test_deadline_token_keeps_the_original_deadline():
+    assert api_server.deadline_after("2026-01-01T00:00:00", 90) == "2026-01-01T00:01:30"
+    assert api_server.deadline_after("2026-01-01T00:00:00", None) is None
+
+    token = api_server.deadline_token(iso(seconds=60))
+    assert 55 < token.remaining() <= 60
+    assert api_server.deadline_token(None).remaining() is None
+
+    expired = api_server.deadline_token(iso(seconds=-1))
+    assert expired.reason == "timed_out"
+
+
+def test_startup_recovery_claims_only_expired_leases(simulated):
+    store = api_server.open_workflow_store()
+    stale = iso(minutes=-5)
+    base = {"created_at": iso(minutes=-10), "scenario": SCENARIO, "deadline_seconds": 3600}
+    # Run by a live sibling worker: left alone
+    store.create({
+        **base, "workflow_id": "sibling", "status": "running",
+        "owner": "other-worker", "lease_expires_at": iso(minutes=5),
+    })
+    # Left behind by stopped workers
+    store.create({
+        **base, "workflow_id": "orphan", "status": "running",
+        "owner": "dead-worker", "lease_expires_at": stale, "deadline_at": iso(minutes=50),
+    })
+    store.create({
+        **base, "workflow_id": "overdue", "status": "queued",
+        "owner": "dead-worker", "lease_expires_at": stale, "deadline_at": iso(seconds=-1),
+    })
+    store.create({
+        "workflow_id": "no_scenario", "status": "queued", "created_at": base["created_at"],
+        "owner": "dead-worker", "lease_expires_at": stale,
+    })
+
+    with TestClient(api_server.app):
+        deadline = time.monotonic() + 10
+        while store.get_status("orphan") != "completed" and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        assert store.get("sibling")["owner"] == "other-worker"
+        assert store.get_status("sibling") == "running"
+
+        orphan = store.get("orphan")
+        assert orphan["status"] == "completed"
+        assert orphan["owner"] == api_server.INSTANCE_ID
+        assert orphan["resume_count"] == 1
+        assert set(orphan["results"]["resumed_stages"]) <= set(ORDER)
+
+        # Its deadline passed while no server was running it
+        assert store.get_status("overdue") == "timed_out"
+        assert store.get_status("no_scenario") == "interrupted"
+
+    for workflow_id in ("sibling", "orphan", "overdue", "no_scenario"):
+        store.delete(workflow_id)
+
+
+def test_submissions_are_leased_with_an_absolute_deadline(simulated):
+    store = api_server.open_workflow_store()
+    with TestClient(api_server.app) as client:
+        response = client.post(
+            "/workflow/run",
+            json={"scenario_type": "infrastructure", "deadline_seconds": 120},
+            headers={"Cache-Control": "no-cache"},
+        )
+        record = store.get(response.json()["workflow_id"])
+
+    assert record["owner"] == api_server.INSTANCE_ID
+    assert record["lease_expires_at"] > record["created_at"]
+    assert record["deadline_at"] == api_server.deadline_after(record["created_at"], 120)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,125 @@
+"""
+TEST: Decision ensemble
+Vote keys, confidence weights, early stopping and failed samples of the
+self-consistency decision
+
+Run with pytest: python -m pytest test_decision_ensemble.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from agents.decision_agent import DecisionAgent
+from config import config
+
+
+REASONING = {
+    "reasoning": {
+        "evaluation": [
+            {"option_id": "opt_1", "option_name": "Airlift"},
+            {"option_id": "opt_12", "option_name": "Airlift and sealift"},
+        ],
+        "ranked_recommendations": [
+            {"rank": 1, "option_id": "opt_12"},
+            {"rank": 2, "option_id": "opt_1"},
+            {"rank": 3, "option_id": "opt_3"},
+        ],
+    }
+}
+
+
+def vote(text):
+    agent = DecisionAgent()
+    return agent._vote_key({"RECOMMENDED DECISION": text}, agent._option_candidates(REASONING))
+
+
+def test_votes_name_the_first_mentioned_option():
+    assert vote("Proceed with opt_12 immediately") == "opt_12"
+    assert vote("Choose opt_1, not opt_12") == "opt_1"
+    assert vote("Go with OPT_3 over opt_1") == "opt_3"
+    # Names count as their option; the longest name at a position wins
+    assert vote("Airlift and sealift, in two phases") == "opt_12"
+    assert vote("An airlift now") == "opt_1"
+
+
+def test_unknown_ids_fall_back_to_the_text():
+    # opt_7 is not an option of this reasoning
+    assert vote("Adopt opt_7!") == "adopt opt_7"
+    assert vote("  Do   nothing. ") == "do nothing"
+
+
+def test_confidence_weights():
+    weight = DecisionAgent()._confidence_weight
+    assert weight({"CONFIDENCE LEVEL": "High - strong evidence"}) == 1.0
+    assert weight({"confidence": "medium"}) == pytest.approx(2 / 3)
+    assert weight({"confidence": "Low"}) == pytest.approx(1 / 3)
+    assert weight({}) == 0.5
+
+
+class ScriptedAgent(DecisionAgent):
+    """Decision agent whose samples are scripted"""
+
+    def __init__(self, samples):
+        super().__init__()
+        self.samples = list(samples)
+        self.drawn = 0
+
+    async def _make_decision(self, analysis, reasoning, context, criteria, allocation=None):
+        self.drawn += 1
+        await asyncio.sleep(0)
+        sample = self.samples.pop(0)
+        if isinstance(sample, Exception):
+            raise sample
+        return sample
+
+
+def decide(agent):
+    return asyncio.run(agent._decide_by_ensemble({}, REASONING, "", {}))
+
+
+def sample(option, confidence="High"):
+    return {"RECOMMENDED DECISION": f"Implement {option}", "CONFIDENCE LEVEL": confidence}
+
+
+@pytest.fixture
+def ensemble(monkeypatch):
+    monkeypatch.setattr(config, "DECISION_SAMPLES", 6)
+    monkeypatch.setattr(config, "DECISION_ENSEMBLE_WAVE", 3)
+    monkeypatch.setattr(config, "DECISION_AGREEMENT", 0.75)
+
+
+def test_unanimous_wave_stops_early(ensemble):
+    agent = ScriptedAgent([sample("opt_12")] * 3 + [sample("opt_1")] * 3)
+    decision, summary = decide(agent)
+    assert agent.drawn == 3
+    assert summary["stopped_early"] and summary["waves"] == 1
+    assert (summary["winner"], summary["agreement"]) == ("opt_12", 1.0)
+    assert decision["RECOMMENDED DECISION"] == "Implement opt_12"
+
+
+def test_confident_votes_outweigh_a_hesitant_majority(ensemble):
+    low, high = sample("opt_1", "Low"), sample("opt_12", "High")
+    agent = ScriptedAgent([low, high, low, low, high, sample("opt_3", "Medium")])
+    decision, summary = decide(agent)
+    assert agent.drawn == 6 and not summary["stopped_early"]
+    assert summary["votes"] == {"opt_1": 3, "opt_12": 2, "opt_3": 1}
+    assert summary["winner"] == "opt_12"
+    assert summary["agreement"] == pytest.approx(2 / 6, abs=1e-3)
+    assert summary["weighted_agreement"] == pytest.approx(2 / (1 + 2 + 2 / 3), abs=1e-3)
+    assert [a["vote"] for a in summary["alternatives"]] == ["opt_1", "opt_3"]
+
+
+def test_failed_samples_count_against_the_budget(ensemble):
+    agent = ScriptedAgent([ValueError("bad json"), sample("opt_1"), sample("opt_1")] * 2)
+    decision, summary = decide(agent)
+    assert (summary["samples"], summary["failed_samples"]) == (2, 1)
+    assert summary["winner"] == "opt_1"
+
+    with pytest.raises(ValueError):
+        decide(ScriptedAgent([ValueError("down")] * 6))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,152 @@
+"""
+TEST: Constraint feasibility
+Quantity parsing, limits read from constraints, per-option checks, and the
+reasoning agent ruling out options that break a numeric limit
+
+Run with pytest: python -m pytest test_feasibility.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from agents.reasoning_agent import ReasoningAgent
+from config import config
+from feasibility import (
+    FEASIBLE,
+    INFEASIBLE,
+    UNKNOWN,
+    check_option,
+    check_options,
+    extract_limits,
+    split_feasible,
+)
+from quantities import CURRENCY, DURATION, NUMBER, PERCENT, parse_quantities, parse_quantity
+
+
+def test_quantities_share_a_unit_per_kind():
+    cost = parse_quantity("48 million USD")
+    assert (cost.value, cost.unit) == (parse_quantity("$48M").value, "USD")
+    cost = parse_quantity("€1.5bn")
+    assert (cost.value, cost.kind, cost.unit) == (1.5e9, CURRENCY, "EUR")
+    assert not cost.comparable(parse_quantity("$1.5bn"))
+
+    assert parse_quantity("2 weeks").value == 336
+    assert parse_quantity("90 minutes").value == 1.5
+    assert parse_quantity("90 minutes").kind == DURATION
+    assert parse_quantity("15%").kind == PERCENT
+    assert parse_quantity("1,200 units").kind == NUMBER
+    assert parse_quantity(7).value == parse_quantity(7.0).value == 7.0
+
+
+def test_only_amounts_are_quantities():
+    assert parse_quantity("none yet") is None
+    assert parse_quantity(True) is None
+    assert parse_quantity(None) is None
+    assert parse_quantity(["$5M"]) is None
+    amounts = parse_quantities("$50M immediate, $200M total within 72 hours")
+    assert [q.value for q in amounts] == [50e6, 200e6, 72]
+    assert str(amounts[0]) == "50,000,000 USD"
+
+
+def test_limits_read_direction_from_wording():
+    limits = extract_limits({
+        "budget": "$50M immediate, $200M total",
+        "response_time": "within 72 hours",
+        "coverage": "at least 80% of residents",
+        "priority_zone": "Region 3",
+        "cost_cap": {"field": "estimated_cost", "max": "$10M", "min": "$1M"},
+    })
+    described = [(l.constraint, l.describe(), l.field) for l in limits]
+    assert described == [
+        ("budget", "<= 50,000,000 USD", None),
+        ("response_time", "<= 72 hours", None),
+        ("coverage", ">= 80%", None),
+        ("cost_cap", "<= 10,000,000 USD", "estimated_cost"),
+        ("cost_cap", ">= 1,000,000 USD", "estimated_cost"),
+    ]
+    assert extract_limits(None) == []
+
+
+LIMITS = extract_limits({"budget": "$50M", "response_time": "within 3 days"})
+
+
+def test_option_checks():
+    ok = check_option({"name": "A", "cost": "$40M", "duration": "48 hours"}, LIMITS)
+    assert ok["status"] == FEASIBLE
+    assert [c["passed"] for c in ok["checks"]] == [True, True]
+
+    over = check_option({"cost": "$60M", "duration": "1 week"}, LIMITS)
+    assert over["status"] == INFEASIBLE
+    assert over["violations"] == [
+        "cost 60,000,000 USD violates budget (<= 50,000,000 USD)",
+        "duration 168 hours violates response_time (<= 72 hours)",
+    ]
+
+    # No duration field: the deadline cannot be checked
+    assert check_option({"cost": "$40M"}, LIMITS)["status"] == UNKNOWN
+    assert check_option({"cost": "$40M"}, [])["status"] == UNKNOWN
+
+
+def test_limits_apply_to_the_field_named_like_the_constraint():
+    limits = extract_limits({"capital_cost": "max $10M"})
+    result = check_option({"capital_cost": "$8M", "operating_expense": "$20M"}, limits)
+    assert [c["field"] for c in result["checks"]] == ["capital_cost"]
+    assert result["status"] == FEASIBLE
+
+
+OPTIONS = [
+    {"name": "A", "cost": "$40M"},
+    {"name": "B", "cost": "$90M"},
+    {"option_id": "c", "name": "C", "cost": "$20M"},
+]
+
+
+def test_infeasible_options_are_split_off_with_stable_ids():
+    feasibility = check_options(OPTIONS, {"budget": "$50M"})
+    assert list(feasibility["options"]) == ["opt_1", "opt_2", "c"]
+    kept, ruled_out = split_feasible(OPTIONS, feasibility)
+    assert [o["option_id"] for o in kept] == ["opt_1", "c"]
+    assert [o["option_id"] for o in ruled_out] == ["opt_2"]
+
+
+def test_nothing_is_ruled_out_when_every_option_is_infeasible():
+    feasibility = check_options(OPTIONS, {"budget": "$10M"})
+    assert split_feasible(OPTIONS, feasibility) == (OPTIONS, [])
+
+
+def test_reasoning_agent_ranks_only_feasible_options(monkeypatch):
+    monkeypatch.setattr(config, "REASONING_MODE", "local")
+    monkeypatch.setattr(config, "CONSTRAINT_PREFILTER", "summarize")
+    monkeypatch.setattr(config, "SENSITIVITY_SAMPLES", 0)
+    options = [dict(o, coverage="90%") for o in OPTIONS]
+
+    response = asyncio.run(ReasoningAgent().execute({
+        "options": options,
+        "constraints": {"budget": "$50M"},
+        "objectives": [],
+    }))
+    assert response.status == "success"
+    assert response.data["ruled_out_options"] == ["opt_2"]
+    reasoning = response.data["reasoning"]
+    assert [r["option_id"] for r in reasoning["ranked_recommendations"]] == ["c", "opt_1"]
+    by_id = {e["option_id"]: e for e in reasoning["evaluation"]}
+    assert by_id["c"]["constraint_compliance"] == {"budget": "pass"}
+    assert by_id["c"]["feasibility"] == FEASIBLE
+
+
+def test_ruled_out_summary_lists_violations(monkeypatch):
+    agent = ReasoningAgent()
+    feasibility = check_options(OPTIONS, {"budget": "$50M"})
+    _, ruled_out = split_feasible(OPTIONS, feasibility)
+
+    monkeypatch.setattr(config, "CONSTRAINT_PREFILTER", "summarize")
+    summary = agent._summarize_ruled_out(ruled_out, feasibility)
+    assert "- opt_2 (B): cost 90,000,000 USD violates budget" in summary
+    monkeypatch.setattr(config, "CONSTRAINT_PREFILTER", "exclude")
+    assert agent._summarize_ruled_out(ruled_out, feasibility) == ""
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,89 @@
+"""
+TEST: Scenario fingerprinting
+Duplicate detection key: normalization, run options and file versions
+
+Run with pytest: python -m pytest test_fingerprint.py
+"""
+
+import os
+import sys
+
+import pytest
+
+from fingerprint import normalize, scenario_fingerprint, source_versions
+
+
+SCENARIO = {
+    "data_source": {"source_type": "text", "data": "Region A: 60% outage"},
+    "objectives": ["Restore power", "Protect hospitals"],
+    "constraints": {"budget_limit": 50_000_000},
+    "timeline": "30 days",
+}
+
+
+def fingerprint(scenario=SCENARIO, **run_options):
+    return scenario_fingerprint("custom", scenario, "openai", "gpt-4", run_options)
+
+
+def test_normalize_collapses_whitespace_and_drops_none():
+    assert normalize({"b": "  a \n  b ", "a": None, "c": [" x ", None]}) == {
+        "b": "a b",
+        "c": ["x", None],
+    }
+
+
+def test_formatting_differences_share_a_fingerprint():
+    reformatted = dict(SCENARIO, data_source={
+        "data": "Region A:\n    60% outage",
+        "source_type": "text",
+    }, extra=None)
+    assert fingerprint(reformatted) == fingerprint()
+
+
+def test_content_model_and_order_change_the_fingerprint():
+    reordered = dict(SCENARIO, objectives=list(reversed(SCENARIO["objectives"])))
+    assert fingerprint(reordered) != fingerprint()
+    assert scenario_fingerprint("custom", SCENARIO, "openai", "gpt-4o") != fingerprint()
+    assert scenario_fingerprint("emergency", SCENARIO, "openai", "gpt-4") != fingerprint()
+
+
+@pytest.mark.parametrize("option, value", [
+    ("priority", "critical"),
+    ("deadline_seconds", 30.0),
+    ("token_budget", 1000),
+    ("cost_budget", 0.5),
+])
+def test_run_options_change_the_fingerprint(option, value):
+    base = {"priority": "standard", "deadline_seconds": None, "token_budget": None, "cost_budget": None}
+    assert fingerprint(**dict(base, **{option: value})) != fingerprint(**base)
+    # Unset options are the same as omitted ones
+    assert fingerprint(**base) == fingerprint(priority="standard")
+
+
+def test_edited_file_source_changes_the_fingerprint(tmp_path):
+    path = tmp_path / "report.txt"
+    path.write_text("Region A: 60% outage")
+    scenario = dict(SCENARIO, data_source={"source_type": "file", "source_path": str(path)})
+    before = fingerprint(scenario)
+    assert fingerprint(scenario) == before
+
+    path.write_text("Region A: 80% outage, Region B flooded")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert fingerprint(scenario) != before
+
+
+def test_source_versions_of_mixed_sources(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    versions = source_versions([
+        {"source_type": "file", "source_path": str(path)},
+        {"source_type": "file", "source_path": str(tmp_path / "missing.csv")},
+        {"source_type": "text", "data": "x"},
+    ])
+    assert versions == [[os.stat(path).st_mtime_ns, len("a,b\n1,2\n")], None]
+    assert source_versions(None) == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
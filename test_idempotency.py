@@ -0,0 +1,79 @@
+"""
+TEST: Idempotent submissions
+A repeated Idempotency-Key returns the original workflow, also when two
+requests with the same key race past the lookup
+
+Run with pytest: python -m pytest test_idempotency.py
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from config import config
+
+# The API server must not create workflows.db in the working directory
+config.WORKFLOW_STORE = "memory"
+config.EVENT_POLL_INTERVAL = 0.01
+
+import api_server  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from llm_client import llm_client  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(llm_client, "provider", "simulated")
+    monkeypatch.setattr(llm_client, "model", "simulated")
+    monkeypatch.setattr(config, "SIMULATED_LATENCY", 0.0)
+    monkeypatch.setattr(config, "SIMULATED_LATENCY_JITTER", 0.0)
+    with TestClient(api_server.app) as client:
+        yield client
+
+
+def submit(client, key, context="Storm response"):
+    return client.post(
+        "/workflow/run",
+        json={"scenario_type": "custom", "context": context},
+        headers={"Idempotency-Key": key, "Cache-Control": "no-cache"},
+    )
+
+
+def test_repeated_key_returns_the_original_workflow(client):
+    first = submit(client, "key-1")
+    second = submit(client, "key-1")
+    assert first.status_code == second.status_code == 200
+    assert second.json()["workflow_id"] == first.json()["workflow_id"]
+    assert second.json()["reused"] is True
+    assert submit(client, "key-1", context="Another scenario").status_code == 422
+
+
+def test_racing_submissions_with_one_key_get_one_workflow(client, monkeypatch):
+    store = api_server.open_workflow_store()
+    lookup = store.find_by_idempotency_key
+    both_looked = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def racing_lookup(key):
+        # Neither request has stored its workflow when both look the key up
+        calls.append(key)
+        result = lookup(key)
+        if len(calls) <= 2:
+            both_looked.wait()
+        return result
+
+    monkeypatch.setattr(store, "find_by_idempotency_key", racing_lookup)
+    with ThreadPoolExecutor(2) as pool:
+        responses = list(pool.map(lambda _: submit(client, "race"), range(2)))
+
+    assert [r.status_code for r in responses] == [200, 200]
+    ids = {r.json()["workflow_id"] for r in responses}
+    assert len(ids) == 1
+    assert sorted(r.json()["reused"] for r in responses) == [False, True]
+    assert len([w for w in store.list() if w.get("idempotency_key") == "race"]) == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
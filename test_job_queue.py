@@ -0,0 +1,163 @@
+"""
+TEST: Workflow job queue
+Bounded worker pool, backpressure and cancellation of queued and running jobs
+
+Run with pytest: python -m pytest test_job_queue.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from job_queue import QueueClosedError, QueueFullError, WorkflowJob, WorkflowJobQueue
+from scheduling import PriorityClass
+
+
+SINGLE_CLASS = {"standard": PriorityClass("standard", 1)}
+
+
+def make_job(workflow_id, priority="standard"):
+    return WorkflowJob(workflow_id=workflow_id, scenario={}, priority=priority)
+
+
+class Runner:
+    """Job runner that blocks until released and records its concurrency"""
+
+    def __init__(self):
+        self.started = []
+        self.active = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, job):
+        self.started.append(job.workflow_id)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            while not self.release.is_set():
+                if job.cancellation.cancelled:
+                    return
+                await asyncio.sleep(0.005)
+        finally:
+            self.active -= 1
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+def test_submit_before_start_is_rejected():
+    queue = WorkflowJobQueue(Runner(), classes=SINGLE_CLASS)
+    with pytest.raises(QueueClosedError):
+        queue.submit(make_job("w1"))
+
+
+def test_unknown_priority_is_rejected():
+    async def main():
+        queue = WorkflowJobQueue(Runner(), classes=SINGLE_CLASS)
+        await queue.start()
+        try:
+            with pytest.raises(ValueError):
+                queue.submit(make_job("w1", priority="urgent"))
+        finally:
+            await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_workers_bound_concurrency_and_run_every_job():
+    async def main():
+        runner = Runner()
+        queue = WorkflowJobQueue(runner, workers=2, max_depth=10, classes=SINGLE_CLASS)
+        await queue.start()
+        for i in range(5):
+            queue.submit(make_job(f"w{i}"))
+        await settle()
+        assert queue.running == 2
+        assert queue.depth == 3
+
+        runner.release.set()
+        for _ in range(50):
+            if len(runner.started) == 5 and queue.running == 0:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return runner, queue
+
+    runner, queue = asyncio.run(main())
+    assert runner.peak == 2
+    assert runner.started == [f"w{i}" for i in range(5)]
+    assert queue.stats()["classes"]["standard"]["queue_wait_seconds"]["count"] == 5
+
+
+def test_full_queue_rejects_with_retry_after():
+    async def main():
+        queue = WorkflowJobQueue(
+            Runner(), workers=1, max_depth=2, initial_estimate=30.0, classes=SINGLE_CLASS
+        )
+        await queue.start()
+        queue.submit(make_job("running"))
+        await settle()
+        assert queue.submit(make_job("q1")) == 0
+        assert queue.submit(make_job("q2")) == 1
+        with pytest.raises(QueueFullError) as excinfo:
+            queue.submit(make_job("q3"))
+        await queue.stop()
+        return queue, excinfo.value
+
+    queue, error = asyncio.run(main())
+    assert error.retry_after == 30
+    assert queue.stats()["classes"]["standard"]["rejected"] == 1
+
+
+def test_cancel_queued_and_running_jobs():
+    async def main():
+        runner = Runner()
+        queue = WorkflowJobQueue(runner, workers=1, max_depth=5, classes=SINGLE_CLASS)
+        await queue.start()
+        running, queued = make_job("running"), make_job("queued")
+        queue.submit(running)
+        queue.submit(queued)
+        await settle()
+
+        assert queue.cancel("queued") is queued
+        assert queued.cancellation.cancelled
+        assert queue.depth == 0
+
+        assert queue.cancel("running") is running
+        assert running.cancellation.reason == "cancelled"
+        await settle()
+        assert queue.running == 0
+        assert queue.cancel("unknown") is None
+
+        # The permit of the removed job is skipped, not run
+        await settle()
+        await queue.stop()
+        return runner
+
+    assert asyncio.run(main()).started == ["running"]
+
+
+def test_failing_runner_keeps_the_worker_alive():
+    async def main():
+        ran = []
+
+        async def runner(job):
+            ran.append(job.workflow_id)
+            raise RuntimeError("boom")
+
+        queue = WorkflowJobQueue(runner, workers=1, classes=SINGLE_CLASS)
+        await queue.start()
+        queue.submit(make_job("w1"))
+        queue.submit(make_job("w2"))
+        await settle()
+        await queue.stop()
+        return ran
+
+    assert asyncio.run(main()) == ["w1", "w2"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,132 @@
+"""
+TEST: HTTP load test
+Arrival patterns, step summaries, saturation detection and request timing
+of benchmarks/loadtest.py
+
+Run with pytest: python -m pytest test_loadtest.py
+"""
+
+import asyncio
+import random
+import sys
+
+import httpx
+import pytest
+
+from benchmarks.loadtest import (
+    Step,
+    arrival_gaps,
+    percentile,
+    saturated,
+    scenario_request,
+    timed_request,
+)
+
+
+def test_percentile_is_none_without_samples():
+    assert percentile([], 95) is None
+    assert percentile([0.3, 0.1, 0.2], 50) == 0.2
+    assert percentile([0.3, 0.1, 0.2], 0) == 0.1
+
+
+def test_constant_arrivals_match_the_rate():
+    gaps = arrival_gaps("constant", rate=4, duration=10)
+    assert len(gaps) == 40
+    assert set(gaps) == {0.25}
+    # Even a tiny rate offers at least one session
+    assert len(arrival_gaps("constant", rate=0.01, duration=1)) == 1
+
+
+def test_burst_arrivals_pause_between_bursts():
+    gaps = arrival_gaps("burst", rate=10, duration=10)
+    assert len(gaps) == 100
+    pauses = [i for i, gap in enumerate(gaps) if gap]
+    assert pauses == list(range(10, 100, 10))
+    assert {gaps[i] for i in pauses} == {1.0}
+    assert sum(gaps) == pytest.approx(9.0)
+
+
+def test_poisson_arrivals_average_the_rate():
+    random.seed(7)
+    gaps = arrival_gaps("poisson", rate=20, duration=100)
+    assert len(gaps) == 2000
+    assert all(gap >= 0 for gap in gaps)
+    assert sum(gaps) / len(gaps) == pytest.approx(1 / 20, rel=0.1)
+
+
+def test_step_summary():
+    step = Step(rate=2)
+    step.sessions, step.completed, step.rejected = 4, 3, 1
+    step.workflow_seconds = [1.0, 2.0, 3.0]
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        step.record("GET /workflow/{id}", seconds, ok=True)
+    step.record("POST /workflow/run", 0.05, ok=False)
+
+    summary = step.summary(duration=2.0)
+    assert summary["workflow_throughput"] == 1.5
+    assert summary["requests"] == 5
+    assert summary["error_rate"] == pytest.approx(0.2)
+    assert summary["workflow_seconds_p50"] == 2.0
+    assert summary["endpoints"]["GET /workflow/{id}"] == {
+        "requests": 4, "errors": 0, "p50": 0.2, "p95": 0.4, "p99": 0.4,
+    }
+    assert summary["endpoints"]["POST /workflow/run"]["errors"] == 1
+
+    empty = Step(rate=1).summary(duration=0)
+    assert (empty["workflow_throughput"], empty["error_rate"]) == (0.0, 0.0)
+    assert empty["workflow_seconds_p95"] is None
+
+
+def healthy(**overrides):
+    summary = {
+        "endpoints": {"GET /workflow/{id}": {"p95": 0.1}},
+        "error_rate": 0.0,
+        "rejected_submissions": 0,
+        "abandoned_sessions": 0,
+    }
+    summary.update(overrides)
+    return summary
+
+
+def test_saturation_reasons():
+    assert saturated(healthy(), slo=0.5) is None
+    assert saturated(healthy(endpoints={}), slo=0.5) is None
+    assert "status p95" in saturated(healthy(endpoints={"GET /workflow/{id}": {"p95": 0.8}}), 0.5)
+    assert "error rate" in saturated(healthy(error_rate=0.02), 0.5)
+    assert saturated(healthy(error_rate=0.01), 0.5) is None
+    assert "3 submissions rejected" in saturated(healthy(rejected_submissions=3), 0.5)
+    assert "not finished" in saturated(healthy(abandoned_sessions=1), 0.5)
+
+
+def test_scenario_requests_are_unique_or_reusable_presets():
+    random.seed(1)
+    unique = [scenario_request(0.0) for _ in range(20)]
+    assert {r["scenario_type"] for r in unique} == {"custom"}
+    assert len({r["data_source"]["data"] for r in unique}) == 20
+    presets = {scenario_request(1.0)["scenario_type"] for _ in range(20)}
+    assert presets <= {"emergency", "infrastructure"}
+
+
+def test_admission_rejections_are_not_errors():
+    statuses = {"/ok": 200, "/full": 429, "/draining": 503, "/broken": 500}
+
+    def handler(request):
+        if request.url.path == "/down":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(statuses[request.url.path])
+
+    async def main():
+        step = Step(rate=1)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            for path in ("/ok", "/full", "/draining", "/broken", "/down"):
+                response = await timed_request(client, step, path, "GET", f"http://test{path}")
+                assert (response is None) == (path == "/down")
+        return step
+
+    step = asyncio.run(main())
+    assert step.errors == {"/broken": 1, "/down": 1}
+    assert sum(step.requests.values()) == 5
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
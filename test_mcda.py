@@ -0,0 +1,165 @@
+"""
+TEST: Multi-criteria decision analysis
+Weighted sum, TOPSIS and AHP scoring, AHP weights and consistency, and
+ranking options from a criteria spec
+
+Run with pytest: python -m pytest test_mcda.py
+"""
+
+import sys
+
+import numpy as np
+import pytest
+
+from mcda import (
+    Criterion,
+    ahp,
+    ahp_weights,
+    build_matrix,
+    criterion_value,
+    infer_criteria,
+    normalize_minmax,
+    rank_options,
+    topsis,
+    weighted_sum,
+)
+
+
+# Three options x (benefit, cost) criteria
+MATRIX = np.array([[10.0, 5.0], [30.0, 15.0], [20.0, 5.0]])
+BENEFIT = np.array([True, False])
+WEIGHTS = np.array([0.5, 0.5])
+
+
+def test_minmax_scales_best_to_one():
+    scaled = normalize_minmax(MATRIX, BENEFIT)
+    assert scaled.tolist() == [[0.0, 1.0], [1.0, 0.0], [0.5, 1.0]]
+    # A constant column does not separate options
+    assert normalize_minmax(np.array([[3.0], [3.0]]), np.array([True])).tolist() == [[1.0], [1.0]]
+
+
+def test_weighted_sum():
+    assert weighted_sum(MATRIX, WEIGHTS, BENEFIT).tolist() == [0.5, 0.5, 0.75]
+    cost_heavy = weighted_sum(MATRIX, np.array([0.2, 0.8]), BENEFIT)
+    assert cost_heavy == pytest.approx([0.8, 0.2, 0.9])
+
+
+def test_topsis_closeness():
+    scores = topsis(MATRIX, WEIGHTS, BENEFIT)
+    assert all(0.0 <= s <= 1.0 for s in scores)
+    assert int(np.argmax(scores)) == 2
+    # An option at the ideal on every criterion scores 1, at the anti-ideal 0
+    dominance = np.array([[1.0, 1.0], [2.0, 0.5]])
+    assert topsis(dominance, WEIGHTS, BENEFIT).tolist() == pytest.approx([0.0, 1.0])
+    # Identical options: closeness undefined, reported as 0.5
+    assert topsis(np.ones((2, 2)), WEIGHTS, BENEFIT).tolist() == [0.5, 0.5]
+
+
+def test_ahp_synthesis_rescales_best_to_one():
+    scores = ahp(MATRIX, WEIGHTS, BENEFIT)
+    assert scores.max() == pytest.approx(1.0)
+    assert int(np.argmax(scores)) == 2
+    # Priorities: benefit 10/60, 30/60, 20/60; cost reciprocals 1/5, 1/15, 1/5 over 7/15
+    raw = 0.5 * np.array([1 / 6, 1 / 2, 1 / 3]) + 0.5 * np.array([3 / 7, 1 / 7, 3 / 7])
+    assert scores == pytest.approx(raw / raw.max())
+
+
+def test_ahp_weights_of_a_consistent_matrix():
+    weights, ratio = ahp_weights([[1, 2, 4], [1 / 2, 1, 2], [1 / 4, 1 / 2, 1]])
+    assert weights == pytest.approx([4 / 7, 2 / 7, 1 / 7])
+    assert ratio == pytest.approx(0.0, abs=1e-9)
+
+    weights, ratio = ahp_weights([[1, 3], [1 / 3, 1]])
+    assert weights == pytest.approx([0.75, 0.25])
+    assert ratio == 0.0
+
+
+def test_ahp_flags_contradictory_judgments():
+    # A > B > C > A
+    _, ratio = ahp_weights([[1, 9, 1 / 9], [1 / 9, 1, 9], [9, 1 / 9, 1]])
+    assert ratio > 0.1
+    with pytest.raises(ValueError):
+        ahp_weights([[1, 2, 3], [1, 1, 1]])
+    with pytest.raises(ValueError):
+        ahp_weights([[1, 0], [0, 1]])
+
+
+def test_criterion_values_are_parsed_quantities():
+    option = {"duration": "2 days", "criteria": {"cost": "$45M"}}
+    assert criterion_value(option, "duration") == 48
+    assert criterion_value({"duration": "12 hours"}, "duration") == 12
+    assert criterion_value(option, "cost") == 45_000_000
+    assert criterion_value(option, "missing") is None
+
+
+def test_missing_values_get_the_worst_value():
+    options = [{"cost": 10, "coverage": 80}, {"coverage": 60}, {"cost": 30}]
+    criteria = [Criterion("cost", direction="cost"), Criterion("coverage")]
+    assert build_matrix(options, criteria).tolist() == [[10, 80], [30, 60], [30, 60]]
+
+
+def test_inferred_criteria_and_directions():
+    options = [
+        {"option_id": "a", "name": "A", "cost": "$5M", "coverage": "80%", "notes": "fast"},
+        {"option_id": "b", "criteria": {"response_time": "4 hours"}},
+    ]
+    criteria = infer_criteria(options)
+    assert [(c.name, c.direction) for c in criteria] == [
+        ("cost", "cost"), ("coverage", "benefit"), ("response_time", "cost"),
+    ]
+
+
+OPTIONS = [
+    {"option_id": "cheap", "cost": 10, "coverage": 40},
+    {"option_id": "broad", "cost": 30, "coverage": 90},
+    {"option_id": "balanced", "cost": 15, "coverage": 75},
+]
+
+
+@pytest.mark.parametrize("method", ["weighted_sum", "topsis", "ahp"])
+def test_rank_options_follows_the_weights(method):
+    cost_first = rank_options(OPTIONS, {"weights": {"cost": 5, "coverage": 1}}, method)
+    coverage_first = rank_options(OPTIONS, {"weights": {"cost": 1, "coverage": 5}}, method)
+    assert cost_first["ranked_recommendations"][0]["option_id"] == "cheap"
+    assert coverage_first["ranked_recommendations"][0]["option_id"] == "broad"
+
+    ranked = cost_first["ranked_recommendations"]
+    assert [r["rank"] for r in ranked] == [1, 2, 3]
+    scores = [r["overall_score"] for r in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert cost_first["method"] == method
+    assert cost_first["criteria"][0] == {"name": "cost", "weight": pytest.approx(5 / 6), "direction": "cost"}
+    assert cost_first["evaluation"][1]["criterion_values"] == {"cost": 30.0, "coverage": 90.0}
+
+
+def test_rank_options_spec():
+    result = rank_options(OPTIONS, {
+        "method": "weighted_sum",
+        "directions": {"cost": "benefit"},
+        "weights": {"cost": 1},
+    })
+    assert result["method"] == "weighted_sum"
+    assert result["ranked_recommendations"][0]["option_id"] == "broad"
+    by_id = {e["option_id"]: e for e in result["evaluation"]}
+    assert by_id["balanced"]["objective_scores"] == {"cost": 25.0}
+
+    pairwise = rank_options(OPTIONS, {
+        "pairwise": {"criteria": ["coverage", "cost"], "matrix": [[1, 3], [1 / 3, 1]]},
+    })
+    assert [c["weight"] for c in pairwise["criteria"]] == pytest.approx([0.75, 0.25])
+    assert pairwise["consistency_ratio"] == 0.0
+
+    with pytest.raises(ValueError):
+        rank_options(OPTIONS, {"pairwise": {"criteria": ["cost"], "matrix": [[1, 3], [1 / 3, 1]]}})
+    with pytest.raises(ValueError):
+        rank_options(OPTIONS, method="electre")
+
+
+def test_unmeasurable_options_tie_in_given_order():
+    result = rank_options([{"option_id": "x", "name": "X"}, {"option_id": "y"}])
+    assert [r["option_id"] for r in result["ranked_recommendations"]] == ["x", "y"]
+    assert {r["overall_score"] for r in result["ranked_recommendations"]} == {50.0}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,76 @@
+"""
+TEST: Prometheus metrics
+Counters, gauges and histograms, text exposition and LLM call labelling
+
+Run with pytest: python -m pytest test_metrics.py
+"""
+
+import sys
+
+import pytest
+
+from metrics import Registry, call_context, current_agent, current_operation
+
+
+def test_counter_and_gauge_render_per_label_set():
+    registry = Registry()
+    counter = registry.counter("jobs_total", "Jobs done", ["status"])
+    gauge = registry.gauge("queue_depth", "Waiting jobs")
+
+    counter.labels("ok").inc()
+    counter.labels(status="ok").inc(2)
+    counter.labels("failed").inc()
+    gauge.set(5)
+    gauge.labels().dec(2)
+
+    assert registry.render() == (
+        "# HELP jobs_total Jobs done\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{status="failed"} 1\n'
+        'jobs_total{status="ok"} 3\n'
+        "# HELP queue_depth Waiting jobs\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 3\n"
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=(1, 5))
+    for value in (0.5, 1.0, 2.0, 10.0):
+        histogram.labels("analysis").observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{stage="analysis",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="analysis",le="5"} 3' in lines
+    assert 'latency_seconds_bucket{stage="analysis",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{stage="analysis"} 13.5' in lines
+    assert 'latency_seconds_count{stage="analysis"} 4' in lines
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.counter("errors_total", "Errors", ["error"]).labels('a "b"\\\n').inc()
+    assert 'errors_total{error="a \\"b\\"\\\\\\n"} 1' in registry.render()
+
+
+def test_wrong_label_count_and_duplicate_names_are_rejected():
+    registry = Registry()
+    counter = registry.counter("jobs_total", "Jobs", ["status"])
+    with pytest.raises(ValueError):
+        counter.labels("ok", "extra")
+    with pytest.raises(ValueError):
+        registry.gauge("jobs_total", "Again")
+
+
+def test_call_context_labels_and_restores():
+    assert current_agent.get() == "none"
+    with call_context(agent="AnalysisAgent", operation="risk"):
+        with call_context(operation="trend"):
+            assert (current_agent.get(), current_operation.get()) == ("AnalysisAgent", "trend")
+        assert current_operation.get() == "risk"
+    assert (current_agent.get(), current_operation.get()) == ("none", "none")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
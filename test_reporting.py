@@ -0,0 +1,132 @@
+"""
+TEST: Workflow reporters
+Event payloads, fan-out to several reporters, and stage progress as
+reported by the orchestrator's StageEvents
+
+Run with pytest: python -m pytest test_reporting.py
+"""
+
+import sys
+
+import pytest
+
+from agents import AgentResponse
+from orchestrator import STAGES, StageEvents
+from reporting import (
+    CompositeReporter,
+    EventReporter,
+    NullReporter,
+    WorkflowReporter,
+    combine_reporters,
+)
+
+
+class RecordingReporter(WorkflowReporter):
+    """Keeps every notification as (method, args)"""
+
+    def __init__(self):
+        self.calls = []
+
+    def stage_started(self, *args):
+        self.calls.append(("stage_started", args))
+
+    def step_started(self, *args):
+        self.calls.append(("step_started", args))
+
+    def analysis_completed(self, *args):
+        self.calls.append(("analysis_completed", args))
+
+    def stage_finished(self, *args):
+        self.calls.append(("stage_finished", args))
+
+
+def response(status="success"):
+    return AgentResponse(agent_name="TestAgent", status=status)
+
+
+def test_event_reporter_payloads():
+    events = []
+    reporter = EventReporter(lambda event_type, data: events.append((event_type, data)))
+    result = response()
+
+    reporter.workflow_started("w1")
+    reporter.step_started("Calling the LLM")
+    reporter.stage_started("analysis", "Analysis", 2, 6, 13)
+    reporter.analysis_completed("risk", result, 0.12345, 25)
+    reporter.stage_finished("analysis", "Analysis", "success", 1.5, 63, {"risk": result})
+    reporter.workflow_finished({})
+
+    assert [event_type for event_type, _ in events] == [
+        "stage_started", "analysis_completed", "stage_finished",
+    ]
+    assert events[0][1] == {
+        "stage": "analysis", "label": "Analysis", "index": 2, "total_stages": 6, "progress": 13,
+    }
+    assert events[1][1]["status"] == "success"
+    assert events[1][1]["duration_ms"] == 123.5
+    assert events[2][1]["duration_ms"] == 1500.0
+    assert events[2][1]["result"] == {"risk": result}
+
+
+def test_combine_reporters():
+    assert isinstance(combine_reporters(), NullReporter)
+    assert isinstance(combine_reporters(None, None), NullReporter)
+    only = RecordingReporter()
+    assert combine_reporters(None, only) is only
+
+    first, second = RecordingReporter(), RecordingReporter()
+    combined = combine_reporters(first, None, second)
+    assert isinstance(combined, CompositeReporter)
+    assert combined.reporters == [first, second]
+
+
+def test_composite_forwards_in_order():
+    order = []
+
+    class Named(WorkflowReporter):
+        def __init__(self, name):
+            self.name = name
+
+        def step_started(self, description):
+            order.append((self.name, description))
+
+    CompositeReporter([Named("console"), Named("events")]).step_started("ingest")
+    assert order == [("console", "ingest"), ("events", "ingest")]
+
+
+def test_stage_events_report_weighted_progress():
+    reporter = RecordingReporter()
+    events = StageEvents(reporter)
+    total = sum(weight for _, _, weight in STAGES)
+
+    events.stage_started("ingestion")
+    events.stage_finished("ingestion", response())
+    events.stage_started("analysis")
+    events.analysis_completed("risk", response(), 0.1)
+    events.analysis_completed("trend", response(), 0.1)
+
+    assert events.progress == round(100 * 3 / total)
+    # Finishing a stage recomputes progress from the stage weights
+    events.stage_finished("analysis", {"risk": response(), "trend": response("error")})
+    assert events.progress == round(100 * 5 / total)
+
+    method, args = reporter.calls[-1]
+    assert method == "stage_finished"
+    assert args[:3] == ("analysis", "Analysis", "error")
+    assert [m for m, _ in reporter.calls] == [
+        "stage_started", "stage_finished", "stage_started",
+        "analysis_completed", "analysis_completed", "stage_finished",
+    ]
+    assert reporter.calls[0][1] == ("ingestion", "Data Ingestion", 1, len(STAGES), 0)
+
+
+def test_headless_stage_events_use_the_null_reporter():
+    events = StageEvents()
+    assert isinstance(events.reporter, NullReporter)
+    events.stage_started("ingestion")
+    events.stage_finished("ingestion", response())
+    assert events.current_stage is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
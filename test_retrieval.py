@@ -0,0 +1,80 @@
+"""
+TEST: BM25 retrieval index
+Chunking, ranking and budgeted chunk selection for per-analysis context
+
+Run with pytest: python -m pytest test_retrieval.py
+"""
+
+import sys
+
+import pytest
+
+from retrieval import BM25Index, chunk_text, content_to_text, estimate_tokens, tokenize
+
+
+REPORT = """
+Region A: 60% power outage, hospitals at capacity
+Region B: water supply at 15% stock, roads flooded
+Region C: minor damage, shelters operational
+AVAILABLE RESOURCES: 30 water trucks, 25 generators
+"""
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The Water and THE Power of 2") == ["water", "power", "2"]
+
+
+def test_chunk_text_respects_token_size():
+    text = "\n".join(f"line {i} " + "word " * 10 for i in range(40))
+    chunks = chunk_text(text, chunk_tokens=20)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 20 * 4 for chunk in chunks)
+    # Nothing is lost
+    assert sum(chunk.count("line") for chunk in chunks) == 40
+
+
+def test_chunk_text_splits_overlong_lines_on_words():
+    chunks = chunk_text("word " * 200, chunk_tokens=10)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 40 for chunk in chunks)
+
+
+def test_content_to_text_keeps_records_on_one_line_each():
+    text = content_to_text([{"region": "A"}, {"region": "B"}])
+    assert text.splitlines() == ['{"region": "A"}', '{"region": "B"}']
+
+
+def test_search_ranks_matching_chunk_first():
+    index = BM25Index(REPORT.strip().splitlines())
+    top_id, _ = index.search("water stock", k=1)[0]
+    assert "Region B" in index.chunks[top_id]
+
+
+def test_search_unknown_terms_and_empty_index():
+    assert BM25Index(["alpha beta"]).search("gamma") == []
+    assert BM25Index([]).search("anything") == []
+
+
+def test_select_fits_budget_and_keeps_document_order():
+    index = BM25Index(REPORT.strip().splitlines())
+    chunks = index.select("water generators outage", token_budget=40, k=4)
+    assert chunks
+    assert sum(estimate_tokens(c) for c in chunks) <= 40
+    positions = [index.chunks.index(c) for c in chunks]
+    assert positions == sorted(positions)
+
+
+def test_select_falls_back_to_leading_chunks():
+    index = BM25Index(["first chunk", "second chunk", "third chunk"])
+    assert index.select("nothing matches", token_budget=100, k=2) == ["first chunk", "second chunk"]
+
+
+def test_from_content_and_stats():
+    index = BM25Index.from_content(REPORT, chunk_tokens=10)
+    stats = index.stats()
+    assert stats["chunks"] == len(index) > 1
+    assert stats["terms"] > 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,217 @@
+"""
+TEST: Priority scheduling
+Weighted fair queuing, admission control across classes and the
+priority-aware LLM call scheduler
+
+Run with pytest: python -m pytest test_scheduling.py
+"""
+
+import asyncio
+import sys
+from collections import Counter
+
+import pytest
+
+from job_queue import AdmissionDeferredError, QueueFullError, WorkflowJob, WorkflowJobQueue
+from scheduling import (
+    LLMCallScheduler,
+    PriorityClass,
+    WaitStats,
+    WeightedFairQueue,
+    parse_mapping,
+    parse_priority_classes,
+    priority_context,
+    current_priority,
+)
+
+
+CLASSES = parse_priority_classes("critical:8,standard:3,batch:1")
+
+
+def test_parse_priority_classes_and_mapping():
+    assert CLASSES["critical"] == PriorityClass("critical", 8.0)
+    assert parse_priority_classes("only")["only"].weight == 1.0
+    with pytest.raises(ValueError):
+        parse_priority_classes(" , ")
+    assert parse_mapping("emergency:critical, bad ,x:") == {"emergency": "critical"}
+
+
+def test_wfq_serves_backlogged_classes_by_weight():
+    queue = WeightedFairQueue(CLASSES)
+    for i in range(100):
+        for name in CLASSES:
+            queue.push(name, f"{name}{i}")
+
+    served = Counter(queue.pop()[0] for _ in range(60))
+    # 8 : 3 : 1 shares while every class stays backlogged
+    assert served == {"critical": 40, "standard": 15, "batch": 5}
+
+
+def test_wfq_is_fifo_within_a_class_and_does_not_starve():
+    queue = WeightedFairQueue(CLASSES)
+    queue.push("batch", "b1")
+    for i in range(20):
+        queue.push("critical", f"c{i}")
+
+    order = [queue.pop()[1] for _ in range(21)]
+    assert [item for item in order if item.startswith("c")] == [f"c{i}" for i in range(20)]
+    # The batch item was queued first and is served within its fair share
+    assert order.index("b1") <= 8
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_wfq_idle_class_does_not_bank_credit():
+    queue = WeightedFairQueue(CLASSES)
+    for i in range(10):
+        queue.push("critical", i)
+    for _ in range(10):
+        queue.pop()
+
+    # Batch arriving after a long critical burst starts at the current
+    # virtual time: it gets one turn per eight critical ones instead of
+    # jumping ahead of the critical work queued with it
+    queue.push("batch", "b")
+    for i in range(8):
+        queue.push("critical", f"c{i}")
+    order = [queue.pop()[1] for _ in range(9)]
+    assert order.index("b") == 8
+
+
+def test_wfq_find_remove_and_shedding_helpers():
+    queue = WeightedFairQueue(CLASSES)
+    queue.push("standard", "s1")
+    queue.push("batch", "b1")
+    queue.push("batch", "b2")
+
+    assert queue.lowest_backlogged() == "batch"
+    assert queue.lowest_backlogged(below="batch") is None
+    assert queue.pop_newest("batch") == "b2"
+    assert queue.find(lambda item: item.startswith("s")) == "s1"
+    assert queue.remove("standard", "s1") is True
+    assert queue.remove("standard", "s1") is False
+    assert len(queue) == 1
+
+
+def test_wait_stats_percentiles():
+    stats = WaitStats(window=100)
+    for i in range(1, 101):
+        stats.record(i / 100)
+    summary = stats.summary()
+    assert summary["count"] == 100
+    assert (summary["p50"], summary["p95"], summary["p99"]) == (0.5, 0.95, 0.99)
+    assert WaitStats().summary()["p50"] is None
+
+
+def make_job(workflow_id, priority):
+    return WorkflowJob(workflow_id=workflow_id, scenario={}, priority=priority)
+
+
+async def idle_runner(job):
+    await asyncio.sleep(10)
+
+
+def test_full_queue_sheds_newest_lower_priority_job():
+    async def main():
+        shed = []
+        queue = WorkflowJobQueue(
+            idle_runner, workers=1, max_depth=3, classes=CLASSES,
+            shed_threshold=1.0, on_shed=shed.append,
+        )
+        await queue.start()
+        queue.submit(make_job("running", "critical"))
+        await asyncio.sleep(0.01)
+        for workflow_id in ("b1", "b2", "s1"):
+            queue.submit(make_job(workflow_id, "batch" if workflow_id[0] == "b" else "standard"))
+
+        queue.submit(make_job("c1", "critical"))
+        # Nothing below critical is left to shed for the next standard job
+        queue.submit(make_job("c2", "critical"))
+        with pytest.raises(QueueFullError):
+            queue.submit(make_job("s2", "standard"))
+        await queue.stop()
+        return shed, queue.stats()["classes"]
+
+    shed, classes = asyncio.run(main())
+    assert [job.workflow_id for job in shed] == ["b2", "b1"]
+    assert classes["batch"]["shed"] == 2
+    assert classes["standard"]["rejected"] == 1
+
+
+def test_lowest_class_is_deferred_above_the_threshold():
+    async def main():
+        queue = WorkflowJobQueue(
+            idle_runner, workers=1, max_depth=4, classes=CLASSES, shed_threshold=0.5
+        )
+        await queue.start()
+        queue.submit(make_job("running", "standard"))
+        await asyncio.sleep(0.01)
+        queue.submit(make_job("s1", "standard"))
+        queue.submit(make_job("s2", "standard"))
+        with pytest.raises(AdmissionDeferredError):
+            queue.submit(make_job("b1", "batch"))
+        # Higher classes are still admitted
+        queue.submit(make_job("s3", "standard"))
+        await queue.stop()
+        return queue.stats()["classes"]["batch"]
+
+    assert asyncio.run(main())["deferred"] == 1
+
+
+def test_llm_scheduler_admits_waiters_by_priority():
+    async def main():
+        scheduler = LLMCallScheduler(1, CLASSES)
+        order = []
+
+        async def call(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        holder = asyncio.create_task(call("first", "batch"))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(call("batch", "batch")),
+            asyncio.create_task(call("critical", "critical")),
+        ]
+        await asyncio.gather(holder, *waiters)
+        return order, scheduler
+
+    order, scheduler = asyncio.run(main())
+    assert order == ["first", "critical", "batch"]
+    assert scheduler.active == 0
+
+
+def test_llm_scheduler_cancelled_waiter_frees_nothing():
+    async def main():
+        scheduler = LLMCallScheduler(1, CLASSES)
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot("standard"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        release.set()
+        await holder
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert scheduler.active == 0
+    assert scheduler.stats()["classes"]["standard"]["queued"] == 0
+
+
+def test_priority_context_sets_the_default_for_llm_calls():
+    with priority_context("critical"):
+        assert current_priority.get() == "critical"
+    assert current_priority.get() != "critical"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
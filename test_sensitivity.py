@@ -0,0 +1,194 @@
+"""
+TEST: Ranking sensitivity
+Monte Carlo robustness re-scored with the ranking's own MCDA method, the
+objective-score model of LLM rankings, and flip points
+
+Run with pytest: python -m pytest test_sensitivity.py
+"""
+
+import sys
+
+import numpy as np
+import pytest
+
+from agents.decision_agent import DecisionAgent
+from mcda import METHODS, rank_options, score
+from sensitivity import analyze, fit_weights, objective_matrix, overall_scores, value_matrix
+
+
+def random_options(rng, count):
+    return [
+        {
+            "option_id": f"o{i}",
+            "cost": float(rng.uniform(1, 100)),
+            "coverage": float(rng.uniform(1, 100)),
+            "speed": float(rng.uniform(1, 100)),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_leader_is_the_rankings_first_option(method):
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        spec = {"weights": {c: float(rng.uniform(0.1, 1)) for c in ("cost", "coverage", "speed")}}
+        ranking = rank_options(random_options(rng, int(rng.integers(2, 8))), spec, method)
+        result = analyze(
+            ranking["evaluation"], ranking["ranked_recommendations"],
+            criteria=ranking["criteria"], method=method, samples=50,
+        )
+        first = ranking["ranked_recommendations"][0]["option_id"]
+        assert result["model"] == method
+        # Re-scoring reproduces the ranking, not just its reported leader
+        assert result["model_leader"] == result["leader"] == first
+        base_ranks = {o["option_id"]: o["base_rank"] for o in result["options"]}
+        assert base_ranks == {r["option_id"]: r["rank"] for r in ranking["ranked_recommendations"]}
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_batched_scores_match_single_scores(method):
+    rng = np.random.default_rng(3)
+    matrix = rng.uniform(1, 100, size=(4, 5, 3))
+    weights = rng.dirichlet(np.ones(3), size=4)
+    benefit = np.array([True, False, True])
+    batched = score(matrix, weights, benefit, method)
+    assert batched.shape == (4, 5)
+    for k in range(4):
+        assert batched[k] == pytest.approx(score(matrix[k], weights[k], benefit, method))
+    with pytest.raises(ValueError):
+        score(matrix, weights, benefit, "electre")
+
+
+def test_dominant_option_is_robust_and_close_calls_are_not():
+    options = [
+        {"option_id": "strong", "cost": 10, "coverage": 95},
+        {"option_id": "weak", "cost": 90, "coverage": 20},
+        {"option_id": "close", "cost": 11, "coverage": 94},
+    ]
+    ranking = rank_options(options, {"weights": {"cost": 1, "coverage": 1}}, "weighted_sum")
+    result = analyze(ranking["evaluation"], ranking["ranked_recommendations"],
+                     criteria=ranking["criteria"], method="weighted_sum", samples=500)
+    p_first = {o["option_id"]: o["p_first"] for o in result["options"]}
+    assert p_first["weak"] == 0.0
+    assert 0.05 < p_first["close"] < 0.95
+    assert result["leader_probability"] == p_first[result["leader"]]
+    assert sum(p_first.values()) == pytest.approx(1.0)
+    # Deterministic per input
+    again = analyze(ranking["evaluation"], ranking["ranked_recommendations"],
+                    criteria=ranking["criteria"], method="weighted_sum", samples=500)
+    assert again["options"] == result["options"]
+
+
+def test_flip_points_find_the_weight_that_changes_the_leader():
+    options = [
+        {"option_id": "cheap", "cost": 10, "coverage": 40},
+        {"option_id": "broad", "cost": 30, "coverage": 90},
+    ]
+    ranking = rank_options(options, {"weights": {"cost": 3, "coverage": 1}}, "weighted_sum")
+    result = analyze(ranking["evaluation"], ranking["ranked_recommendations"],
+                     criteria=ranking["criteria"], method="weighted_sum", samples=200)
+    assert result["leader"] == "cheap"
+    by_criterion = {f["criterion"]: f for f in result["flip_points"]}
+    # Min-max scores are 1/0 per criterion: the lead changes just past equal weights
+    assert by_criterion["cost"]["base_weight"] == 0.75
+    assert by_criterion["cost"]["flip_weight"] == pytest.approx(0.495)
+    assert by_criterion["cost"]["new_leader"] == "broad"
+
+
+def test_llm_scores_fill_in_for_each_other():
+    evaluation = [
+        {"option_id": "a", "overall_score": 70, "objective_scores": {"x": 10}},
+        {"option_id": "b", "overall_score": 72},
+        {"option_id": "c", "objective_scores": {"x": 20, "y": "n/a", "z": 40}},
+    ]
+    ids, matrix = overall_scores(evaluation)
+    assert ids == ["a", "b", "c"] and matrix[:, 0].tolist() == [70, 72, 30]
+
+    ids, objectives, matrix = objective_matrix(evaluation)
+    assert objectives == ["x", "z"]
+    assert matrix.tolist() == [[10, 70], [72, 72], [20, 40]]
+
+
+def test_objective_weights_are_fitted_to_the_overall_scores():
+    rng = np.random.default_rng(1)
+    matrix = rng.uniform(0, 100, size=(8, 4))
+    weights = np.array([0.5, 0.3, 0.2, 0.0])
+    assert fit_weights(matrix, matrix @ weights + 3) == pytest.approx(weights, abs=1e-3)
+    # Scores that cannot tell the objectives apart: equal weights
+    assert fit_weights(np.full((3, 2), 50.0), np.array([50.0, 60, 70])).tolist() == [0.5, 0.5]
+
+
+def test_llm_rankings_with_close_objective_scores_have_flip_points():
+    evaluation = [
+        {"option_id": "a", "overall_score": 70, "objective_scores": {"cost": 80, "speed": 60}},
+        {"option_id": "b", "overall_score": 68, "objective_scores": {"cost": 60, "speed": 76}},
+        {"option_id": "c", "overall_score": 40, "objective_scores": {"cost": 40, "speed": 40}},
+    ]
+    ranked = [{"rank": 1, "option_id": "a"}, {"rank": 2, "option_id": "b"}]
+    result = analyze(evaluation, ranked, samples=1000)
+    assert result["model"] == "objective_scores"
+    assert result["weights"] == {"cost": 0.5, "speed": 0.5}
+    assert result["leader"] == result["model_leader"] == "a"
+    assert 0.5 < result["leader_probability"] < 0.9
+    # a leads while cost weighs more than 16/36 of the total
+    by_criterion = {f["criterion"]: f for f in result["flip_points"]}
+    assert by_criterion["cost"]["flip_weight"] == pytest.approx(0.44)
+    assert by_criterion["cost"]["new_leader"] == "b"
+    assert result["nearest_flip"]["new_leader"] == "b"
+
+
+def test_llm_rankings_without_objective_scores_perturb_the_overall_score():
+    evaluation = [
+        {"option_id": "a", "overall_score": 70},
+        {"option_id": "b", "overall_score": 72},
+        {"option_id": "c", "overall_score": 30},
+    ]
+    # The LLM ranked a first despite its lower score: a is still the leader reported
+    ranked = [{"rank": 1, "option_id": "a"}, {"rank": 2, "option_id": "b"}]
+    result = analyze(evaluation, ranked, samples=1000)
+    assert result["model"] == "overall_score"
+    assert (result["leader"], result["model_leader"]) == ("a", "b")
+    assert 0.2 < result["leader_probability"] < 0.5
+    assert result["flip_points"] == [] and result["nearest_flip"] is None
+
+    assert analyze(evaluation[:1], samples=10) is None
+
+
+def test_missing_values_get_the_worst_value():
+    evaluation = [
+        {"option_id": "a", "criterion_values": {"cost": 10, "coverage": 50}},
+        {"option_id": "b", "criterion_values": {"coverage": 80}},
+        {"option_id": "c"},
+    ]
+    criteria = [
+        {"name": "cost", "weight": 0.5, "direction": "cost"},
+        {"name": "coverage", "weight": 0.5, "direction": "benefit"},
+    ]
+    ids, matrix = value_matrix(evaluation, criteria)
+    assert matrix.tolist() == [[10, 50], [10, 80], [10, 50]]
+
+
+def test_decision_prompt_reports_the_ranked_leader():
+    reasoning = {
+        "sensitivity": {
+            "model": "overall_score", "samples": 100, "leader": "a", "leader_probability": 0.3,
+            "model_leader": "b", "options": [], "flip_points": [],
+        }
+    }
+    section = DecisionAgent()._format_sensitivity(reasoning)
+    assert "100 perturbed overall-score samples" in section
+    assert "a (ranked first) stays first with probability 30%" in section
+    assert "b would rank first" in section
+
+    reasoning["sensitivity"].update(
+        model="objective_scores", model_leader="a",
+        flip_points=[{"criterion": "cost", "base_weight": 0.5, "flip_weight": 0.44, "new_leader": "b"}],
+    )
+    section = DecisionAgent()._format_sensitivity(reasoning)
+    assert "re-scored with objective weights fitted to the overall scores" in section
+    assert "b would lead if cost weighed 0.44 instead of 0.50" in section
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
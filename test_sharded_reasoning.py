@@ -0,0 +1,133 @@
+"""
+TEST: Sharded reasoning
+Tournament evaluation of option sets larger than one prompt: rounds,
+finalists, ranking of eliminated options and LLM call counts
+
+Run with pytest: python -m pytest test_sharded_reasoning.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from agents.reasoning_agent import ReasoningAgent
+from config import config
+
+
+class ScoringAgent(ReasoningAgent):
+    """Reasoning agent whose LLM evaluation scores options by their quality"""
+
+    def __init__(self, final_reply=None):
+        super().__init__()
+        self.prompts = []
+        self.final_reply = final_reply
+
+    async def _evaluate_with_llm(self, options, constraints, objectives, context,
+                                 evidence=None, ruled_out=""):
+        self.prompts.append([o["option_id"] for o in options])
+        await asyncio.sleep(0)
+        if ruled_out == "FINAL" and self.final_reply is not None:
+            return self.final_reply
+        ordered = sorted(options, key=lambda o: o["quality"], reverse=True)
+        return {
+            "evaluation": [
+                {"option_id": o["option_id"], "overall_score": o["quality"]} for o in options
+            ],
+            "ranked_recommendations": [
+                {"rank": rank, "option_id": o["option_id"], "justification": f"q={o['quality']}"}
+                for rank, o in enumerate(ordered, 1)
+            ],
+        }
+
+
+def options(count):
+    return [{"name": f"Option {i}", "quality": i} for i in range(count)]
+
+
+def reason(agent, opts):
+    return asyncio.run(agent._reason_with_constraints(opts, {}, [], "", ruled_out="FINAL"))
+
+
+@pytest.fixture
+def shards(monkeypatch):
+    monkeypatch.setattr(config, "REASONING_MODE", "llm")
+    monkeypatch.setattr(config, "REASONING_SHARD_SIZE", 4)
+    monkeypatch.setattr(config, "REASONING_SHARD_FINALISTS", 2)
+
+
+def test_tournament_ranks_every_option(shards):
+    agent = ScoringAgent()
+    result = reason(agent, options(10))
+
+    # Round 1: shards of 4, 4, 2; round 2: 4, 2; final: 4 finalists
+    assert [len(p) for p in agent.prompts] == [4, 4, 2, 4, 2, 4]
+    assert result["sharding"] == {
+        "options": 10,
+        "shard_size": 4,
+        "finalists_per_shard": 2,
+        "rounds": 3,
+        "llm_calls": 6,
+        "finalists": ["opt_8", "opt_7", "opt_10", "opt_9"],
+    }
+
+    ranked = result["ranked_recommendations"]
+    assert [r["rank"] for r in ranked] == list(range(1, 11))
+    # Finalists by the final evaluation, then later rounds' losers, shards interleaved
+    assert [r["option_id"] for r in ranked] == [
+        "opt_10", "opt_9", "opt_8", "opt_7",
+        "opt_4", "opt_3",
+        "opt_2", "opt_6", "opt_1", "opt_5",
+    ]
+    assert ranked[0]["justification"] == "q=9"
+    assert ranked[4]["justification"] == "Eliminated in round 2 of 3 (placed 3 of 4 in its shard)"
+    assert ranked[-1]["justification"] == "Eliminated in round 1 of 3 (placed 4 of 4 in its shard)"
+    assert [e["option_id"] for e in result["evaluation"]] == [r["option_id"] for r in ranked]
+
+
+def test_unparseable_final_answer_keeps_shard_order(shards):
+    agent = ScoringAgent(final_reply={"raw_reasoning": "not json"})
+    result = reason(agent, options(6))
+    # Unparseable final answer: finalists keep their shard scores' order
+    assert [r["option_id"] for r in result["ranked_recommendations"]] == [
+        "opt_6", "opt_5", "opt_4", "opt_3", "opt_2", "opt_1",
+    ]
+    assert result["ranked_recommendations"][0]["justification"] == "Finalist"
+    assert result["raw_reasoning"] == "not json"
+
+
+def test_calls_grow_linearly(shards, monkeypatch):
+    monkeypatch.setattr(config, "REASONING_SHARD_SIZE", 10)
+    monkeypatch.setattr(config, "REASONING_SHARD_FINALISTS", 3)
+    agent = ScoringAgent()
+    result = reason(agent, options(200))
+    assert result["sharding"]["llm_calls"] < 200 / 10 * 1.5
+    assert len(result["ranked_recommendations"]) == 200
+    assert result["ranked_recommendations"][0]["option_id"] == "opt_200"
+
+
+@pytest.mark.parametrize("size, count", [(0, 30), (4, 4)])
+def test_small_sets_and_disabled_sharding_use_one_call(shards, monkeypatch, size, count):
+    monkeypatch.setattr(config, "REASONING_SHARD_SIZE", size)
+    agent = ScoringAgent()
+    opts = [dict(o, option_id=f"o{i}") for i, o in enumerate(options(count))]
+    result = reason(agent, opts)
+    assert len(agent.prompts) == 1
+    assert "sharding" not in result
+
+
+def test_shard_order_falls_back_to_scores_then_input_order():
+    order = ReasoningAgent()._shard_order(["a", "b", "c", "d"], {
+        "ranked_recommendations": [{"rank": 1, "option_id": "c"}, {"option_id": "zzz"}],
+        "evaluation": [
+            {"option_id": "a", "overall_score": 40},
+            {"option_id": "b", "overall_score": 90},
+            {"option_id": "c", "overall_score": "n/a"},
+        ],
+    })
+    assert order == ["c", "b", "a", "d"]
+    assert ReasoningAgent()._shard_order(["a", "b"], {"raw_reasoning": "?"}) == ["a", "b"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,202 @@
+"""
+TEST: Stage cache
+Stage keys, LRU/TTL memoization, single-flight sharing of in-flight stages,
+and incremental re-runs of a workflow whose options changed
+
+Run with pytest: python -m pytest test_stage_cache.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from config import config
+from llm_client import llm_client
+from orchestrator import AgenticOrchestrator
+from stage_cache import StageCache, stage_key
+
+
+def test_stage_key_ignores_dict_order_but_not_values():
+    assert stage_key("reasoning", {"a": 1, "b": 2}) == stage_key("reasoning", {"b": 2, "a": 1})
+    assert stage_key("reasoning", {"a": 1}) != stage_key("reasoning", {"a": 2})
+    assert stage_key("reasoning", {"a": 1}) != stage_key("decision", {"a": 1})
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = StageCache(max_entries=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # a is now the most recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    now = [1000.0]
+    monkeypatch.setattr("stage_cache.time.monotonic", lambda: now[0])
+    cache.put("d", 4)
+    now[0] += 11
+    assert cache.get("d") is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_values_are_copied_in_and_out():
+    cache = StageCache()
+    value = {"metadata": {}}
+    cache.put("k", value)
+    value["metadata"]["changed"] = True
+    cache.get("k")["metadata"]["reused"] = True
+    assert cache.get("k") == {"metadata": {}}
+
+
+def test_disabled_cache_stores_nothing():
+    cache = StageCache(max_entries=0)
+    cache.put("k", 1)
+    assert cache.get("k") is None
+
+
+def test_concurrent_identical_stages_compute_once():
+    cache = StageCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"value": 42}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [reused for _, reused in results] == [False, True, True, True, True]
+    assert {r["value"] for r, _ in results} == {42}
+    assert cache.stats()["shared"] == 4
+    # Memoized for later runs as well
+    assert asyncio.run(cache.get_or_compute("k", compute)) == ({"value": 42}, True)
+    assert len(calls) == 1
+
+
+def test_failures_are_shared_but_not_memoized():
+    cache = StageCache()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("provider down")
+
+    async def main():
+        return await asyncio.gather(
+            cache.get_or_compute("k", failing),
+            cache.get_or_compute("k", failing),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(main()))
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        asyncio.run(cache.get_or_compute("k", failing))
+    assert len(calls) == 2
+
+
+def test_rejected_values_are_not_memoized():
+    cache = StageCache()
+
+    async def compute():
+        return {"status": "error"}
+
+    asyncio.run(cache.get_or_compute("k", compute, store_if=lambda v: v["status"] == "success"))
+    assert cache.get("k") is None
+
+
+def test_waiter_computes_itself_when_the_owner_is_cancelled():
+    cache = StageCache()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "computed by waiter"
+
+    async def main():
+        owner = asyncio.create_task(cache.get_or_compute("k", slow))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.get_or_compute("k", fast))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == ("computed by waiter", False)
+
+
+def scenario(options):
+    return {
+        "data_source": {
+            "source_type": "text",
+            "data": "Region North: 40% power outage, 12 shelters damaged, water stock 25%",
+        },
+        "context": "Storm response",
+        "objectives": ["Restore power"],
+        "options": options,
+        "constraints": {"budget": "$5M"},
+        "resources": {"crews": "20"},
+        "timeline": "48 hours",
+    }
+
+
+def test_changed_options_rerun_only_downstream_stages(monkeypatch):
+    monkeypatch.setattr(llm_client, "provider", "simulated")
+    monkeypatch.setattr(llm_client, "model", "simulated")
+    monkeypatch.setattr(config, "SIMULATED_LATENCY", 0.0)
+    monkeypatch.setattr(config, "SIMULATED_LATENCY_JITTER", 0.0)
+    cache = StageCache()
+    orchestrator = AgenticOrchestrator()
+    options = [{"option_id": "a", "name": "Generators first"}]
+
+    async def run(options):
+        return await orchestrator.execute_workflow(scenario(options), verbose=False, cache=cache)
+
+    first = asyncio.run(run(options))
+    assert first["status"] == "success"
+    assert first["reused_stages"] == []
+
+    assert asyncio.run(run(options))["reused_stages"] == [
+        "ingestion", "analysis", "reasoning", "allocation", "decision", "execution",
+    ]
+
+    changed = asyncio.run(run(options + [{"option_id": "b", "name": "Water first"}]))
+    assert changed["status"] == "success"
+    # Execution is keyed on the decision's output, which the simulated
+    # provider repeats, so only reasoning and decision must re-run
+    assert changed["reused_stages"][:3] == ["ingestion", "analysis", "allocation"]
+    assert "reasoning" not in changed["reused_stages"]
+    assert "decision" not in changed["reused_stages"]
+
+
+
+def test_custom_scenario_without_a_data_source_runs_every_stage(monkeypatch):
+    monkeypatch.setattr(llm_client, "provider", "simulated")
+    monkeypatch.setattr(llm_client, "model", "simulated")
+    monkeypatch.setattr(config, "SIMULATED_LATENCY", 0.0)
+    monkeypatch.setattr(config, "SIMULATED_LATENCY_JITTER", 0.0)
+    # What the API builds for a custom request that leaves fields out
+    custom = dict.fromkeys([
+        "data_source", "objectives", "options", "constraints", "resources",
+        "timeline", "decision_criteria", "criteria", "allocation",
+    ])
+    custom["context"] = "Choose a flood response"
+
+    results = asyncio.run(AgenticOrchestrator().execute_workflow(
+        custom, verbose=False, cache=StageCache()
+    ))
+    assert results["status"] == "success"
+    assert list(results["stages"]) == [
+        "ingestion", "analysis", "reasoning", "allocation", "decision", "execution",
+    ]
+    assert results["stages"]["ingestion"].status == "error"
+    assert results["stages"]["decision"].status == "success"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,187 @@
+"""
+TEST: What-if sweeps
+Grid expansion, applying grid points, outcomes and the comparison matrix,
+and the sweep endpoint queuing each point as a workflow
+
+Run with pytest: python -m pytest test_sweep.py
+"""
+
+import json
+import sys
+
+import pytest
+
+from config import config
+
+# The API server must not create workflows.db in the working directory
+config.WORKFLOW_STORE = "memory"
+config.EVENT_POLL_INTERVAL = 0.01
+
+import api_server  # noqa: E402
+from agents import AgentResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from llm_client import llm_client  # noqa: E402
+from sweep import (  # noqa: E402
+    _load_grid,
+    apply_point,
+    comparison_matrix,
+    expand_grid,
+    point_outcome,
+    render_matrix,
+)
+
+
+def test_expand_grid_varies_the_first_parameter_slowest():
+    points = expand_grid({"constraints.budget": [1, 2], "criteria.weights.cost": ["a", "b", "c"]})
+    assert len(points) == 6
+    assert points[0] == {"constraints.budget": 1, "criteria.weights.cost": "a"}
+    assert points[1] == {"constraints.budget": 1, "criteria.weights.cost": "b"}
+    assert points[3] == {"constraints.budget": 2, "criteria.weights.cost": "a"}
+
+
+@pytest.mark.parametrize("grid", [
+    {},
+    {"options.0.name": ["x"]},  # options feed every stage: not sweepable
+    {"constraints.budget": []},
+    {"constraints.budget": "$5M"},
+])
+def test_expand_grid_rejects_bad_grids(grid):
+    with pytest.raises(ValueError):
+        expand_grid(grid)
+
+
+def test_apply_point_sets_nested_paths_on_a_copy():
+    scenario = {"constraints": {"budget": "$5M"}, "objectives": ["a", "b"], "criteria": None}
+    point = {
+        "constraints.budget": "$9M",
+        "objectives.1": "c",
+        "criteria.weights.cost": 3,
+    }
+    applied = apply_point(scenario, point)
+    assert applied["constraints"] == {"budget": "$9M"}
+    assert applied["objectives"] == ["a", "c"]
+    assert applied["criteria"] == {"weights": {"cost": 3}}
+    assert scenario["constraints"]["budget"] == "$5M"
+
+    with pytest.raises(ValueError):
+        apply_point(scenario, {"objectives.5": "x"})
+
+
+def results(workflow_id, recommended, status="success"):
+    decision = AgentResponse(
+        agent_name="DecisionAgent",
+        status=status,
+        data={"decision": {"RECOMMENDED DECISION": recommended, "CONFIDENCE LEVEL": "High"}},
+    )
+    return {
+        "workflow_id": workflow_id,
+        "status": status,
+        "reused_stages": ["ingestion", "analysis"],
+        "usage": {"calls": 3, "total_tokens": 100, "cost_usd": 0.0, "by_agent": {}},
+        "stages": {"decision": decision},
+    }
+
+
+def test_point_outcome():
+    outcome = point_outcome(2, {"constraints.budget": 1}, results("w2", "opt_1"))
+    assert outcome["decision"] == "opt_1"
+    assert outcome["confidence"] == "High"
+    assert outcome["usage"] == {"calls": 3, "total_tokens": 100, "cost_usd": 0.0}
+    assert point_outcome(0, {}, {**results("w0", None), "stages": {}})["decision"] is None
+
+
+def test_two_parameter_matrix_pivots_decisions():
+    grid = {"a": [1, 2], "b": ["x", "y"]}
+    outcomes = [
+        point_outcome(i, point, results(f"w{i}", f"opt_{i}", "error" if i == 3 else "success"))
+        for i, point in enumerate(expand_grid({f"constraints.{k}": v for k, v in grid.items()}))
+    ]
+    for outcome in outcomes:
+        outcome["parameters"] = {k.split(".")[1]: v for k, v in outcome["parameters"].items()}
+
+    matrix = comparison_matrix(list(grid), list(reversed(outcomes)))
+    assert matrix["columns"] == ["a", "b", "decision", "confidence", "status"]
+    assert [row[:2] for row in matrix["rows"]] == [[1, "x"], [1, "y"], [2, "x"], [2, "y"]]
+    assert matrix["pivot"] == {
+        "rows": [1, 2],
+        "columns": ["x", "y"],
+        "cells": [["opt_0", "opt_1"], ["opt_2", "error"]],
+    }
+
+    text = render_matrix(matrix).splitlines()
+    assert text[0].split(" | ")[0].strip() == "a"
+    assert set(text[1]) <= {"-", "+"}
+    assert len(text) == 2 + 4
+
+
+def test_load_grid_from_params(tmp_path):
+    path = tmp_path / "grid.json"
+    path.write_text(json.dumps({"constraints.budget": [1, 2]}))
+    grid = _load_grid(str(path), ['objectives.0=["a", "b"]', "criteria.weights.cost=1, 3", "x.y=7"])
+    assert grid == {
+        "constraints.budget": [1, 2],
+        "objectives.0": ["a", "b"],
+        "criteria.weights.cost": ["1", "3"],
+        "x.y": [7],
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(llm_client, "provider", "simulated")
+    monkeypatch.setattr(llm_client, "model", "simulated")
+    monkeypatch.setattr(config, "SIMULATED_LATENCY", 0.0)
+    monkeypatch.setattr(config, "SIMULATED_LATENCY_JITTER", 0.0)
+    with TestClient(api_server.app) as client:
+        yield client
+
+
+def test_sweep_points_are_queued_as_workflows(client):
+    response = client.post("/workflow/sweep", json={
+        "scenario": {"scenario_type": "infrastructure"},
+        "grid": {"constraints.budget_limit": ["$40M", "$60M"], "decision_criteria.risk": ["low"]},
+    })
+    assert response.status_code == 200
+    accepted, *points, summary = [json.loads(line) for line in response.text.splitlines()]
+
+    ids = [w["workflow_id"] for w in accepted["workflows"]]
+    assert accepted["sweep_id"] == summary["sweep_id"]
+    assert sorted(p["index"] for p in points) == [0, 1]
+    assert {p["workflow_id"] for p in points} == set(ids)
+    assert summary["points"] == 2
+    assert summary["statuses"] == {"success": 2}
+    assert [row[0] for row in summary["matrix"]["rows"]] == ["$40M", "$60M"]
+
+    record = api_server.open_workflow_store().get(ids[1])
+    assert record["status"] == "completed"
+    assert record["priority"] == "batch"
+    assert record["sweep_parameters"] == {
+        "constraints.budget_limit": "$60M", "decision_criteria.risk": "low",
+    }
+    assert record["scenario"]["constraints"]["budget_limit"] == "$60M"
+
+
+def test_bulk_work_cannot_claim_critical_priority(client):
+    sweep = {"scenario": {"scenario_type": "infrastructure"}, "grid": {"constraints.x": [1]}}
+    batch = {"scenarios": [{"scenario_type": "infrastructure"}]}
+    for path, body in (("/workflow/sweep", sweep), ("/workflow/batch", batch)):
+        response = client.post(path, json={**body, "priority": "critical"})
+        assert response.status_code == 400
+        assert "cannot run above the standard class" in response.json()["detail"]
+        assert client.post(path, json={**body, "priority": "nonsense"}).status_code == 400
+
+    assert api_server.bulk_priority(None) == "batch"
+    assert api_server.bulk_priority("standard") == "standard"
+
+
+def test_invalid_sweeps_are_rejected(client):
+    base = {"scenario": {"scenario_type": "infrastructure"}}
+    assert client.post("/workflow/sweep", json={**base, "grid": {}}).status_code == 400
+    too_many = {"constraints.x": list(range(config.SWEEP_MAX_POINTS + 1))}
+    assert client.post("/workflow/sweep", json={**base, "grid": too_many}).status_code == 400
+    bad_index = {"objectives.99": ["x"]}
+    assert client.post("/workflow/sweep", json={**base, "grid": bad_index}).status_code == 400
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
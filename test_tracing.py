@@ -0,0 +1,100 @@
+"""
+TEST: Tracing
+Span nesting across tasks, error status, OTLP/JSON export and the timeline
+
+Run with pytest: python -m pytest test_tracing.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from tracing import FileSpanExporter, SpanExporter, Tracer, load_spans, render_timeline
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(spans)
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.span("workflow") as span:
+        span.set_attribute("ignored", 1)
+        assert tracer.current_span() is span
+    assert not tracer.enabled
+
+
+def test_trace_is_exported_once_the_root_span_ends():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+    with tracer.span("workflow", {"workflow.id": "w1"}) as root:
+        with tracer.span("stage.ingestion") as stage:
+            with tracer.span("agent.execute"):
+                pass
+        assert exporter.traces == []
+
+    (spans,) = exporter.traces
+    assert [s.name for s in spans] == ["agent.execute", "stage.ingestion", "workflow"]
+    assert {s.trace_id for s in spans} == {root.trace_id}
+    assert stage.parent_span_id == root.span_id
+    assert spans[0].parent_span_id == stage.span_id
+    assert root.status == "OK"
+
+
+def test_spans_in_child_tasks_keep_their_parent():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    async def call(name):
+        with tracer.span(name):
+            await asyncio.sleep(0)
+
+    async def main():
+        with tracer.span("stage.analysis") as stage:
+            await asyncio.gather(call("llm.call.a"), call("llm.call.b"))
+        return stage
+
+    stage = asyncio.run(main())
+    children = [s for s in exporter.traces[0] if s.name.startswith("llm")]
+    assert {s.parent_span_id for s in children} == {stage.span_id}
+
+
+def test_exceptions_mark_the_span_as_error():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+    with pytest.raises(ValueError):
+        with tracer.span("llm.call"):
+            raise ValueError("bad response")
+
+    (span,) = exporter.traces[0]
+    assert span.status == "ERROR"
+    assert span.attributes["error.type"] == "ValueError"
+
+
+def test_file_export_round_trips_and_renders(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    tracer = Tracer(FileSpanExporter(path))
+    with tracer.span("workflow", {"workflow.id": "w1", "retries": 2, "ok": True}):
+        with tracer.span("llm.call", {"llm.attempt": 1, "tags": ["a", "b"]}):
+            pass
+
+    spans = load_spans(path)
+    by_name = {s["name"]: s for s in spans}
+    assert by_name["workflow"]["attributes"] == {"workflow.id": "w1", "retries": 2, "ok": True}
+    assert by_name["llm.call"]["attributes"]["tags"] == ["a", "b"]
+    assert by_name["llm.call"]["parent_span_id"] == by_name["workflow"]["span_id"]
+
+    timeline = render_timeline(spans).splitlines()
+    assert timeline[0].startswith(f"trace {spans[0]['trace_id']}")
+    assert timeline[1].startswith("workflow") and "id=w1" in timeline[1]
+    assert timeline[2].startswith("  llm.call") and "attempt=1" in timeline[2]
+    assert render_timeline([]) == ""
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
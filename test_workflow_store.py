@@ -0,0 +1,351 @@
+"""
+TEST: Workflow store
+CRUD, events and concurrent writers on both repository backends, and the
+ordered writer thread the API server uses to keep writes off the event loop
+
+Run with pytest: python -m pytest test_workflow_store.py
+"""
+
+import asyncio
+import sys
+import threading
+
+import pytest
+
+from agents import AgentResponse
+from events import EventBroker
+from workflow_store import (
+    DuplicateIdempotencyKeyError,
+    InMemoryWorkflowRepository,
+    SQLiteWorkflowRepository,
+    StoreWriter,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        repo = InMemoryWorkflowRepository()
+    else:
+        repo = SQLiteWorkflowRepository(str(tmp_path / "workflows.db"))
+    yield repo
+    repo.close()
+
+
+def make_record(workflow_id, status="queued", created_at="2026-01-01T00:00:00", **fields):
+    return {
+        "workflow_id": workflow_id,
+        "status": status,
+        "created_at": created_at,
+        "scenario_type": "emergency",
+        **fields,
+    }
+
+
+def test_create_get_update_delete(store):
+    store.create(make_record("w1", fingerprint="fp", idempotency_key="key"))
+    store.update("w1", status="running", progress=40)
+
+    record = store.get("w1")
+    assert record["status"] == "running"
+    assert record["progress"] == 40
+    assert record["fingerprint"] == "fp"
+    assert store.get_status("w1") == "running"
+    assert store.find_by_idempotency_key("key")["workflow_id"] == "w1"
+    assert store.find_by_fingerprint("fp", ["running"])["workflow_id"] == "w1"
+    assert store.find_by_fingerprint("fp", ["completed"]) is None
+
+    assert store.delete("w1") is True
+    assert store.get("w1") is None
+    assert store.delete("w1") is False
+
+
+def test_idempotency_key_is_taken_once(store):
+    store.create(make_record("w1", idempotency_key="key"))
+    with pytest.raises(DuplicateIdempotencyKeyError):
+        store.create(make_record("w2", idempotency_key="key"))
+    assert store.get("w2") is None
+    # Submissions without a key never conflict
+    store.create(make_record("w3"))
+    store.create(make_record("w4"))
+
+
+def test_update_of_missing_workflow_is_ignored(store):
+    store.update("missing", status="running")
+    assert store.get("missing") is None
+
+
+def test_save_results_keeps_stages_and_summary(store):
+    store.create(make_record("w1"))
+    response = AgentResponse(agent_name="A", status="success", data={"x": 1})
+    store.save_stage_result("w1", "ingestion", response)
+    store.save_results("w1", {"status": "success", "stages": {"ingestion": response}})
+
+    results = store.get("w1")["results"]
+    assert results["status"] == "success"
+    assert results["stages"]["ingestion"]["data"] == {"x": 1}
+
+
+def test_save_results_does_not_lose_concurrent_updates(store):
+    store.create(make_record("w1"))
+    errors = []
+
+    def save():
+        try:
+            for i in range(200):
+                store.save_results("w1", {"status": "success", "round": i, "stages": {}})
+        except Exception as e:
+            errors.append(e)
+
+    def update():
+        try:
+            for i in range(200):
+                store.update("w1", **{f"field_{i}": i})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save), threading.Thread(target=update)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    record = store.get("w1")
+    # No update was overwritten by a save_results that read the record earlier
+    assert all(f"field_{i}" in record for i in range(200))
+    assert record["results"]["round"] == 199
+
+
+def test_sqlite_writers_in_two_connections(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first, second = SQLiteWorkflowRepository(path), SQLiteWorkflowRepository(path)
+    first.create(make_record("w1"))
+
+    threads = [
+        threading.Thread(target=lambda: [first.update("w1", a=i) for i in range(30)]),
+        threading.Thread(
+            target=lambda: [
+                second.save_results("w1", {"status": "success", "n": i}) for i in range(30)
+            ]
+        ),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    record = second.get("w1")
+    assert record["a"] == 29
+    assert record["results"]["n"] == 29
+    first.close()
+    second.close()
+
+
+def seed_listing(store):
+    for i in range(7):
+        store.create(make_record(
+            f"w{i}",
+            status="completed" if i % 2 else "failed",
+            created_at=f"2026-01-0{i + 1}T00:00:00",
+        ))
+
+
+def test_list_page_walks_all_pages_newest_first(store):
+    seed_listing(store)
+    seen, cursor = [], None
+    while True:
+        records, cursor = store.list_page(limit=3, cursor=cursor)
+        seen.extend(r["workflow_id"] for r in records)
+        if cursor is None:
+            break
+    assert seen == [f"w{i}" for i in reversed(range(7))]
+
+
+def test_list_page_projects_requested_fields(store):
+    seed_listing(store)
+    records, _ = store.list_page(limit=1, fields=["workflow_id", "scenario_type"])
+    assert records == [{"workflow_id": "w6", "scenario_type": "emergency"}]
+    with pytest.raises(ValueError):
+        store.list_page(fields=["results"])
+
+
+def test_count_applies_the_list_filters(store):
+    seed_listing(store)
+    filters = {
+        "status": "completed",
+        "created_after": "2026-01-02T00:00:00",
+        "created_before": "2026-01-07T00:00:00",
+    }
+    records, _ = store.list_page(limit=50, **filters)
+    # Bounds are exclusive: w1 was created exactly at created_after
+    assert [r["workflow_id"] for r in records] == ["w5", "w3"]
+    assert store.count(**filters) == 2
+    assert store.count("failed") == 4
+    assert store.count(created_before="2026-01-03T00:00:00") == 2
+    assert store.count() == 7
+
+
+def test_events_are_sequential_per_workflow(store):
+    store.create(make_record("w1"))
+    for i in range(3):
+        store.append_event("w1", "stage_started", {"i": i})
+    store.append_event("w2", "workflow_started", {})
+
+    events = store.list_events("w1")
+    assert [e["event_id"] for e in events] == [1, 2, 3]
+    assert [e["data"]["i"] for e in store.list_events("w1", after_id=1)] == [1, 2]
+    assert store.list_events("w2")[0]["event_id"] == 1
+
+
+def test_trim_events_keeps_the_newest(store):
+    for workflow_id in ("w1", "w2"):
+        store.create(make_record(workflow_id))
+        for i in range(5):
+            store.append_event(workflow_id, "stage_started", {"i": i})
+
+    assert store.trim_events(2, "w1") == 3
+    assert [e["event_id"] for e in store.list_events("w1")] == [4, 5]
+    assert len(store.list_events("w2")) == 5
+
+    # Ids keep increasing after a trim (Last-Event-ID stays valid)
+    assert store.append_event("w1", "workflow_resumed", {})["event_id"] == 6
+    assert store.trim_events(1) == 2 + 4
+    assert [e["event_id"] for e in store.list_events("w1")] == [6]
+
+
+def test_delete_finished_purges_old_terminal_workflows(store):
+    store.create(make_record(
+        "old_done", status="completed", created_at="2025-01-01T00:00:00",
+        completed_at="2025-01-01T00:05:00",
+    ))
+    store.create(make_record("old_running", status="running", created_at="2025-01-01T00:00:00"))
+    store.create(make_record(
+        "new_done", status="completed", created_at="2026-06-01T00:00:00",
+        completed_at="2026-06-01T00:05:00",
+    ))
+    store.save_stage_result("old_done", "ingestion", {"agent_name": "A"})
+    store.append_event("old_done", "workflow_completed", {})
+
+    assert store.delete_finished("2026-01-01T00:00:00", ["completed", "failed"]) == 1
+    assert store.get("old_done") is None
+    assert store.list_events("old_done") == []
+    assert store.get_status("old_running") == "running"
+    assert store.get_status("new_done") == "completed"
+
+
+def test_retention_counts_from_when_a_workflow_finished(store):
+    # Created long ago, resumed and finished again recently
+    store.create(make_record("resumed", status="running", created_at="2025-01-01T00:00:00"))
+    store.update("resumed", status="completed", completed_at="2026-06-01T00:05:00", resume_count=1)
+    # Finished without a completion time: the last update counts
+    store.create(make_record("no_completed_at", status="failed", created_at="2025-01-01T00:00:00"))
+
+    assert store.delete_finished("2026-01-01T00:00:00", ["completed", "failed"]) == 0
+    assert store.get_status("resumed") == "completed"
+    assert store.delete_finished("2026-06-02T00:00:00", ["completed", "failed"]) == 1
+    assert store.get("resumed") is None
+    assert store.get_status("no_completed_at") == "failed"
+
+
+ACTIVE = ["queued", "running"]
+
+
+def test_only_expired_leases_are_claimed(store):
+    store.create(make_record("live", owner="a", lease_expires_at="2026-01-01T00:10:00"))
+    store.create(make_record("expired", owner="b", lease_expires_at="2026-01-01T00:04:00"))
+    store.create(make_record("legacy", status="running"))  # stored before leases
+    store.create(make_record("done", status="completed", lease_expires_at="2026-01-01T00:00:00"))
+
+    claimed = store.claim_expired("c", "2026-01-01T00:06:00", "2026-01-01T00:05:00", ACTIVE)
+    assert sorted(r["workflow_id"] for r in claimed) == ["expired", "legacy"]
+    assert all(r["owner"] == "c" for r in claimed)
+    assert store.get("expired")["lease_expires_at"] == "2026-01-01T00:06:00"
+    assert store.get("live")["owner"] == "a"
+    # Claimed leases are live again
+    assert store.claim_expired("d", "2026-01-01T00:07:00", "2026-01-01T00:05:30", ACTIVE) == []
+
+
+def test_renewed_leases_are_not_claimed(store):
+    store.create(make_record("w1", owner="a", lease_expires_at="2026-01-01T00:01:00"))
+    store.create(make_record("w2", status="completed", owner="a"))
+    assert store.renew_leases("a", "2026-01-01T00:10:00", ACTIVE) == 1
+    assert store.renew_leases("b", "2026-01-01T00:10:00", ACTIVE) == 0
+    assert store.claim_expired("b", "2026-01-01T00:11:00", "2026-01-01T00:05:00", ACTIVE) == []
+
+    store.update("w1", status="running")
+    assert store.get("w1")["lease_expires_at"] == "2026-01-01T00:10:00"
+
+
+def test_each_expired_workflow_is_claimed_by_one_process(tmp_path):
+    path = str(tmp_path / "shared.db")
+    seed = SQLiteWorkflowRepository(path)
+    for i in range(50):
+        seed.create(make_record(f"w{i}", owner="dead", lease_expires_at="2026-01-01T00:00:00"))
+
+    workers = [SQLiteWorkflowRepository(path) for _ in range(4)]
+    claims = {}
+
+    def claim(index):
+        claims[index] = [
+            r["workflow_id"]
+            for r in workers[index].claim_expired(
+                f"worker{index}", "2026-01-01T00:10:00", "2026-01-01T00:05:00", ACTIVE
+            )
+        ]
+
+    threads = [threading.Thread(target=claim, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    claimed = [wid for ids in claims.values() for wid in ids]
+    assert sorted(claimed) == sorted(f"w{i}" for i in range(50))
+    for index, ids in claims.items():
+        assert all(seed.get(wid)["owner"] == f"worker{index}" for wid in ids)
+    for repo in [seed, *workers]:
+        repo.close()
+
+
+def test_store_writer_runs_calls_in_order(store):
+    writer = StoreWriter()
+    store.create(make_record("w1"))
+
+    async def main():
+        for i in range(20):
+            writer.submit(store.update, "w1", progress=i)
+        # Awaited calls queue behind the unawaited ones
+        return await writer.run(store.get, "w1")
+
+    assert asyncio.run(main())["progress"] == 19
+    writer.close()
+
+
+def test_event_broker_with_writer_wakes_subscribers(store):
+    writer = StoreWriter()
+    broker = EventBroker(store, poll_interval=5.0, writer=writer)
+    store.create(make_record("w1", status="running"))
+
+    async def main():
+        received = []
+
+        async def subscribe():
+            async for event in broker.subscribe("w1"):
+                received.append(event.type)
+
+        task = asyncio.create_task(subscribe())
+        await asyncio.sleep(0.05)
+        broker.publish("w1", "stage_started", {"progress": 10})
+        writer.submit(store.update, "w1", status="completed")
+        broker.publish("w1", "workflow_completed", {"status": "completed"})
+        # Woken by the writer thread well before the 5s poll
+        await asyncio.wait_for(task, timeout=2.0)
+        return received
+
+    assert asyncio.run(main()) == ["stage_started", "workflow_completed"]
+    writer.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
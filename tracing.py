@@ -0,0 +1,401 @@
+"""
+Tracing
+Lightweight spans for workflows, stages, agents and LLM calls, exported as
+OpenTelemetry (OTLP/JSON) documents to the console or a local file
+Run `python tracing.py traces.jsonl` to print a timeline of each trace
+"""
+
+from typing import Dict, Any, Callable, Iterator, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+from config import config
+
+
+SERVICE_NAME = "agentic-ai-system"
+
+_KINDS = {"INTERNAL": 1, "SERVER": 2, "CLIENT": 3}
+_STATUS_CODES = {"UNSET": 0, "OK": 1, "ERROR": 2}
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+def _any_value(value: Any) -> Dict[str, Any]:
+    """Encode an attribute value as an OTLP AnyValue"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_any_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _from_any_value(value: Dict[str, Any]) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "arrayValue" in value:
+        return [_from_any_value(v) for v in value["arrayValue"].get("values", [])]
+    for key in ("boolValue", "doubleValue", "stringValue"):
+        if key in value:
+            return value[key]
+    return None
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_span_id", "kind",
+        "start_ns", "end_ns", "attributes", "events", "status", "status_message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = "INTERNAL",
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status = "UNSET"
+        self.status_message: Optional[str] = None
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append(
+            {"name": name, "time_ns": time.time_ns(), "attributes": attributes or {}}
+        )
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        self.status = status
+        self.status_message = message
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON representation"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [
+                {"key": k, "value": _any_value(v)} for k, v in self.attributes.items()
+            ],
+            "status": {"code": _STATUS_CODES[self.status]},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.events:
+            span["events"] = [
+                {
+                    "name": e["name"],
+                    "timeUnixNano": str(e["time_ns"]),
+                    "attributes": [
+                        {"key": k, "value": _any_value(v)}
+                        for k, v in e["attributes"].items()
+                    ],
+                }
+                for e in self.events
+            ]
+        return span
+
+
+class _NoopSpan:
+    """Span used when tracing is disabled; every operation is a no-op"""
+
+    trace_id = None
+    span_id = None
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def to_otlp_document(spans: List[Span]) -> Dict[str, Any]:
+    """Wrap spans in an OTLP ExportTraceServiceRequest (JSON encoding)"""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": SERVICE_NAME},
+                        "spans": [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class SpanExporter:
+    """Receives the spans of each finished trace"""
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """Writes one OTLP/JSON document per trace to stderr"""
+
+    def __init__(self, stream: Any = None):
+        self.stream = stream or sys.stderr
+
+    def export(self, spans: List[Span]) -> None:
+        self.stream.write(json.dumps(to_otlp_document(spans)) + "\n")
+        self.stream.flush()
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends one OTLP/JSON document per trace to a JSON Lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(to_otlp_document(spans))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class Tracer:
+    """
+    Creates spans and exports each trace once its root span ends
+
+    The active span is tracked in a context variable, so spans started in
+    tasks created inside a span (e.g. the cancellable stage pipeline) are
+    parented correctly. With no exporter, spans are not recorded at all.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = exporter
+        self._current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+        self._pending: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current_span(self) -> Any:
+        """Active span in this context (a no-op span if there is none)"""
+        return self._current.get() or NOOP_SPAN
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = "INTERNAL",
+    ) -> Iterator[Any]:
+        """Run the enclosed block inside a child of the active span"""
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+
+        parent = self._current.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else _new_id(16),
+            parent_span_id=parent.span_id if parent else None,
+            attributes=attributes,
+            kind=kind,
+        )
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_attribute("error.type", type(e).__name__)
+            span.set_status("ERROR", str(e) or type(e).__name__)
+            raise
+        finally:
+            self._current.reset(token)
+            self._end(span)
+
+    def _end(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        if span.status == "UNSET":
+            span.set_status("OK")
+
+        with self._lock:
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_span_id is not None:
+                return
+            del self._pending[span.trace_id]
+
+        self.exporter.export(spans)
+
+
+def traced(name: str, **attributes: Any) -> Callable:
+    """Decorator running an async function inside a span"""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.span(name, attributes):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def create_tracer() -> Tracer:
+    """Tracer for the configured exporter (TRACE_EXPORTER)"""
+    if config.TRACE_EXPORTER == "console":
+        return Tracer(ConsoleSpanExporter())
+    if config.TRACE_EXPORTER == "file":
+        return Tracer(FileSpanExporter(config.TRACE_FILE))
+    if config.TRACE_EXPORTER in ("", "none"):
+        return Tracer()
+    raise ValueError(f"Unsupported TRACE_EXPORTER: {config.TRACE_EXPORTER}")
+
+
+# Process-wide tracer
+tracer = create_tracer()
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Read exported OTLP/JSON documents back as flat span dicts"""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for raw in scope.get("spans", []):
+                        spans.append({
+                            "trace_id": raw["traceId"],
+                            "span_id": raw["spanId"],
+                            "parent_span_id": raw.get("parentSpanId"),
+                            "name": raw["name"],
+                            "start_ns": int(raw["startTimeUnixNano"]),
+                            "end_ns": int(raw["endTimeUnixNano"]),
+                            "status": raw.get("status", {}).get("code", 0),
+                            "attributes": {
+                                a["key"]: _from_any_value(a["value"])
+                                for a in raw.get("attributes", [])
+                            },
+                        })
+    return spans
+
+
+# Attributes shown next to each bar in the timeline
+_TIMELINE_ATTRIBUTES = (
+    "workflow.id", "agent.name", "llm.operation", "llm.attempt",
+    "llm.slot_wait_ms", "llm.prompt_tokens", "llm.completion_tokens", "error.type",
+)
+
+
+def render_timeline(spans: List[Dict[str, Any]], width: int = 40) -> str:
+    """
+    Flame-style text timeline of one trace
+
+    Each span is drawn as a bar positioned on the trace's time axis and
+    indented under its parent.
+    """
+    if not spans:
+        return ""
+
+    start = min(s["start_ns"] for s in spans)
+    total = max(max(s["end_ns"] for s in spans) - start, 1)
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    ids = {s["span_id"] for s in spans}
+    for span in sorted(spans, key=lambda s: s["start_ns"]):
+        parent = span["parent_span_id"] if span["parent_span_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+
+    label_width = 44
+    lines = [f"trace {spans[0]['trace_id']}  ({total / 1e9:.2f}s)"]
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in children.get(parent, []):
+            offset = int((span["start_ns"] - start) / total * width)
+            length = max(1, round((span["end_ns"] - span["start_ns"]) / total * width))
+            bar = " " * offset + "█" * min(length, width - offset)
+            label = ("  " * depth + span["name"])[:label_width]
+            details = " ".join(
+                f"{k.split('.', 1)[-1]}={span['attributes'][k]}"
+                for k in _TIMELINE_ATTRIBUTES
+                if k in span["attributes"]
+            )
+            flag = " !" if span["status"] == _STATUS_CODES["ERROR"] else ""
+            lines.append(
+                f"{label:<{label_width}} |{bar:<{width}}| "
+                f"{(span['end_ns'] - span['start_ns']) / 1e9:7.2f}s{flag} {details}".rstrip()
+            )
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print trace timelines")
+    parser.add_argument("path", nargs="?", default=config.TRACE_FILE)
+    parser.add_argument("--trace", help="Only this trace id")
+    args = parser.parse_args()
+
+    by_trace: Dict[str, List[Dict[str, Any]]] = {}
+    for span in load_spans(args.path):
+        if args.trace is None or span["trace_id"] == args.trace:
+            by_trace.setdefault(span["trace_id"], []).append(span)
+
+    for trace_spans in by_trace.values():
+        print(render_timeline(trace_spans))
+        print()
@@ -0,0 +1,1052 @@
+"""
+Workflow Store
+Pluggable persistence for API workflow records and stage results
+Default backend is an embedded SQLite database in WAL mode so that several
+uvicorn worker processes can serve the same workflows consistently
+"""
+
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import base64
+import json
+import sqlite3
+import threading
+
+from config import config
+
+
+# Record fields that live in their own indexed columns
+_INDEXED_FIELDS = (
+    "workflow_id",
+    "status",
+    "scenario_type",
+    "created_at",
+    "fingerprint",
+    "idempotency_key",
+    "owner",
+    "lease_expires_at",
+)
+
+# Fields a workflow listing may project; large payloads such as results
+# are only served by the per-workflow lookup
+LISTABLE_FIELDS = (
+    "workflow_id",
+    "status",
+    "scenario_type",
+    "priority",
+    "created_at",
+    "queued_at",
+    "started_at",
+    "completed_at",
+    "queue_wait_seconds",
+    "execution_seconds",
+    "progress",
+    "current_stage",
+    "error",
+    "total_tokens",
+    "cost_usd",
+)
+
+DEFAULT_LIST_FIELDS = (
+    "workflow_id",
+    "status",
+    "progress",
+    "created_at",
+    "started_at",
+    "completed_at",
+)
+
+
+def _projection(fields: Optional[List[str]]) -> List[str]:
+    """Validate requested list fields, defaulting to DEFAULT_LIST_FIELDS"""
+    fields = list(fields or DEFAULT_LIST_FIELDS)
+    for field in fields:
+        if field not in LISTABLE_FIELDS:
+            raise ValueError(f"Field cannot be listed: {field}")
+    return fields
+
+
+class DuplicateIdempotencyKeyError(Exception):
+    """Another workflow was already created with the same Idempotency-Key"""
+
+
+def encode_cursor(created_at: str, workflow_id: str) -> str:
+    """Opaque pagination cursor for the last row of a page"""
+    raw = json.dumps([created_at, workflow_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        created_at, workflow_id = json.loads(base64.urlsafe_b64decode(cursor))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return created_at, workflow_id
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON fallback for AgentResponse and other pydantic models"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+def to_json(obj: Any) -> str:
+    """Serialize workflow data (including AgentResponse objects) to JSON"""
+    return json.dumps(obj, default=_json_default)
+
+
+class WorkflowRepository(ABC):
+    """
+    Abstract workflow repository
+    Stores one record per workflow plus the per-stage results of its run
+    """
+
+    @abstractmethod
+    def create(self, record: Dict[str, Any]) -> None:
+        """
+        Insert a new workflow record (must contain workflow_id)
+
+        Raises:
+            DuplicateIdempotencyKeyError: record["idempotency_key"] is
+                already taken (a concurrent submission won the race)
+        """
+        pass
+
+    @abstractmethod
+    def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Return the full workflow record including results, or None"""
+        pass
+
+    @abstractmethod
+    def update(self, workflow_id: str, **fields: Any) -> None:
+        """Merge fields into an existing workflow record"""
+        pass
+
+    @abstractmethod
+    def save_results(self, workflow_id: str, results: Dict[str, Any]) -> None:
+        """Store orchestrator results; stage results are written as one batch"""
+        pass
+
+    @abstractmethod
+    def save_stage_result(self, workflow_id: str, stage: str, result: Any) -> None:
+        """Store (or replace) one stage result as soon as the stage finishes"""
+        pass
+
+    @abstractmethod
+    def delete(self, workflow_id: str) -> bool:
+        """Delete a workflow and its stage results; returns False if missing"""
+        pass
+
+    @abstractmethod
+    def list(
+        self, status: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """List workflow records, newest first"""
+        pass
+
+    @abstractmethod
+    def list_page(
+        self,
+        status: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List a page of projected workflow records, newest first
+
+        Args:
+            status: Only workflows with this status
+            created_after: ISO timestamp lower bound (exclusive)
+            created_before: ISO timestamp upper bound (exclusive)
+            cursor: Cursor returned with the previous page
+            limit: Page size
+            fields: Fields to return (subset of LISTABLE_FIELDS)
+
+        Returns:
+            (records, next_cursor) - next_cursor is None on the last page
+        """
+        pass
+
+    @abstractmethod
+    def count(
+        self,
+        status: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+    ) -> int:
+        """Count workflows matching the list_page filters"""
+        pass
+
+    @abstractmethod
+    def find_by_idempotency_key(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the workflow created with an Idempotency-Key, if any"""
+        pass
+
+    @abstractmethod
+    def find_by_fingerprint(
+        self, fingerprint: str, statuses: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Newest workflow (without results) with a fingerprint and status"""
+        pass
+
+    @abstractmethod
+    def get_status(self, workflow_id: str) -> Optional[str]:
+        """Return only the status of a workflow, or None if missing"""
+        pass
+
+    @abstractmethod
+    def is_cancel_requested(self, workflow_id: str) -> bool:
+        """Whether cancel_requested is set on the workflow (cheap poll)"""
+        pass
+
+    @abstractmethod
+    def append_event(
+        self, workflow_id: str, event_type: str, data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Append a progress event; event ids increase per workflow from 1"""
+        pass
+
+    @abstractmethod
+    def list_events(self, workflow_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """Return events with event_id greater than after_id, in order"""
+        pass
+
+    @abstractmethod
+    def trim_events(self, keep: int, workflow_id: Optional[str] = None) -> int:
+        """
+        Keep only the newest `keep` events of a workflow (or of every
+        workflow); returns the number of events deleted
+        """
+        pass
+
+    @abstractmethod
+    def delete_finished(self, finished_before: str, statuses: List[str]) -> int:
+        """
+        Delete workflows in one of `statuses` that finished before an ISO
+        timestamp (completed_at, else the last update), with their stage
+        results and events; returns the number of workflows deleted
+
+        A workflow created long ago but resumed recently is kept for the
+        whole retention window after it finishes again.
+        """
+        pass
+
+    @abstractmethod
+    def renew_leases(self, owner: str, lease_expires_at: str, statuses: List[str]) -> int:
+        """
+        Extend the lease of every workflow in one of `statuses` held by
+        owner (a server process); returns the number of workflows renewed
+        """
+        pass
+
+    @abstractmethod
+    def claim_expired(
+        self, owner: str, lease_expires_at: str, now: str, statuses: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Take over workflows in one of `statuses` whose lease expired before
+        the ISO timestamp now (or that have none)
+
+        Each workflow is claimed with a conditional update, so of several
+        processes claiming at once exactly one gets it. Returns the claimed
+        records (without results).
+        """
+        pass
+
+    def close(self) -> None:
+        """Release backend resources"""
+        pass
+
+
+class InMemoryWorkflowRepository(WorkflowRepository):
+    """Process-local repository (tests, single-process development)"""
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._updated_at: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def create(self, record: Dict[str, Any]) -> None:
+        key = record.get("idempotency_key")
+        with self._lock:
+            if key is not None and any(
+                r.get("idempotency_key") == key for r in self._records.values()
+            ):
+                raise DuplicateIdempotencyKeyError(key)
+            self._records[record["workflow_id"]] = dict(record)
+            self._updated_at[record["workflow_id"]] = datetime.now().isoformat()
+
+    def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(workflow_id)
+        return dict(record) if record is not None else None
+
+    def update(self, workflow_id: str, **fields: Any) -> None:
+        with self._lock:
+            if workflow_id in self._records:
+                self._records[workflow_id].update(fields)
+                self._updated_at[workflow_id] = datetime.now().isoformat()
+
+    def save_results(self, workflow_id: str, results: Dict[str, Any]) -> None:
+        # Round-trip through JSON so stored results match the SQLite backend
+        payload = json.loads(to_json(results))
+        with self._lock:
+            record = self._records.get(workflow_id)
+            if record is not None:
+                record["results"] = payload
+                self._updated_at[workflow_id] = datetime.now().isoformat()
+
+    def save_stage_result(self, workflow_id: str, stage: str, result: Any) -> None:
+        with self._lock:
+            record = self._records.get(workflow_id)
+            if record is not None:
+                results = record.setdefault("results", {})
+                results.setdefault("stages", {})[stage] = json.loads(to_json(result))
+
+    def delete(self, workflow_id: str) -> bool:
+        with self._lock:
+            self._events.pop(workflow_id, None)
+            self._updated_at.pop(workflow_id, None)
+            return self._records.pop(workflow_id, None) is not None
+
+    def list(
+        self, status: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        records = [
+            dict(r) for r in self._records.values()
+            if status is None or r.get("status") == status
+        ]
+        records.sort(key=lambda r: r.get("created_at", ""), reverse=True)
+        return records[:limit] if limit is not None else records
+
+    def list_page(
+        self,
+        status: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        fields = _projection(fields)
+        after_key = decode_cursor(cursor) if cursor else None
+
+        keys = sorted(
+            (
+                (r.get("created_at", ""), r["workflow_id"])
+                for r in self._matching(status, created_after, created_before)
+            ),
+            reverse=True,
+        )
+        if after_key is not None:
+            keys = [key for key in keys if key < after_key]
+
+        page = keys[:limit]
+        records = [
+            {f: self._records[wid].get(f) for f in fields} for _, wid in page
+        ]
+        next_cursor = encode_cursor(*page[-1]) if len(keys) > limit else None
+        return records, next_cursor
+
+    def count(
+        self,
+        status: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+    ) -> int:
+        return sum(1 for _ in self._matching(status, created_after, created_before))
+
+    def _matching(
+        self,
+        status: Optional[str],
+        created_after: Optional[str],
+        created_before: Optional[str],
+    ) -> Iterator[Dict[str, Any]]:
+        """Records passing the list filters (same semantics as SQLite)"""
+        for r in list(self._records.values()):
+            created_at = r.get("created_at", "")
+            if (
+                (status is None or r.get("status") == status)
+                and (created_after is None or created_at > created_after)
+                and (created_before is None or created_at < created_before)
+            ):
+                yield r
+
+    def find_by_idempotency_key(self, key: str) -> Optional[Dict[str, Any]]:
+        for record in self._records.values():
+            if record.get("idempotency_key") == key:
+                return dict(record)
+        return None
+
+    def find_by_fingerprint(
+        self, fingerprint: str, statuses: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        matches = [
+            r for r in self._records.values()
+            if r.get("fingerprint") == fingerprint and r.get("status") in statuses
+        ]
+        if not matches:
+            return None
+        newest = max(matches, key=lambda r: r.get("created_at", ""))
+        return {k: v for k, v in newest.items() if k != "results"}
+
+    def get_status(self, workflow_id: str) -> Optional[str]:
+        record = self._records.get(workflow_id)
+        return record.get("status") if record is not None else None
+
+    def is_cancel_requested(self, workflow_id: str) -> bool:
+        record = self._records.get(workflow_id)
+        return bool(record and record.get("cancel_requested"))
+
+    def append_event(
+        self, workflow_id: str, event_type: str, data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        with self._lock:
+            events = self._events.setdefault(workflow_id, [])
+            event = {
+                "event_id": events[-1]["event_id"] + 1 if events else 1,
+                "workflow_id": workflow_id,
+                "type": event_type,
+                "timestamp": datetime.now().isoformat(),
+                "data": data,
+            }
+            events.append(event)
+        return event
+
+    def list_events(self, workflow_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        return [e for e in self._events.get(workflow_id, []) if e["event_id"] > after_id]
+
+    def trim_events(self, keep: int, workflow_id: Optional[str] = None) -> int:
+        deleted = 0
+        with self._lock:
+            ids = [workflow_id] if workflow_id is not None else list(self._events)
+            for wid in ids:
+                events = self._events.get(wid, [])
+                if len(events) > keep:
+                    deleted += len(events) - keep
+                    self._events[wid] = events[len(events) - keep:]
+        return deleted
+
+    def delete_finished(self, finished_before: str, statuses: List[str]) -> int:
+        with self._lock:
+            expired = [
+                wid for wid, r in self._records.items()
+                if r.get("status") in statuses
+                and (r.get("completed_at") or self._updated_at.get(wid, "")) < finished_before
+            ]
+            for wid in expired:
+                del self._records[wid]
+                self._events.pop(wid, None)
+                self._updated_at.pop(wid, None)
+        return len(expired)
+
+    def renew_leases(self, owner: str, lease_expires_at: str, statuses: List[str]) -> int:
+        with self._lock:
+            held = [
+                r for r in self._records.values()
+                if r.get("owner") == owner and r.get("status") in statuses
+            ]
+            for record in held:
+                record["lease_expires_at"] = lease_expires_at
+        return len(held)
+
+    def claim_expired(
+        self, owner: str, lease_expires_at: str, now: str, statuses: List[str]
+    ) -> List[Dict[str, Any]]:
+        claimed = []
+        with self._lock:
+            for record in self._records.values():
+                if record.get("status") in statuses and (
+                    record.get("lease_expires_at") or ""
+                ) < now:
+                    record["owner"] = owner
+                    record["lease_expires_at"] = lease_expires_at
+                    claimed.append({k: v for k, v in record.items() if k != "results"})
+        claimed.sort(key=lambda r: r.get("created_at", ""))
+        return claimed
+
+
+class SQLiteWorkflowRepository(WorkflowRepository):
+    """
+    Embedded SQLite repository
+
+    WAL journaling lets readers in other processes proceed while one worker
+    writes. Workflow records are indexed by id, status and created_at; stage
+    results live in a separate table and are written in a single transaction.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path,
+            timeout=30,
+            isolation_level=None,  # explicit transactions below
+            check_same_thread=False,
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS workflows (
+                    workflow_id   TEXT PRIMARY KEY,
+                    status        TEXT NOT NULL,
+                    scenario_type TEXT,
+                    created_at    TEXT NOT NULL,
+                    updated_at    TEXT NOT NULL,
+                    record        TEXT NOT NULL,
+                    fingerprint     TEXT,
+                    idempotency_key TEXT,
+                    owner            TEXT,
+                    lease_expires_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_workflows_status
+                    ON workflows (status, created_at, workflow_id);
+                CREATE INDEX IF NOT EXISTS idx_workflows_created_at
+                    ON workflows (created_at, workflow_id);
+
+                CREATE TABLE IF NOT EXISTS stage_results (
+                    workflow_id TEXT NOT NULL,
+                    stage       TEXT NOT NULL,
+                    payload     TEXT NOT NULL,
+                    updated_at  TEXT NOT NULL,
+                    PRIMARY KEY (workflow_id, stage)
+                );
+
+                CREATE TABLE IF NOT EXISTS workflow_events (
+                    workflow_id TEXT NOT NULL,
+                    event_id    INTEGER NOT NULL,
+                    type        TEXT NOT NULL,
+                    timestamp   TEXT NOT NULL,
+                    data        TEXT NOT NULL,
+                    PRIMARY KEY (workflow_id, event_id)
+                );
+                """
+            )
+
+            # Databases created before fingerprinting or leases lack these columns
+            columns = {
+                row["name"]
+                for row in self._conn.execute("PRAGMA table_info(workflows)")
+            }
+            for column in ("fingerprint", "idempotency_key", "owner", "lease_expires_at"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE workflows ADD COLUMN {column} TEXT")
+
+            self._conn.executescript(
+                """
+                CREATE INDEX IF NOT EXISTS idx_workflows_fingerprint
+                    ON workflows (fingerprint, created_at);
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_workflows_idempotency_key
+                    ON workflows (idempotency_key);
+                CREATE INDEX IF NOT EXISTS idx_workflows_owner
+                    ON workflows (owner, status);
+                """
+            )
+
+    def _write(self, statements: List[tuple]) -> None:
+        """Run (sql, params | [params]) statements in one transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in statements:
+                    if isinstance(params, list):
+                        self._conn.executemany(sql, params)
+                    else:
+                        self._conn.execute(sql, params)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _row_to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = json.loads(row["record"])
+        record["workflow_id"] = row["workflow_id"]
+        record["status"] = row["status"]
+        record["scenario_type"] = row["scenario_type"]
+        record["created_at"] = row["created_at"]
+        record["fingerprint"] = row["fingerprint"]
+        record["idempotency_key"] = row["idempotency_key"]
+        record["owner"] = row["owner"]
+        record["lease_expires_at"] = row["lease_expires_at"]
+        return record
+
+    def create(self, record: Dict[str, Any]) -> None:
+        now = datetime.now().isoformat()
+        created_at = record.get("created_at", now)
+        body = {k: v for k, v in record.items() if k not in _INDEXED_FIELDS}
+        try:
+            self._write([(
+                "INSERT INTO workflows "
+                "(workflow_id, status, scenario_type, created_at, updated_at, record, "
+                "fingerprint, idempotency_key, owner, lease_expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record["workflow_id"],
+                    record.get("status", "pending"),
+                    record.get("scenario_type"),
+                    created_at,
+                    now,
+                    to_json(body),
+                    record.get("fingerprint"),
+                    record.get("idempotency_key"),
+                    record.get("owner"),
+                    record.get("lease_expires_at"),
+                ),
+            )])
+        except sqlite3.IntegrityError:
+            # The UNIQUE index on idempotency_key settles concurrent submissions
+            key = record.get("idempotency_key")
+            if key is not None and self.find_by_idempotency_key(key) is not None:
+                raise DuplicateIdempotencyKeyError(key)
+            raise
+
+    def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT * FROM workflows WHERE workflow_id = ?", (workflow_id,)
+        )
+        if not rows:
+            return None
+
+        record = self._row_to_record(rows[0])
+        stage_rows = self._query(
+            "SELECT stage, payload FROM stage_results WHERE workflow_id = ? "
+            "ORDER BY rowid",
+            (workflow_id,),
+        )
+        if stage_rows:
+            results = record.setdefault("results", {})
+            results["stages"] = {
+                r["stage"]: json.loads(r["payload"]) for r in stage_rows
+            }
+        return record
+
+    def update(self, workflow_id: str, **fields: Any) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM workflows WHERE workflow_id = ?", (workflow_id,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return
+
+                record = self._row_to_record(row)
+                record.update(fields)
+                body = {k: v for k, v in record.items() if k not in _INDEXED_FIELDS}
+                self._conn.execute(
+                    "UPDATE workflows SET status = ?, scenario_type = ?, owner = ?, "
+                    "lease_expires_at = ?, updated_at = ?, record = ? WHERE workflow_id = ?",
+                    (
+                        record["status"],
+                        record.get("scenario_type"),
+                        record.get("owner"),
+                        record.get("lease_expires_at"),
+                        datetime.now().isoformat(),
+                        to_json(body),
+                        workflow_id,
+                    ),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def save_results(self, workflow_id: str, results: Dict[str, Any]) -> None:
+        now = datetime.now().isoformat()
+        stages = results.get("stages", {})
+        summary = {k: v for k, v in results.items() if k != "stages"}
+
+        with self._lock:
+            # Read and rewrite the record in one transaction so a concurrent
+            # update() from another process is not overwritten
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT record FROM workflows WHERE workflow_id = ?", (workflow_id,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return
+
+                body = json.loads(row["record"])
+                body["results"] = summary
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO stage_results "
+                    "(workflow_id, stage, payload, updated_at) VALUES (?, ?, ?, ?)",
+                    [
+                        (workflow_id, stage, to_json(payload), now)
+                        for stage, payload in stages.items()
+                    ],
+                )
+                self._conn.execute(
+                    "UPDATE workflows SET updated_at = ?, record = ? WHERE workflow_id = ?",
+                    (now, to_json(body), workflow_id),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def save_stage_result(self, workflow_id: str, stage: str, result: Any) -> None:
+        self._write([(
+            "INSERT OR REPLACE INTO stage_results "
+            "(workflow_id, stage, payload, updated_at) VALUES (?, ?, ?, ?)",
+            (workflow_id, stage, to_json(result), datetime.now().isoformat()),
+        )])
+
+    def delete(self, workflow_id: str) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM stage_results WHERE workflow_id = ?", (workflow_id,)
+                )
+                self._conn.execute(
+                    "DELETE FROM workflow_events WHERE workflow_id = ?", (workflow_id,)
+                )
+                cursor = self._conn.execute(
+                    "DELETE FROM workflows WHERE workflow_id = ?", (workflow_id,)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount > 0
+
+    def list(
+        self, status: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM workflows"
+        params: tuple = ()
+        if status is not None:
+            sql += " WHERE status = ?"
+            params = (status,)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return [self._row_to_record(row) for row in self._query(sql, params)]
+
+    def list_page(
+        self,
+        status: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        fields = _projection(fields)
+
+        # Indexed columns are read directly; everything else is extracted
+        # from the record JSON without materializing the whole document
+        columns = ["workflow_id AS _cursor_id", "created_at AS _cursor_created"]
+        for field in fields:
+            if field in _INDEXED_FIELDS:
+                columns.append(f"{field} AS {field}")
+            else:
+                columns.append(f"json_extract(record, '$.{field}') AS {field}")
+
+        where, params = self._filters(status, created_after, created_before)
+        if cursor:
+            cursor_created, cursor_id = decode_cursor(cursor)
+            where.append("(created_at < ? OR (created_at = ? AND workflow_id < ?))")
+            params.extend([cursor_created, cursor_created, cursor_id])
+
+        sql = f"SELECT {', '.join(columns)} FROM workflows"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, workflow_id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._query(sql, tuple(params))
+        page = rows[:limit]
+        records = [{field: row[field] for field in fields} for row in page]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(last["_cursor_created"], last["_cursor_id"])
+        return records, next_cursor
+
+    def count(
+        self,
+        status: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+    ) -> int:
+        where, params = self._filters(status, created_after, created_before)
+        sql = "SELECT COUNT(*) FROM workflows"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._query(sql, tuple(params))[0][0]
+
+    @staticmethod
+    def _filters(
+        status: Optional[str],
+        created_after: Optional[str],
+        created_before: Optional[str],
+    ) -> Tuple[List[str], List[Any]]:
+        """WHERE clauses and parameters shared by list_page and count"""
+        where = []
+        params: List[Any] = []
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if created_after is not None:
+            where.append("created_at > ?")
+            params.append(created_after)
+        if created_before is not None:
+            where.append("created_at < ?")
+            params.append(created_before)
+        return where, params
+
+    def find_by_idempotency_key(self, key: str) -> Optional[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT * FROM workflows WHERE idempotency_key = ?", (key,)
+        )
+        return self._row_to_record(rows[0]) if rows else None
+
+    def find_by_fingerprint(
+        self, fingerprint: str, statuses: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        placeholders = ", ".join("?" for _ in statuses)
+        rows = self._query(
+            f"SELECT * FROM workflows WHERE fingerprint = ? "
+            f"AND status IN ({placeholders}) ORDER BY created_at DESC LIMIT 1",
+            (fingerprint, *statuses),
+        )
+        if not rows:
+            return None
+        record = self._row_to_record(rows[0])
+        record.pop("results", None)
+        return record
+
+    def get_status(self, workflow_id: str) -> Optional[str]:
+        rows = self._query(
+            "SELECT status FROM workflows WHERE workflow_id = ?", (workflow_id,)
+        )
+        return rows[0]["status"] if rows else None
+
+    def is_cancel_requested(self, workflow_id: str) -> bool:
+        rows = self._query(
+            "SELECT json_extract(record, '$.cancel_requested') FROM workflows "
+            "WHERE workflow_id = ?",
+            (workflow_id,),
+        )
+        return bool(rows and rows[0][0])
+
+    def append_event(
+        self, workflow_id: str, event_type: str, data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            # The sequence is assigned inside the write transaction so ids
+            # stay gap-free and ordered across worker processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT COALESCE(MAX(event_id), 0) FROM workflow_events "
+                    "WHERE workflow_id = ?",
+                    (workflow_id,),
+                ).fetchone()
+                event_id = row[0] + 1
+                self._conn.execute(
+                    "INSERT INTO workflow_events "
+                    "(workflow_id, event_id, type, timestamp, data) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (workflow_id, event_id, event_type, timestamp, to_json(data)),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return {
+            "event_id": event_id,
+            "workflow_id": workflow_id,
+            "type": event_type,
+            "timestamp": timestamp,
+            "data": data,
+        }
+
+    def list_events(self, workflow_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT * FROM workflow_events WHERE workflow_id = ? AND event_id > ? "
+            "ORDER BY event_id",
+            (workflow_id, after_id),
+        )
+        return [
+            {
+                "event_id": row["event_id"],
+                "workflow_id": row["workflow_id"],
+                "type": row["type"],
+                "timestamp": row["timestamp"],
+                "data": json.loads(row["data"]),
+            }
+            for row in rows
+        ]
+
+    def trim_events(self, keep: int, workflow_id: Optional[str] = None) -> int:
+        # Event ids are gap-free per workflow, so the newest `keep` are
+        # those within `keep` of the workflow's highest id
+        sql = (
+            "DELETE FROM workflow_events WHERE event_id <= ("
+            "SELECT MAX(e.event_id) FROM workflow_events e "
+            "WHERE e.workflow_id = workflow_events.workflow_id) - ?"
+        )
+        params: tuple = (keep,)
+        if workflow_id is not None:
+            sql += " AND workflow_id = ?"
+            params += (workflow_id,)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(sql, params)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    def delete_finished(self, finished_before: str, statuses: List[str]) -> int:
+        placeholders = ", ".join("?" for _ in statuses)
+        finished = (
+            f"status IN ({placeholders}) "
+            "AND COALESCE(json_extract(record, '$.completed_at'), updated_at) < ?"
+        )
+        expired = f"SELECT workflow_id FROM workflows WHERE {finished}"
+        params = (*statuses, finished_before)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ("stage_results", "workflow_events"):
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE workflow_id IN ({expired})", params
+                    )
+                cursor = self._conn.execute(f"DELETE FROM workflows WHERE {finished}", params)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    def renew_leases(self, owner: str, lease_expires_at: str, statuses: List[str]) -> int:
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE workflows SET lease_expires_at = ? "
+                    f"WHERE owner = ? AND status IN ({placeholders})",
+                    (lease_expires_at, owner, *statuses),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    def claim_expired(
+        self, owner: str, lease_expires_at: str, now: str, statuses: List[str]
+    ) -> List[Dict[str, Any]]:
+        placeholders = ", ".join("?" for _ in statuses)
+        expired = (
+            f"status IN ({placeholders}) "
+            "AND (lease_expires_at IS NULL OR lease_expires_at < ?)"
+        )
+        candidates = self._query(
+            f"SELECT * FROM workflows WHERE {expired} ORDER BY created_at",
+            (*statuses, now),
+        )
+
+        claimed = []
+        for row in candidates:
+            # Another process may have claimed (or finished) it since the
+            # SELECT; the condition is re-checked by the UPDATE itself
+            with self._lock:
+                cursor = self._conn.execute(
+                    "UPDATE workflows SET owner = ?, lease_expires_at = ? "
+                    f"WHERE workflow_id = ? AND {expired}",
+                    (owner, lease_expires_at, row["workflow_id"], *statuses, now),
+                )
+            if cursor.rowcount == 1:
+                record = self._row_to_record(row)
+                record.pop("results", None)
+                record.update(owner=owner, lease_expires_at=lease_expires_at)
+                claimed.append(record)
+        return claimed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class StoreWriter:
+    """
+    Runs repository calls on one dedicated thread, in submission order
+
+    SQLite writes take BEGIN IMMEDIATE and may wait up to busy_timeout for
+    another process's transaction; the API server hands them to this
+    thread so they never block the event loop. Calls that only need to be
+    ordered (progress, events, checkpoints) are submitted without waiting.
+    The thread is started on first use, also after close().
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queue a call; the future holds its result"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="workflow-store"
+                )
+            return self._executor.submit(fn, *args, **kwargs)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Queue a call and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def close(self) -> None:
+        """Finish the queued calls and stop the thread"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def create_workflow_repository() -> WorkflowRepository:
+    """Create the repository configured by WORKFLOW_STORE"""
+    backend = config.WORKFLOW_STORE
+
+    if backend == "sqlite":
+        return SQLiteWorkflowRepository(config.WORKFLOW_DB_PATH)
+    elif backend == "memory":
+        return InMemoryWorkflowRepository()
+    else:
+        raise ValueError(
+            f"Invalid WORKFLOW_STORE: {backend}. Must be 'sqlite' or 'memory'"
+        )